@@ -16,9 +16,12 @@ def get_app() -> object:
     return _app
 
 
-try:
-    app = get_app()
-except ImportError:  # pragma: no cover - en entornos sin dependencias opcionales
-    app = None
-
-application = app
+def __getattr__(name: str) -> object:
+    # Importar ``challenge`` (p. ej. desde procesos worker o el pipeline) ya no
+    # arrastra la inicialización de la API; solo acceder a ``app`` la dispara.
+    if name in {"app", "application"}:
+        try:
+            return get_app()
+        except ImportError:  # pragma: no cover - en entornos sin dependencias opcionales
+            return None
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -4,17 +4,49 @@
 
 from __future__ import annotations
 
+import asyncio
 import io
+import json
 import logging
 import os
 import pickle
+import tempfile
+import time
 from datetime import datetime
 from pathlib import Path
-from typing import List, Sequence, Union
+from typing import List, Optional, Sequence, Union
 
 import uvicorn
-from fastapi import FastAPI, HTTPException
+from fastapi import BackgroundTasks, FastAPI, HTTPException, Request, Response
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from pydantic import ValidationError
 from pydantic import BaseModel
+from starlette.requests import ClientDisconnect
+
+try:
+    from .bundle import MAGIC as BUNDLE_MAGIC, ModelBundle, load_bundle, load_model
+    from .executor import DeadlineExceeded, ExecutorSaturated, InferenceExecutor
+    from .hashing import HASHED_COLUMNS
+    from .ledger import PredictionLedger
+    from .monitor import DistributionMonitor, vocabulary_from_features
+    from .profiling import RequestProfiler
+    from .registry import CANARY, SHADOW, ModelEntry, ModelRegistry, parse_candidates
+    from .segments import SegmentedModel
+    from .serve import process_memory
+    from .warmup import WarmUp, parse_batch_sizes
+    from .workers import ProcessInferencePool, WorkerCrashed, default_loader
+except ImportError:  # pragma: no cover - standalone execution inside the API image
+    from bundle import MAGIC as BUNDLE_MAGIC, ModelBundle, load_bundle, load_model
+    from executor import DeadlineExceeded, ExecutorSaturated, InferenceExecutor
+    from hashing import HASHED_COLUMNS
+    from ledger import PredictionLedger
+    from monitor import DistributionMonitor, vocabulary_from_features
+    from profiling import RequestProfiler
+    from registry import CANARY, SHADOW, ModelEntry, ModelRegistry, parse_candidates
+    from segments import SegmentedModel
+    from serve import process_memory
+    from warmup import WarmUp, parse_batch_sizes
+    from workers import ProcessInferencePool, WorkerCrashed, default_loader
 
 
 def _env_flag(name: str, default: bool = False) -> bool:
@@ -24,24 +56,69 @@ def _env_flag(name: str, default: bool = False) -> bool:
     return value.lower() in {"1", "true", "yes", "on"}
 
 
+def _env_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    if value is None or not value.strip():
+        return default
+    return int(value)
+
+
+def _env_float(name: str, default: float) -> float:
+    value = os.getenv(name)
+    if value is None or not value.strip():
+        return default
+    return float(value)
+
+
 GCS_BUCKET_NAME = os.getenv("GCS_BUCKET_NAME", "latam-challenge-storage")
 GCS_MODEL_BLOB_PATH = os.getenv("GCS_MODEL_BLOB_PATH", "latam-model/xgb_model.pkl")
 BQ_TABLE_ID = os.getenv(
     "BQ_TABLE_ID", "mlops-latam.latam_model_results.table_preds_model_latam"
 )
 
-DEFAULT_MODEL_PATH = Path(__file__).resolve().parents[1] / "xgb_model.pkl"
+# DelayModel.fit writes a bundle; the legacy pickle is still served when no bundle exists.
+# Per-segment models (DelayModel.fit_segments) are served by pointing MODEL_LOCAL_PATH to their directory.
+_MODEL_DIR = Path(__file__).resolve().parents[1]
+DEFAULT_MODEL_PATH = next(
+    (path for path in (_MODEL_DIR / "xgb_model.bundle", _MODEL_DIR / "xgb_model.pkl") if path.exists()),
+    _MODEL_DIR / "xgb_model.pkl",
+)
 MODEL_LOCAL_PATH = Path(os.getenv("MODEL_LOCAL_PATH", DEFAULT_MODEL_PATH))
 DISABLE_GCP = _env_flag("CHALLENGE_API_DISABLE_GCP", False)
 ENABLE_BIGQUERY = _env_flag("CHALLENGE_API_ENABLE_BQ", False)
 FAKE_MODEL_MODE = _env_flag("CHALLENGE_API_FAKE_MODEL", False)
+INFERENCE_WORKERS = _env_int("CHALLENGE_API_INFERENCE_WORKERS", 2)
+INFERENCE_QUEUE_SIZE = _env_int("CHALLENGE_API_INFERENCE_QUEUE", 16)
+INFERENCE_TIMEOUT_MS = _env_int("CHALLENGE_API_INFERENCE_TIMEOUT_MS", 5000)
+PROCESS_WORKERS = _env_int("CHALLENGE_API_PROCESS_WORKERS", 0)
+PROCESS_MAX_ROWS = _env_int("CHALLENGE_API_PROCESS_MAX_ROWS", 4096)
+PRIMARY_MODEL_NAME = os.getenv("CHALLENGE_API_MODEL_NAME", "primary")
+CANARY_MODELS = os.getenv("CHALLENGE_API_CANARY_MODELS", "")
+SHADOW_MODELS = os.getenv("CHALLENGE_API_SHADOW_MODELS", "")
+MODEL_VARIANT_HEADER = "X-Model-Variant"
+STREAM_CHUNK_SIZE = _env_int("CHALLENGE_API_STREAM_CHUNK_SIZE", 1000)
+STREAM_MAX_LINE_BYTES = _env_int("CHALLENGE_API_STREAM_MAX_LINE_BYTES", 64 * 1024)
+PROFILE_SAMPLE_RATE = _env_float("CHALLENGE_API_PROFILE_RATE", 0.0)
+PROFILE_TOKEN = os.getenv("CHALLENGE_API_PROFILE_TOKEN")
+PROFILE_CAPACITY = _env_int("CHALLENGE_API_PROFILE_CAPACITY", 32)
+MONITOR_BUCKET_SECONDS = _env_float("CHALLENGE_API_MONITOR_BUCKET_SECONDS", 10.0)
+MONITOR_WINDOW_BUCKETS = _env_int("CHALLENGE_API_MONITOR_WINDOW_BUCKETS", 30)
+MONITOR_TUMBLING_SECONDS = _env_float("CHALLENGE_API_MONITOR_TUMBLING_SECONDS", 300.0)
+LEDGER_DIR = os.getenv("CHALLENGE_API_LEDGER_DIR")
+LEDGER_SEGMENT_ROWS = _env_int("CHALLENGE_API_LEDGER_SEGMENT_ROWS", 100_000)
+LEDGER_SEGMENT_SECONDS = _env_float("CHALLENGE_API_LEDGER_SEGMENT_SECONDS", 3600.0)
+LEDGER_FSYNC_MS = _env_int("CHALLENGE_API_LEDGER_FSYNC_MS", 1000)
+WARMUP_ENABLED = _env_flag("CHALLENGE_API_WARMUP", True)
+WARMUP_BATCH_SIZES = parse_batch_sizes(os.getenv("CHALLENGE_API_WARMUP_BATCH_SIZES"))
+WARMUP_ROUNDS = _env_int("CHALLENGE_API_WARMUP_ROUNDS", 2)
 
 if not FAKE_MODEL_MODE:
+    import numpy as np
     import pandas as pd
     from google.api_core.exceptions import NotFound
     from google.cloud import bigquery, storage
 else:  # pragma: no cover - optional dependencies are unnecessary under fake mode
-    pd = None  # type: ignore
+    np = pd = None  # type: ignore
     NotFound = Exception  # type: ignore
     bigquery = storage = None  # type: ignore
 
@@ -56,6 +133,10 @@ logger = logging.getLogger(__name__)
 xgb_model = None
 feature_names: List[str] = []
 bq_client = None
+process_pool = None
+# Pickle written for the workers when the model did not come from a local file; removed on shutdown.
+worker_artifact_tmp: Optional[Path] = None
+prediction_ledger = None
 
 
 def _extract_feature_names(model) -> List[str]:
@@ -72,15 +153,8 @@ def _extract_feature_names(model) -> List[str]:
 
 
 def _load_local_model(path: Path):
-    try:
-        from joblib import load as joblib_load  # type: ignore
-
-        logger.info("Loading model from local artifact: %s", path)
-        return joblib_load(path)
-    except Exception as exc:
-        logger.debug("joblib.load failed (%s); falling back to pickle.", exc)
-        with path.open("rb") as handler:
-            return pickle.load(handler)
+    logger.info("Loading model from local artifact: %s", path)
+    return load_model(path)
 
 
 def initialize_model() -> None:
@@ -111,12 +185,18 @@ def initialize_model() -> None:
         blob = bucket.blob(GCS_MODEL_BLOB_PATH)
         model_bytes = blob.download_as_bytes()
 
-        try:
-            from joblib import load as joblib_load  # type: ignore
+        if model_bytes.startswith(BUNDLE_MAGIC):
+            # Bundles are memory-mapped, so they need a backing file shared by all workers.
+            cache_path = Path(tempfile.gettempdir()) / Path(GCS_MODEL_BLOB_PATH).name
+            cache_path.write_bytes(model_bytes)
+            model = load_bundle(cache_path)
+        else:
+            try:
+                from joblib import load as joblib_load  # type: ignore
 
-            model = joblib_load(io.BytesIO(model_bytes))
-        except Exception:
-            model = pickle.loads(model_bytes)
+                model = joblib_load(io.BytesIO(model_bytes))
+            except Exception:
+                model = pickle.loads(model_bytes)
 
         xgb_model = model
         feature_names[:] = _extract_feature_names(model)
@@ -199,6 +279,75 @@ else:
     initialize_bigquery()
 
 
+def _load_candidate(path: str):
+    # Under fake mode a candidate can be declared as "fake" to exercise routing without artifacts.
+    if FAKE_MODEL_MODE and path == "fake":
+        return _FakeModel()
+    return _load_local_model(Path(path))
+
+
+def _build_registry() -> ModelRegistry:
+    registry = ModelRegistry(
+        ModelEntry(PRIMARY_MODEL_NAME, xgb_model, feature_names, source=str(MODEL_LOCAL_PATH))
+    )
+    for role, spec in ((CANARY, CANARY_MODELS), (SHADOW, SHADOW_MODELS)):
+        for candidate in parse_candidates(spec):
+            try:
+                model = _load_candidate(candidate["path"])
+            except Exception as exc:  # pragma: no cover - defensive fallback
+                logger.error("Could not load %s model '%s': %s", role, candidate["name"], exc, exc_info=True)
+                continue
+            registry.register(
+                ModelEntry(
+                    candidate["name"],
+                    model,
+                    _extract_feature_names(model),
+                    role=role,
+                    traffic_percent=candidate["percent"],
+                    source=candidate["path"],
+                )
+            )
+    return registry
+
+
+model_registry = _build_registry()
+
+
+def _build_monitor() -> DistributionMonitor:
+    if isinstance(xgb_model, ModelBundle):
+        vocabulary = {column: xgb_model.vocabulary(column) for column in xgb_model.schema}
+    elif feature_names:
+        vocabulary = vocabulary_from_features(feature_names)
+    else:
+        vocabulary = {
+            "OPERA": sorted(VALID_OPERAS),
+            "TIPOVUELO": sorted(VALID_TIPOVUELOS),
+            "MES": sorted(VALID_MESES),
+        }
+    # Only bundles written by DelayModel.fit carry the training distribution used as drift reference.
+    monitor = DistributionMonitor(
+        vocabulary,
+        reference=getattr(xgb_model, "training", None),
+        bucket_seconds=MONITOR_BUCKET_SECONDS,
+        window_buckets=MONITOR_WINDOW_BUCKETS,
+        tumbling_seconds=MONITOR_TUMBLING_SECONDS,
+    )
+    if feature_names:
+        monitor.bind_features(feature_names)
+    return monitor
+
+
+request_profiler = RequestProfiler(
+    sample_rate=PROFILE_SAMPLE_RATE, token=PROFILE_TOKEN, capacity=PROFILE_CAPACITY
+)
+inference_executor = InferenceExecutor(
+    max_workers=INFERENCE_WORKERS,
+    max_queue=INFERENCE_QUEUE_SIZE,
+    timeout=INFERENCE_TIMEOUT_MS / 1000.0,
+)
+model_warmup = WarmUp(WARMUP_BATCH_SIZES, rounds=WARMUP_ROUNDS, enabled=WARMUP_ENABLED)
+
+
 app = FastAPI(
     title="LATAM Flight Delay Prediction API",
     description="Predicts flight delay probability based on OPERA, MES and TIPOVUELO.",
@@ -210,6 +359,9 @@ class FlightData(BaseModel):
     OPERA: str
     MES: int
     TIPOVUELO: str
+    # High-cardinality inputs; only models trained with hashed or delay-rate features use them.
+    SIGLADES: Optional[str] = None
+    DIANOM: Optional[str] = None
 
 
 class BatchRequest(BaseModel):
@@ -226,6 +378,8 @@ VALID_OPERAS = {
 VALID_TIPOVUELOS = {"N", "I"}
 VALID_MESES = set(range(1, 13))
 
+prediction_monitor = _build_monitor()
+
 
 def _validate_flight(flight: FlightData) -> None:
     if flight.OPERA not in VALID_OPERAS:
@@ -236,13 +390,26 @@ def _validate_flight(flight: FlightData) -> None:
         raise HTTPException(status_code=400, detail="Invalid month (MES)")
 
 
-def _build_features(flights: Sequence[FlightData]):
+def _build_features(flights: Sequence[FlightData], model=None, names: Sequence[str] = None):
     if FAKE_MODEL_MODE:
         return flights
 
-    if xgb_model is None or not feature_names:
+    model = xgb_model if model is None else model
+    names = feature_names if names is None else names
+    if model is None or not names:
         raise HTTPException(status_code=500, detail="Model not available")
 
+    if isinstance(model, ModelBundle):
+        records = _flight_columns(flights)
+        columns = list(model.hashing["columns"]) if model.hashing else []
+        if model.rates is not None:
+            columns.extend(model.header["rates"]["columns"])
+        for column in columns:
+            if column in HASHED_COLUMNS and column not in records:
+                records[column] = [getattr(flight, column) for flight in flights]
+        # Delay rates are gathered from the bundle's precomputed table inside encode.
+        return model.encode(records)
+
     payload = [flight.dict() for flight in flights]
     df = pd.DataFrame(payload)
     df = pd.get_dummies(
@@ -251,42 +418,424 @@ def _build_features(flights: Sequence[FlightData]):
         prefix=["OPERA", "TIPOVUELO", "MES"],
     )
 
-    for column in feature_names:
+    for column in names:
         if column not in df.columns:
             df[column] = 0
 
-    df = df.reindex(columns=feature_names, fill_value=0)
+    df = df.reindex(columns=names, fill_value=0)
     return df
 
 
+def _predict_with(
+    entry: ModelEntry, flights: Sequence[FlightData], features=None, in_process: bool = False
+) -> List[int]:
+    if features is None:
+        features = _build_features(flights, entry.model, entry.feature_names)
+    elif not FAKE_MODEL_MODE and isinstance(features, np.ndarray) and not isinstance(entry.model, ModelBundle):
+        # Matrix shared from a bundle-encoded request; estimators fitted on frames expect names.
+        features = pd.DataFrame(features, columns=entry.feature_names)
+    if entry is model_registry.primary and process_pool is not None and not in_process:
+        raw_predictions = process_pool.predict(np.asarray(features, dtype=np.float32))
+    else:
+        raw_predictions = entry.model.predict(features)
+    return [int(value) for value in raw_predictions]
+
+
+def _compare_with(entry: ModelEntry, flights: Sequence[FlightData], features=None) -> List[int]:
+    # Background comparisons never take a process-pool slot that live primary requests are waiting for.
+    return _predict_with(entry, flights, features, in_process=True)
+
+
+def _score_flights(
+    flights: Sequence[FlightData], entry: ModelEntry = None, observe: bool = True
+) -> List[int]:
+    entry = model_registry.primary if entry is None else entry
+    received = time.perf_counter()
+    features = _build_features(flights, entry.model, entry.feature_names)
+    started = time.perf_counter()
+    try:
+        predictions = _predict_with(entry, flights, features)
+    except ExecutorSaturated:
+        # Every inference process stayed busy: shed the request like a full queue (429).
+        raise
+    except WorkerCrashed as exc:
+        model_registry.record_error(entry)
+        logger.error("Inference worker crashed: %s", exc)
+        raise HTTPException(status_code=503, detail="Inference worker unavailable") from exc
+    except Exception as exc:
+        model_registry.record_error(entry)
+        logger.error("Model inference failed: %s", exc, exc_info=True)
+        raise HTTPException(status_code=500, detail="Internal prediction error") from exc
+
+    if observe:
+        finished = time.perf_counter()
+        model_registry.record(entry, len(predictions), finished - started, predictions)
+        # Same span as the warm-up calls: encoding plus prediction.
+        model_warmup.record_request(len(predictions), finished - received)
+        model_registry.compare_async(entry, flights, features, predictions, _compare_with)
+        records = None
+        if prediction_ledger is not None:
+            records = _flight_columns(flights)
+            try:
+                prediction_ledger.append(entry.name, records, predictions)
+            except Exception as exc:  # pragma: no cover - defensive, the response is already computed
+                logger.error("Failed to append predictions to the ledger: %s", exc, exc_info=True)
+        try:
+            _monitor_request(entry, flights, features, predictions, records)
+        except Exception as exc:
+            logger.error("Failed to record predictions in the monitor: %s", exc, exc_info=True)
+    return predictions
+
+
+def _flight_columns(flights: Sequence[FlightData]):
+    return {
+        "OPERA": [flight.OPERA for flight in flights],
+        "TIPOVUELO": [flight.TIPOVUELO for flight in flights],
+        "MES": [flight.MES for flight in flights],
+    }
+
+
+def _monitor_request(entry: ModelEntry, flights: Sequence[FlightData], features, predictions, records=None) -> None:
+    if entry is not model_registry.primary:
+        # Canary answers are tracked by the registry; the monitor follows the served primary model.
+        return
+    if FAKE_MODEL_MODE or features is None:
+        prediction_monitor.observe(predictions, records=records or _flight_columns(flights))
+    else:
+        prediction_monitor.observe(predictions, matrix=features)
+
+
+class _DuplexStreamingResponse(StreamingResponse):
+    """
+    Streams the response while the request body is still being read.
+
+    StreamingResponse listens on ``receive`` for disconnects, which would steal
+    the body chunks the generator is consuming; disconnects surface instead as
+    ``ClientDisconnect`` from ``request.stream()``.
+    """
+
+    async def __call__(self, scope, receive, send) -> None:
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+
+def _parse_stream_line(line: bytes) -> FlightData:
+    try:
+        flight = FlightData.parse_raw(line)
+    except ValidationError as exc:
+        raise HTTPException(status_code=400, detail="Invalid flight record") from exc
+    _validate_flight(flight)
+    return flight
+
+
+async def _score_stream_chunk(pending, entry) -> bytes:
+    flights = [item for _, item in pending if isinstance(item, FlightData)]
+    predictions = iter([])
+    if flights:
+        deadline = time.monotonic() + inference_executor.timeout
+        while True:
+            try:
+                predictions = iter(await inference_executor.run(_score_flights, flights, entry))
+                break
+            except ExecutorSaturated:
+                # Stop reading the body until a worker frees up; the client sees TCP backpressure.
+                if time.monotonic() > deadline:
+                    raise
+                await asyncio.sleep(0.05)
+
+    lines = []
+    for line_number, item in pending:
+        if isinstance(item, FlightData):
+            lines.append({"line": line_number, "delay_prediction": next(predictions)})
+        else:
+            lines.append({"line": line_number, "error": item})
+    return "".join(json.dumps(line) + "\n" for line in lines).encode("utf-8")
+
+
+async def _stream_predictions(request: Request, entry):
+    buffer = bytearray()
+    pending = []
+    line_number = 0
+    oversized = False
+
+    def consume(line: Optional[bytes]) -> None:
+        # ``None`` stands for a line longer than STREAM_MAX_LINE_BYTES, whose bytes were dropped.
+        nonlocal line_number
+        line_number += 1
+        if line is None or len(line) > STREAM_MAX_LINE_BYTES:
+            pending.append((line_number, f"Line exceeds {STREAM_MAX_LINE_BYTES} bytes"))
+            return
+        if not line.strip():
+            return
+        try:
+            pending.append((line_number, _parse_stream_line(line)))
+        except HTTPException as exc:
+            pending.append((line_number, exc.detail))
+
+    try:
+        async for data in request.stream():
+            buffer.extend(data)
+            start = 0
+            while True:
+                newline = buffer.find(b"\n", start)
+                if newline < 0:
+                    break
+                consume(None if oversized else bytes(buffer[start:newline]))
+                oversized = False
+                start = newline + 1
+                if len(pending) >= STREAM_CHUNK_SIZE:
+                    yield await _score_stream_chunk(pending, entry)
+                    pending = []
+            del buffer[:start]
+            if len(buffer) > STREAM_MAX_LINE_BYTES:
+                # Drop the rest of an oversized line instead of buffering it until its newline.
+                oversized = True
+                buffer.clear()
+
+        if oversized or buffer:
+            consume(None if oversized else bytes(buffer))
+        if pending:
+            yield await _score_stream_chunk(pending, entry)
+    except ClientDisconnect:
+        raise
+    except (ExecutorSaturated, DeadlineExceeded) as exc:
+        logger.warning("Streaming prediction aborted: %s", exc)
+        yield _stream_error(str(exc))
+    except HTTPException as exc:
+        # The 200 status line is already sent: end the body with an explicit error line.
+        logger.warning("Streaming prediction aborted: %s", exc.detail)
+        yield _stream_error(exc.detail)
+    except Exception as exc:
+        logger.error("Streaming prediction failed: %s", exc, exc_info=True)
+        yield _stream_error("Internal prediction error")
+
+
+def _stream_error(message: str) -> bytes:
+    return (json.dumps({"error": message}) + "\n").encode("utf-8")
+
+
+async def _run_inference(fn, *args):
+    try:
+        return await inference_executor.run(fn, *args)
+    except ExecutorSaturated as exc:
+        logger.warning("Inference queue full; shedding request.")
+        raise HTTPException(
+            status_code=429, detail="Inference queue is full", headers={"Retry-After": "1"}
+        ) from exc
+    except DeadlineExceeded as exc:
+        logger.warning("Inference deadline exceeded; shedding request.")
+        raise HTTPException(status_code=503, detail="Inference deadline exceeded") from exc
+
+
+def _worker_artifact() -> Path:
+    global worker_artifact_tmp
+
+    if isinstance(xgb_model, ModelBundle):
+        return Path(xgb_model.path)
+    if MODEL_LOCAL_PATH.exists():
+        return MODEL_LOCAL_PATH
+
+    # The model came from GCS: persist the in-memory copy so workers load the same one.
+    handle, path = tempfile.mkstemp(prefix="latam-model-", suffix=".pkl")
+    with os.fdopen(handle, "wb") as artifact:
+        pickle.dump(xgb_model, artifact)
+    worker_artifact_tmp = Path(path)
+    return worker_artifact_tmp
+
+
+def _remove_worker_artifact() -> None:
+    global worker_artifact_tmp
+
+    if worker_artifact_tmp is not None:
+        worker_artifact_tmp.unlink(missing_ok=True)
+        worker_artifact_tmp = None
+
+
+@app.on_event("startup")
+def _start_process_pool() -> None:
+    global process_pool
+
+    if PROCESS_WORKERS <= 0 or FAKE_MODEL_MODE or xgb_model is None or not feature_names:
+        return
+
+    try:
+        process_pool = ProcessInferencePool(
+            default_loader(_worker_artifact()),
+            n_features=len(feature_names),
+            processes=PROCESS_WORKERS,
+            max_rows=PROCESS_MAX_ROWS,
+            timeout=INFERENCE_TIMEOUT_MS / 1000.0,
+        )
+    except Exception:
+        _remove_worker_artifact()
+        raise
+
+
+@app.on_event("startup")
+def _open_ledger() -> None:
+    global prediction_ledger
+
+    # Opened per serving process: pre-fork workers each append to their own segments.
+    if LEDGER_DIR and prediction_ledger is None:
+        prediction_ledger = PredictionLedger(
+            LEDGER_DIR,
+            segment_rows=LEDGER_SEGMENT_ROWS,
+            segment_seconds=LEDGER_SEGMENT_SECONDS,
+            fsync_interval=LEDGER_FSYNC_MS / 1000.0,
+        )
+
+
+def warm_up_grid() -> List[FlightData]:
+    return [
+        FlightData(OPERA=opera, MES=month, TIPOVUELO=flight_type)
+        for opera in sorted(VALID_OPERAS)
+        for flight_type in sorted(VALID_TIPOVUELOS)
+        for month in sorted(VALID_MESES)
+    ]
+
+
+def _warm_up_targets():
+    if xgb_model is None:
+        raise HTTPException(status_code=500, detail="Model not available")
+    # Shadows and canaries are warmed too: their first comparisons would otherwise run cold.
+    for entry in model_registry.entries:
+        yield entry.name, lambda flights, entry=entry: _score_flights(flights, entry, observe=False)
+    # Runs once every target is warmed, before the warm-up reports ready.
+    if isinstance(xgb_model, SegmentedModel):
+        xgb_model.reset_counters()
+
+
+def warm_up() -> bool:
+    """Warms every registered model synchronously (used by the pre-fork parent)."""
+    return model_warmup.run(_warm_up_targets(), warm_up_grid())
+
+
+@app.on_event("startup")
+def _start_warm_up() -> None:
+    # Forked workers inherit a warmed parent; only new inference processes need another pass.
+    if model_warmup.ready and process_pool is None:
+        return
+    model_warmup.start(_warm_up_targets(), warm_up_grid())
+
+
+@app.on_event("shutdown")
+def _shutdown_executor() -> None:
+    global process_pool, prediction_ledger
+
+    model_warmup.stop()
+    inference_executor.shutdown(wait=False)
+    model_registry.shutdown(wait=False)
+    if process_pool is not None:
+        process_pool.close()
+        process_pool = None
+    _remove_worker_artifact()
+    if prediction_ledger is not None:
+        prediction_ledger.close()
+        prediction_ledger = None
+
+
 @app.get("/health", status_code=200)
-def health_check():
+async def health_check():
     return {"status": "ok"}
 
 
+@app.get("/ready", status_code=200)
+async def readiness_check(response: Response):
+    if not model_warmup.ready:
+        response.status_code = 503
+    return model_warmup.snapshot()
+
+
+@app.get("/metrics", status_code=200)
+async def metrics():
+    snapshot = {"inference": inference_executor.snapshot(), "memory": process_memory()}
+    if process_pool is not None:
+        snapshot["process_workers"] = process_pool.snapshot()
+    if prediction_ledger is not None:
+        snapshot["ledger"] = prediction_ledger.snapshot()
+    if isinstance(xgb_model, SegmentedModel):
+        snapshot["segments"] = xgb_model.snapshot()
+    return snapshot
+
+
+def _require_profile_access(request: Request) -> None:
+    if request_profiler.token is None:
+        raise HTTPException(status_code=404, detail="Profiling admin endpoints are disabled")
+    if not request_profiler.is_authorized(request.headers):
+        raise HTTPException(status_code=403, detail="Invalid profiling token")
+
+
+@app.get("/admin/profiles", status_code=200)
+async def list_profiles(request: Request):
+    _require_profile_access(request)
+    return {"profiles": request_profiler.list()}
+
+
+@app.get("/admin/profiles/{profile_id}", status_code=200)
+async def download_profile(profile_id: int, request: Request, format: str = "text"):
+    _require_profile_access(request)
+    record = request_profiler.get(profile_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    if format == "pstats":
+        return Response(
+            content=record.as_pstats(),
+            media_type="application/octet-stream",
+            headers={"Content-Disposition": f'attachment; filename="profile-{profile_id}.pstats"'},
+        )
+    return PlainTextResponse(record.as_text())
+
+
+@app.post("/predict/stream", status_code=200)
+async def predict_stream(request: Request):
+    entry = model_registry.route(request.headers.get(MODEL_VARIANT_HEADER))
+    return _DuplexStreamingResponse(
+        _stream_predictions(request, entry),
+        media_type="application/x-ndjson",
+        headers={MODEL_VARIANT_HEADER: entry.name},
+    )
+
+
+@app.get("/monitor", status_code=200)
+async def monitor():
+    return prediction_monitor.snapshot()
+
+
+@app.get("/models", status_code=200)
+async def models():
+    return model_registry.snapshot()
+
+
 @app.post("/predict", status_code=200)
-def predict_delay(payload: Union[BatchRequest, FlightData]):
+async def predict_delay(
+    payload: Union[BatchRequest, FlightData],
+    request: Request,
+    response: Response,
+    background_tasks: BackgroundTasks,
+):
     flights = payload.flights if isinstance(payload, BatchRequest) else [payload]
 
     for flight in flights:
         _validate_flight(flight)
 
-    if FAKE_MODEL_MODE:
-        predictions = [0 for _ in flights]
-    else:
-        features_df = _build_features(flights)
-        try:
-            raw_predictions = xgb_model.predict(features_df)
-        except Exception as exc:
-            logger.error("Model inference failed: %s", exc, exc_info=True)
-            raise HTTPException(status_code=500, detail="Internal prediction error") from exc
-        predictions = [int(value) for value in raw_predictions.tolist()]
+    entry = model_registry.route(request.headers.get(MODEL_VARIANT_HEADER))
+    scorer = _score_flights
+    if request_profiler.enabled:
+        reason = request_profiler.select(request.headers)
+        if reason is not None:
+            scorer = request_profiler.wrap(_score_flights, f"/predict ({len(flights)} flights)", reason)
+
+    predictions = await _run_inference(scorer, flights, entry)
+    response.headers[MODEL_VARIANT_HEADER] = entry.name
+    if scorer is not _score_flights and request_profiler.get(scorer.profile_id) is not None:
+        response.headers["X-Profile-Id"] = str(scorer.profile_id)
 
     if isinstance(payload, BatchRequest):
         return {"predict": predictions}
 
     result = predictions[0]
-    log_prediction_to_bigquery(payload, result)
+    background_tasks.add_task(log_prediction_to_bigquery, payload, result)
     return {
         "delay_prediction": result,
         "details": {
@@ -0,0 +1,529 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Memory-mappable model bundle.
+
+A bundle is a single file laid out as::
+
+    magic (8 bytes) | format version (uint32) | reserved (uint32) | header length (uint64)
+    JSON header (schema, feature columns, threshold, estimator config, training
+                 metadata, array index, payload checksum)
+    payload: numeric arrays, each starting on a 64-byte boundary
+
+The payload holds the estimator parameters (linear coefficients or flattened
+tree arrays), the encoder vocabulary and the category -> feature lookup table.
+Since format version 2 it also carries the estimator in its native
+serialization (XGBoost UBJSON) so the original object can be rebuilt with
+:meth:`ModelBundle.estimator`. Version 3 adds an optional ``hashing`` header
+entry for models that also take hashed high-cardinality columns (see
+``hashing.py``), and version 4 an optional ``rates`` entry plus the ``rates/*``
+arrays of the historical delay-rate table (see ``rates.py``); bundles are
+written with the oldest version able to describe them. Loading maps the file read-only, so it is
+near-instant and its pages are shared by every process that maps the same file.
+The rate table of an existing bundle can be refreshed with :func:`replace_rates`.
+
+Usage:
+
+    python -m challenge.api.bundle convert challenge/xgb_model.pkl challenge/xgb_model.bundle
+    python -m challenge.api.bundle inspect challenge/xgb_model.bundle
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import pickle
+import struct
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Union
+
+import numpy as np
+
+try:
+    from .hashing import feature_names as hashed_feature_names, hash_encode
+    from .rates import DelayRateTable, feature_names as rate_feature_names
+except ImportError:  # pragma: no cover - standalone execution inside the API image
+    from hashing import feature_names as hashed_feature_names, hash_encode
+    from rates import DelayRateTable, feature_names as rate_feature_names
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"LATAMMDL"
+FORMAT_VERSION = 4
+# Oldest format able to describe the bundle; hashed features need version 3 and delay rates version 4.
+_BASE_VERSION = 2
+_HASHING_VERSION = 3
+_RATES_PREFIX = "rates/"
+_PREFIX = struct.Struct("<8sIIQ")
+_ALIGNMENT = 64
+_ROW_BLOCK = 4096
+
+# Categorical inputs and their value types, in the order used by the one-hot encoding.
+DEFAULT_SCHEMA = {"OPERA": "str", "TIPOVUELO": "str", "MES": "int"}
+
+PathLike = Union[str, os.PathLike]
+
+
+class BundleError(ValueError):
+    """Raised when a bundle is malformed, corrupted or of an unsupported version."""
+
+
+def is_bundle(path: PathLike) -> bool:
+    try:
+        with open(path, "rb") as handler:
+            return handler.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+
+def _align(offset: int) -> int:
+    return (offset + _ALIGNMENT - 1) // _ALIGNMENT * _ALIGNMENT
+
+
+def _vocabulary_arrays(feature_columns: Sequence[str], schema: Mapping[str, str]) -> Dict[str, np.ndarray]:
+    arrays: Dict[str, np.ndarray] = {}
+    for column, kind in schema.items():
+        prefix = f"{column}_"
+        entries = [(index, name[len(prefix):]) for index, name in enumerate(feature_columns) if name.startswith(prefix)]
+        values = [value for _, value in entries]
+        if kind == "int":
+            arrays[f"vocab/{column}"] = np.asarray([int(value) for value in values], dtype=np.int64)
+        else:
+            encoded = [value.encode("utf-8") for value in values]
+            width = max((len(value) for value in encoded), default=1)
+            arrays[f"vocab/{column}"] = np.asarray(encoded, dtype=f"S{max(width, 1)}")
+        arrays[f"lookup/{column}"] = np.asarray([index for index, _ in entries], dtype=np.int32)
+    return arrays
+
+
+def _linear_arrays(model) -> Dict[str, np.ndarray]:
+    return {
+        "linear/coef": np.ascontiguousarray(np.ravel(model.coef_), dtype=np.float64),
+        "linear/intercept": np.ascontiguousarray(np.ravel(model.intercept_), dtype=np.float64),
+    }
+
+
+def _tree_arrays(model) -> Dict[str, Any]:
+    booster = model.get_booster()
+    document = json.loads(booster.save_raw("json"))
+    learner = document["learner"]
+    trees = learner["gradient_booster"]["model"]["trees"]
+    try:
+        best_iteration = model.best_iteration
+    except AttributeError:
+        best_iteration = None
+    if best_iteration is not None:
+        trees = trees[: int(best_iteration) + 1]
+
+    roots, features, thresholds, lefts, rights, defaults = [], [], [], [], [], []
+    offset = 0
+    max_depth = 0
+    for tree in trees:
+        left = np.asarray(tree["left_children"], dtype=np.int32)
+        right = np.asarray(tree["right_children"], dtype=np.int32)
+        is_leaf = left < 0
+        roots.append(offset)
+        features.append(np.where(is_leaf, -1, np.asarray(tree["split_indices"], dtype=np.int32)))
+        thresholds.append(np.asarray(tree["split_conditions"], dtype=np.float32))
+        lefts.append(np.where(is_leaf, -1, left + offset))
+        rights.append(np.where(is_leaf, -1, right + offset))
+        defaults.append(np.asarray(tree["default_left"], dtype=np.uint8))
+        max_depth = max(max_depth, _depth(left, right))
+        offset += left.shape[0]
+
+    base_score = float(learner["learner_model_param"]["base_score"])
+    return {
+        "arrays": {
+            "tree/roots": np.asarray(roots, dtype=np.int32),
+            "tree/feature": np.concatenate(features).astype(np.int32),
+            # For leaves XGBoost stores the leaf value in split_conditions.
+            "tree/value": np.concatenate(thresholds).astype(np.float32),
+            "tree/left": np.concatenate(lefts).astype(np.int32),
+            "tree/right": np.concatenate(rights).astype(np.int32),
+            "tree/default_left": np.concatenate(defaults).astype(np.uint8),
+        },
+        "params": {
+            "max_depth": max_depth,
+            "base_margin": float(np.log(base_score / (1.0 - base_score))),
+        },
+    }
+
+
+def _native_xgboost(model) -> np.ndarray:
+    # save_model (unlike Booster.save_raw) keeps the scikit-learn wrapper attributes.
+    with tempfile.TemporaryDirectory() as workdir:
+        target = os.path.join(workdir, "model.ubj")
+        model.save_model(target)
+        with open(target, "rb") as handler:
+            return np.frombuffer(handler.read(), dtype=np.uint8)
+
+
+def _estimator_config(model) -> Dict[str, Any]:
+    params = model.get_params() if hasattr(model, "get_params") else {}
+    return {
+        "class": f"{type(model).__module__}.{type(model).__name__}",
+        "params": {
+            key: value if value is None or isinstance(value, (bool, int, float, str)) else repr(value)
+            for key, value in sorted(params.items())
+        },
+    }
+
+
+def _depth(left: np.ndarray, right: np.ndarray) -> int:
+    depth, frontier = 0, [0]
+    while True:
+        children = [child for node in frontier for child in (left[node], right[node]) if child >= 0]
+        if not children:
+            return depth
+        depth += 1
+        frontier = children
+
+
+def write_bundle(
+    path: PathLike,
+    model,
+    feature_columns: Sequence[str],
+    schema: Optional[Mapping[str, str]] = None,
+    threshold: float = 0.5,
+    metadata: Optional[Mapping[str, Any]] = None,
+    training: Optional[Mapping[str, Any]] = None,
+    hashing: Optional[Mapping[str, Any]] = None,
+    rates: Optional[DelayRateTable] = None,
+) -> str:
+    """
+    Serialises ``model`` into a bundle at ``path`` atomically and returns the payload checksum.
+
+    ``training`` holds free-form training metadata (dates, row counts, metrics).
+    ``hashing`` (``hashing.spec``) describes the hashed columns; their
+    ``hashed_<i>`` features must be contiguous in ``feature_columns``, and so
+    must the ``rate_*`` features filled from ``rates``.
+    """
+    schema = dict(schema or DEFAULT_SCHEMA)
+    feature_columns = [str(column) for column in feature_columns]
+    arrays = _vocabulary_arrays(feature_columns, schema)
+    version = _BASE_VERSION
+    if hashing:
+        hashing = dict(hashing)
+        hashing["offset"] = _block_offset(feature_columns, hashed_feature_names(hashing["n_features"]))
+        version = _HASHING_VERSION
+    rates_spec = None
+    if rates is not None:
+        rates_spec = {**rates.spec(), "offset": _block_offset(feature_columns, rate_feature_names())}
+        arrays.update(rates.to_arrays(_RATES_PREFIX))
+        version = FORMAT_VERSION
+
+    if hasattr(model, "get_booster"):
+        kind = "tree_ensemble"
+        exported = _tree_arrays(model)
+        arrays.update(exported["arrays"])
+        arrays["estimator/native"] = _native_xgboost(model)
+        params = exported["params"]
+        native_format = "xgboost-ubj"
+    elif hasattr(model, "coef_"):
+        kind = "linear"
+        arrays.update(_linear_arrays(model))
+        params = {"classes": [int(value) for value in np.ravel(getattr(model, "classes_", [0, 1]))]}
+        # The coefficients are the whole fitted state of a linear model.
+        native_format = "arrays"
+    else:
+        raise BundleError(f"Unsupported estimator type: {type(model).__name__}")
+
+    header = {
+        "format_version": version,
+        "kind": kind,
+        "schema": schema,
+        "feature_columns": feature_columns,
+        "threshold": float(threshold),
+        "estimator": {**_estimator_config(model), "format": native_format},
+        "training": dict(training or {}),
+        "params": params,
+        "hashing": hashing or None,
+        "rates": rates_spec,
+        "metadata": dict(metadata or {}),
+    }
+    return _write(path, header, arrays)
+
+
+def _write(path: PathLike, header: Dict[str, Any], arrays: Mapping[str, np.ndarray]) -> str:
+    """Lays out ``arrays`` after ``header`` (which gains the array index and checksum) and replaces ``path``."""
+    index: Dict[str, Dict[str, Any]] = {}
+    cursor = 0
+    for name, array in arrays.items():
+        cursor = _align(cursor)
+        index[name] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": cursor, "nbytes": array.nbytes}
+        cursor += array.nbytes
+    payload_size = _align(cursor)
+
+    payload = bytearray(payload_size)
+    for name, array in arrays.items():
+        entry = index[name]
+        payload[entry["offset"]:entry["offset"] + entry["nbytes"]] = np.ascontiguousarray(array).tobytes()
+    checksum = hashlib.sha256(payload).hexdigest()
+
+    header = {**header, "arrays": index, "payload_sha256": checksum}
+    version = header["format_version"]
+    header_bytes = json.dumps(header, ensure_ascii=False).encode("utf-8")
+    header_end = _PREFIX.size + len(header_bytes)
+    padding = _align(header_end) - header_end
+
+    target = Path(path)
+    handle, temp_path = tempfile.mkstemp(dir=target.parent or ".", prefix=f".{target.name}.")
+    try:
+        with os.fdopen(handle, "wb") as output:
+            output.write(_PREFIX.pack(MAGIC, version, 0, len(header_bytes)))
+            output.write(header_bytes)
+            output.write(b"\0" * padding)
+            output.write(payload)
+            output.flush()
+            os.fsync(output.fileno())
+        os.replace(temp_path, target)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+        raise
+    return checksum
+
+
+def _block_offset(feature_columns: List[str], names: List[str]) -> int:
+    try:
+        offset = feature_columns.index(names[0])
+    except ValueError:
+        raise BundleError(f"Feature {names[0]} is missing from the feature columns") from None
+    if feature_columns[offset:offset + len(names)] != names:
+        raise BundleError(f"The features {names[0]}..{names[-1]} must be contiguous")
+    return offset
+
+
+def replace_rates(path: PathLike, rates: DelayRateTable) -> str:
+    """
+    Rewrites the bundle at ``path`` with an updated delay-rate table (e.g. after
+    adding a new month of flights), keeping the estimator and everything else.
+    """
+    bundle = load_bundle(path)
+    if not bundle.header.get("rates"):
+        raise BundleError(f"{path} was not trained with delay-rate features")
+    # Copies, since the maps point into the file that is about to be replaced.
+    arrays = {name: np.array(array) for name, array in bundle.arrays.items() if not name.startswith(_RATES_PREFIX)}
+    arrays.update(rates.to_arrays(_RATES_PREFIX))
+    header = {key: value for key, value in bundle.header.items() if key not in ("arrays", "payload_sha256")}
+    header["rates"] = {**rates.spec(), "offset": bundle.header["rates"]["offset"]}
+    return _write(path, header, arrays)
+
+
+class ModelBundle:
+    """Read-only view over a mapped bundle that predicts like the original estimator."""
+
+    def __init__(self, path: PathLike, header: Dict[str, Any], arrays: Dict[str, np.ndarray]) -> None:
+        self.path = str(path)
+        self.header = header
+        self.arrays = arrays
+        self.kind: str = header["kind"]
+        self.format_version: int = header["format_version"]
+        self.schema: Dict[str, str] = header["schema"]
+        self.feature_columns: List[str] = list(header["feature_columns"])
+        self.feature_names_in_ = np.asarray(self.feature_columns, dtype=object)
+        self.threshold: float = header.get("threshold", 0.5)
+        self.metadata: Dict[str, Any] = header.get("metadata", {})
+        self.training: Dict[str, Any] = header.get("training", {})
+        self.estimator_config: Dict[str, Any] = header.get("estimator", {})
+        self.hashing: Optional[Dict[str, Any]] = header.get("hashing")
+        rates = header.get("rates")
+        self.rates: Optional[DelayRateTable] = None
+        if rates:
+            self.rates = DelayRateTable.from_arrays(arrays, smoothing=rates["smoothing"], prefix=_RATES_PREFIX)
+        self._estimator = None
+        self._margin_threshold = float(np.log(self.threshold / (1.0 - self.threshold)))
+        self._codes = {
+            column: {
+                (value.decode("utf-8") if isinstance(value, bytes) else int(value)): position
+                for position, value in enumerate(arrays[f"vocab/{column}"].tolist())
+            }
+            for column in self.schema
+        }
+
+    @property
+    def n_features(self) -> int:
+        return len(self.feature_columns)
+
+    def vocabulary(self, column: str) -> List[Any]:
+        return list(self._codes[column])
+
+    def encode(self, records: Mapping[str, Sequence[Any]]) -> np.ndarray:
+        """
+        One-hot encodes column-oriented raw values straight into the model's feature order;
+        hashed columns, when the model has them, go into their fixed-width block, and
+        delay rates are gathered from the precomputed table.
+        """
+        rows = len(next(iter(records.values()))) if records else 0
+        matrix = np.zeros((rows, self.n_features), dtype=np.float32)
+        positions = np.arange(rows)
+        for column, kind in self.schema.items():
+            if column not in records:
+                continue
+            codes = self._codes[column]
+            lookup = self.arrays[f"lookup/{column}"]
+            cast = int if kind == "int" else str
+            found = np.fromiter(
+                (codes.get(cast(value), -1) for value in records[column]), dtype=np.int64, count=rows
+            )
+            known = found >= 0
+            matrix[positions[known], lookup[found[known]]] = 1.0
+        if self.hashing:
+            hash_encode(
+                records, self.hashing["columns"], self.hashing["n_features"], out=matrix, offset=self.hashing["offset"]
+            )
+        if self.rates is not None:
+            self.rates.encode(records, out=matrix, offset=self.header["rates"]["offset"])
+        return matrix
+
+    def _as_matrix(self, features) -> np.ndarray:
+        if hasattr(features, "reindex"):
+            features = features.reindex(columns=self.feature_columns, fill_value=0)
+            return features.to_numpy(dtype=np.float32)
+        matrix = np.asarray(features, dtype=np.float32)
+        if matrix.ndim != 2 or matrix.shape[1] != self.n_features:
+            raise ValueError(f"Expected (rows, {self.n_features}) features, got {matrix.shape}")
+        return matrix
+
+    def decision_function(self, features) -> np.ndarray:
+        """Returns the raw margin (log-odds of a delay) per row."""
+        matrix = self._as_matrix(features)
+        if self.kind == "linear":
+            return matrix @ self.arrays["linear/coef"] + self.arrays["linear/intercept"][0]
+        return np.concatenate(
+            [self._tree_margin(matrix[start:start + _ROW_BLOCK]) for start in range(0, matrix.shape[0], _ROW_BLOCK)]
+            or [np.empty(0, dtype=np.float64)]
+        )
+
+    def _tree_margin(self, matrix: np.ndarray) -> np.ndarray:
+        feature = self.arrays["tree/feature"]
+        value = self.arrays["tree/value"]
+        left = self.arrays["tree/left"]
+        right = self.arrays["tree/right"]
+        default_left = self.arrays["tree/default_left"].astype(bool)
+
+        rows = np.arange(matrix.shape[0])[:, None]
+        node = np.broadcast_to(self.arrays["tree/roots"], (matrix.shape[0], self.arrays["tree/roots"].shape[0])).copy()
+        for _ in range(self.header["params"]["max_depth"]):
+            split = feature[node]
+            leaf = split < 0
+            sample = matrix[rows, np.maximum(split, 0)]
+            go_left = np.where(np.isnan(sample), default_left[node], sample < value[node])
+            node = np.where(leaf, node, np.where(go_left, left[node], right[node]))
+        return value[node].sum(axis=1, dtype=np.float64) + self.header["params"]["base_margin"]
+
+    def predict_proba(self, features) -> np.ndarray:
+        positive = 1.0 / (1.0 + np.exp(-self.decision_function(features)))
+        return np.column_stack([1.0 - positive, positive])
+
+    def predict(self, features) -> np.ndarray:
+        return (self.decision_function(features) > self._margin_threshold).astype(np.int64)
+
+    def estimator(self):
+        """Rebuilds (once) the original estimator object from its native serialization."""
+        if self._estimator is not None:
+            return self._estimator
+        native_format = self.estimator_config.get("format")
+        if native_format == "xgboost-ubj":
+            import xgboost as xgb  # type: ignore
+
+            model = xgb.XGBClassifier()
+            model.load_model(bytearray(self.arrays["estimator/native"].tobytes()))
+        elif native_format == "arrays":
+            from sklearn.linear_model import LogisticRegression
+
+            params = {
+                key: value
+                for key, value in self.estimator_config.get("params", {}).items()
+                if key in LogisticRegression().get_params()
+            }
+            model = LogisticRegression(**params)
+            model.coef_ = np.asarray(self.arrays["linear/coef"], dtype=np.float64).reshape(1, -1)
+            model.intercept_ = np.asarray(self.arrays["linear/intercept"], dtype=np.float64)
+            model.classes_ = np.asarray(self.header["params"].get("classes", [0, 1]))
+            model.n_features_in_ = self.n_features
+            model.feature_names_in_ = self.feature_names_in_
+        else:
+            raise BundleError(f"{self.path} does not embed a native estimator (format version {self.format_version})")
+        self._estimator = model
+        return model
+
+
+def load_bundle(path: PathLike, verify: bool = True) -> ModelBundle:
+    """Maps a bundle read-only; ``verify`` checks the payload checksum."""
+    with open(path, "rb") as handler:
+        prefix = handler.read(_PREFIX.size)
+        if len(prefix) < _PREFIX.size:
+            raise BundleError(f"{path} is too short to be a model bundle")
+        magic, version, _, header_length = _PREFIX.unpack(prefix)
+        if magic != MAGIC:
+            raise BundleError(f"{path} is not a model bundle")
+        if version > FORMAT_VERSION:
+            raise BundleError(f"Unsupported bundle format version {version} (max {FORMAT_VERSION})")
+        header = json.loads(handler.read(header_length).decode("utf-8"))
+
+    raw = np.memmap(path, dtype=np.uint8, mode="r")
+    payload_offset = _align(_PREFIX.size + header_length)
+    if verify:
+        digest = hashlib.sha256(raw[payload_offset:]).hexdigest()
+        if digest != header["payload_sha256"]:
+            raise BundleError(f"Checksum mismatch for {path}")
+
+    arrays = {}
+    for name, entry in header["arrays"].items():
+        start = payload_offset + entry["offset"]
+        arrays[name] = raw[start:start + entry["nbytes"]].view(np.dtype(entry["dtype"])).reshape(entry["shape"])
+    return ModelBundle(path, header, arrays)
+
+
+def load_model(path: PathLike):
+    """
+    Loads a bundle when the file carries the bundle magic, a segmented model when
+    ``path`` is a directory with a segment manifest, else a legacy joblib/pickle artifact.
+    """
+    if os.path.isdir(path):
+        try:
+            from .segments import load_segmented
+        except ImportError:  # pragma: no cover - standalone execution inside the API image
+            from segments import load_segmented
+
+        return load_segmented(path)
+    if is_bundle(path):
+        return load_bundle(path)
+    try:
+        from joblib import load as joblib_load  # type: ignore
+
+        return joblib_load(path)
+    except Exception:
+        with open(path, "rb") as handler:
+            return pickle.load(handler)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Model bundle utilities")
+    commands = parser.add_subparsers(dest="command", required=True)
+    convert = commands.add_parser("convert", help="Convert a pickle/joblib estimator into a bundle")
+    convert.add_argument("source")
+    convert.add_argument("target")
+    inspect = commands.add_parser("inspect", help="Print a bundle header")
+    inspect.add_argument("path")
+    args = parser.parse_args()
+
+    if args.command == "convert":
+        model = load_model(args.source)
+        names = getattr(model, "feature_names_in_", None)
+        if names is None:
+            names = model.get_booster().feature_names
+        checksum = write_bundle(args.target, model, list(names), metadata={"converted_from": args.source})
+        print(f"{args.target} written (sha256 {checksum})")
+    else:
+        header = load_bundle(args.path).header
+        print(json.dumps({key: value for key, value in header.items() if key != "arrays"}, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":  # pragma: no cover - manual execution
+    main()
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Bounded inference executor with load shedding for the prediction API."""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, Optional
+
+_LATENCY_WINDOW = 1024
+
+
+class ExecutorSaturated(RuntimeError):
+    """Raised when the pending queue is full and the request must be shed."""
+
+
+class DeadlineExceeded(RuntimeError):
+    """Raised when a request could not be served before its deadline."""
+
+
+def latency_summary(samples: Deque[float]) -> Dict[str, float]:
+    if not samples:
+        return {"count": 0, "mean_ms": 0.0, "p50_ms": 0.0, "p95_ms": 0.0, "p99_ms": 0.0, "max_ms": 0.0}
+
+    ordered = sorted(samples)
+    last = len(ordered) - 1
+
+    def _pick(quantile: float) -> float:
+        return round(ordered[min(last, int(round(quantile * last)))] * 1000.0, 3)
+
+    return {
+        "count": len(ordered),
+        "mean_ms": round(sum(ordered) / len(ordered) * 1000.0, 3),
+        "p50_ms": _pick(0.50),
+        "p95_ms": _pick(0.95),
+        "p99_ms": _pick(0.99),
+        "max_ms": round(ordered[-1] * 1000.0, 3),
+    }
+
+
+class InferenceExecutor:
+    """
+    Dedicated thread pool for model inference.
+
+    At most ``max_workers`` calls run concurrently and at most ``max_queue`` more
+    wait for a free worker; anything beyond that is rejected immediately with
+    :class:`ExecutorSaturated`. Every call carries a deadline: work that is still
+    queued when the deadline passes is dropped without running.
+    """
+
+    def __init__(self, max_workers: int = 2, max_queue: int = 16, timeout: float = 5.0) -> None:
+        if max_workers < 1:
+            raise ValueError("max_workers must be >= 1")
+        if max_queue < 0:
+            raise ValueError("max_queue must be >= 0")
+
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="inference")
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+        self._submitted = 0
+        self._completed = 0
+        self._failed = 0
+        self._rejected = 0
+        self._expired = 0
+        self._wait_times: Deque[float] = deque(maxlen=_LATENCY_WINDOW)
+        self._service_times: Deque[float] = deque(maxlen=_LATENCY_WINDOW)
+
+    async def run(self, fn: Callable[..., Any], *args: Any, timeout: Optional[float] = None) -> Any:
+        """Runs ``fn(*args)`` on the pool and awaits its result without blocking the event loop."""
+        budget = self.timeout if timeout is None else timeout
+        deadline = time.monotonic() + budget
+
+        with self._lock:
+            if self._queued + self._running >= self.max_workers + self.max_queue:
+                self._rejected += 1
+                raise ExecutorSaturated("Inference queue is full")
+            self._queued += 1
+            self._submitted += 1
+
+        future = self._pool.submit(self._execute, fn, args, time.monotonic(), deadline)
+        future.add_done_callback(self._release_cancelled)
+
+        try:
+            return await asyncio.wait_for(
+                asyncio.wrap_future(future), timeout=max(0.0, deadline - time.monotonic())
+            )
+        except asyncio.TimeoutError as exc:
+            future.cancel()
+            with self._lock:
+                self._expired += 1
+            raise DeadlineExceeded("Inference deadline exceeded") from exc
+
+    def _execute(self, fn: Callable[..., Any], args: tuple, enqueued: float, deadline: float) -> Any:
+        started = time.monotonic()
+        with self._lock:
+            self._queued -= 1
+            self._running += 1
+            self._wait_times.append(started - enqueued)
+
+        failed = False
+        try:
+            if started > deadline:
+                failed = True
+                raise DeadlineExceeded("Request expired while queued")
+            return fn(*args)
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            with self._lock:
+                self._running -= 1
+                self._service_times.append(time.monotonic() - started)
+                if failed:
+                    self._failed += 1
+                else:
+                    self._completed += 1
+
+    def _release_cancelled(self, future: Future) -> None:
+        # A future cancelled before a worker picked it up never reaches _execute.
+        if future.cancelled():
+            with self._lock:
+                self._queued -= 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Returns queue depth, counters and wait/service latency percentiles."""
+        with self._lock:
+            return {
+                "workers": self.max_workers,
+                "queue_capacity": self.max_queue,
+                "timeout_ms": int(self.timeout * 1000),
+                "queue_depth": self._queued,
+                "running": self._running,
+                "submitted": self._submitted,
+                "completed": self._completed,
+                "failed": self._failed,
+                "rejected": self._rejected,
+                "expired": self._expired,
+                "wait": latency_summary(self._wait_times),
+                "service": latency_summary(self._service_times),
+            }
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._pool.shutdown(wait=wait, cancel_futures=True)
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Signed feature hashing for high-cardinality categorical inputs.
+
+Columns such as ``SIGLADES`` (destination) would add one dense feature per
+distinct value under one-hot encoding. Hashing maps every ``column=value``
+token into a fixed number of ``hashed_<i>`` features instead, so the width of
+the matrix no longer depends on the cardinality, and unseen values need no
+vocabulary. Each token adds ``+1`` or ``-1`` to its bucket (the sign comes from
+the same digest) so that collisions tend to cancel out instead of piling up.
+
+Buckets come from BLAKE2b rather than ``hash()``, which is salted per process,
+so the training pipeline and every API worker agree on them. Only the distinct
+values of a batch are hashed (through a bounded per-process cache, so serving
+rarely computes a digest); rows are then gathered with NumPy.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from functools import lru_cache
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Raw columns the API accepts for hashing; the model may use any subset of them.
+HASHED_COLUMNS = ("SIGLADES", "DIANOM")
+DEFAULT_N_FEATURES = 64
+PREFIX = "hashed"
+_CACHE_SIZE = 1 << 16
+
+
+def feature_names(n_features: int) -> List[str]:
+    return [f"{PREFIX}_{index}" for index in range(n_features)]
+
+
+def spec(columns: Sequence[str], n_features: int = DEFAULT_N_FEATURES) -> Optional[Dict[str, Any]]:
+    """Hashing description stored in bundle headers; None when nothing is hashed."""
+    if not columns:
+        return None
+    if n_features < 1:
+        raise ValueError("n_features must be a positive integer")
+    return {"columns": list(columns), "n_features": int(n_features), "prefix": PREFIX}
+
+
+@lru_cache(maxsize=_CACHE_SIZE)
+def _token(token: str, n_features: int) -> Tuple[int, float]:
+    digest = hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest()
+    number = int.from_bytes(digest, "little")
+    return (number >> 1) % n_features, 1.0 if number & 1 else -1.0
+
+
+def hash_tokens(column: str, values: Sequence[Any], n_features: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Bucket and sign of each (distinct) value of ``column``."""
+    buckets = np.empty(len(values), dtype=np.int64)
+    signs = np.empty(len(values), dtype=np.float32)
+    for position, value in enumerate(values):
+        buckets[position], signs[position] = _token(f"{column}={value}", n_features)
+    return buckets, signs
+
+
+def _missing(value: Any) -> bool:
+    return value is None or value != value
+
+
+def hash_codes(
+    column: str,
+    codes: np.ndarray,
+    categories: Sequence[Any],
+    n_features: int,
+    out: np.ndarray,
+    offset: int = 0,
+) -> None:
+    """
+    Adds the hashed block of an already factorized column to ``out``.
+
+    ``codes`` index ``categories`` (pandas categorical codes or ``pd.factorize``);
+    ``-1`` marks a missing value, which contributes nothing.
+    """
+    buckets, signs = hash_tokens(column, list(categories), n_features)
+    rows = np.flatnonzero(codes >= 0)
+    # Each row appears once per column, so plain fancy indexing accumulates correctly.
+    out[rows, offset + buckets[codes[rows]]] += signs[codes[rows]]
+
+
+def hash_encode(
+    records: Mapping[str, Sequence[Any]],
+    columns: Sequence[str],
+    n_features: int,
+    out: Optional[np.ndarray] = None,
+    offset: int = 0,
+) -> np.ndarray:
+    """
+    Hashes column-oriented raw values into ``out[:, offset:offset + n_features]``.
+
+    Columns absent from ``records`` and missing values (None/NaN) leave their rows untouched.
+    """
+    rows = len(next(iter(records.values()))) if records else 0
+    if out is None:
+        out = np.zeros((rows, offset + n_features), dtype=np.float32)
+    for column in columns:
+        if column not in records:
+            continue
+        lookup: Dict[Any, int] = {}
+        values = records[column]
+        codes = np.fromiter(
+            (-1 if _missing(value) else lookup.setdefault(str(value), len(lookup)) for value in values),
+            dtype=np.int64,
+            count=rows,
+        )
+        hash_codes(column, codes, list(lookup), n_features, out, offset)
+    return out
@@ -0,0 +1,496 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Append-only local ledger of served predictions.
+
+Predictions are appended as NDJSON lines (the same fields as the BigQuery
+rows) to the process' active segment, ``<started>-<pid>-<seq>.ndjson.active``.
+Writes go to the OS page cache on the request path; a background thread
+fsyncs them every ``fsync_interval`` seconds, or sooner once ``fsync_rows``
+rows are pending, so a crash loses at most that window. A segment is closed
+once it holds ``segment_rows`` rows or is ``segment_seconds`` old, and closed
+segments are compacted into zstd Parquet (or compressed ``.npz`` without
+pyarrow) by the same thread. Segments left active by a previous process are
+closed, dropping a torn last line, when a ledger opens the directory.
+
+Usage:
+
+    python -m challenge.api.ledger query --dir ledger --start 2024-01-01T00:00 --airline "Sky Airline"
+    python -m challenge.api.ledger export --dir ledger --end 2024-02-01 --output predictions.ndjson
+    python -m challenge.api.ledger compact --dir ledger
+    python -m challenge.api.ledger stats --dir ledger
+
+Exported NDJSON or Parquet files can be bulk-loaded with ``bq load``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Union
+
+import numpy as np
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - pyarrow is optional
+    pa = None
+    pq = None
+
+logger = logging.getLogger(__name__)
+
+FIELDS = ("prediction_timestamp", "model", "airline", "month", "flight_type", "delay_prediction")
+FILTERS = {"model": "model", "airline": "airline", "month": "month", "flight_type": "flight_type"}
+ACTIVE_SUFFIX = ".ndjson.active"
+CLOSED_SUFFIX = ".ndjson"
+COMPACT_SUFFIXES = (".parquet", ".npz")
+# Most to least final state of a segment.
+_SEGMENT_SUFFIXES = COMPACT_SUFFIXES + (CLOSED_SUFFIX, ACTIVE_SUFFIX)
+_TAIL_CACHE = 4096
+
+PathLike = Union[str, os.PathLike]
+
+
+def _timestamp(now: float) -> str:
+    return datetime.utcfromtimestamp(now).isoformat(timespec="microseconds") + "Z"
+
+
+class PredictionLedger:
+    """
+    Appends prediction rows to rotating local segments and compacts closed ones.
+
+    :meth:`append` only formats the lines and writes them to the active segment
+    under a lock; fsync, rotation by age and compaction happen on a daemon
+    thread. Several processes (pre-fork workers) can share a directory because
+    segment names carry the writer's pid.
+    """
+
+    def __init__(
+        self,
+        directory: PathLike,
+        segment_rows: int = 100_000,
+        segment_seconds: float = 3600.0,
+        fsync_interval: float = 1.0,
+        fsync_rows: int = 1000,
+        compaction: str = "parquet",
+    ) -> None:
+        if segment_rows < 1 or segment_seconds <= 0:
+            raise ValueError("Segment limits must be positive")
+        if compaction not in {"parquet", "npz", "none"}:
+            raise ValueError(f"Unknown compaction format: {compaction}")
+        if compaction == "parquet" and pq is None:
+            logger.warning("pyarrow is not available; ledger segments will be compacted to .npz.")
+            compaction = "npz"
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.segment_rows = segment_rows
+        self.segment_seconds = segment_seconds
+        self.fsync_interval = fsync_interval
+        self.fsync_rows = max(1, fsync_rows)
+        self.compaction = compaction
+
+        self.rows_written = 0
+        self.fsyncs = 0
+        self.segments_closed = 0
+        self.segments_compacted = 0
+
+        self._lock = threading.Lock()
+        self._compacting = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._prefix = f"{datetime.utcnow().strftime('%Y%m%dT%H%M%S')}-{os.getpid()}"
+        self._sequence = 0
+        self._handle = None
+        self._segment_path: Optional[Path] = None
+        self._segment_rows = 0
+        self._segment_opened = 0.0
+        self._unsynced = 0
+        self._tails: Dict[tuple, str] = {}
+
+        self._recovered = recover_segments(self.directory)
+        self._thread = threading.Thread(target=self._run, name="prediction-ledger", daemon=True)
+        self._thread.start()
+
+    # ==============================================================
+    # WRITES
+    # ==============================================================
+    def append(
+        self,
+        model: str,
+        records: Mapping[str, Sequence[Any]],
+        predictions: Sequence[int],
+        now: Optional[float] = None,
+    ) -> None:
+        """Appends one row per prediction; ``records`` holds the OPERA/MES/TIPOVUELO columns."""
+        if not predictions:
+            return
+        stamp = json.dumps(_timestamp(time.time() if now is None else now))
+        prefix = f'{{"prediction_timestamp":{stamp},"model":{json.dumps(model)},'
+        # Everything after the shared prefix depends only on the (few) category
+        # combinations, so each distinct line tail is encoded once and reused.
+        tails = self._tails
+        if len(tails) > _TAIL_CACHE:
+            tails.clear()
+        body = []
+        for key in zip(records["OPERA"], records["MES"], records["TIPOVUELO"], predictions):
+            tail = tails.get(key)
+            if tail is None:
+                airline, month, flight_type, prediction = key
+                tail = tails[key] = (
+                    f'"airline":{json.dumps(airline)},"month":{int(month)},'
+                    f'"flight_type":{json.dumps(flight_type)},"delay_prediction":{int(prediction)}}}\n'
+                )
+            body.append(tail)
+        text = prefix + prefix.join(body)
+        rows = len(body)
+
+        with self._lock:
+            if self._stopped.is_set():
+                raise RuntimeError("The ledger is closed")
+            if self._handle is None:
+                self._open_segment()
+            self._handle.write(text)
+            self._segment_rows += rows
+            self._unsynced += rows
+            self.rows_written += rows
+            if self._segment_rows >= self.segment_rows:
+                self._close_segment()
+        if self._unsynced >= self.fsync_rows:
+            self._wake.set()
+
+    def _open_segment(self) -> None:
+        self._sequence += 1
+        self._segment_path = self.directory / f"{self._prefix}-{self._sequence:06d}{ACTIVE_SUFFIX}"
+        self._handle = open(self._segment_path, "a", encoding="utf-8")
+        self._segment_rows = 0
+        self._segment_opened = time.monotonic()
+
+    def _sync(self) -> None:
+        if self._handle is not None and self._unsynced:
+            self._handle.flush()
+            os.fsync(self._handle.fileno())
+            self._unsynced = 0
+            self.fsyncs += 1
+
+    def _close_segment(self) -> None:
+        self._sync()
+        self._handle.close()
+        closed = self._segment_path.with_name(self._segment_path.name[: -len(ACTIVE_SUFFIX)] + CLOSED_SUFFIX)
+        os.replace(self._segment_path, closed)
+        self._handle = None
+        self._segment_path = None
+        self.segments_closed += 1
+        self._wake.set()
+
+    # ==============================================================
+    # BACKGROUND
+    # ==============================================================
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            self._wake.wait(self.fsync_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+                if self.compaction != "none":
+                    self.compact()
+            except Exception as exc:  # pragma: no cover - defensive, keeps the thread alive
+                logger.error("Prediction ledger maintenance failed: %s", exc, exc_info=True)
+
+    def flush(self) -> None:
+        """Fsyncs pending rows and closes the active segment if it is too old."""
+        with self._lock:
+            self._sync()
+            if self._handle is not None and time.monotonic() - self._segment_opened >= self.segment_seconds:
+                self._close_segment()
+
+    def compact(self) -> int:
+        """Compacts closed segments of this process (and those recovered at startup)."""
+        converted = 0
+        with self._compacting:
+            recovered, self._recovered = self._recovered, []
+            for path in recovered + sorted(self.directory.glob(f"{self._prefix}-*{CLOSED_SUFFIX}")):
+                if path.exists():
+                    compact_segment(path, self.compaction)
+                    converted += 1
+            self.segments_compacted += converted
+        return converted
+
+    def close(self) -> None:
+        """Closes the active segment and compacts it; further appends fail."""
+        with self._lock:
+            if self._stopped.is_set():
+                return
+            self._stopped.set()
+            if self._handle is not None:
+                self._close_segment()
+        self._wake.set()
+        self._thread.join(timeout=5.0)
+        if self.compaction != "none":
+            self.compact()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "directory": str(self.directory),
+                "rows_written": self.rows_written,
+                "unsynced_rows": self._unsynced,
+                "active_segment": self._segment_path.name if self._segment_path else None,
+                "active_segment_rows": self._segment_rows,
+                "fsyncs": self.fsyncs,
+                "segments_closed": self.segments_closed,
+                "segments_compacted": self.segments_compacted,
+            }
+
+
+# ==============================================================
+# SEGMENT FILES
+# ==============================================================
+def recover_segments(directory: PathLike) -> List[Path]:
+    """Closes segments left active by dead writers, truncating any torn last line."""
+    recovered = []
+    for path in sorted(Path(directory).glob(f"*{ACTIVE_SUFFIX}")):
+        pid = path.name.split("-")[1] if path.name.count("-") >= 2 else ""
+        if pid.isdigit() and int(pid) != os.getpid() and _alive(int(pid)):
+            continue
+        closed = path.with_name(path.name[: -len(ACTIVE_SUFFIX)] + CLOSED_SUFFIX)
+        try:
+            data = path.read_bytes()
+            complete = data[: data.rfind(b"\n") + 1]
+            if len(complete) != len(data):
+                logger.warning("Dropping a torn line at the end of %s.", path.name)
+                with open(path, "r+b") as handle:
+                    handle.truncate(len(complete))
+            os.replace(path, closed)
+        except FileNotFoundError:
+            # Pre-fork workers recover the same directory at startup; another one got here first.
+            continue
+        recovered.append(closed)
+    return recovered
+
+
+def _alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:  # pragma: no cover - pid owned by another user
+        return True
+    return True
+
+
+def _read_ndjson(path: Path) -> Dict[str, np.ndarray]:
+    text = path.read_text(encoding="utf-8")
+    # A segment being written may end in a partial line; only complete lines are read.
+    rows = [json.loads(line) for line in text[: text.rfind("\n") + 1].splitlines() if line.strip()]
+    return {
+        "prediction_timestamp": np.array(
+            [row["prediction_timestamp"].rstrip("Z") for row in rows], dtype="datetime64[us]"
+        ),
+        "model": np.array([row["model"] for row in rows], dtype=object),
+        "airline": np.array([row["airline"] for row in rows], dtype=object),
+        "month": np.array([row["month"] for row in rows], dtype=np.int8),
+        "flight_type": np.array([row["flight_type"] for row in rows], dtype=object),
+        "delay_prediction": np.array([row["delay_prediction"] for row in rows], dtype=np.int8),
+    }
+
+
+def compact_segment(path: PathLike, compaction: str = "parquet") -> Path:
+    """Rewrites a closed NDJSON segment as zstd Parquet or compressed ``.npz`` and removes it."""
+    path = Path(path)
+    columns = _read_ndjson(path)
+    stem = path.name[: -len(CLOSED_SUFFIX)]
+    if compaction == "parquet" and pq is not None:
+        target = path.with_name(f"{stem}.parquet")
+        table = pa.table({
+            name: pa.array(values, type=pa.timestamp("us", tz="UTC")) if name == "prediction_timestamp"
+            else pa.array(values, type=pa.dictionary(pa.int32(), pa.string())) if values.dtype == object
+            else pa.array(values)
+            for name, values in columns.items()
+        })
+        temp = target.with_name(f".{target.name}.tmp")
+        pq.write_table(table, temp, compression="zstd")
+    else:
+        target = path.with_name(f"{stem}.npz")
+        temp = target.with_name(f".{stem}.tmp.npz")
+        np.savez_compressed(
+            temp,
+            **{name: values.astype(str) if values.dtype == object else values for name, values in columns.items()},
+        )
+    os.replace(temp, target)
+    path.unlink()
+    return target
+
+
+def _read_stem(directory: Path, stem: str, start=None, end=None):
+    """Reads a segment under its most final suffix; None if every attempt raced with the writer."""
+    for suffix in _SEGMENT_SUFFIXES:
+        try:
+            return _read_segment(directory / f"{stem}{suffix}", start, end)
+        except FileNotFoundError:
+            continue
+    return None
+
+
+def _read_segment(path: Path, start=None, end=None):
+    import pandas as pd
+
+    if path.suffix == ".parquet":
+        filters = []
+        if start is not None:
+            filters.append(("prediction_timestamp", ">=", start))
+        if end is not None:
+            filters.append(("prediction_timestamp", "<", end))
+        # Row-group statistics let pyarrow skip data outside the time range.
+        frame = pq.read_table(path, filters=filters or None).to_pandas()
+        for column in ("model", "airline", "flight_type"):
+            frame[column] = frame[column].astype(str)
+    else:
+        columns = dict(np.load(path, allow_pickle=False)) if path.suffix == ".npz" else _read_ndjson(path)
+        frame = pd.DataFrame(columns)
+        frame["prediction_timestamp"] = pd.to_datetime(frame["prediction_timestamp"], utc=True)
+        for column in ("model", "airline", "flight_type"):
+            frame[column] = frame[column].astype(str)
+    return frame
+
+
+def _segment_suffix(name: str) -> Optional[str]:
+    return next((suffix for suffix in _SEGMENT_SUFFIXES if name.endswith(suffix)), None)
+
+
+def read_ledger(
+    directory: PathLike,
+    start: Optional[Union[str, datetime]] = None,
+    end: Optional[Union[str, datetime]] = None,
+    **filters: Any,
+):
+    """
+    Reads every segment (compacted, closed and active) into a DataFrame sorted
+    by time, keeping rows in ``[start, end)`` that match the column filters
+    (``model``, ``airline``, ``month``, ``flight_type``).
+    """
+    import pandas as pd
+
+    unknown = set(filters) - set(FILTERS)
+    if unknown:
+        raise ValueError(f"Unknown ledger filters: {sorted(unknown)}")
+    start = pd.Timestamp(start, tz="UTC") if start is not None else None
+    end = pd.Timestamp(end, tz="UTC") if end is not None else None
+
+    # A segment moves from active to closed to compacted; reading each stem in
+    # the opposite order never counts a segment twice nor misses one that the
+    # writer renames or compacts while we read.
+    directory = Path(directory)
+    stems = set()
+    for path in directory.iterdir():
+        suffix = _segment_suffix(path.name)
+        if suffix is not None and not path.name.startswith("."):
+            stems.add(path.name[: -len(suffix)])
+
+    frames = []
+    for stem in sorted(stems):
+        # The segment may move forward between two attempts of the same pass
+        # (e.g. compacted right after its Parquet file was found missing); a new
+        # pass then finds it under a later suffix.
+        for _ in range(len(_SEGMENT_SUFFIXES)):
+            segment = _read_stem(directory, stem, start, end)
+            if segment is not None:
+                frames.append(segment)
+                break
+    frame = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=list(FIELDS))
+    if frame.empty:
+        return frame[list(FIELDS)]
+
+    mask = np.ones(len(frame), dtype=bool)
+    if start is not None:
+        mask &= (frame["prediction_timestamp"] >= start).to_numpy()
+    if end is not None:
+        mask &= (frame["prediction_timestamp"] < end).to_numpy()
+    for name, value in filters.items():
+        if value is not None:
+            column = frame[FILTERS[name]]
+            mask &= (column == (int(value) if name == "month" else str(value))).to_numpy()
+    frame = frame.loc[mask, list(FIELDS)].sort_values("prediction_timestamp", kind="stable")
+    return frame.reset_index(drop=True)
+
+
+def export_ledger(frame, output: PathLike) -> Path:
+    """Writes a query result as NDJSON (BigQuery format), Parquet or CSV depending on the suffix."""
+    output = Path(output)
+    if output.suffix == ".parquet":
+        frame.to_parquet(output, index=False, compression="zstd")
+    elif output.suffix == ".csv":
+        frame.to_csv(output, index=False)
+    elif frame.empty:
+        output.write_text("")
+    else:
+        export = frame.copy()
+        export["prediction_timestamp"] = export["prediction_timestamp"].dt.strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+        export.to_json(output, orient="records", lines=True, force_ascii=False)
+    return output
+
+
+def ledger_stats(directory: PathLike) -> Dict[str, Any]:
+    directory = Path(directory)
+    stats: Dict[str, Dict[str, int]] = {}
+    for path in directory.iterdir():
+        if path.name.startswith("."):
+            continue
+        suffix = _segment_suffix(path.name)
+        if suffix is None:
+            continue
+        kind = "active" if suffix == ACTIVE_SUFFIX else suffix.lstrip(".")
+        entry = stats.setdefault(kind, {"files": 0, "bytes": 0})
+        entry["files"] += 1
+        entry["bytes"] += path.stat().st_size
+    return {"directory": str(directory), "segments": stats}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Prediction ledger utilities")
+    commands = parser.add_subparsers(dest="command", required=True)
+    for name in ("query", "export"):
+        command = commands.add_parser(name, help=f"{name.capitalize()} predictions in a time range")
+        command.add_argument("--dir", required=True)
+        command.add_argument("--start", default=None, help="Inclusive UTC start (ISO 8601)")
+        command.add_argument("--end", default=None, help="Exclusive UTC end (ISO 8601)")
+        for column in FILTERS:
+            command.add_argument(f"--{column}", default=None)
+        if name == "query":
+            command.add_argument("--limit", type=int, default=20)
+        else:
+            command.add_argument("--output", required=True, help=".ndjson, .parquet or .csv")
+    compact = commands.add_parser("compact", help="Recover dead segments and compact closed ones")
+    compact.add_argument("--dir", required=True)
+    compact.add_argument("--format", default="parquet", choices=["parquet", "npz"])
+    stats = commands.add_parser("stats", help="Segment counts and sizes")
+    stats.add_argument("--dir", required=True)
+    args = parser.parse_args()
+
+    if args.command in {"query", "export"}:
+        frame = read_ledger(
+            args.dir, args.start, args.end, **{column: getattr(args, column) for column in FILTERS}
+        )
+        if args.command == "export":
+            print(f"Exported {len(frame)} rows to {export_ledger(frame, args.output)}")
+        else:
+            print(f"{len(frame)} rows")
+            if len(frame):
+                print(frame.tail(args.limit).to_string(index=False))
+    elif args.command == "compact":
+        closed = recover_segments(args.dir)
+        closed += sorted(p for p in Path(args.dir).glob(f"*{CLOSED_SUFFIX}") if p not in closed)
+        for path in closed:
+            print(compact_segment(path, args.format))
+    else:
+        print(json.dumps(ledger_stats(args.dir), indent=2))
+
+
+if __name__ == "__main__":  # pragma: no cover - manual execution
+    main()
@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""In-process monitor of served feature distributions and predicted delay rate."""
+
+from __future__ import annotations
+
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence
+
+import numpy as np
+
+# Categorical inputs tracked by the monitor, in the order of the one-hot encoding.
+MONITORED_COLUMNS = ("OPERA", "TIPOVUELO", "MES")
+OTHER = "__other__"
+
+_SHARE_FLOOR = 1e-4
+
+
+def vocabulary_from_features(
+    feature_names: Sequence[str], columns: Sequence[str] = MONITORED_COLUMNS
+) -> Dict[str, List[str]]:
+    """Recovers the per-column categories from one-hot feature names such as ``OPERA_Copa Air``."""
+    vocabulary: Dict[str, List[str]] = {}
+    for column in columns:
+        prefix = f"{column}_"
+        vocabulary[column] = [str(name)[len(prefix):] for name in feature_names if str(name).startswith(prefix)]
+    return vocabulary
+
+
+def population_stability(observed: np.ndarray, expected: np.ndarray) -> float:
+    """Population stability index between two count vectors over the same categories."""
+    observed = np.maximum(observed / max(observed.sum(), 1), _SHARE_FLOOR)
+    expected = np.maximum(expected / max(expected.sum(), 1), _SHARE_FLOOR)
+    return float(np.sum((observed - expected) * np.log(observed / expected)))
+
+
+class DistributionMonitor:
+    """
+    Incrementally counts served categories and predictions over time windows.
+
+    Every category of the encoder vocabulary owns a fixed slot (plus one
+    ``__other__`` slot per column for values outside the vocabulary) in a flat
+    int64 counter row; the last two slots hold scored rows and predicted
+    delays. Observing a request adds one such row to:
+
+    - a ring of ``window_buckets`` buckets of ``bucket_seconds`` each, summed on
+      demand into the sliding window;
+    - the current tumbling window of ``tumbling_seconds`` (aligned to the
+      clock), which replaces the previous one when it closes;
+    - the running total since startup.
+
+    When the request was encoded as a one-hot matrix whose layout was declared
+    with :meth:`bind_features`, the counts come from one column sum of that
+    matrix and a small projection, so no Python loop runs over rows.
+    """
+
+    def __init__(
+        self,
+        vocabulary: Mapping[str, Sequence[Any]],
+        reference: Optional[Mapping[str, Any]] = None,
+        bucket_seconds: float = 10.0,
+        window_buckets: int = 30,
+        tumbling_seconds: float = 300.0,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        if bucket_seconds <= 0 or tumbling_seconds <= 0:
+            raise ValueError("Window lengths must be positive")
+        if window_buckets < 1:
+            raise ValueError("window_buckets must be >= 1")
+        self.columns = list(vocabulary)
+        self.bucket_seconds = float(bucket_seconds)
+        self.window_buckets = int(window_buckets)
+        self.tumbling_seconds = float(tumbling_seconds)
+        self._clock = clock
+        self._lock = threading.Lock()
+
+        self._codes: Dict[str, Dict[str, int]] = {}
+        self._labels: List[str] = []
+        self._ranges: Dict[str, slice] = {}
+        for column in self.columns:
+            start = len(self._labels)
+            values = [str(value) for value in vocabulary[column]] + [OTHER]
+            self._codes[column] = {value: start + offset for offset, value in enumerate(values)}
+            self._labels.extend(values)
+            self._ranges[column] = slice(start, len(self._labels))
+        self._rows_slot = len(self._labels)
+        self._positive_slot = self._rows_slot + 1
+        self.n_slots = self._rows_slot + 2
+
+        self._reference = self._reference_counts(reference or {})
+        self._reference_rates = {
+            key: (reference or {}).get(key) for key in ("train_rows", "positive_rate", "predicted_positive_rate")
+        }
+        self._projection: Optional[np.ndarray] = None
+        self._other_slots: Optional[np.ndarray] = None
+
+        self._buckets = np.zeros((self.window_buckets, self.n_slots), dtype=np.int64)
+        self._bucket_ids = np.full(self.window_buckets, -1, dtype=np.int64)
+        self._tumbling_id = -1
+        self._tumbling = np.zeros(self.n_slots, dtype=np.int64)
+        self._previous_id = -1
+        self._previous = np.zeros(self.n_slots, dtype=np.int64)
+        self._total = np.zeros(self.n_slots, dtype=np.int64)
+        self.started_at = self._clock()
+
+    def _reference_counts(self, reference: Mapping[str, Any]) -> Optional[np.ndarray]:
+        categories = reference.get("category_counts")
+        if not categories:
+            return None
+        counts = np.zeros(self.n_slots, dtype=np.float64)
+        for column, values in categories.items():
+            codes = self._codes.get(column)
+            if codes is None:
+                continue
+            for value, count in values.items():
+                counts[codes.get(str(value), codes[OTHER])] += count
+        return counts
+
+    # ==============================================================
+    # OBSERVATION
+    # ==============================================================
+    def bind_features(self, feature_names: Sequence[str]) -> None:
+        """Declares the one-hot layout of the matrices later passed to :meth:`observe`."""
+        # Column sums of a request times this projection give its slot counts: each
+        # feature adds to its category and subtracts from its column's ``__other__``
+        # slot, which starts at the row count (see ``_other_slots``).
+        projection = np.zeros((len(feature_names), self.n_slots), dtype=np.float64)
+        for index, name in enumerate(feature_names):
+            column, _, value = str(name).partition("_")
+            slot = self._codes.get(column, {}).get(value)
+            if slot is not None:
+                projection[index, slot] = 1.0
+                projection[index, self._codes[column][OTHER]] = -1.0
+        self._projection = projection
+        self._other_slots = np.zeros(self.n_slots, dtype=np.int64)
+        self._other_slots[[codes[OTHER] for codes in self._codes.values()]] = 1
+
+    def _counts_from_matrix(self, matrix) -> np.ndarray:
+        # Legacy frames mix get_dummies booleans with zero-filled int columns (object dtype).
+        matrix = np.asarray(matrix, dtype=np.float32)
+        counts = np.rint(matrix.sum(axis=0) @ self._projection).astype(np.int64)
+        counts += self._other_slots * matrix.shape[0]
+        return counts
+
+    def _counts_from_records(self, records: Mapping[str, Sequence[Any]]) -> np.ndarray:
+        counts = np.zeros(self.n_slots, dtype=np.int64)
+        for column in self.columns:
+            codes = self._codes[column]
+            other = codes[OTHER]
+            slots = [codes.get(str(value), other) for value in records.get(column, ())]
+            if slots:
+                counts += np.bincount(slots, minlength=self.n_slots)
+        return counts
+
+    def observe(
+        self,
+        predictions: Sequence[int],
+        matrix=None,
+        records: Optional[Mapping[str, Sequence[Any]]] = None,
+    ) -> None:
+        """
+        Counts one scored request (0/1 ``predictions``), from its encoded
+        ``matrix`` when possible, else from column-oriented raw ``records``.
+        """
+        if matrix is not None and self._projection is not None and np.ndim(matrix) == 2:
+            counts = self._counts_from_matrix(matrix)
+        else:
+            counts = self._counts_from_records(records or {})
+        counts[self._rows_slot] = len(predictions)
+        counts[self._positive_slot] = int(sum(predictions))
+
+        with self._lock:
+            bucket = self._advance(self._clock())
+            self._buckets[bucket] += counts
+            self._tumbling += counts
+            self._total += counts
+
+    def _advance(self, now: float) -> int:
+        bucket_id = int(now // self.bucket_seconds)
+        position = bucket_id % self.window_buckets
+        if self._bucket_ids[position] != bucket_id:
+            self._buckets[position] = 0
+            self._bucket_ids[position] = bucket_id
+
+        tumbling_id = int(now // self.tumbling_seconds)
+        if tumbling_id != self._tumbling_id:
+            if self._tumbling_id == tumbling_id - 1:
+                self._previous[:] = self._tumbling
+            else:
+                self._previous[:] = 0
+            self._previous_id = tumbling_id - 1
+            self._tumbling[:] = 0
+            self._tumbling_id = tumbling_id
+        return position
+
+    # ==============================================================
+    # REPORTING
+    # ==============================================================
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            now = self._clock()
+            self._advance(now)
+            current_bucket = int(now // self.bucket_seconds)
+            live = self._bucket_ids > current_bucket - self.window_buckets
+            sliding = self._buckets[live].sum(axis=0)
+            tumbling = self._tumbling.copy()
+            previous = self._previous.copy()
+            total = self._total.copy()
+            tumbling_id, previous_id = self._tumbling_id, self._previous_id
+
+        return {
+            "reference": {"available": self._reference is not None, **self._reference_rates},
+            "windows": {
+                "sliding": self._window(
+                    sliding, seconds=self.bucket_seconds * self.window_buckets,
+                    start=(current_bucket - self.window_buckets + 1) * self.bucket_seconds,
+                ),
+                "tumbling_current": self._window(
+                    tumbling, seconds=self.tumbling_seconds, start=tumbling_id * self.tumbling_seconds
+                ),
+                "tumbling_previous": self._window(
+                    previous, seconds=self.tumbling_seconds, start=previous_id * self.tumbling_seconds
+                ),
+                "total": self._window(total, seconds=now - self.started_at, start=self.started_at),
+            },
+        }
+
+    def _window(self, counts: np.ndarray, seconds: float, start: float) -> Dict[str, Any]:
+        rows = int(counts[self._rows_slot])
+        positives = int(counts[self._positive_slot])
+        distribution = {}
+        drift = {}
+        for column in self.columns:
+            window = self._ranges[column]
+            distribution[column] = {
+                label: int(count)
+                for label, count in zip(self._labels[window], counts[window])
+                if count or label != OTHER
+            }
+            if self._reference is not None and rows:
+                observed = counts[window].astype(np.float64)
+                expected = self._reference[window]
+                shares = observed / max(observed.sum(), 1)
+                reference_shares = expected / max(expected.sum(), 1)
+                drift[column] = {
+                    "psi": round(population_stability(observed, expected), 6),
+                    "max_share_delta": round(float(np.max(np.abs(shares - reference_shares))), 6),
+                    "unknown_share": round(float(shares[-1]), 6),
+                }
+
+        predicted_rate = positives / rows if rows else None
+        reference_rate = self._reference_rates.get("predicted_positive_rate")
+        return {
+            "start": datetime.utcfromtimestamp(max(start, 0)).isoformat() + "Z",
+            "seconds": round(seconds, 3),
+            "rows": rows,
+            "predicted_delays": positives,
+            "predicted_delay_rate": round(predicted_rate, 6) if predicted_rate is not None else None,
+            "predicted_delay_rate_delta": (
+                round(predicted_rate - reference_rate, 6)
+                if predicted_rate is not None and reference_rate is not None
+                else None
+            ),
+            "distribution": distribution,
+            "drift": drift or None,
+        }
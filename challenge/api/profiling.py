@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Opt-in per-request CPU and allocation profiling for the prediction API."""
+
+from __future__ import annotations
+
+import cProfile
+import hmac
+import io
+import itertools
+import marshal
+import pstats
+import random
+import threading
+import time
+import tracemalloc
+from collections import deque
+from datetime import datetime
+from typing import Any, Callable, Deque, Dict, List, Mapping, Optional
+
+PROFILE_HEADER = "X-Profile-Token"
+
+
+class ProfileRecord:
+    """A captured profile: cProfile stats plus the top allocation sites of one request."""
+
+    def __init__(
+        self,
+        profile_id: int,
+        label: str,
+        reason: str,
+        duration: float,
+        stats: pstats.Stats,
+        allocations: List[Dict[str, Any]],
+        peak_bytes: int,
+    ) -> None:
+        self.profile_id = profile_id
+        self.label = label
+        self.reason = reason
+        self.captured_at = datetime.utcnow().isoformat() + "Z"
+        self.duration = duration
+        self.stats = stats
+        self.allocations = allocations
+        self.peak_bytes = peak_bytes
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "id": self.profile_id,
+            "label": self.label,
+            "reason": self.reason,
+            "captured_at": self.captured_at,
+            "duration_ms": round(self.duration * 1000.0, 3),
+            "function_calls": self.stats.total_calls,
+            "peak_allocated_bytes": self.peak_bytes,
+        }
+
+    def as_text(self, limit: int = 40) -> str:
+        buffer = io.StringIO()
+        self.stats.stream = buffer
+        self.stats.sort_stats("cumulative").print_stats(limit)
+        buffer.write("\nTop allocations (tracemalloc):\n")
+        for allocation in self.allocations:
+            buffer.write(
+                f"{allocation['size_bytes']:>12} B {allocation['count']:>8} blocks  {allocation['location']}\n"
+            )
+        return buffer.getvalue()
+
+    def as_pstats(self) -> bytes:
+        """Returns the stats in the on-disk format read by ``pstats.Stats(path)``, snakeviz, etc."""
+        return marshal.dumps(self.stats.stats)
+
+
+class RequestProfiler:
+    """
+    Samples a fraction of requests (or those carrying the privileged header)
+    and profiles them with cProfile and tracemalloc.
+
+    Captured profiles go into a bounded ring buffer. Only one request is
+    profiled at a time because tracemalloc is process-wide; a request selected
+    while another is being profiled simply runs unprofiled. When neither a
+    sample rate nor a token is configured, :attr:`enabled` is false and callers
+    skip the hook entirely.
+    """
+
+    def __init__(
+        self,
+        sample_rate: float = 0.0,
+        token: Optional[str] = None,
+        capacity: int = 32,
+        top_allocations: int = 25,
+    ) -> None:
+        self.sample_rate = max(0.0, min(1.0, sample_rate))
+        self.token = token or None
+        self.top_allocations = top_allocations
+        self.enabled = self.sample_rate > 0 or self.token is not None
+        self._records: Deque[ProfileRecord] = deque(maxlen=max(1, capacity))
+        self._busy = threading.Lock()
+        self._ids = itertools.count(1)
+
+    def is_authorized(self, headers: Mapping[str, str]) -> bool:
+        if self.token is None:
+            return False
+        # Constant-time comparison so response timing does not leak the token prefix.
+        return hmac.compare_digest(headers.get(PROFILE_HEADER, "").encode(), self.token.encode())
+
+    def select(self, headers: Mapping[str, str]) -> Optional[str]:
+        """Returns why the request should be profiled, or ``None``."""
+        if self.is_authorized(headers):
+            return "header"
+        if self.sample_rate > 0 and random.random() < self.sample_rate:
+            return "sampled"
+        return None
+
+    def wrap(self, fn: Callable[..., Any], label: str, reason: str) -> Callable[..., Any]:
+        """Returns ``fn`` instrumented to capture a profile into the ring buffer when it runs."""
+        profile_id = next(self._ids)
+
+        def profiled(*args: Any, **kwargs: Any) -> Any:
+            if not self._busy.acquire(blocking=False):
+                return fn(*args, **kwargs)
+            profiler = cProfile.Profile()
+            tracing = not tracemalloc.is_tracing()
+            try:
+                if tracing:
+                    tracemalloc.start()
+                tracemalloc.reset_peak()
+                started = time.perf_counter()
+                profiler.enable()
+                try:
+                    return fn(*args, **kwargs)
+                finally:
+                    profiler.disable()
+                    duration = time.perf_counter() - started
+                    snapshot = tracemalloc.take_snapshot()
+                    _, peak = tracemalloc.get_traced_memory()
+                    self._records.append(
+                        ProfileRecord(
+                            profile_id,
+                            label,
+                            reason,
+                            duration,
+                            pstats.Stats(profiler),
+                            self._top_allocations(snapshot),
+                            peak,
+                        )
+                    )
+            finally:
+                if tracing:
+                    tracemalloc.stop()
+                self._busy.release()
+
+        profiled.profile_id = profile_id  # type: ignore[attr-defined]
+        return profiled
+
+    def _top_allocations(self, snapshot: tracemalloc.Snapshot) -> List[Dict[str, Any]]:
+        snapshot = snapshot.filter_traces(
+            (
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, cProfile.__file__),
+                tracemalloc.Filter(False, __file__),
+            )
+        )
+        return [
+            {"location": str(stat.traceback), "size_bytes": stat.size, "count": stat.count}
+            for stat in snapshot.statistics("lineno")[: self.top_allocations]
+        ]
+
+    def list(self) -> List[Dict[str, Any]]:
+        return [record.summary() for record in reversed(self._records)]
+
+    def get(self, profile_id: int) -> Optional[ProfileRecord]:
+        for record in self._records:
+            if record.profile_id == profile_id:
+                return record
+        return None
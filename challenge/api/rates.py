@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Precomputed historical delay rates per airline, destination and month.
+
+One-hot ``OPERA``/``MES`` features say nothing about how often a given route
+runs late. :class:`DelayRateTable` keeps the flight and delay counts of every
+(``OPERA``, ``SIGLADES``, ``MES``) cell in a dense array indexed by category
+codes and derives smoothed delay rates at three levels from them: airline x
+month, airline x destination and airline x destination x month. Each level is
+shrunk towards its parent (airline, then the global rate) with ``smoothing``
+pseudo-flights, so sparse cells degrade gracefully. Code 0 of every axis
+collects missing values and answers for unseen ones, which therefore get the
+rate of their parent level.
+
+The rates are precomputed into one float32 table of shape ``(airlines,
+destinations, months, levels)``, so encoding a batch is one dictionary lookup
+per distinct value plus a single gather, with no joins. The counts are kept
+next to the table, so new months are added with :meth:`DelayRateTable.update`
+without re-reading the history; bundles embed both (see ``bundle.py``).
+
+Training rows must not see their own label in their features:
+:meth:`DelayRateTable.out_of_fold` computes each row's rates from the counts of
+the other folds only.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, List, Mapping, Optional, Sequence
+
+import numpy as np
+
+# Key columns of the table, in axis order, and their value types.
+RATE_COLUMNS = ("OPERA", "SIGLADES", "MES")
+SCHEMA = {"OPERA": "str", "SIGLADES": "str", "MES": "int"}
+LEVELS = (("OPERA", "MES"), ("OPERA", "SIGLADES"), ("OPERA", "SIGLADES", "MES"))
+PREFIX = "rate"
+DEFAULT_SMOOTHING = 20.0
+DEFAULT_FOLDS = 5
+
+
+def feature_names() -> List[str]:
+    return [f"{PREFIX}_{'_'.join(level)}" for level in LEVELS]
+
+
+def _missing(value: Any) -> bool:
+    return value is None or value != value
+
+
+def _key(column: str, value: Any) -> Any:
+    return int(value) if SCHEMA[column] == "int" else str(value)
+
+
+def smoothed_rates(flights: np.ndarray, delays: np.ndarray, smoothing: float) -> np.ndarray:
+    """Rates of every level for every cell, shaped ``flights.shape + (len(LEVELS),)``."""
+    flights = np.asarray(flights, dtype=np.float64)
+    delays = np.asarray(delays, dtype=np.float64)
+    total = flights.sum()
+    overall = delays.sum() / total if total else 0.0
+
+    def shrink(delayed: np.ndarray, flown: np.ndarray, prior) -> np.ndarray:
+        return (delayed + smoothing * prior) / (flown + smoothing)
+
+    airline = shrink(delays.sum(axis=(1, 2), keepdims=True), flights.sum(axis=(1, 2), keepdims=True), overall)
+    route = shrink(delays.sum(axis=2, keepdims=True), flights.sum(axis=2, keepdims=True), airline)
+    table = np.empty(flights.shape + (len(LEVELS),), dtype=np.float32)
+    table[..., 0] = shrink(delays.sum(axis=1, keepdims=True), flights.sum(axis=1, keepdims=True), airline)
+    table[..., 1] = route
+    table[..., 2] = shrink(delays, flights, route)
+    return table
+
+
+class DelayRateTable:
+    """
+    Flight and delay counts per (``OPERA``, ``SIGLADES``, ``MES``) cell and their smoothed rates.
+
+    ``vocabularies`` lists the known values of each column; value ``i`` of the
+    list has code ``i + 1`` and code 0 stands for missing or unseen values.
+    """
+
+    def __init__(
+        self,
+        vocabularies: Optional[Mapping[str, Sequence[Any]]] = None,
+        flights: Optional[np.ndarray] = None,
+        delays: Optional[np.ndarray] = None,
+        smoothing: float = DEFAULT_SMOOTHING,
+        table: Optional[np.ndarray] = None,
+    ) -> None:
+        if smoothing <= 0:
+            raise ValueError("smoothing must be positive")
+        vocabularies = vocabularies or {}
+        self.vocabularies: Dict[str, List[Any]] = {
+            column: [_key(column, value) for value in vocabularies.get(column, [])] for column in RATE_COLUMNS
+        }
+        self._codes = {
+            column: {value: code for code, value in enumerate(values, start=1)}
+            for column, values in self.vocabularies.items()
+        }
+        shape = self.shape
+        self.flights = np.zeros(shape, dtype=np.int64) if flights is None else flights
+        self.delays = np.zeros(shape, dtype=np.int64) if delays is None else delays
+        if self.flights.shape != shape or self.delays.shape != shape:
+            raise ValueError(f"Counts must have shape {shape}")
+        self.smoothing = float(smoothing)
+        self._table = table
+
+    @property
+    def shape(self) -> tuple:
+        return tuple(len(self.vocabularies[column]) + 1 for column in RATE_COLUMNS)
+
+    @property
+    def rows(self) -> int:
+        return int(self.flights.sum())
+
+    @property
+    def table(self) -> np.ndarray:
+        """Smoothed rates, computed on first use after the counts change."""
+        if self._table is None:
+            self._table = smoothed_rates(self.flights, self.delays, self.smoothing)
+        return self._table
+
+    # ==============================================================
+    # CODES
+    # ==============================================================
+    def category_codes(
+        self, column: str, codes: np.ndarray, categories: Sequence[Any], grow: bool = False
+    ) -> np.ndarray:
+        """
+        Table codes of an already factorized column (pandas categorical codes or
+        ``pd.factorize``, ``-1`` = missing). ``grow`` adds unseen categories to the
+        vocabulary instead of mapping them to code 0.
+        """
+        keys = [None if _missing(value) else _key(column, value) for value in categories]
+        if grow:
+            self._grow(column, keys)
+        vocabulary = self._codes[column]
+        lookup = np.fromiter(
+            (0 if key is None else vocabulary.get(key, 0) for key in [None] + keys), dtype=np.int64, count=len(keys) + 1
+        )
+        return lookup[np.asarray(codes, dtype=np.int64) + 1]
+
+    def codes(self, column: str, values: Sequence[Any], grow: bool = False) -> np.ndarray:
+        """Table codes of raw values; only the distinct values are looked up."""
+        lookup: Dict[Any, int] = {}
+        local = np.fromiter(
+            (-1 if _missing(value) else lookup.setdefault(_key(column, value), len(lookup)) for value in values),
+            dtype=np.int64,
+            count=len(values),
+        )
+        return self.category_codes(column, local, list(lookup), grow=grow)
+
+    def _grow(self, column: str, keys: Sequence[Any]) -> None:
+        vocabulary = self._codes[column]
+        added = [key for key in dict.fromkeys(keys) if key is not None and key not in vocabulary]
+        if not added:
+            return
+        for key in added:
+            self.vocabularies[column].append(key)
+            vocabulary[key] = len(vocabulary) + 1
+        padding = [(0, 0)] * len(RATE_COLUMNS)
+        padding[RATE_COLUMNS.index(column)] = (0, len(added))
+        self.flights = np.pad(self.flights, padding)
+        self.delays = np.pad(self.delays, padding)
+        self._table = None
+
+    # ==============================================================
+    # COUNTS
+    # ==============================================================
+    def add(self, codes: Sequence[np.ndarray], delay: Sequence[int]) -> "DelayRateTable":
+        """Adds one flight per row of ``codes`` (one code array per column) with its 0/1 ``delay``."""
+        flat = np.ravel_multi_index(tuple(codes), self.shape)
+        size = self.flights.size
+        # New arrays rather than in-place sums: the counts may be read-only maps of a bundle.
+        self.flights = self.flights + np.bincount(flat, minlength=size).reshape(self.shape)
+        delayed = np.bincount(flat, weights=np.asarray(delay, dtype=np.float64), minlength=size)
+        self.delays = self.delays + delayed.astype(np.int64).reshape(self.shape)
+        self._table = None
+        return self
+
+    def update(self, records: Mapping[str, Sequence[Any]], delay: Sequence[int]) -> "DelayRateTable":
+        """Adds column-oriented raw flights (e.g. a new month), growing the vocabularies as needed."""
+        rows = len(delay)
+        codes = [
+            self.codes(column, records[column], grow=True) if column in records else np.zeros(rows, dtype=np.int64)
+            for column in RATE_COLUMNS
+        ]
+        return self.add(codes, delay)
+
+    # ==============================================================
+    # LOOKUP
+    # ==============================================================
+    def gather(self, codes: Sequence[np.ndarray], out: Optional[np.ndarray] = None, offset: int = 0) -> np.ndarray:
+        """Rates of each row (one column per level) with a single gather over the flattened table."""
+        flat = np.ravel_multi_index(tuple(codes), self.shape)
+        rates = self.table.reshape(-1, len(LEVELS))[flat]
+        if out is None:
+            return rates
+        out[:, offset:offset + len(LEVELS)] = rates
+        return out
+
+    def encode(
+        self, records: Mapping[str, Sequence[Any]], out: Optional[np.ndarray] = None, offset: int = 0
+    ) -> np.ndarray:
+        """Rates of column-oriented raw values; absent columns count as missing."""
+        rows = len(next(iter(records.values()))) if records else 0
+        codes = [
+            self.codes(column, records[column]) if column in records else np.zeros(rows, dtype=np.int64)
+            for column in RATE_COLUMNS
+        ]
+        return self.gather(codes, out=out, offset=offset)
+
+    def out_of_fold(
+        self, codes: Sequence[np.ndarray], delay: Sequence[int], n_folds: int = DEFAULT_FOLDS, seed: int = 42
+    ) -> np.ndarray:
+        """
+        Rates of the rows already added to the table, each computed without the
+        counts of its own (random) fold so that no row sees its own label.
+        """
+        delay = np.asarray(delay, dtype=np.float64)
+        if n_folds < 2:
+            raise ValueError("n_folds must be at least 2")
+        folds = np.random.default_rng(seed).integers(0, n_folds, len(delay))
+        flat = np.ravel_multi_index(tuple(codes), self.shape)
+        size = self.flights.size
+        key = folds * size + flat
+        fold_flights = np.bincount(key, minlength=n_folds * size).reshape((n_folds,) + self.shape)
+        fold_delays = np.bincount(key, weights=delay, minlength=n_folds * size).reshape((n_folds,) + self.shape)
+        rates = np.empty((len(delay), len(LEVELS)), dtype=np.float32)
+        for fold in range(n_folds):
+            members = np.flatnonzero(folds == fold)
+            table = smoothed_rates(self.flights - fold_flights[fold], self.delays - fold_delays[fold], self.smoothing)
+            rates[members] = table.reshape(-1, len(LEVELS))[flat[members]]
+        return rates
+
+    # ==============================================================
+    # PERSISTENCE
+    # ==============================================================
+    def spec(self) -> Dict[str, Any]:
+        """Description stored in bundle headers."""
+        return {
+            "columns": list(RATE_COLUMNS),
+            "features": feature_names(),
+            "smoothing": self.smoothing,
+            "rows": self.rows,
+            "shape": list(self.shape),
+        }
+
+    def to_arrays(self, prefix: str = "rates/") -> Dict[str, np.ndarray]:
+        arrays = {
+            f"{prefix}flights": np.ascontiguousarray(self.flights, dtype=np.int64),
+            f"{prefix}delays": np.ascontiguousarray(self.delays, dtype=np.int64),
+            f"{prefix}table": np.ascontiguousarray(self.table, dtype=np.float32),
+        }
+        for column, kind in SCHEMA.items():
+            values = self.vocabularies[column]
+            if kind == "int":
+                arrays[f"{prefix}vocab/{column}"] = np.asarray(values, dtype=np.int64)
+            else:
+                encoded = [value.encode("utf-8") for value in values]
+                width = max((len(value) for value in encoded), default=1)
+                arrays[f"{prefix}vocab/{column}"] = np.asarray(encoded, dtype=f"S{max(width, 1)}")
+        return arrays
+
+    @classmethod
+    def from_arrays(
+        cls, arrays: Mapping[str, np.ndarray], smoothing: float = DEFAULT_SMOOTHING, prefix: str = "rates/"
+    ) -> "DelayRateTable":
+        """Rebuilds a table from :meth:`to_arrays` output (e.g. read-only maps of a bundle)."""
+        vocabularies = {
+            column: [
+                value.decode("utf-8") if isinstance(value, bytes) else value
+                for value in arrays[f"{prefix}vocab/{column}"].tolist()
+            ]
+            for column in RATE_COLUMNS
+        }
+        return cls(
+            vocabularies,
+            flights=arrays[f"{prefix}flights"],
+            delays=arrays[f"{prefix}delays"],
+            smoothing=smoothing,
+            table=arrays.get(f"{prefix}table"),
+        )
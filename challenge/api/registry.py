@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Model registry with canary routing and off-path shadow scoring."""
+
+from __future__ import annotations
+
+import logging
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, List, Optional, Sequence
+
+try:
+    from .executor import DeadlineExceeded, ExecutorSaturated, latency_summary
+except ImportError:  # pragma: no cover - standalone execution inside the API image
+    from executor import DeadlineExceeded, ExecutorSaturated, latency_summary
+
+logger = logging.getLogger(__name__)
+
+PRIMARY = "primary"
+CANARY = "canary"
+SHADOW = "shadow"
+
+_LATENCY_WINDOW = 1024
+
+
+class ModelEntry:
+    """A registered model together with its routing role and serving statistics."""
+
+    def __init__(
+        self,
+        name: str,
+        model: Any,
+        feature_names: Sequence[str],
+        role: str = PRIMARY,
+        traffic_percent: float = 0.0,
+        source: Optional[str] = None,
+    ) -> None:
+        if role not in {PRIMARY, CANARY, SHADOW}:
+            raise ValueError(f"Unknown model role: {role}")
+        self.name = name
+        self.model = model
+        self.feature_names = list(feature_names)
+        self.role = role
+        self.traffic_percent = float(traffic_percent)
+        self.source = source
+        self.requests = 0
+        self.rows = 0
+        self.errors = 0
+        self.latencies: Deque[float] = deque(maxlen=_LATENCY_WINDOW)
+        # Agreement with the primary model, measured off the request path.
+        self.compared_rows = 0
+        self.agreeing_rows = 0
+        self.positive_rows = 0
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "role": self.role,
+            "source": self.source,
+            "traffic_percent": self.traffic_percent,
+            "requests": self.requests,
+            "rows": self.rows,
+            "errors": self.errors,
+            "latency": latency_summary(self.latencies),
+            "compared_rows": self.compared_rows,
+            "agreement_rate": (
+                round(self.agreeing_rows / self.compared_rows, 6) if self.compared_rows else None
+            ),
+            "positive_rate": round(self.positive_rows / self.rows, 6) if self.rows else None,
+        }
+
+
+# scorer(entry, flights, features) -> predictions; features may be None when they must be rebuilt.
+Scorer = Callable[[ModelEntry, Sequence[Any], Any], List[int]]
+
+
+class ModelRegistry:
+    """
+    Holds the primary model plus canary and shadow candidates.
+
+    Canary models receive a percentage of live traffic (or any request naming
+    them in the routing header). Shadow models never answer requests: after a
+    response is computed, the same flights (and, when the feature layout
+    matches, the same encoded matrix) are scored on a background thread and
+    compared with the primary. Requests served by a canary are re-scored with
+    the primary the same way. Background work is bounded; when it falls behind,
+    comparisons are dropped instead of delaying live traffic.
+    """
+
+    def __init__(self, primary: ModelEntry, max_pending_comparisons: int = 64) -> None:
+        self._entries: Dict[str, ModelEntry] = {}
+        self._lock = threading.Lock()
+        self._background = ThreadPoolExecutor(max_workers=1, thread_name_prefix="shadow")
+        self._max_pending = max_pending_comparisons
+        self._pending = 0
+        self.dropped_comparisons = 0
+        self.primary = primary
+        self.register(primary)
+
+    def register(self, entry: ModelEntry) -> None:
+        with self._lock:
+            if entry.role == PRIMARY:
+                self.primary = entry
+            self._entries[entry.name] = entry
+        logger.info("Registered %s model '%s'.", entry.role, entry.name)
+
+    def get(self, name: str) -> Optional[ModelEntry]:
+        return self._entries.get(name)
+
+    @property
+    def entries(self) -> List[ModelEntry]:
+        return list(self._entries.values())
+
+    @property
+    def shadows(self) -> List[ModelEntry]:
+        return [entry for entry in self._entries.values() if entry.role == SHADOW]
+
+    def route(self, requested: Optional[str] = None) -> ModelEntry:
+        """
+        Picks the model answering a request: an explicitly requested primary or
+        canary, a canary draw or the primary. Shadow names are ignored.
+        """
+        if requested:
+            entry = self._entries.get(requested)
+            if entry is not None and entry.role in {PRIMARY, CANARY}:
+                return entry
+
+        draw = random.random() * 100.0
+        for entry in self._entries.values():
+            if entry.role != CANARY or entry.traffic_percent <= 0:
+                continue
+            if draw < entry.traffic_percent:
+                return entry
+            draw -= entry.traffic_percent
+        return self.primary
+
+    def record(self, entry: ModelEntry, rows: int, elapsed: float, predictions: Sequence[int]) -> None:
+        with self._lock:
+            entry.requests += 1
+            entry.rows += rows
+            entry.positive_rows += int(sum(predictions))
+            entry.latencies.append(elapsed)
+
+    def record_error(self, entry: ModelEntry) -> None:
+        with self._lock:
+            entry.errors += 1
+
+    def compare_async(
+        self,
+        served: ModelEntry,
+        flights: Sequence[Any],
+        features: Any,
+        predictions: Sequence[int],
+        scorer: Scorer,
+    ) -> None:
+        """Schedules shadow scoring (and primary scoring for canary traffic) off the request path."""
+        targets = self.shadows if served is self.primary else [self.primary]
+        if not targets:
+            return
+
+        with self._lock:
+            if self._pending >= self._max_pending:
+                self.dropped_comparisons += 1
+                return
+            self._pending += 1
+        self._background.submit(self._compare, served, targets, flights, features, list(predictions), scorer)
+
+    def _compare(self, served, targets, flights, features, predictions, scorer) -> None:
+        try:
+            for target in targets:
+                shared = features if target.feature_names == served.feature_names else None
+                started = time.perf_counter()
+                try:
+                    other = scorer(target, flights, shared)
+                except (ExecutorSaturated, DeadlineExceeded) as exc:
+                    # Load shedding is not a model failure: drop the comparison instead.
+                    logger.info("Comparison with '%s' skipped: %s", target.name, exc)
+                    with self._lock:
+                        self.dropped_comparisons += 1
+                    continue
+                except Exception as exc:
+                    logger.warning("Shadow scoring with '%s' failed: %s", target.name, exc)
+                    self.record_error(target)
+                    continue
+                elapsed = time.perf_counter() - started
+
+                # Agreement is always attributed to the candidate, never to the primary.
+                candidate = served if target is self.primary else target
+                agreeing = sum(int(a) == int(b) for a, b in zip(predictions, other))
+                with self._lock:
+                    candidate.compared_rows += len(predictions)
+                    candidate.agreeing_rows += agreeing
+                if target.role == SHADOW:
+                    self.record(target, len(other), elapsed, other)
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "models": {name: entry.snapshot() for name, entry in self._entries.items()},
+                "pending_comparisons": self._pending,
+                "dropped_comparisons": self.dropped_comparisons,
+            }
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._background.shutdown(wait=wait)
+
+
+def parse_candidates(spec: Optional[str]) -> List[Dict[str, Any]]:
+    """
+    Parses ``name=path[@percent]`` entries separated by commas, e.g.
+    ``v2=/models/v2.bundle@10,v3=/models/v3.bundle``.
+    """
+    candidates = []
+    for item in (spec or "").split(","):
+        item = item.strip()
+        if not item:
+            continue
+        name, _, target = item.partition("=")
+        if not name or not target:
+            raise ValueError(f"Invalid model spec '{item}'; expected name=path[@percent]")
+        path, _, percent = target.partition("@")
+        candidates.append({"name": name.strip(), "path": path.strip(), "percent": float(percent or 0.0)})
+    return candidates
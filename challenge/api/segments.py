@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Per-segment models served behind a single router.
+
+A segmented artifact is a directory holding one bundle per segment (for
+example one per ``OPERA`` value), a ``global`` fallback bundle for segments
+that were too small to get their own model, and ``segments.json`` mapping
+segment values to bundle files. Every bundle shares the global one-hot
+layout, so a request is encoded once; :class:`SegmentedModel` then groups the
+rows by the segment column's one-hot block and scores each group with its
+model in a single vectorized call.
+
+Usage:
+
+    python -m challenge.api.segments inspect challenge/xgb_model.segments
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, Mapping, Optional, Union
+
+import numpy as np
+
+try:
+    from .bundle import BundleError, ModelBundle, load_bundle
+except ImportError:  # pragma: no cover - standalone execution inside the API image
+    from bundle import BundleError, ModelBundle, load_bundle
+
+MANIFEST_FILENAME = "segments.json"
+FALLBACK = "global"
+
+PathLike = Union[str, os.PathLike]
+
+
+def is_segmented(path: PathLike) -> bool:
+    return (Path(path) / MANIFEST_FILENAME).is_file()
+
+
+def write_manifest(
+    directory: PathLike,
+    column: str,
+    segments: Mapping[str, str],
+    fallback: str,
+    metadata: Optional[Mapping[str, Any]] = None,
+) -> Path:
+    """Writes ``segments.json`` atomically; bundle paths are relative to ``directory``."""
+    directory = Path(directory)
+    manifest = {
+        "column": column,
+        "fallback": fallback,
+        "segments": dict(segments),
+        "metadata": dict(metadata or {}),
+    }
+    temp = directory / f".{MANIFEST_FILENAME}.tmp"
+    temp.write_text(json.dumps(manifest, indent=2, ensure_ascii=False), encoding="utf-8")
+    path = directory / MANIFEST_FILENAME
+    os.replace(temp, path)
+    return path
+
+
+class SegmentedModel(ModelBundle):
+    """
+    Routes each row to the bundle of its segment, or to the fallback bundle.
+
+    It exposes the fallback's schema, encoder and training metadata, so the
+    API treats it like any other bundle (encoding, process workers, drift
+    reference); only scoring is dispatched per segment.
+    """
+
+    def __init__(
+        self,
+        path: PathLike,
+        column: str,
+        fallback: ModelBundle,
+        segments: Mapping[str, ModelBundle],
+        metadata: Optional[Mapping[str, Any]] = None,
+    ) -> None:
+        super().__init__(fallback.path, fallback.header, fallback.arrays)
+        self.path = str(path)
+        self.column = column
+        self.fallback = fallback
+        self.segment_metadata = dict(metadata or {})
+        self.models = [fallback]
+        self.names = [FALLBACK]
+        # Feature index of each segment's one-hot column and the model serving it.
+        indices = []
+        for value, model in segments.items():
+            if model.feature_columns != self.feature_columns:
+                raise BundleError(f"Segment '{value}' does not share the fallback feature layout")
+            name = f"{column}_{value}"
+            if name not in self.feature_columns:
+                raise BundleError(f"Segment column {name} is not a model feature")
+            indices.append(self.feature_columns.index(name))
+            self.models.append(model)
+            self.names.append(str(value))
+        self._segment_features = np.asarray(indices, dtype=np.int64)
+        self._lock = threading.Lock()
+        # Rows answered per model by predict().
+        self._rows = np.zeros(len(self.models), dtype=np.int64)
+
+    def route(self, features) -> np.ndarray:
+        """Model position (0 = fallback) serving each row."""
+        matrix = self._as_matrix(features)
+        if not len(self._segment_features):
+            return np.zeros(matrix.shape[0], dtype=np.int64)
+        block = matrix[:, self._segment_features]
+        # One-hot rows have a single 1 in the block; rows with none go to the fallback.
+        return np.where(block.any(axis=1), block.argmax(axis=1) + 1, 0).astype(np.int64)
+
+    def _dispatch(self, features, method: str, width: Optional[int] = None) -> np.ndarray:
+        matrix = self._as_matrix(features)
+        codes = self.route(matrix)
+        counts = np.bincount(codes, minlength=len(self.models))
+        shape = (matrix.shape[0],) if width is None else (matrix.shape[0], width)
+        output = np.empty(shape, dtype=np.float64 if method != "predict" else np.int64)
+        order = np.argsort(codes, kind="stable")
+        start = 0
+        for code in np.flatnonzero(counts):
+            rows = order[start:start + counts[code]]
+            start += counts[code]
+            output[rows] = getattr(self.models[code], method)(matrix[rows])
+        if method == "predict":
+            with self._lock:
+                self._rows += counts
+        return output
+
+    def decision_function(self, features) -> np.ndarray:
+        return self._dispatch(features, "decision_function")
+
+    def predict_proba(self, features) -> np.ndarray:
+        return self._dispatch(features, "predict_proba", width=2)
+
+    def predict(self, features) -> np.ndarray:
+        # Each segment applies its own threshold.
+        return self._dispatch(features, "predict")
+
+    def estimator(self):
+        raise BundleError(f"{self.path} holds several estimators; use .models instead")
+
+    def reset_counters(self) -> None:
+        with self._lock:
+            self._rows[:] = 0
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            rows = self._rows.tolist()
+        return {
+            "column": self.column,
+            "segments": {
+                name: {"source": model.path, "rows": count}
+                for name, model, count in zip(self.names, self.models, rows)
+            },
+        }
+
+
+def load_segmented(path: PathLike, verify: bool = True) -> SegmentedModel:
+    directory = Path(path)
+    manifest = json.loads((directory / MANIFEST_FILENAME).read_text(encoding="utf-8"))
+    fallback = load_bundle(directory / manifest["fallback"], verify=verify)
+    segments = {
+        value: load_bundle(directory / filename, verify=verify) for value, filename in manifest["segments"].items()
+    }
+    return SegmentedModel(directory, manifest["column"], fallback, segments, manifest.get("metadata"))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Per-segment model artifacts")
+    commands = parser.add_subparsers(dest="command", required=True)
+    inspect_parser = commands.add_parser("inspect", help="Print the segments and their training metadata")
+    inspect_parser.add_argument("path")
+    args = parser.parse_args()
+
+    model = load_segmented(args.path)
+    print(json.dumps({
+        "column": model.column,
+        "metadata": model.segment_metadata,
+        "segments": {
+            name: {"source": bundle.path, "kind": bundle.kind, "training": bundle.training}
+            for name, bundle in zip(model.names, model.models)
+        },
+    }, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":  # pragma: no cover - manual use
+    main()
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Pre-fork launcher for the prediction API.
+
+The parent process imports the API (which loads the model), warms the
+inference path once and freezes the garbage collector, then forks the
+requested number of uvicorn workers sharing one listening socket. Workers
+inherit the model pages copy-on-write instead of each loading their own copy.
+
+Usage:
+
+    python -m challenge.api.serve --workers 4 --port 8080
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import logging
+import os
+import signal
+import socket
+import time
+from pathlib import Path
+from typing import Dict, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+
+def process_memory(pid: Union[int, str] = "self") -> Dict[str, int]:
+    """Reads RSS, PSS and unique (private) memory in bytes from ``/proc/<pid>/smaps_rollup``."""
+    fields: Dict[str, int] = {}
+    try:
+        for line in Path(f"/proc/{pid}/smaps_rollup").read_text().splitlines():
+            parts = line.split()
+            if len(parts) >= 3 and parts[0].endswith(":"):
+                fields[parts[0][:-1]] = int(parts[1]) * 1024
+    except (OSError, ValueError):
+        return {}
+
+    return {
+        "rss_bytes": fields.get("Rss", 0),
+        "pss_bytes": fields.get("Pss", 0),
+        "uss_bytes": fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0),
+        "shared_bytes": fields.get("Shared_Clean", 0) + fields.get("Shared_Dirty", 0),
+    }
+
+
+def _import_api():
+    try:
+        from . import api  # type: ignore
+    except ImportError:  # pragma: no cover - standalone execution inside the API image
+        import api  # type: ignore
+    return api
+
+
+def _warm_up(api) -> None:
+    # Synchronous here: workers are forked only after the parent is ready.
+    if not api.warm_up():
+        logger.warning("Parent warm-up did not complete: %s", api.model_warmup.error)
+
+
+def _bind(host: str, port: int, backlog: int = 2048) -> socket.socket:
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+class PreforkServer:
+    """Supervises forked uvicorn workers, restarting any that exit unexpectedly."""
+
+    def __init__(
+        self,
+        host: str = "0.0.0.0",
+        port: int = 8080,
+        workers: int = 2,
+        report_interval: float = 60.0,
+        log_level: str = "info",
+    ) -> None:
+        if workers < 1:
+            raise ValueError("workers must be >= 1")
+        self.host = host
+        self.port = port
+        self.workers = workers
+        self.report_interval = report_interval
+        self.log_level = log_level
+        self._children: Dict[int, int] = {}
+        self._stopping = False
+        self._app = None
+        self._socket: Optional[socket.socket] = None
+
+    def _spawn(self, index: int) -> None:
+        pid = os.fork()
+        if pid == 0:  # pragma: no cover - runs in the child process
+            self._run_child()
+        self._children[pid] = index
+        logger.info("Worker %d started (pid %d).", index, pid)
+
+    def _run_child(self) -> None:  # pragma: no cover - runs in the child process
+        import uvicorn
+
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+        code = 0
+        try:
+            config = uvicorn.Config(self._app, host=self.host, port=self.port, log_level=self.log_level)
+            uvicorn.Server(config).run(sockets=[self._socket])
+        except BaseException:
+            logger.exception("Worker %d crashed.", os.getpid())
+            code = 1
+        finally:
+            os._exit(code)
+
+    def _request_stop(self, signum, _frame) -> None:
+        logger.info("Received signal %d; stopping workers.", signum)
+        self._stopping = True
+
+    def memory_report(self) -> Dict[str, Dict[str, int]]:
+        report = {"parent": process_memory(os.getpid())}
+        for pid, index in sorted(self._children.items(), key=lambda item: item[1]):
+            report[f"worker-{index}"] = {"pid": pid, **process_memory(pid)}
+        return report
+
+    def _log_memory(self) -> None:
+        for name, usage in self.memory_report().items():
+            logger.info(
+                "%s memory: rss=%.1f MiB pss=%.1f MiB unique=%.1f MiB",
+                name,
+                usage.get("rss_bytes", 0) / 2**20,
+                usage.get("pss_bytes", 0) / 2**20,
+                usage.get("uss_bytes", 0) / 2**20,
+            )
+
+    def run(self) -> None:
+        api = _import_api()
+        self._app = api.app
+        _warm_up(api)
+
+        # Objects created so far are shared with every worker; moving them to the
+        # permanent generation stops the collector from dirtying their pages.
+        gc.collect()
+        gc.freeze()
+
+        self._socket = _bind(self.host, self.port)
+        signal.signal(signal.SIGTERM, self._request_stop)
+        signal.signal(signal.SIGINT, self._request_stop)
+
+        for index in range(self.workers):
+            self._spawn(index)
+
+        next_report = time.monotonic() + self.report_interval
+        while not self._stopping:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                pid, status = 0, 0
+            if pid and pid in self._children:
+                index = self._children.pop(pid)
+                if not self._stopping:
+                    logger.warning("Worker %d (pid %d) exited with status %d; restarting.", index, pid, status)
+                    self._spawn(index)
+            if self.report_interval > 0 and time.monotonic() >= next_report:
+                self._log_memory()
+                next_report = time.monotonic() + self.report_interval
+            time.sleep(0.2)
+
+        for pid in list(self._children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        for pid in list(self._children):
+            try:
+                os.waitpid(pid, 0)
+            except ChildProcessError:
+                pass
+        self._children.clear()
+        self._socket.close()
+        logger.info("All workers stopped.")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Pre-fork launcher for the LATAM delay API")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", 8080)))
+    parser.add_argument("--workers", type=int, default=int(os.getenv("WEB_CONCURRENCY", 2)))
+    parser.add_argument(
+        "--report_interval",
+        type=float,
+        default=60.0,
+        help="Seconds between per-worker memory reports (0 disables them)",
+    )
+    parser.add_argument("--log_level", default="info")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    PreforkServer(
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        report_interval=args.report_interval,
+        log_level=args.log_level,
+    ).run()
+
+
+if __name__ == "__main__":  # pragma: no cover - manual execution
+    main()
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Startup warm-up and readiness tracking for the prediction API."""
+
+from __future__ import annotations
+
+import itertools
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+try:
+    from .executor import latency_summary
+except ImportError:  # pragma: no cover - standalone execution inside the API image
+    from executor import latency_summary
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+RUNNING = "running"
+READY = "ready"
+FAILED = "failed"
+
+DEFAULT_BATCH_SIZES = (1, 32, 256)
+
+
+def parse_batch_sizes(spec: Optional[str]) -> Tuple[int, ...]:
+    """Parses ``"1,32,256"``; an empty spec falls back to the defaults."""
+    if spec is None or not spec.strip():
+        return DEFAULT_BATCH_SIZES
+    sizes = tuple(int(item) for item in spec.split(",") if item.strip())
+    if any(size < 1 for size in sizes):
+        raise ValueError("warm-up batch sizes must be positive integers")
+    return sizes
+
+
+def batches(grid: Sequence[Any], batch_size: int) -> List[List[Any]]:
+    """
+    Splits ``grid`` into batches of ``batch_size`` items covering every item.
+
+    The last batch, or a single batch larger than the grid, is completed by
+    cycling over the grid so that every call has exactly ``batch_size`` rows.
+    """
+    count = max(1, -(-len(grid) // batch_size))
+    items = list(itertools.islice(itertools.cycle(grid), count * batch_size))
+    return [items[start:start + batch_size] for start in range(0, len(items), batch_size)]
+
+
+class WarmUp:
+    """
+    Runs synthetic inferences through the serving path before reporting ready.
+
+    The first calls of a fresh process pay one-off costs (pandas and estimator
+    allocations, lazily imported code, process worker start-up) that would
+    otherwise land on the first real requests after a deploy. Every model is
+    scored over the whole grid at each batch size for ``rounds`` passes; the
+    report keeps the first call of each batch size apart from the steady-state
+    latency of the rest. The latency of the first live request is recorded too,
+    so the report shows whether warm-up actually covered the cold path.
+    """
+
+    def __init__(self, batch_sizes: Sequence[int] = DEFAULT_BATCH_SIZES, rounds: int = 2, enabled: bool = True) -> None:
+        if rounds < 1:
+            raise ValueError("rounds must be >= 1")
+        self.batch_sizes = tuple(batch_sizes)
+        self.rounds = rounds
+        self.enabled = enabled
+        self.status = PENDING
+        self.error: Optional[str] = None
+        self.seconds: Optional[float] = None
+        self.models: Dict[str, Dict[str, Any]] = {}
+        self.first_request: Optional[Dict[str, Any]] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.status == READY
+
+    def run(self, targets: Iterable[Tuple[str, Callable[[Sequence[Any]], Any]]], grid: Sequence[Any]) -> bool:
+        """
+        Scores ``grid`` with every ``(name, score)`` target; returns True once ready.
+
+        A failing target marks the warm-up as failed and stops it, since the
+        same error would be served to live traffic.
+        """
+        self.status = RUNNING
+        self.error = None
+        self.models = {}
+        started = time.perf_counter()
+        if not self.enabled:
+            self.seconds = 0.0
+            self.status = READY
+            return True
+        try:
+            for name, score in targets:
+                self.models[name] = self._warm(score, grid)
+                if self._stop.is_set():
+                    self.status = PENDING
+                    return False
+        except Exception as exc:
+            self.error = getattr(exc, "detail", None) or repr(exc)
+            self.seconds = round(time.perf_counter() - started, 4)
+            self.status = FAILED
+            logger.error("Warm-up failed: %s", self.error)
+            return False
+
+        self.seconds = round(time.perf_counter() - started, 4)
+        self.status = READY
+        logger.info(
+            "Warm-up scored %d calls in %.1f ms; ready.",
+            sum(size["calls"] for model in self.models.values() for size in model.values()),
+            self.seconds * 1000,
+        )
+        return True
+
+    def _warm(self, score: Callable[[Sequence[Any]], Any], grid: Sequence[Any]) -> Dict[str, Dict[str, Any]]:
+        report = {}
+        for batch_size in self.batch_sizes:
+            chunks = batches(grid, batch_size)
+            first = None
+            steady = deque()
+            for _ in range(self.rounds):
+                for chunk in chunks:
+                    if self._stop.is_set():
+                        return report
+                    started = time.perf_counter()
+                    score(chunk)
+                    elapsed = time.perf_counter() - started
+                    if first is None:
+                        first = elapsed
+                    else:
+                        steady.append(elapsed)
+            report[str(batch_size)] = {
+                "calls": len(steady) + 1,
+                "rows": (len(steady) + 1) * batch_size,
+                "first_ms": round(first * 1000.0, 3),
+                "steady": latency_summary(steady),
+            }
+        return report
+
+    def start(self, targets: Iterable[Tuple[str, Callable[[Sequence[Any]], Any]]], grid: Sequence[Any]) -> None:
+        """Runs :meth:`run` on a background thread so the process can answer liveness probes meanwhile."""
+        self._stop.clear()
+        self.status = RUNNING
+        self._thread = threading.Thread(target=self.run, args=(targets, grid), name="warm-up", daemon=True)
+        self._thread.start()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        if self._thread is not None:
+            self._thread.join(timeout)
+        return self.ready
+
+    def stop(self, timeout: float = 1.0) -> None:
+        self._stop.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+        self._thread = None
+
+    def record_request(self, rows: int, elapsed: float) -> None:
+        """Keeps the latency of the first live request served after warm-up."""
+        if self.first_request is None and self.ready:
+            self.first_request = {"rows": rows, "ms": round(elapsed * 1000.0, 3)}
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "status": self.status,
+            "error": self.error,
+            "seconds": self.seconds,
+            "batch_sizes": list(self.batch_sizes),
+            "rounds": self.rounds,
+            "models": self.models,
+            "first_request": self.first_request,
+        }
@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Out-of-process inference workers fed through shared-memory feature buffers."""
+
+from __future__ import annotations
+
+import functools
+import logging
+import multiprocessing
+import os
+import queue
+import threading
+import time
+import warnings
+from multiprocessing import shared_memory
+from typing import Any, Callable, List, Optional
+
+import numpy as np
+
+try:
+    from .bundle import load_model
+    from .executor import ExecutorSaturated
+except ImportError:  # pragma: no cover - standalone execution inside the API image
+    from bundle import load_model
+    from executor import ExecutorSaturated
+
+logger = logging.getLogger(__name__)
+
+_INPUT_DTYPE = np.float32
+_OUTPUT_DTYPE = np.int32
+_POLL_INTERVAL = 0.05
+
+
+class WorkerCrashed(RuntimeError):
+    """Raised when an inference worker dies while serving a batch."""
+
+
+def _views(buffer, max_rows: int, n_features: int):
+    inputs = np.ndarray((max_rows, n_features), dtype=_INPUT_DTYPE, buffer=buffer)
+    outputs = np.ndarray((max_rows,), dtype=_OUTPUT_DTYPE, buffer=buffer, offset=inputs.nbytes)
+    return inputs, outputs
+
+
+def _worker_main(loader: Callable[[], Any], shm_name: str, max_rows: int, n_features: int, conn) -> None:
+    # Feature-name checks are meaningless here: the column order is fixed by the parent.
+    warnings.filterwarnings("ignore", message="X does not have valid feature names")
+    model = loader()
+    shm = shared_memory.SharedMemory(name=shm_name)
+    inputs, outputs = _views(shm.buf, max_rows, n_features)
+    conn.send(("ready", os.getpid()))
+
+    try:
+        while True:
+            try:
+                rows = conn.recv()
+            except EOFError:
+                break
+            if rows is None:
+                break
+            try:
+                outputs[:rows] = np.asarray(model.predict(inputs[:rows]), dtype=_OUTPUT_DTYPE)
+                conn.send(("ok", rows))
+            except Exception as exc:  # pragma: no cover - surfaced to the parent
+                conn.send(("error", repr(exc)))
+    finally:
+        del inputs, outputs
+        shm.close()
+        conn.close()
+
+
+class _Slot:
+    """One worker process together with its private shared-memory segment."""
+
+    def __init__(self, index: int, max_rows: int, n_features: int) -> None:
+        self.index = index
+        size = max_rows * n_features * np.dtype(_INPUT_DTYPE).itemsize
+        size += max_rows * np.dtype(_OUTPUT_DTYPE).itemsize
+        self.shm = shared_memory.SharedMemory(create=True, size=size)
+        self.inputs, self.outputs = _views(self.shm.buf, max_rows, n_features)
+        self.process = None
+        self.conn = None
+        self.restarts = -1
+        self.batches = 0
+        self.rows = 0
+
+    def close(self) -> None:
+        del self.inputs, self.outputs
+        self.shm.close()
+        self.shm.unlink()
+
+
+class ProcessInferencePool:
+    """
+    Pool of long-lived inference processes.
+
+    Each worker owns a shared-memory segment holding a ``max_rows x n_features``
+    float32 input matrix followed by a ``max_rows`` int32 prediction vector. The
+    parent copies the encoded batch into the segment and sends only the row
+    count through a pipe; the worker predicts on a view of the same pages and
+    writes the predictions back in place. Batches larger than ``max_rows`` are
+    split. A worker found dead is restarted and the batch fails with
+    :class:`WorkerCrashed`.
+    """
+
+    def __init__(
+        self,
+        loader: Callable[[], Any],
+        n_features: int,
+        processes: int = 2,
+        max_rows: int = 4096,
+        timeout: float = 30.0,
+        start_method: str = "spawn",
+    ) -> None:
+        if processes < 1:
+            raise ValueError("processes must be >= 1")
+        if n_features < 1:
+            raise ValueError("n_features must be >= 1")
+
+        self.n_features = n_features
+        self.max_rows = max_rows
+        self.timeout = timeout
+        self._loader = loader
+        self._context = multiprocessing.get_context(start_method)
+        self._slots = [_Slot(index, max_rows, n_features) for index in range(processes)]
+        self._idle: "queue.Queue[_Slot]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._closed = False
+
+        try:
+            for slot in self._slots:
+                self._start(slot)
+                self._idle.put(slot)
+        except Exception:
+            self.close()
+            raise
+        logger.info("Started %d inference worker processes (max %d rows per batch).", processes, max_rows)
+
+    def _start(self, slot: _Slot) -> None:
+        parent_conn, child_conn = self._context.Pipe()
+        process = self._context.Process(
+            target=_worker_main,
+            args=(self._loader, slot.shm.name, self.max_rows, self.n_features, child_conn),
+            name=f"inference-worker-{slot.index}",
+            daemon=True,
+        )
+        process.start()
+        child_conn.close()
+        slot.process, slot.conn = process, parent_conn
+        slot.restarts += 1
+
+        status, _ = self._receive(slot, self.timeout)
+        if status != "ready":  # pragma: no cover - defensive
+            raise WorkerCrashed(f"Worker {slot.index} failed to start")
+
+    def _restart(self, slot: _Slot) -> None:
+        logger.warning("Inference worker %d died; restarting.", slot.index)
+        self._terminate(slot)
+        self._start(slot)
+
+    @staticmethod
+    def _terminate(slot: _Slot) -> None:
+        if slot.conn is not None:
+            slot.conn.close()
+        if slot.process is not None and slot.process.is_alive():
+            slot.process.terminate()
+        if slot.process is not None:
+            slot.process.join(timeout=5)
+
+    def _receive(self, slot: _Slot, timeout: float):
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                if slot.conn.poll(_POLL_INTERVAL):
+                    return slot.conn.recv()
+            except (EOFError, OSError) as exc:
+                raise WorkerCrashed(f"Worker {slot.index} died") from exc
+            if not slot.process.is_alive():
+                raise WorkerCrashed(f"Worker {slot.index} died")
+            if time.monotonic() > deadline:
+                raise WorkerCrashed(f"Worker {slot.index} timed out")
+
+    def predict(self, features: np.ndarray) -> np.ndarray:
+        """Scores an encoded ``(rows, n_features)`` matrix and returns int predictions."""
+        if self._closed:
+            raise RuntimeError("Inference pool is closed")
+        if features.ndim != 2 or features.shape[1] != self.n_features:
+            raise ValueError(
+                f"Expected a (rows, {self.n_features}) matrix, got {features.shape}"
+            )
+
+        try:
+            slot = self._idle.get(timeout=self.timeout)
+        except queue.Empty as exc:
+            raise ExecutorSaturated(f"All {len(self._slots)} inference workers are busy") from exc
+        try:
+            if not slot.process.is_alive():
+                self._restart(slot)
+
+            results: List[np.ndarray] = []
+            for start in range(0, features.shape[0], self.max_rows):
+                chunk = features[start:start + self.max_rows]
+                rows = chunk.shape[0]
+                np.copyto(slot.inputs[:rows], chunk, casting="unsafe")
+                try:
+                    slot.conn.send(rows)
+                    status, detail = self._receive(slot, self.timeout)
+                except (WorkerCrashed, BrokenPipeError, OSError) as exc:
+                    self._restart(slot)
+                    raise WorkerCrashed(str(exc)) from exc
+                if status != "ok":
+                    raise RuntimeError(f"Worker {slot.index} failed: {detail}")
+                results.append(slot.outputs[:rows].copy())
+                slot.batches += 1
+                slot.rows += rows
+        finally:
+            self._idle.put(slot)
+
+        if not results:
+            return np.empty(0, dtype=_OUTPUT_DTYPE)
+        return np.concatenate(results)
+
+    def snapshot(self) -> dict:
+        return {
+            "processes": len(self._slots),
+            "max_rows": self.max_rows,
+            "idle": self._idle.qsize(),
+            "workers": [
+                {
+                    "pid": slot.process.pid if slot.process is not None else None,
+                    "alive": bool(slot.process is not None and slot.process.is_alive()),
+                    "restarts": slot.restarts,
+                    "batches": slot.batches,
+                    "rows": slot.rows,
+                }
+                for slot in self._slots
+            ],
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        for slot in self._slots:
+            try:
+                if slot.process is not None and slot.process.is_alive():
+                    slot.conn.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+            self._terminate(slot)
+            slot.close()
+
+
+def default_loader(path: Optional[os.PathLike]) -> Callable[[], Any]:
+    """Builds a picklable loader for the given artifact path (bundle or legacy pickle)."""
+    return functools.partial(load_model, str(path))
@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Configuración del estimador de DelayModel.
+
+La configuración parte de ``DEFAULT_CONFIG``, se combina con un archivo JSON
+(``DELAY_MODEL_CONFIG`` o el argumento ``path``) y finalmente con variables de
+entorno puntuales, en ese orden de prioridad:
+
+    {
+      "estimator": "xgboost",
+      "n_jobs": 4,
+      "xgboost": {"tree_method": "hist", "early_stopping_rounds": 20},
+      "logistic_regression": {"solver": "liblinear"},
+      "features": {"hashed_columns": ["SIGLADES", "DIANOM"], "hash_features": 64, "rate_features": true}
+    }
+
+| Variable                               | Clave                                 |
+|----------------------------------------|---------------------------------------|
+| ``DELAY_MODEL_ESTIMATOR``              | ``estimator`` (``auto`` usa ``USE_XGBOOST``) |
+| ``DELAY_MODEL_N_JOBS``                 | ``n_jobs``                            |
+| ``DELAY_MODEL_TREE_METHOD``            | ``xgboost.tree_method``               |
+| ``DELAY_MODEL_N_ESTIMATORS``           | ``xgboost.n_estimators``              |
+| ``DELAY_MODEL_EARLY_STOPPING_ROUNDS``  | ``xgboost.early_stopping_rounds``     |
+| ``DELAY_MODEL_SOLVER``                 | ``logistic_regression.solver``        |
+| ``DELAY_MODEL_HASHED_COLUMNS``         | ``features.hashed_columns`` (por comas) |
+| ``DELAY_MODEL_HASH_FEATURES``          | ``features.hash_features``            |
+| ``DELAY_MODEL_RATE_FEATURES``          | ``features.rate_features``            |
+| ``DELAY_MODEL_RATE_SMOOTHING``         | ``features.rate_smoothing``           |
+
+``n_jobs`` limita tanto los hilos del estimador como los de BLAS/OpenMP durante
+el entrenamiento (``training_threads``). ``features`` agrega columnas de alta
+cardinalidad codificadas por hashing (``api/hashing.py``) a las one-hot y,
+con ``rate_features``, las tasas históricas de retraso por aerolínea, destino y
+mes (``api/rates.py``).
+"""
+
+import copy
+import json
+import logging
+import os
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, Mapping, Optional, Tuple, Union
+
+import numpy as np
+from sklearn.linear_model import LogisticRegression
+from sklearn.model_selection import train_test_split
+
+try:
+    from threadpoolctl import threadpool_limits
+except ImportError:  # pragma: no cover - threadpoolctl llega con scikit-learn
+    threadpool_limits = None
+
+ESTIMATORS = ("auto", "xgboost", "logistic_regression")
+TREE_METHODS = ("auto", "exact", "approx", "hist")
+SOLVERS = ("lbfgs", "liblinear", "newton-cg", "newton-cholesky", "sag", "saga")
+# Columnas que ya se codifican con one-hot y no pueden además pasar por hashing.
+ONE_HOT_COLUMNS = ("OPERA", "TIPOVUELO", "MES")
+# Fracción del entrenamiento reservada para medir la parada temprana.
+STOPPING_FRACTION = 0.1
+
+DEFAULT_CONFIG: Dict[str, Any] = {
+    "estimator": "auto",
+    # None deja a cada librería decidir (todos los núcleos en XGBoost).
+    "n_jobs": None,
+    "xgboost": {
+        "learning_rate": 0.01,
+        "n_estimators": 200,
+        "max_depth": 4,
+        "tree_method": "hist",
+        "max_bin": 256,
+        # Rondas sin mejora del logloss de validación antes de detenerse; None lo desactiva.
+        "early_stopping_rounds": None,
+        "random_state": 1,
+    },
+    "logistic_regression": {
+        "solver": "lbfgs",
+        "max_iter": 1000,
+        "tol": 1e-4,
+        "random_state": 1,
+    },
+    "features": {
+        # Columnas crudas codificadas por hashing en un bloque de ancho fijo; vacío las desactiva.
+        "hashed_columns": [],
+        "hash_features": 64,
+        # Tasas históricas de retraso (aerolínea x destino x mes) calculadas en el entrenamiento.
+        "rate_features": False,
+        # Vuelos ficticios con los que cada tasa se acerca a la del nivel superior.
+        "rate_smoothing": 20.0,
+        # Folds con los que se calculan las tasas de las filas de entrenamiento sin su propia etiqueta.
+        "rate_folds": 5,
+    },
+}
+
+_ENVIRONMENT = {
+    "DELAY_MODEL_ESTIMATOR": (("estimator",), str),
+    "DELAY_MODEL_N_JOBS": (("n_jobs",), int),
+    "DELAY_MODEL_TREE_METHOD": (("xgboost", "tree_method"), str),
+    "DELAY_MODEL_N_ESTIMATORS": (("xgboost", "n_estimators"), int),
+    "DELAY_MODEL_EARLY_STOPPING_ROUNDS": (("xgboost", "early_stopping_rounds"), int),
+    "DELAY_MODEL_SOLVER": (("logistic_regression", "solver"), str),
+    "DELAY_MODEL_HASHED_COLUMNS": (("features", "hashed_columns"), lambda raw: [
+        column.strip() for column in raw.split(",") if column.strip()
+    ]),
+    "DELAY_MODEL_HASH_FEATURES": (("features", "hash_features"), int),
+    "DELAY_MODEL_RATE_FEATURES": (("features", "rate_features"), lambda raw: raw.lower() in {"1", "true", "yes", "on"}),
+    "DELAY_MODEL_RATE_SMOOTHING": (("features", "rate_smoothing"), float),
+}
+
+
+def _merge(base: Dict[str, Any], override: Mapping[str, Any]) -> Dict[str, Any]:
+    for key, value in override.items():
+        if isinstance(value, Mapping) and isinstance(base.get(key), dict):
+            _merge(base[key], value)
+        else:
+            base[key] = value
+    return base
+
+
+def load_config(
+    path: Optional[Union[str, Path]] = None,
+    environ: Optional[Mapping[str, str]] = None,
+) -> Dict[str, Any]:
+    """
+    Se arma la configuración del estimador a partir de los valores por defecto,
+    el archivo JSON y las variables de entorno.
+
+    Args:
+        path: archivo JSON; por defecto, ``DELAY_MODEL_CONFIG`` si está definido.
+        environ: variables de entorno a consultar (por defecto, ``os.environ``).
+
+    Returns:
+        Dict[str, Any]: configuración validada, con ``estimator`` ya resuelto.
+    """
+    environ = os.environ if environ is None else environ
+    config = copy.deepcopy(DEFAULT_CONFIG)
+    path = path or environ.get("DELAY_MODEL_CONFIG")
+    if path:
+        _merge(config, json.loads(Path(path).read_text(encoding="utf-8")))
+
+    for variable, (keys, cast) in _ENVIRONMENT.items():
+        raw = environ.get(variable, "").strip()
+        if not raw:
+            continue
+        target = config
+        for key in keys[:-1]:
+            target = target[key]
+        # "none" permite desactivar desde el entorno un valor fijado en el archivo.
+        target[keys[-1]] = None if raw.lower() == "none" else cast(raw)
+
+    if config["estimator"] == "auto":
+        use_xgboost = environ.get("USE_XGBOOST", "").lower() in {"1", "true", "yes"}
+        config["estimator"] = "xgboost" if use_xgboost else "logistic_regression"
+    _validate(config)
+    return config
+
+
+def _validate(config: Mapping[str, Any]) -> None:
+    if config["estimator"] not in ESTIMATORS:
+        raise ValueError(f"Estimador desconocido: {config['estimator']}")
+    if config["n_jobs"] is not None and config["n_jobs"] < 1:
+        raise ValueError("n_jobs debe ser un entero positivo.")
+    if config["xgboost"]["tree_method"] not in TREE_METHODS:
+        raise ValueError(f"Método de construcción de árboles desconocido: {config['xgboost']['tree_method']}")
+    if config["logistic_regression"]["solver"] not in SOLVERS:
+        raise ValueError(f"Solver desconocido: {config['logistic_regression']['solver']}")
+    hashed = set(config["features"]["hashed_columns"] or [])
+    if hashed & set(ONE_HOT_COLUMNS):
+        raise ValueError(f"Las columnas {sorted(hashed & set(ONE_HOT_COLUMNS))} ya se codifican con one-hot.")
+    if hashed and (config["features"]["hash_features"] or 0) < 1:
+        raise ValueError("hash_features debe ser un entero positivo.")
+    if config["features"]["rate_features"]:
+        if (config["features"]["rate_smoothing"] or 0) <= 0:
+            raise ValueError("rate_smoothing debe ser positivo.")
+        if (config["features"]["rate_folds"] or 0) < 2:
+            raise ValueError("rate_folds debe ser al menos 2.")
+
+
+def build_estimator(config: Mapping[str, Any]):
+    """
+    El estimador se construye con la configuración indicada; si XGBoost no está
+    disponible, se recurre a una regresión logística.
+    """
+    if config["estimator"] == "xgboost":
+        try:
+            import xgboost as xgb  # type: ignore
+
+            logging.info("Inicializando modelo XGBoost (%s).", config["xgboost"]["tree_method"])
+            return xgb.XGBClassifier(
+                n_jobs=config["n_jobs"],
+                use_label_encoder=False,
+                eval_metric="logloss",
+                **config["xgboost"],
+            )
+        except Exception as exc:  # pragma: no cover - solo se ejecuta en entornos con XGBoost
+            logging.warning(
+                "No se pudo inicializar XGBoost (%s). Se utilizará LogisticRegression.",
+                exc
+            )
+
+    logging.info("Inicializando modelo LogisticRegression (%s).", config["logistic_regression"]["solver"])
+    return LogisticRegression(**config["logistic_regression"])
+
+
+def fit_params(model, eval_set: Optional[Tuple[Any, Any]] = None) -> Dict[str, Any]:
+    """
+    Argumentos adicionales de ``fit``: con parada temprana, XGBoost necesita el
+    conjunto de validación sobre el que mide el logloss.
+    """
+    if getattr(model, "early_stopping_rounds", None) is None:
+        return {}
+    if eval_set is None:
+        raise ValueError("La parada temprana requiere un conjunto de validación.")
+    return {"eval_set": [eval_set], "verbose": False}
+
+
+def stopping_split(model, features, target, fraction: float = STOPPING_FRACTION, seed: int = 42) -> tuple:
+    """
+    Con parada temprana, separa ``fraction`` de las filas de entrenamiento como
+    conjunto de validación para ``fit_params``, de modo que el holdout o el fold
+    que luego se evalúa no decida cuándo detenerse. Devuelve ``(features,
+    target, eval_set)``; sin parada temprana, los datos completos y ``None``.
+    """
+    if getattr(model, "early_stopping_rounds", None) is None:
+        return features, target, None
+    _, counts = np.unique(np.asarray(target), return_counts=True)
+    stratify = target if len(counts) > 1 and counts.min() >= 2 else None
+    fit_features, stop_features, fit_target, stop_target = train_test_split(
+        features, target, test_size=fraction, random_state=seed, stratify=stratify
+    )
+    return fit_features, fit_target, (stop_features, stop_target)
+
+
+@contextmanager
+def training_threads(n_jobs: Optional[int]) -> Iterator[None]:
+    """Limita los hilos de BLAS/OpenMP mientras dura el entrenamiento."""
+    if n_jobs is None or threadpool_limits is None:
+        yield
+        return
+    with threadpool_limits(limits=n_jobs):
+        yield
+
+
+def iterations(model) -> Dict[str, Any]:
+    """Iteraciones efectivamente realizadas por el estimador entrenado."""
+    if hasattr(model, "get_booster"):
+        rounds = int(model.get_booster().num_boosted_rounds())
+        best = None
+        if model.get_params().get("early_stopping_rounds") is not None:
+            best = int(model.best_iteration)
+        return {
+            "boosted_rounds": rounds,
+            "best_iteration": best,
+            "stopped_early": best is not None and rounds < int(model.get_params()["n_estimators"]),
+        }
+    if hasattr(model, "n_iter_"):
+        n_iter = int(max(model.n_iter_))
+        return {"n_iter": n_iter, "converged": n_iter < int(model.get_params()["max_iter"])}
+    return {}
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Evaluación vectorizada de clasificadores binarios sobre el conjunto de validación.
+
+Las métricas se obtienen de un único ``np.bincount`` ponderado por (valor de
+score, etiqueta): de esos conteos salen la matriz de confusión y el ROC-AUC
+(estadístico de Mann-Whitney). Los puntajes se ordenan una sola vez, por lo que
+cada réplica bootstrap (un vector de pesos multinomial) cuesta O(n) y las
+réplicas se reparten en bloques independientes entre procesos.
+"""
+
+import json
+import logging
+import os
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+import numpy as np
+
+METRICS = ("accuracy", "precision", "recall", "f1", "roc_auc")
+
+
+class _Scores:
+    """Etiquetas y puntajes preprocesados para evaluar con distintos pesos por fila."""
+
+    def __init__(
+        self,
+        y_true: np.ndarray,
+        scores: np.ndarray,
+        threshold: float,
+        sample_weight: Optional[np.ndarray] = None,
+    ) -> None:
+        self.y_true = np.asarray(y_true).astype(np.int64).ravel()
+        # Pesos por fila (p. ej. inversos de la probabilidad de muestreo); None equivale a 1.
+        self.sample_weight = None if sample_weight is None else np.asarray(sample_weight, dtype=np.float64).ravel()
+        scores = np.asarray(scores, dtype=np.float64).ravel()
+        # Grupo de empate de cada fila en orden creciente de score; la predicción
+        # (score > threshold) es constante dentro de cada grupo.
+        unique, group = np.unique(scores, return_inverse=True)
+        self.groups = len(unique)
+        self.key = 2 * group.ravel() + self.y_true
+        self.predicted = unique > threshold
+
+    def metrics(self, weights: Optional[np.ndarray] = None) -> Dict[str, Any]:
+        if self.sample_weight is not None:
+            weights = self.sample_weight if weights is None else weights * self.sample_weight
+        counts = np.bincount(self.key, weights=weights, minlength=2 * self.groups).reshape(-1, 2)
+        negatives, positives = counts[:, 0], counts[:, 1]
+
+        tp, fp = positives[self.predicted].sum(), negatives[self.predicted].sum()
+        fn, tn = positives.sum() - tp, negatives.sum() - fp
+        total = tn + fp + fn + tp
+        precision = tp / (tp + fp) if tp + fp else 0.0
+        recall = tp / (tp + fn) if tp + fn else 0.0
+        f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+
+        # ROC-AUC (Mann-Whitney): cada positivo suma los negativos con score menor
+        # y la mitad de los empatados.
+        total_pos, total_neg = tp + fn, tn + fp
+        if total_pos and total_neg:
+            below = np.cumsum(negatives) - negatives
+            roc_auc = float(np.dot(positives, below + 0.5 * negatives) / (total_pos * total_neg))
+        else:
+            roc_auc = float("nan")
+
+        return {
+            "accuracy": float((tp + tn) / total) if total else 0.0,
+            "precision": float(precision),
+            "recall": float(recall),
+            "f1": float(f1),
+            "roc_auc": roc_auc,
+            "confusion_matrix": {"tn": float(tn), "fp": float(fp), "fn": float(fn), "tp": float(tp)},
+        }
+
+
+def _bootstrap_chunk(scores: _Scores, rounds: int, seed: np.random.SeedSequence) -> List[List[float]]:
+    rng = np.random.default_rng(seed)
+    size = len(scores.y_true)
+    samples = []
+    for _ in range(rounds):
+        weights = np.bincount(rng.integers(0, size, size), minlength=size).astype(np.float64)
+        values = scores.metrics(weights)
+        samples.append([values[name] for name in METRICS])
+    return samples
+
+
+def evaluate_binary(
+    y_true: Union[np.ndarray, List[int]],
+    scores: Union[np.ndarray, List[float]],
+    threshold: float = 0.5,
+    n_bootstrap: int = 200,
+    confidence: float = 0.95,
+    n_jobs: Optional[int] = None,
+    seed: int = 42,
+    sample_weight: Optional[Union[np.ndarray, List[float]]] = None,
+) -> Dict[str, Any]:
+    """
+    Se calculan matriz de confusión, accuracy, precision, recall, F1 y ROC-AUC,
+    junto con intervalos de confianza bootstrap por percentiles.
+
+    Args:
+        y_true: etiquetas reales (0/1).
+        scores: probabilidad estimada de la clase positiva.
+        threshold: umbral estricto (``score > threshold``) para la clase positiva.
+        n_bootstrap: réplicas bootstrap; 0 omite los intervalos.
+        confidence: nivel de confianza de los intervalos.
+        n_jobs: procesos para el bootstrap; por defecto, los núcleos disponibles.
+        seed: semilla raíz; los resultados no dependen de ``n_jobs``.
+        sample_weight: peso de cada fila; la matriz de confusión queda en filas ponderadas.
+
+    Returns:
+        Dict[str, Any]: métricas puntuales, intervalos y tiempos.
+    """
+    started = time.perf_counter()
+    data = _Scores(np.asarray(y_true), np.asarray(scores), threshold, sample_weight)
+    point = data.metrics()
+    confusion = {cell: int(round(value)) for cell, value in point.pop("confusion_matrix").items()}
+    report: Dict[str, Any] = {
+        "rows": int(len(data.y_true)),
+        "positive_rate": float(np.average(data.y_true, weights=data.sample_weight)) if len(data.y_true) else 0.0,
+        "threshold": threshold,
+        "confusion_matrix": confusion,
+        "metrics": {name: _finite(value) for name, value in point.items()},
+    }
+    metrics_seconds = time.perf_counter() - started
+
+    intervals = {}
+    jobs = 0
+    bootstrap_started = time.perf_counter()
+    if n_bootstrap > 0 and len(data.y_true):
+        # Bloques de tamaño fijo con semillas derivadas: el resultado es reproducible
+        # sin importar cuántos procesos los ejecuten.
+        block = 25
+        sizes = [min(block, n_bootstrap - start) for start in range(0, n_bootstrap, block)]
+        seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+        jobs = max(1, min(n_jobs or os.cpu_count() or 1, len(sizes)))
+        if jobs == 1:
+            chunks = [_bootstrap_chunk(data, size, child) for size, child in zip(sizes, seeds)]
+        else:
+            with ProcessPoolExecutor(max_workers=jobs) as pool:
+                chunks = list(pool.map(_bootstrap_chunk, [data] * len(sizes), sizes, seeds))
+        samples = np.array([row for chunk in chunks for row in chunk], dtype=np.float64)
+        alpha = (1.0 - confidence) / 2.0
+        with warnings.catch_warnings():
+            # Una métrica indefinida en todas las réplicas (p. ej. AUC con una sola clase) queda en None.
+            warnings.simplefilter("ignore", RuntimeWarning)
+            low, high = np.nanquantile(samples, [alpha, 1.0 - alpha], axis=0)
+        intervals = {
+            name: {"low": _finite(low[i]), "high": _finite(high[i])} for i, name in enumerate(METRICS)
+        }
+
+    report["confidence_intervals"] = {"level": confidence, "bootstrap_rounds": n_bootstrap, **intervals}
+    report["timings"] = {
+        "metrics_seconds": round(metrics_seconds, 4),
+        "bootstrap_seconds": round(time.perf_counter() - bootstrap_started, 4),
+        "bootstrap_jobs": jobs,
+    }
+    return report
+
+
+def _finite(value: float) -> Optional[float]:
+    return None if np.isnan(value) else float(value)
+
+
+def write_report(report: Dict[str, Any], path: Union[str, Path]) -> Path:
+    """Se guarda el reporte como JSON de forma atómica."""
+    path = Path(path)
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    tmp_path.write_text(json.dumps(report, indent=2, ensure_ascii=False))
+    os.replace(tmp_path, path)
+    logging.info("El reporte fue almacenado en %s.", path)
+    return path
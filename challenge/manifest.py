@@ -0,0 +1,344 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Manifiesto estructurado de cada ejecución del pipeline.
+
+Cada etapa (lectura, preprocesamiento, entrenamiento, predicción, escritura)
+registra tiempo de reloj, tiempo de CPU (incluidos los procesos hijos) y pico de
+memoria residente. En Linux el pico se reinicia al comenzar cada etapa
+escribiendo ``5`` en ``/proc/self/clear_refs`` y se lee de ``VmHWM``; donde no
+es posible se informa el pico del proceso completo. El manifiesto incluye
+además conteos de filas, huellas de las entradas, la configuración del
+estimador y el checksum de los artefactos.
+
+Cada ejecución queda en ``<run_dir>/<run_id>/manifest.json`` y se resume en una
+línea de ``<run_dir>/index.jsonl``, que puede consultarse así:
+
+    python manifest.py list --run_dir runs
+    python manifest.py show 20240101T120000-ab12cd --run_dir runs
+    python manifest.py trend --stage fit --metric wall_seconds --run_dir runs
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import platform
+import re
+import resource
+import sys
+import time
+import uuid
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+INDEX_FILENAME = "index.jsonl"
+MANIFEST_FILENAME = "manifest.json"
+_CLEAR_REFS = Path("/proc/self/clear_refs")
+_STATUS = Path("/proc/self/status")
+
+
+def _cpu_seconds() -> float:
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return own.ru_utime + own.ru_stime + children.ru_utime + children.ru_stime
+
+
+def _reset_peak_memory() -> bool:
+    """Reinicia VmHWM del proceso; devuelve False si el kernel no lo permite."""
+    try:
+        _CLEAR_REFS.write_text("5")
+        return True
+    except OSError:
+        return False
+
+
+def _peak_memory_bytes() -> int:
+    try:
+        match = re.search(r"VmHWM:\s+(\d+)\s+kB", _STATUS.read_text())
+        if match:
+            return int(match.group(1)) * 1024
+    except OSError:
+        pass
+    # ru_maxrss está en KiB en Linux y en bytes en macOS.
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def fingerprint(path: Union[str, Path], chunk_size: int = 1 << 20) -> Dict[str, Any]:
+    """Tamaño, fecha de modificación y SHA-256 de un archivo o de todos los archivos de un directorio."""
+    path = Path(path)
+    if not path.exists():
+        return {"path": str(path), "exists": False}
+
+    digest = hashlib.sha256()
+    files = sorted(p for p in path.rglob("*") if p.is_file()) if path.is_dir() else [path]
+    size = 0
+    for file in files:
+        if path.is_dir():
+            digest.update(str(file.relative_to(path)).encode("utf-8"))
+        with open(file, "rb") as handle:
+            for block in iter(lambda: handle.read(chunk_size), b""):
+                digest.update(block)
+        size += file.stat().st_size
+    return {
+        "path": str(path),
+        "exists": True,
+        "files": len(files),
+        "size_bytes": size,
+        "modified_at": datetime.utcfromtimestamp(path.stat().st_mtime).isoformat() + "Z",
+        "sha256": digest.hexdigest(),
+    }
+
+
+def estimator_config(estimator: Any) -> Dict[str, Any]:
+    """Clase y parámetros de un estimador scikit-learn compatible, serializables a JSON."""
+    if estimator is None:
+        return {}
+    params = estimator.get_params() if hasattr(estimator, "get_params") else {}
+    return {
+        "class": f"{type(estimator).__module__}.{type(estimator).__name__}",
+        "params": {key: _jsonable(value) for key, value in sorted(params.items())},
+    }
+
+
+def _jsonable(value: Any) -> Any:
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, (list, tuple)):
+        return [_jsonable(item) for item in value]
+    if isinstance(value, dict):
+        return {str(key): _jsonable(item) for key, item in value.items()}
+    return repr(value)
+
+
+class RunManifest:
+    """
+    El manifiesto se construye durante la ejecución y se escribe al finalizar.
+
+    Uso:
+        manifest = RunManifest("runs", mode="train", arguments=vars(args))
+        with manifest.stage("fit") as info:
+            model.fit(X, y)
+            info["rows"] = len(X)
+        manifest.finish()
+    """
+
+    def __init__(
+        self,
+        run_dir: Union[str, Path] = "runs",
+        mode: Optional[str] = None,
+        arguments: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        self.run_dir = Path(run_dir)
+        self.run_id = f"{datetime.utcnow().strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:6]}"
+        self.started_at = datetime.utcnow().isoformat() + "Z"
+        self._started = time.perf_counter()
+        self._cpu_started = _cpu_seconds()
+        self.data: Dict[str, Any] = {
+            "run_id": self.run_id,
+            "mode": mode,
+            "started_at": self.started_at,
+            "arguments": _jsonable(arguments or {}),
+            "environment": {
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "cpu_count": os.cpu_count(),
+                "pid": os.getpid(),
+            },
+            "stages": [],
+            "inputs": {},
+            "artifacts": {},
+        }
+        # PipelineProfiler opcional (run_pipeline.py --profile): traza cada etapa y se cierra en finish().
+        self.profiler = None
+
+    @property
+    def directory(self) -> Path:
+        return self.run_dir / self.run_id
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[Dict[str, Any]]:
+        """Mide la etapa; el diccionario entregado admite datos extra (filas, columnas, etc.)."""
+        # El trazado de memoria envuelve la medición para que sus instantáneas no se sumen a la etapa.
+        with self.profiler.stage(name) if self.profiler is not None else nullcontext():
+            with self._measure(name) as info:
+                yield info
+
+    @contextmanager
+    def _measure(self, name: str) -> Iterator[Dict[str, Any]]:
+        info: Dict[str, Any] = {}
+        scoped = _reset_peak_memory()
+        started = time.perf_counter()
+        cpu_started = _cpu_seconds()
+        status = "ok"
+        try:
+            yield info
+        except BaseException:
+            status = "failed"
+            raise
+        finally:
+            record = {
+                "name": name,
+                "status": status,
+                "wall_seconds": round(time.perf_counter() - started, 4),
+                "cpu_seconds": round(_cpu_seconds() - cpu_started, 4),
+                "peak_memory_bytes": _peak_memory_bytes(),
+                "peak_memory_scope": "stage" if scoped else "process",
+            }
+            record.update(_jsonable(info))
+            self.data["stages"].append(record)
+            logging.info(
+                "Etapa %s: %.3f s de reloj, %.3f s de CPU, pico de memoria %.1f MiB.",
+                name,
+                record["wall_seconds"],
+                record["cpu_seconds"],
+                record["peak_memory_bytes"] / 2**20,
+            )
+
+    def add_input(self, role: str, path: Union[str, Path]) -> None:
+        self.data["inputs"][role] = fingerprint(path)
+
+    def add_artifact(self, role: str, path: Union[str, Path]) -> None:
+        self.data["artifacts"][role] = fingerprint(path)
+
+    def set(self, key: str, value: Any) -> None:
+        self.data[key] = _jsonable(value)
+
+    def finish(self, status: str = "ok", error: Optional[str] = None) -> Path:
+        """Escribe el manifiesto y agrega su resumen al índice de ejecuciones."""
+        if self.profiler is not None:
+            self.data["profile"] = _jsonable(self.profiler.stop())
+        self.data.update(
+            status=status,
+            error=error,
+            finished_at=datetime.utcnow().isoformat() + "Z",
+            wall_seconds=round(time.perf_counter() - self._started, 4),
+            cpu_seconds=round(_cpu_seconds() - self._cpu_started, 4),
+            peak_memory_bytes=max([s["peak_memory_bytes"] for s in self.data["stages"]], default=0),
+        )
+        target_dir = self.directory
+        target_dir.mkdir(parents=True, exist_ok=True)
+        path = target_dir / MANIFEST_FILENAME
+        tmp_path = target_dir / f".{MANIFEST_FILENAME}.tmp"
+        tmp_path.write_text(json.dumps(self.data, indent=2, ensure_ascii=False))
+        os.replace(tmp_path, path)
+
+        with open(self.run_dir / INDEX_FILENAME, "a", encoding="utf-8") as index:
+            index.write(json.dumps(self.summary(), ensure_ascii=False) + "\n")
+        logging.info("El manifiesto de la ejecución fue almacenado en %s.", path)
+        return path
+
+    def summary(self) -> Dict[str, Any]:
+        artifact = self.data["artifacts"].get("model", {})
+        return {
+            "run_id": self.run_id,
+            "mode": self.data["mode"],
+            "started_at": self.started_at,
+            "status": self.data.get("status"),
+            "wall_seconds": self.data.get("wall_seconds"),
+            "cpu_seconds": self.data.get("cpu_seconds"),
+            "peak_memory_bytes": self.data.get("peak_memory_bytes"),
+            "profiled": "profile" in self.data,
+            "stages": {
+                stage["name"]: {
+                    key: stage.get(key)
+                    for key in ("wall_seconds", "cpu_seconds", "peak_memory_bytes", "rows")
+                    if key in stage
+                }
+                for stage in self.data["stages"]
+            },
+            "inputs": {role: item.get("sha256") for role, item in self.data["inputs"].items()},
+            "artifact_sha256": artifact.get("sha256"),
+            "manifest": str(self.run_dir / self.run_id / MANIFEST_FILENAME),
+        }
+
+
+# ==============================================================
+# CONSULTA
+# ==============================================================
+def load_index(run_dir: Union[str, Path] = "runs") -> List[Dict[str, Any]]:
+    """Lee el índice de ejecuciones, ignorando líneas truncadas."""
+    path = Path(run_dir) / INDEX_FILENAME
+    if not path.exists():
+        return []
+    runs = []
+    for line in path.read_text(encoding="utf-8").splitlines():
+        try:
+            runs.append(json.loads(line))
+        except ValueError:
+            continue
+    return runs
+
+
+def stage_trend(
+    runs: List[Dict[str, Any]],
+    stage: str,
+    metric: str = "wall_seconds",
+    mode: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """Serie de una métrica de etapa a lo largo de las ejecuciones, con su variación relativa."""
+    series = []
+    previous = None
+    for run in runs:
+        if mode and run.get("mode") != mode:
+            continue
+        value = run.get("stages", {}).get(stage, {}).get(metric)
+        if value is None:
+            continue
+        change = (value - previous) / previous if previous else None
+        series.append({
+            "run_id": run["run_id"],
+            "started_at": run.get("started_at"),
+            metric: value,
+            "change": round(change, 4) if change is not None else None,
+        })
+        previous = value
+    return series
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Consulta de manifiestos de ejecución del pipeline")
+    parser.add_argument("--run_dir", default="runs")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    list_parser = commands.add_parser("list", help="Resumen de las últimas ejecuciones")
+    list_parser.add_argument("--last", type=int, default=20)
+    list_parser.add_argument("--mode", default=None)
+
+    show_parser = commands.add_parser("show", help="Manifiesto completo de una ejecución")
+    show_parser.add_argument("run_id")
+
+    trend_parser = commands.add_parser("trend", help="Evolución de una métrica de etapa")
+    trend_parser.add_argument("--stage", required=True)
+    trend_parser.add_argument("--metric", default="wall_seconds")
+    trend_parser.add_argument("--mode", default=None)
+    trend_parser.add_argument("--last", type=int, default=20)
+    args = parser.parse_args()
+
+    runs = load_index(args.run_dir)
+    if args.command == "list":
+        selected = [run for run in runs if not args.mode or run.get("mode") == args.mode]
+        for run in selected[-args.last:]:
+            stages = " ".join(
+                f"{name}={values.get('wall_seconds', 0):.2f}s" for name, values in run.get("stages", {}).items()
+            )
+            print(
+                f"{run['run_id']}  {run.get('mode') or '-':8} {run.get('status') or '-':7} "
+                f"{run.get('wall_seconds') or 0:8.2f}s  {(run.get('peak_memory_bytes') or 0) / 2**20:8.1f} MiB  {stages}"
+            )
+    elif args.command == "show":
+        path = Path(args.run_dir) / args.run_id / MANIFEST_FILENAME
+        if not path.exists():
+            parser.error(f"No existe el manifiesto {path}")
+        print(path.read_text(encoding="utf-8"))
+    else:
+        for point in stage_trend(runs, args.stage, args.metric, args.mode)[-args.last:]:
+            print(json.dumps(point, ensure_ascii=False))
+
+
+if __name__ == "__main__":  # pragma: no cover - ejecución manual
+    main()
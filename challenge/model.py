@@ -1,22 +1,188 @@
 import logging
 import os
+import time
 from datetime import datetime
-from typing import List, Tuple, Union
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple, Union
 
-import pickle
 import numpy as np
 import pandas as pd
-from sklearn.linear_model import LogisticRegression
 from sklearn.model_selection import train_test_split
 
+try:
+    from .api.bundle import load_model, replace_rates, write_bundle
+    from .api.hashing import feature_names as hashed_feature_names, hash_codes, spec as hashing_spec
+    from .api.rates import RATE_COLUMNS, DelayRateTable, feature_names as rate_feature_names
+    from .estimators import build_estimator, fit_params, iterations, load_config, stopping_split, training_threads
+    from .evaluation import evaluate_binary, write_report
+    from .ingest import DATE_FORMAT, iter_flights, read_flights
+    from .segmentation import train_segments
+    from .sampling import (
+        CORRECTIONS,
+        StratifiedReservoir,
+        combine_inclusion,
+        corrected_threshold,
+        correction_weights,
+        stratified_downsample,
+    )
+    from .validation import cross_validate, stratified_folds, time_folds
+except ImportError:  # pragma: no cover - ejecución directa desde run_pipeline.py
+    from api.bundle import load_model, replace_rates, write_bundle
+    from api.hashing import feature_names as hashed_feature_names, hash_codes, spec as hashing_spec
+    from api.rates import RATE_COLUMNS, DelayRateTable, feature_names as rate_feature_names
+    from estimators import build_estimator, fit_params, iterations, load_config, stopping_split, training_threads
+    from evaluation import evaluate_binary, write_report
+    from ingest import DATE_FORMAT, iter_flights, read_flights
+    from segmentation import train_segments
+    from sampling import (
+        CORRECTIONS,
+        StratifiedReservoir,
+        combine_inclusion,
+        corrected_threshold,
+        correction_weights,
+        stratified_downsample,
+    )
+    from validation import cross_validate, stratified_folds, time_folds
+
 # El registro de logs es configurado para permitir el seguimiento del proceso.
 logging.basicConfig(
     level=logging.INFO,
     format="%(asctime)s [%(levelname)s] %(message)s"
 )
 
-_MODEL_FILENAME = "xgb_model.pkl"
-_USE_XGBOOST = os.getenv("USE_XGBOOST", "").lower() in {"1", "true", "yes"}
+_MODEL_FILENAME = "xgb_model.bundle"
+_REPORT_FILENAME = "xgb_model.evaluation.json"
+_CV_REPORT_FILENAME = "xgb_model.cv.json"
+_SAMPLING_REPORT_FILENAME = "xgb_model.sampling.json"
+_SEGMENTS_DIRNAME = "xgb_model.segments"
+_SEGMENTS_REPORT_FILENAME = "xgb_model.segments.evaluation.json"
+# Réplicas bootstrap y procesos usados para los intervalos de confianza del holdout.
+_BOOTSTRAP_ROUNDS = int(os.getenv("DELAY_MODEL_BOOTSTRAP_ROUNDS", "200"))
+_EVALUATION_JOBS = int(os.getenv("DELAY_MODEL_EVALUATION_JOBS", "0")) or None
+
+# Columnas crudas que necesita el preprocesamiento.
+INPUT_COLUMNS = ["Fecha-I", "Fecha-O", "OPERA", "TIPOVUELO", "MES"]
+
+# Franjas en segundos del día; igual que en el notebook, los límites son 11:59:00 y 18:59:00 exactos.
+_MORNING = (5 * 3600, 11 * 3600 + 59 * 60)
+_AFTERNOON = (12 * 3600, 18 * 3600 + 59 * 60)
+
+# Temporada alta como (mes, día) inicial y final; el día final solo cuenta a las 00:00:00.
+_HIGH_SEASON_RANGES = [
+    ((12, 15), (12, 31)),
+    ((1, 1), (3, 3)),
+    ((7, 15), (7, 31)),
+    ((9, 11), (9, 30)),
+]
+
+
+def _as_datetime(values: pd.Series) -> pd.Series:
+    """Convierte la columna a datetime64; los valores inválidos quedan como NaT."""
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values
+    return pd.to_datetime(values, format=DATE_FORMAT, errors="coerce")
+
+
+def _period_day(dates: pd.Series) -> np.ndarray:
+    """Asigna mañana, tarde o noche según la hora programada; NaT se considera noche."""
+    seconds = (dates.dt.hour * 3600 + dates.dt.minute * 60 + dates.dt.second).to_numpy()
+    return np.select(
+        [
+            (seconds >= _MORNING[0]) & (seconds <= _MORNING[1]),
+            (seconds >= _AFTERNOON[0]) & (seconds <= _AFTERNOON[1]),
+        ],
+        ["mañana", "tarde"],
+        default="noche",
+    )
+
+
+def _high_season(dates: pd.Series) -> np.ndarray:
+    """Marca con 1 las fechas dentro de los rangos de alta demanda; NaT se considera 0."""
+    key = (dates.dt.month * 100 + dates.dt.day).to_numpy()
+    midnight = ((dates.dt.hour + dates.dt.minute + dates.dt.second) == 0).to_numpy()
+    result = np.zeros(len(dates), dtype=bool)
+    for (start_month, start_day), (end_month, end_day) in _HIGH_SEASON_RANGES:
+        start, end = start_month * 100 + start_day, end_month * 100 + end_day
+        result |= (key >= start) & ((key < end) | ((key == end) & midnight))
+    return result.astype(int)
+
+
+def _training_metadata(
+    X_train: pd.DataFrame,
+    y_train: pd.Series,
+    report: dict,
+    sample_weight: Optional[np.ndarray] = None
+) -> dict:
+    """
+    Resume el entrenamiento para guardarlo dentro del bundle; con una muestra,
+    ``sample_weight`` (inverso de la probabilidad de inclusión) lleva la tasa y los
+    conteos a la escala de la población.
+    """
+    weights = np.ones(len(X_train)) if sample_weight is None else np.asarray(sample_weight)
+    confusion = report["confusion_matrix"]
+    versions = {"numpy": np.__version__, "pandas": pd.__version__}
+    for package in ("sklearn", "xgboost"):
+        try:
+            versions[package] = __import__(package).__version__
+        except ImportError:
+            continue
+    return {
+        "trained_at": datetime.utcnow().isoformat() + "Z",
+        "train_rows": int(len(X_train)),
+        "holdout_rows": int(report["rows"]),
+        "positive_rate": float(np.average(y_train, weights=weights)) if len(y_train) else 0.0,
+        "predicted_positive_rate": (
+            (confusion["tp"] + confusion["fp"]) / report["rows"] if report["rows"] else 0.0
+        ),
+        # Distribución de entrenamiento por categoría; la API la usa como referencia de drift.
+        "category_counts": {
+            column: {
+                name[len(column) + 1:]: int(round(float(X_train[name].to_numpy(dtype=np.float64) @ weights)))
+                for name in X_train.columns
+                if name.startswith(f"{column}_")
+            }
+            for column in ("OPERA", "TIPOVUELO", "MES")
+        },
+        "holdout_metrics": report["metrics"],
+        "sampling": report.get("sampling"),
+        "iterations": report.get("iterations"),
+        "versions": versions,
+    }
+
+
+def _hashed_block(data: pd.DataFrame, columns: List[str], n_features: int) -> pd.DataFrame:
+    """
+    Codifica por hashing las columnas de alta cardinalidad en ``n_features``
+    columnas ``hashed_<i>``; solo se calcula el hash de cada categoría distinta.
+    """
+    missing = [column for column in columns if column not in data.columns]
+    if missing:
+        raise ValueError(f"Faltan las columnas codificadas por hashing: {missing}")
+    block = np.zeros((len(data), n_features), dtype=np.float32)
+    for column in columns:
+        values = data[column]
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            codes, categories = values.cat.codes.to_numpy(), values.cat.categories
+        else:
+            codes, categories = pd.factorize(values)
+        hash_codes(column, codes.astype(np.int64), list(categories), n_features, block)
+    return pd.DataFrame(block, index=data.index, columns=hashed_feature_names(n_features))
+
+
+def _rate_codes(table: DelayRateTable, values: pd.Series, grow: bool = False) -> np.ndarray:
+    """Códigos de la tabla de tasas para una columna; solo se buscan las categorías distintas."""
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        codes, categories = values.cat.codes.to_numpy(), values.cat.categories
+    else:
+        codes, categories = pd.factorize(values)
+    return table.category_codes(values.name, codes, list(categories), grow=grow)
+
+
+def _observed(values: pd.Series) -> pd.Series:
+    """Descarta categorías sin filas para que el one-hot coincida con el de columnas de texto."""
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        return values.cat.remove_unused_categories()
+    return values
 
 class DelayModel:
     """
@@ -24,10 +190,112 @@ class DelayModel:
     El código fue derivado del notebook del Data Scientist y adaptado para su uso en producción.
     """
 
-    def __init__(self):
-        """La clase queda inicializada con los atributos del modelo y las columnas de características."""
+    def __init__(self, config: Optional[dict] = None):
+        """
+        La clase queda inicializada con los atributos del modelo y las columnas de características.
+
+        Args:
+            config (dict, opcional): configuración del estimador; por defecto se toma de
+                ``DELAY_MODEL_CONFIG`` y las variables de entorno (ver ``estimators.load_config``).
+        """
+        self._config = config if config is not None else load_config()
         self._model = None
         self._feature_columns = None
+        self._evaluation = None
+        # Tabla de tasas históricas de retraso (se construye en preprocess o llega con el artefacto).
+        self._rates = None
+        # Umbral sobre la probabilidad de retraso; cambia al corregir un entrenamiento submuestreado.
+        self._threshold = 0.5
+        self.artifact_path = _MODEL_FILENAME
+        self.report_path = _REPORT_FILENAME
+        self.segments_path = _SEGMENTS_DIRNAME
+
+    # ==============================================================
+    # LECTURA
+    # ==============================================================
+    def load_data(
+        self,
+        path: str,
+        extra_columns: Optional[List[str]] = None,
+        engine: Optional[str] = None
+    ) -> Tuple[pd.DataFrame, Dict[str, float]]:
+        """
+        Se leen únicamente las columnas requeridas por el modelo (más la etiqueta
+        `delay` si existe y las adicionales solicitadas) con el esquema tipado.
+
+        Args:
+            path (str): ruta del CSV de vuelos.
+            extra_columns (List[str], opcional): columnas adicionales; None equivale a todas.
+            engine (str, opcional): parser de lectura (`c` o `pyarrow`).
+
+        Returns:
+            Tuple[pd.DataFrame, Dict[str, float]]: datos tipados y métricas de lectura.
+        """
+        columns = None if extra_columns is None else (
+            INPUT_COLUMNS + ["delay"] + self._source_columns() + list(extra_columns)
+        )
+        return read_flights(path, columns=columns, engine=engine)
+
+    def iter_data(
+        self,
+        path: str,
+        extra_columns: Optional[List[str]] = None,
+        chunksize: int = 100_000,
+        skip_rows: int = 0
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Igual que ``load_data`` pero por bloques de ``chunksize`` filas, a partir
+        de la fila ``skip_rows`` (ver ``ingest.iter_flights``).
+        """
+        columns = None if extra_columns is None else (
+            INPUT_COLUMNS + ["delay"] + self._source_columns() + list(extra_columns)
+        )
+        return iter_flights(path, columns=columns, chunksize=chunksize, skip_rows=skip_rows)
+
+    def load_sample(
+        self,
+        path: str,
+        capacity: int,
+        ratio: float = 1.0,
+        chunksize: int = 100_000,
+        seed: int = 42
+    ) -> Tuple[pd.DataFrame, Dict[int, float]]:
+        """
+        Se lee el CSV por bloques y se conserva una muestra estratificada de a lo
+        sumo ``capacity`` filas (ver ``sampling.StratifiedReservoir``), sin cargar
+        el archivo completo en memoria.
+
+        Args:
+            path (str): ruta del CSV de vuelos.
+            capacity (int): filas máximas de la muestra.
+            ratio (float): filas sin retraso por cada fila con retraso.
+            chunksize (int): filas leídas por bloque.
+            seed (int): semilla del muestreo.
+
+        Returns:
+            Tuple[pd.DataFrame, Dict[int, float]]: muestra (con la etiqueta `delay`)
+            y probabilidad de inclusión de cada clase.
+        """
+        reservoir = StratifiedReservoir(capacity, ratio=ratio, seed=seed)
+        columns = INPUT_COLUMNS + ["delay"] + self._source_columns()
+        for chunk in iter_flights(path, columns=columns, chunksize=chunksize):
+            # Las categorías cambian entre bloques; como texto se concatenan sin conflicto.
+            for col in chunk.columns:
+                if isinstance(chunk[col].dtype, pd.CategoricalDtype):
+                    chunk[col] = chunk[col].astype(object)
+            if "delay" not in chunk.columns:
+                minutes = (_as_datetime(chunk["Fecha-O"]) - _as_datetime(chunk["Fecha-I"])).dt.total_seconds() / 60
+                chunk["delay"] = np.where(minutes.fillna(0) > 15, 1, 0)
+            reservoir.add(chunk, chunk["delay"].to_numpy())
+
+        sample, inclusion = reservoir.sample()
+        logging.info(
+            "Muestra de %d filas sobre %d leídas; probabilidad de inclusión por clase: %s.",
+            len(sample),
+            sum(reservoir.seen.values()),
+            {label: round(value, 4) for label, value in inclusion.items()},
+        )
+        return sample, inclusion
 
     # ==============================================================
     # PREPROCESAMIENTO
@@ -49,57 +317,16 @@ class DelayModel:
             pd.DataFrame: únicamente características si no se especifica variable objetivo.
         """
 
-        def get_period_day(date: str) -> str:
-            """Determina la franja horaria correspondiente a la fecha programada."""
-            try:
-                date_time = datetime.strptime(date, "%Y-%m-%d %H:%M:%S").time()
-            except Exception:
-                return "noche"
-
-            if datetime.strptime("05:00", "%H:%M").time() <= date_time <= datetime.strptime("11:59", "%H:%M").time():
-                return "mañana"
-            elif datetime.strptime("12:00", "%H:%M").time() <= date_time <= datetime.strptime("18:59", "%H:%M").time():
-                return "tarde"
-            else:
-                return "noche"
-
-        def is_high_season(fecha: str) -> int:
-            """Identifica si la fecha corresponde a un período de alta demanda."""
-            try:
-                year = int(fecha.split("-")[0])
-                fecha_dt = datetime.strptime(fecha, "%Y-%m-%d %H:%M:%S")
-            except Exception:
-                return 0
-
-            ranges = [
-                ("15-Dec", "31-Dec"),
-                ("1-Jan", "3-Mar"),
-                ("15-Jul", "31-Jul"),
-                ("11-Sep", "30-Sep")
-            ]
-            for start, end in ranges:
-                rmin = datetime.strptime(start, "%d-%b").replace(year=year)
-                rmax = datetime.strptime(end, "%d-%b").replace(year=year)
-                if rmin <= fecha_dt <= rmax:
-                    return 1
-            return 0
-
-        def get_min_diff(row) -> float:
-            """Calcula la diferencia en minutos entre la hora real y la programada."""
-            try:
-                f_o = datetime.strptime(row["Fecha-O"], "%Y-%m-%d %H:%M:%S")
-                f_i = datetime.strptime(row["Fecha-I"], "%Y-%m-%d %H:%M:%S")
-                return (f_o - f_i).total_seconds() / 60
-            except Exception:
-                return 0
-
         data = data.copy()
         logging.info("Se inicia el proceso de generación de características...")
 
         # Se generan las variables derivadas a partir de las fechas y horarios.
-        data["period_day"] = data["Fecha-I"].apply(get_period_day)
-        data["high_season"] = data["Fecha-I"].apply(is_high_season)
-        data["min_diff"] = data.apply(get_min_diff, axis=1)
+        # Las fechas pueden venir como texto (read_csv) o ya tipadas (ingest.read_flights).
+        scheduled = _as_datetime(data["Fecha-I"])
+        operated = _as_datetime(data["Fecha-O"])
+        data["period_day"] = _period_day(scheduled)
+        data["high_season"] = _high_season(scheduled)
+        data["min_diff"] = (operated - scheduled).dt.total_seconds().div(60).fillna(0)
 
         # En caso de no existir la variable objetivo, se crea con base en el umbral de 15 minutos.
         if "delay" not in data.columns:
@@ -107,11 +334,22 @@ class DelayModel:
 
         # Se codifican las variables categóricas mediante one-hot encoding.
         features = pd.concat([
-            pd.get_dummies(data["OPERA"], prefix="OPERA"),
-            pd.get_dummies(data["TIPOVUELO"], prefix="TIPOVUELO"),
-            pd.get_dummies(data["MES"], prefix="MES")
+            pd.get_dummies(_observed(data["OPERA"]), prefix="OPERA"),
+            pd.get_dummies(_observed(data["TIPOVUELO"]), prefix="TIPOVUELO"),
+            pd.get_dummies(_observed(data["MES"]), prefix="MES")
         ], axis=1)
 
+        # Las columnas de alta cardinalidad configuradas se agregan en un bloque de ancho fijo.
+        hashing = self._hashing()
+        if hashing is not None:
+            features = pd.concat(
+                [features, _hashed_block(data, hashing["columns"], hashing["n_features"])], axis=1
+            )
+
+        # Tasas históricas de retraso por aerolínea, destino y mes, obtenidas con un gather sobre la tabla.
+        if self._config["features"]["rate_features"]:
+            features = pd.concat([features, self._rate_block(data, fit=bool(target_column))], axis=1)
+
         # Se guarda el orden de las columnas para mantener consistencia durante la inferencia.
         self._feature_columns = features.columns.tolist()
 
@@ -126,26 +364,347 @@ class DelayModel:
     # ==============================================================
     # ENTRENAMIENTO
     # ==============================================================
-    def fit(self, features: pd.DataFrame, target: pd.Series) -> None:
+    def fit(
+        self,
+        features: pd.DataFrame,
+        target: pd.Series,
+        sampling_ratio: Optional[float] = None,
+        correction: str = "weights",
+        inclusion: Optional[Dict[int, float]] = None
+    ) -> None:
         """
         Entrena el estimador configurado utilizando los datos preprocesados.
 
         Args:
             features (pd.DataFrame): conjunto de características.
             target (pd.Series): variable objetivo.
+            sampling_ratio (float, opcional): si se indica, la partición de entrenamiento
+                se submuestrea a ese número de filas mayoritarias por fila minoritaria.
+            correction (str): `weights` (pesos inversos a la inclusión) o `threshold`
+                (umbral desplazado) para compensar el muestreo.
+            inclusion (Dict[int, float], opcional): probabilidad de inclusión por clase
+                de un muestreo previo (p. ej. ``load_sample``); el holdout se pondera con ella.
         """
         logging.info("Se inicia el entrenamiento del modelo...")
         X_train, X_test, y_train, y_test = train_test_split(
             features, target, test_size=0.33, random_state=42
         )
 
-        model = self._build_estimator()
-        model.fit(X_train, y_train)
+        model, X_train, y_train, sampling = self._fit_estimator(
+            X_train, y_train, sampling_ratio, correction, inclusion
+        )
         self._model = model
-        with open(_MODEL_FILENAME, "wb") as model_file:
-            pickle.dump(model, model_file)
+        self._threshold = sampling["threshold"]
+        self._feature_columns = features.columns.tolist()
+        holdout_weight = None if inclusion is None else correction_weights(y_test, inclusion)
+        report = self._evaluate(
+            model, X_test, y_test, len(X_train), sampling.pop("fit_seconds"),
+            threshold=self._threshold, sample_weight=holdout_weight,
+        )
+        report["estimator_config"] = self._config
+        report["iterations"] = iterations(model)
+        if sampling["stopping_rows"]:
+            report["iterations"]["stopping_rows"] = sampling["stopping_rows"]
+        logging.info("Iteraciones del estimador: %s.", report["iterations"])
+        if sampling["inclusion"] is not None:
+            report["sampling"] = sampling
+
+        # El bundle guarda, además del estimador, el orden de columnas, el vocabulario
+        # del encoder, el umbral y los metadatos del entrenamiento.
+        train_weight = None
+        if sampling["inclusion"] is not None:
+            train_weight = correction_weights(y_train, sampling["inclusion"], normalize=False)
+        started = time.perf_counter()
+        write_bundle(
+            _MODEL_FILENAME,
+            model,
+            self._feature_columns,
+            threshold=self._threshold,
+            training=_training_metadata(X_train, y_train, report, sample_weight=train_weight),
+            hashing=self._hashing(),
+            rates=self._rates if self._config["features"]["rate_features"] else None,
+        )
+        report["timings"]["save_seconds"] = round(time.perf_counter() - started, 4)
         logging.info("El modelo fue entrenado y almacenado en disco como %s.", _MODEL_FILENAME)
 
+        write_report(report, _REPORT_FILENAME)
+        self._evaluation = report
+
+    def _fit_estimator(
+        self,
+        X_train: pd.DataFrame,
+        y_train: pd.Series,
+        sampling_ratio: Optional[float],
+        correction: str,
+        inclusion: Optional[Dict[int, float]]
+    ) -> tuple:
+        """
+        Submuestrea (si corresponde) y entrena un estimador nuevo; devuelve el modelo,
+        las filas usadas y el detalle del muestreo con el umbral corregido. La parada
+        temprana, si está configurada, se mide sobre una fracción de ``X_train``
+        reservada antes del submuestreo (``stopping_split``), nunca sobre el holdout.
+        """
+        if correction not in CORRECTIONS:
+            raise ValueError(f"Corrección de muestreo desconocida: {correction}")
+        available_rows = len(X_train)
+        model = self._build_estimator()
+        X_train, y_train, eval_set = stopping_split(model, X_train, y_train)
+        if sampling_ratio is not None:
+            index, downsampled = stratified_downsample(y_train.to_numpy(), sampling_ratio)
+            X_train, y_train = X_train.iloc[index], y_train.iloc[index]
+            inclusion = combine_inclusion(inclusion, downsampled)
+
+        threshold = 0.5
+        params = fit_params(model, eval_set)
+        if inclusion is not None:
+            if correction == "weights":
+                params["sample_weight"] = correction_weights(y_train.to_numpy(), inclusion)
+            else:
+                threshold = corrected_threshold(inclusion)
+
+        started = time.perf_counter()
+        with training_threads(self._config["n_jobs"]):
+            model.fit(X_train, y_train, **params)
+        sampling = {
+            "ratio": sampling_ratio,
+            "correction": correction if inclusion is not None else None,
+            "inclusion": inclusion,
+            "available_rows": int(available_rows),
+            "train_rows": int(len(X_train)),
+            "stopping_rows": int(len(eval_set[1])) if eval_set is not None else 0,
+            "threshold": threshold,
+            "fit_seconds": time.perf_counter() - started,
+        }
+        if inclusion is not None:
+            logging.info(
+                "Entrenamiento con %d de %d filas (inclusión %s, corrección %s, umbral %.4f).",
+                len(X_train),
+                available_rows,
+                {label: round(value, 4) for label, value in inclusion.items()},
+                correction,
+                threshold,
+            )
+        return model, X_train, y_train, sampling
+
+    def _evaluate(
+        self,
+        model,
+        X_test: pd.DataFrame,
+        y_test: pd.Series,
+        train_rows: int,
+        fit_seconds: float,
+        threshold: float = 0.5,
+        sample_weight: Optional[np.ndarray] = None
+    ) -> dict:
+        """
+        El holdout se puntúa con una sola llamada a predict_proba y se resume en
+        métricas e intervalos bootstrap.
+        """
+        started = time.perf_counter()
+        scores = model.predict_proba(X_test)[:, 1]
+        scoring_seconds = time.perf_counter() - started
+
+        report = evaluate_binary(
+            y_test.to_numpy(),
+            scores,
+            threshold=threshold,
+            n_bootstrap=_BOOTSTRAP_ROUNDS,
+            n_jobs=_EVALUATION_JOBS,
+            sample_weight=sample_weight,
+        )
+        report["estimator"] = type(model).__name__
+        report["artifact"] = _MODEL_FILENAME
+        report["train_rows"] = int(train_rows)
+        report["timings"].update(
+            fit_seconds=round(fit_seconds, 4),
+            scoring_seconds=round(scoring_seconds, 4),
+            evaluation_seconds=round(time.perf_counter() - started, 4),
+        )
+
+        metrics = report["metrics"]
+        auc_interval = report["confidence_intervals"].get("roc_auc", {})
+        logging.info(
+            "Holdout (%d filas): precision=%.3f recall=%.3f f1=%.3f roc_auc=%s IC=[%s, %s]; evaluación en %.2f s.",
+            report["rows"],
+            metrics["precision"],
+            metrics["recall"],
+            metrics["f1"],
+            *(f"{value:.3f}" if value is not None else "n/d" for value in (
+                metrics["roc_auc"], auc_interval.get("low"), auc_interval.get("high")
+            )),
+            report["timings"]["evaluation_seconds"],
+        )
+        return report
+
+    # ==============================================================
+    # VALIDACIÓN CRUZADA
+    # ==============================================================
+    def cross_validate(
+        self,
+        features: pd.DataFrame,
+        target: pd.Series,
+        n_splits: int = 5,
+        strategy: str = "stratified",
+        timestamps: Optional[pd.Series] = None,
+        n_jobs: Optional[int] = None
+    ) -> dict:
+        """
+        Se estima el desempeño con k folds entrenados en paralelo, sin modificar
+        el modelo en memoria ni el artefacto.
+
+        Args:
+            features (pd.DataFrame): conjunto de características.
+            target (pd.Series): variable objetivo.
+            n_splits (int): cantidad de folds.
+            strategy (str): `stratified` (aleatorio estratificado) o `time` (ventana creciente por fecha).
+            timestamps (pd.Series, opcional): fecha programada de cada fila; requerida con `time`.
+            n_jobs (int, opcional): procesos a utilizar; por defecto, los núcleos disponibles.
+
+        Returns:
+            dict: métricas y tiempos por fold y agregados, también guardados en disco.
+        """
+        if strategy == "stratified":
+            folds = stratified_folds(target, n_splits=n_splits)
+        elif strategy == "time":
+            if timestamps is None:
+                raise ValueError("La validación temporal requiere la fecha programada de cada fila.")
+            folds = time_folds(timestamps, n_splits=n_splits)
+        else:
+            raise ValueError(f"Estrategia de validación desconocida: {strategy}")
+
+        logging.info("Se inicia la validación cruzada %s con %d folds...", strategy, n_splits)
+        report = cross_validate(features, target, self._build_estimator(), folds, n_jobs=n_jobs)
+        report["strategy"] = strategy
+        write_report(report, _CV_REPORT_FILENAME)
+        return report
+
+    # ==============================================================
+    # MODELOS POR SEGMENTO
+    # ==============================================================
+    def fit_segments(
+        self,
+        features: pd.DataFrame,
+        target: pd.Series,
+        column: str = "OPERA",
+        min_rows: int = 1000,
+        n_jobs: Optional[int] = None
+    ) -> dict:
+        """
+        Se entrena un modelo por valor de ``column`` y un modelo global de respaldo,
+        en paralelo, con la misma partición que ``fit``. El artefacto queda en el
+        directorio `xgb_model.segments` y pasa a ser el modelo en memoria.
+
+        Args:
+            features (pd.DataFrame): conjunto de características.
+            target (pd.Series): variable objetivo.
+            column (str): columna que define los segmentos (`OPERA`, `TIPOVUELO` o `MES`).
+            min_rows (int): filas de entrenamiento mínimas para un modelo propio.
+            n_jobs (int, opcional): procesos a utilizar; por defecto, los núcleos disponibles.
+
+        Returns:
+            dict: métricas del holdout enrutado y del global, por segmento y en total.
+        """
+        logging.info("Se inicia el entrenamiento de modelos por %s...", column)
+        train_index, test_index = train_test_split(
+            np.arange(len(features)), test_size=0.33, random_state=42
+        )
+        report = train_segments(
+            features,
+            target,
+            self._build_estimator(),
+            column,
+            train_index,
+            test_index,
+            self.segments_path,
+            min_rows=min_rows,
+            n_jobs=n_jobs,
+            metadata=_training_metadata,
+            hashing=self._hashing(),
+            rates=self._rates if self._config["features"]["rate_features"] else None,
+        )
+        report["estimator_config"] = self._config
+        write_report(report, _SEGMENTS_REPORT_FILENAME)
+
+        self._feature_columns = features.columns.tolist()
+        self._threshold = 0.5
+        self.artifact_path = self.segments_path
+        self.report_path = _SEGMENTS_REPORT_FILENAME
+        self._model = load_model(self.segments_path)
+        self._evaluation = report
+        return report
+
+    # ==============================================================
+    # SUBMUESTREO
+    # ==============================================================
+    def sampling_report(
+        self,
+        features: pd.DataFrame,
+        target: pd.Series,
+        ratios: List[float],
+        correction: str = "weights"
+    ) -> dict:
+        """
+        Se entrena un estimador con la partición completa y otro por cada ratio de
+        submuestreo, todos evaluados sobre el mismo holdout, para comparar la
+        aceleración del entrenamiento contra la variación de las métricas. No
+        modifica el modelo en memoria ni el artefacto.
+
+        Args:
+            features (pd.DataFrame): conjunto de características.
+            target (pd.Series): variable objetivo.
+            ratios (List[float]): ratios de submuestreo a comparar.
+            correction (str): corrección aplicada a las muestras (`weights` o `threshold`).
+
+        Returns:
+            dict: tiempos, métricas y diferencias por ratio, también guardados en disco.
+        """
+        X_train, X_test, y_train, y_test = train_test_split(
+            features, target, test_size=0.33, random_state=42
+        )
+        runs = []
+        for ratio in [None] + list(ratios):
+            model, _, _, sampling = self._fit_estimator(X_train, y_train, ratio, correction, None)
+            scores = model.predict_proba(X_test)[:, 1]
+            evaluation = evaluate_binary(y_test.to_numpy(), scores, threshold=sampling["threshold"], n_bootstrap=0)
+            predicted = evaluation["confusion_matrix"]["tp"] + evaluation["confusion_matrix"]["fp"]
+            runs.append({
+                "ratio": ratio,
+                "train_rows": sampling["train_rows"],
+                "threshold": round(sampling["threshold"], 6),
+                "fit_seconds": round(sampling["fit_seconds"], 4),
+                "iterations": iterations(model),
+                "predicted_positive_rate": round(predicted / evaluation["rows"], 6) if evaluation["rows"] else None,
+                "metrics": evaluation["metrics"],
+            })
+
+        full = runs[0]
+        for run in runs:
+            run["speedup"] = round(full["fit_seconds"] / run["fit_seconds"], 2) if run["fit_seconds"] else None
+            run["metric_delta"] = {
+                name: round(value - full["metrics"][name], 6)
+                if value is not None and full["metrics"][name] is not None else None
+                for name, value in run["metrics"].items()
+            }
+            logging.info(
+                "Ratio %s: %d filas, entrenamiento %.3f s (x%s), Δf1=%+.4f, Δroc_auc=%s.",
+                run["ratio"] if run["ratio"] is not None else "completo",
+                run["train_rows"],
+                run["fit_seconds"],
+                run["speedup"],
+                run["metric_delta"]["f1"] or 0.0,
+                "n/d" if run["metric_delta"]["roc_auc"] is None else f"{run['metric_delta']['roc_auc']:+.4f}",
+            )
+
+        report = {
+            "estimator": type(self._build_estimator()).__name__,
+            "correction": correction,
+            "holdout_rows": int(len(y_test)),
+            "positive_rate": float(y_test.mean()) if len(y_test) else 0.0,
+            "runs": runs,
+        }
+        write_report(report, _SAMPLING_REPORT_FILENAME)
+        return report
+
     # ==============================================================
     # PREDICCIÓN
     # ==============================================================
@@ -161,43 +720,123 @@ class DelayModel:
         """
         if self._model is None:
             logging.info("No se encontró el modelo en memoria; se cargará desde disco.")
-            with open(_MODEL_FILENAME, "rb") as model_file:
-                self._model = pickle.load(model_file)
+            self.load_artifact()
 
-        # Se garantiza la alineación de las columnas respecto al modelo entrenado.
-        for col in self._feature_columns:
-            if col not in features.columns:
-                features[col] = 0
-        features = features[self._feature_columns]
+        # Se garantiza la alineación de las columnas respecto al modelo entrenado; el
+        # orden guardado en el artefacto prevalece sobre el del último preprocesamiento.
+        trained_columns = getattr(self._model, "feature_names_in_", None)
+        if trained_columns is not None:
+            self._feature_columns = [str(col) for col in trained_columns]
+        features = features.reindex(columns=self._feature_columns, fill_value=0)
 
-        preds = self._model.predict(features)
+        # Un bundle aplica su propio umbral; un estimador recién entrenado usa el de fit.
+        if hasattr(self._model, "threshold") or self._threshold == 0.5:
+            preds = self._model.predict(features)
+        else:
+            preds = (self._model.predict_proba(features)[:, 1] > self._threshold).astype(int)
         logging.info(f"Se generaron {len(preds)} predicciones.")
         return [int(pred) for pred in preds.tolist()]
 
+    def load_artifact(self) -> None:
+        """Se carga (o recarga) el artefacto de ``artifact_path`` como modelo en memoria."""
+        self._model = load_model(self.artifact_path)
+        self._rates = getattr(self._model, "rates", None)
+        logging.info("Modelo cargado desde %s.", self.artifact_path)
+
+    # ==============================================================
+    # TASAS HISTÓRICAS
+    # ==============================================================
+    def update_rates(self, path: str, chunksize: int = 100_000) -> dict:
+        """
+        Se suman los vuelos de ``path`` (p. ej. un mes nuevo) a la tabla de tasas
+        históricas del artefacto, leyendo por bloques y sin releer el historial
+        ni reentrenar; el artefacto (cada bundle, si está segmentado) se reescribe
+        con la tabla actualizada.
+
+        Args:
+            path (str): CSV de vuelos con `Fecha-I`, `Fecha-O` (o `delay`), `OPERA`, `SIGLADES` y `MES`.
+            chunksize (int): filas leídas por bloque.
+
+        Returns:
+            dict: filas agregadas, filas totales de la tabla, forma de la tabla y tiempo.
+        """
+        started = time.perf_counter()
+        artifact = Path(self.artifact_path)
+        bundles = sorted(artifact.glob("*.bundle")) if artifact.is_dir() else [artifact]
+        table = getattr(load_model(self.artifact_path), "rates", None)
+        if table is None:
+            raise ValueError(f"El artefacto {self.artifact_path} no fue entrenado con tasas históricas.")
+
+        rows = 0
+        for chunk in iter_flights(path, columns=INPUT_COLUMNS + ["delay", "SIGLADES"], chunksize=chunksize):
+            if "delay" in chunk.columns:
+                delay = chunk["delay"].to_numpy()
+            else:
+                minutes = (_as_datetime(chunk["Fecha-O"]) - _as_datetime(chunk["Fecha-I"])).dt.total_seconds() / 60
+                delay = np.where(minutes.fillna(0) > 15, 1, 0)
+            table.add([_rate_codes(table, chunk[column], grow=True) for column in RATE_COLUMNS], delay)
+            rows += len(chunk)
+        for bundle in bundles:
+            replace_rates(bundle, table)
+
+        self._model = None
+        self._rates = table
+        stats = {
+            "rows": rows,
+            "table_rows": table.rows,
+            "shape": list(table.shape),
+            "bundles": len(bundles),
+            "seconds": round(time.perf_counter() - started, 4),
+        }
+        logging.info(
+            "Se agregaron %d vuelos a las tasas históricas de %s (%d en total, tabla %s) en %.3f s.",
+            rows, self.artifact_path, stats["table_rows"], stats["shape"], stats["seconds"],
+        )
+        return stats
+
+    def _rate_block(self, data: pd.DataFrame, fit: bool) -> pd.DataFrame:
+        """
+        Con la variable objetivo, la tabla de tasas se construye con estos datos y
+        cada fila recibe las tasas calculadas sin su propio fold (ver
+        ``DelayRateTable.out_of_fold``); sin ella, las tasas salen de la tabla del
+        entrenamiento o, si el modelo no está en memoria, de la del artefacto.
+        """
+        if "SIGLADES" not in data.columns:
+            raise ValueError("Las tasas históricas requieren la columna SIGLADES.")
+        if fit:
+            table = DelayRateTable(smoothing=self._config["features"]["rate_smoothing"])
+            codes = [_rate_codes(table, data[column], grow=True) for column in RATE_COLUMNS]
+            delay = data["delay"].to_numpy()
+            table.add(codes, delay)
+            rates = table.out_of_fold(codes, delay, n_folds=self._config["features"]["rate_folds"])
+            self._rates = table
+            logging.info("Tabla de tasas históricas de %d vuelos con forma %s.", table.rows, table.shape)
+        else:
+            if self._rates is None:
+                self.load_artifact()
+            if self._rates is None:
+                raise ValueError(f"El artefacto {self.artifact_path} no incluye tasas históricas.")
+            rates = self._rates.gather([_rate_codes(self._rates, data[column]) for column in RATE_COLUMNS])
+        return pd.DataFrame(rates, index=data.index, columns=rate_feature_names())
+
+    def _hashed_columns(self) -> List[str]:
+        return list(self._config["features"]["hashed_columns"] or [])
+
+    def _source_columns(self) -> List[str]:
+        """Columnas crudas adicionales que necesitan el hashing y las tasas históricas."""
+        columns = self._hashed_columns()
+        if self._config["features"]["rate_features"] and "SIGLADES" not in columns:
+            columns.append("SIGLADES")
+        return columns
+
+    def _hashing(self) -> Optional[dict]:
+        """Descripción del hashing configurado (se guarda en el bundle); None si no hay columnas."""
+        return hashing_spec(self._hashed_columns(), self._config["features"]["hash_features"])
+
     def _build_estimator(self):
         """
-        El estimador subyacente se construye intentando utilizar XGBoost cuando la
-        variable de entorno USE_XGBOOST está activa; en caso contrario, se recurre a
-        una regresión logística.
-        """
-        if _USE_XGBOOST:
-            try:
-                import xgboost as xgb  # type: ignore
-
-                logging.info("Inicializando modelo XGBoost.")
-                return xgb.XGBClassifier(
-                    random_state=1,
-                    learning_rate=0.01,
-                    n_estimators=200,
-                    max_depth=4,
-                    use_label_encoder=False,
-                    eval_metric="logloss"
-                )
-            except Exception as exc:  # pragma: no cover - solo se ejecuta en entornos con XGBoost
-                logging.warning(
-                    "No se pudo inicializar XGBoost (%s). Se utilizará LogisticRegression.",
-                    exc
-                )
-
-        logging.info("Inicializando modelo LogisticRegression como fallback.")
-        return LogisticRegression(max_iter=1000, random_state=1)
+        El estimador subyacente se construye con la configuración del modelo
+        (XGBoost o regresión logística, hilos, construcción de árboles, parada
+        temprana y solver; ver ``estimators.py``).
+        """
+        return build_estimator(self._config)
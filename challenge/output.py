@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Escritura de predicciones en formato columnar (Parquet o Feather) o CSV.
+
+Las filas se agregan de manera incremental en grupos de tamaño fijo sobre un
+archivo (o directorio) temporal ubicado junto al destino final, el cual se
+reemplaza de forma atómica al confirmar la escritura. Si el proceso se
+interrumpe, el destino anterior permanece intacto.
+"""
+
+import logging
+import os
+import shutil
+import uuid
+from pathlib import Path
+from typing import Iterable, List, Optional, Sequence, Union
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - solo se requiere para Parquet/Feather
+    pa = None
+    pq = None
+
+FORMATS = ("csv", "parquet", "feather")
+_SUFFIXES = {"csv": ".csv", "parquet": ".parquet", "feather": ".feather"}
+_DEFAULT_COMPRESSION = {"csv": None, "parquet": "snappy", "feather": "lz4"}
+
+
+def infer_format(path: Union[str, Path]) -> str:
+    """Deduce el formato a partir de la extensión del destino; por defecto se asume CSV."""
+    suffix = Path(path).suffix.lower()
+    for name, expected in _SUFFIXES.items():
+        if suffix == expected:
+            return name
+    return "csv"
+
+
+def parse_columns(spec: Optional[str]) -> Optional[List[str]]:
+    """Convierte una lista separada por comas (``"OPERA,MES"``) en una lista de columnas."""
+    columns = [item.strip() for item in (spec or "").split(",") if item.strip()]
+    return columns or None
+
+
+class PredictionWriter:
+    """
+    La salida de predicciones se escribe por bloques y se confirma de forma atómica.
+
+    Cada llamada a :meth:`write` agrega filas al destino temporal, divididas en
+    grupos de ``row_group_size`` filas para acotar la memoria de la conversión a
+    Arrow. Con ``partition_by`` el destino es un directorio con la estructura
+    ``MES=3/OPERA=Grupo LATAM/part-00000.parquet``. :meth:`commit` reemplaza el
+    destino final y :meth:`abort` descarta lo escrito; usado como context
+    manager, la confirmación ocurre solo si no hubo excepciones.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        fmt: Optional[str] = None,
+        columns: Optional[Sequence[str]] = None,
+        partition_by: Optional[Sequence[str]] = None,
+        compression: Optional[str] = "default",
+        row_group_size: int = 100_000,
+    ) -> None:
+        fmt = (fmt or infer_format(path)).lower()
+        if fmt not in FORMATS:
+            raise ValueError(f"Formato de salida no soportado: {fmt}")
+        if row_group_size < 1:
+            raise ValueError("row_group_size debe ser >= 1")
+
+        if fmt != "csv" and pa is None:
+            # Un formato pedido explícitamente no se cambia: se escribiría otro archivo del esperado.
+            raise ImportError(f"pyarrow es necesario para escribir {fmt}; instálalo (requirements.txt) o usa CSV.")
+
+        self.path = Path(path)
+        self.fmt = fmt
+        self.columns = list(columns) if columns else None
+        self.partition_by = list(partition_by) if partition_by else []
+        self.compression = _DEFAULT_COMPRESSION[fmt] if compression == "default" else compression
+        self.row_group_size = row_group_size
+        self.rows_written = 0
+
+        self._tmp_path = self.path.with_name(f".{self.path.name}.tmp-{uuid.uuid4().hex[:8]}")
+        self._schema = None
+        self._writer = None
+        self._parts = 0
+        self._closed = False
+        if self.partition_by:
+            self._tmp_path.mkdir(parents=True)
+        else:
+            self._tmp_path.parent.mkdir(parents=True, exist_ok=True)
+
+    # ==============================================================
+    # ESCRITURA
+    # ==============================================================
+    def write(self, frame: pd.DataFrame) -> None:
+        """Agrega las filas de ``frame`` (restringidas a las columnas seleccionadas) al destino temporal."""
+        if self._closed:
+            raise RuntimeError("El writer ya fue confirmado o descartado.")
+        if self.columns:
+            missing = [col for col in self.columns if col not in frame.columns]
+            if missing:
+                raise KeyError(f"Columnas de salida inexistentes: {missing}")
+            frame = frame[self.columns]
+
+        for start in range(0, len(frame), self.row_group_size):
+            chunk = frame.iloc[start:start + self.row_group_size]
+            if self.partition_by:
+                self._write_partitioned(chunk)
+            else:
+                self._append(chunk)
+            self.rows_written += len(chunk)
+
+    def write_csv_text(self, text: str, rows: int) -> None:
+        """
+        Agrega ``rows`` filas ya formateadas como CSV (sin encabezado, p. ej. por
+        procesos hijos con ``to_csv(header=False, index=False)``) al destino temporal.
+        """
+        if self._closed:
+            raise RuntimeError("El writer ya fue confirmado o descartado.")
+        if self.fmt != "csv" or self.partition_by or not self.columns:
+            raise ValueError("El texto CSV solo se admite en CSV sin particiones y con columnas declaradas.")
+        if self._writer is None:
+            self._append(pd.DataFrame(columns=self.columns))
+        with open(self._tmp_path, "a", encoding="utf-8") as handle:
+            handle.write(text)
+        self.rows_written += rows
+
+    def _to_table(self, frame: pd.DataFrame):
+        # Las columnas object de read_csv pueden mezclar enteros y textos (p. ej. Vlo-O);
+        # se normalizan a texto para que Arrow infiera un único tipo por columna.
+        mixed = [
+            col
+            for col in frame.columns
+            if frame[col].dtype == object
+            and pd.api.types.infer_dtype(frame[col], skipna=True) not in ("string", "empty")
+        ]
+        if mixed:
+            frame = frame.copy()
+            for col in mixed:
+                frame[col] = frame[col].where(frame[col].isna(), frame[col].astype(str))
+        if self._schema is None:
+            schema = pa.Table.from_pandas(frame, preserve_index=False).schema.remove_metadata()
+            self._schema = pa.schema(
+                [
+                    field.with_type(pa.string()) if pa.types.is_null(field.type) else field
+                    for field in schema
+                ]
+            )
+        return pa.Table.from_pandas(frame, schema=self._schema, preserve_index=False)
+
+    def _append(self, frame: pd.DataFrame) -> None:
+        if self.fmt == "csv":
+            header = self._writer is None
+            self._writer = True
+            frame.to_csv(self._tmp_path, mode="w" if header else "a", header=header, index=False)
+            return
+
+        table = self._to_table(frame)
+        if self._writer is None:
+            self._writer = self._open(self._tmp_path, table.schema)
+        self._writer.write_table(table)
+
+    def _open(self, path: Path, schema):
+        if self.fmt == "parquet":
+            return pq.ParquetWriter(str(path), schema, compression=self.compression or "none")
+        options = pa.ipc.IpcWriteOptions(compression=self.compression)
+        return pa.ipc.new_file(str(path), schema, options=options)
+
+    def _write_partitioned(self, frame: pd.DataFrame) -> None:
+        # Cada bloque genera un archivo por partición; las columnas de partición
+        # quedan codificadas en la ruta, como en los datasets de Hive/Arrow.
+        values = [col for col in frame.columns if col not in self.partition_by]
+        for keys, group in frame.groupby(self.partition_by, sort=False, observed=True):
+            keys = keys if isinstance(keys, tuple) else (keys,)
+            directory = self._tmp_path.joinpath(
+                *(f"{col}={_partition_value(key)}" for col, key in zip(self.partition_by, keys))
+            )
+            directory.mkdir(parents=True, exist_ok=True)
+            target = directory / f"part-{self._parts:05d}{_SUFFIXES[self.fmt]}"
+            group = group[values]
+            if self.fmt == "csv":
+                group.to_csv(target, index=False)
+            else:
+                table = self._to_table(group)
+                writer = self._open(target, table.schema)
+                try:
+                    writer.write_table(table)
+                finally:
+                    writer.close()
+        self._parts += 1
+
+    # ==============================================================
+    # CONFIRMACIÓN
+    # ==============================================================
+    def commit(self) -> Path:
+        """Cierra el destino temporal y lo publica en ``path`` reemplazando cualquier salida previa."""
+        if self._closed:
+            raise RuntimeError("El writer ya fue confirmado o descartado.")
+        self._close_writer()
+        if not self.partition_by and self._writer is None:
+            # Sin filas igualmente se publica un archivo válido (vacío).
+            self._append(pd.DataFrame(columns=self.columns or []))
+            self._close_writer()
+
+        if self.partition_by:
+            backup = None
+            if self.path.exists():
+                backup = self.path.with_name(f".{self.path.name}.old-{uuid.uuid4().hex[:8]}")
+                os.replace(self.path, backup)
+            os.replace(self._tmp_path, self.path)
+            if backup is not None:
+                _remove(backup)
+        else:
+            os.replace(self._tmp_path, self.path)
+
+        self._closed = True
+        logging.info("Se escribieron %d filas en %s (%s).", self.rows_written, self.path, self.fmt)
+        return self.path
+
+    def abort(self) -> None:
+        """Descarta todo lo escrito; el destino final no se modifica."""
+        if self._closed:
+            return
+        try:
+            self._close_writer()
+        finally:
+            _remove(self._tmp_path)
+            self._closed = True
+
+    def _close_writer(self) -> None:
+        if self._writer is not None and self._writer is not True:
+            self._writer.close()
+
+    def __enter__(self) -> "PredictionWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.commit()
+        else:
+            self.abort()
+
+
+def write_predictions(
+    frame: pd.DataFrame,
+    path: Union[str, Path],
+    **options,
+) -> Path:
+    """Escribe ``frame`` completo con :class:`PredictionWriter` y devuelve la ruta publicada."""
+    with PredictionWriter(path, **options) as writer:
+        writer.write(frame)
+    return writer.path
+
+
+def read_predictions(path: Union[str, Path], columns: Optional[Iterable[str]] = None) -> pd.DataFrame:
+    """Lee una salida generada por :class:`PredictionWriter`, incluyendo directorios particionados."""
+    path = Path(path)
+    columns = list(columns) if columns else None
+    fmt = infer_format(path)
+    if path.is_dir():
+        files = sorted(p for p in path.rglob("part-*") if p.is_file())
+        frames = []
+        for file in files:
+            frame = read_predictions(file)
+            for part in file.relative_to(path).parts[:-1]:
+                key, _, value = part.partition("=")
+                frame[key] = value
+            frames.append(frame)
+        result = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+        return result[columns] if columns else result
+    if fmt == "parquet":
+        return pd.read_parquet(path, columns=columns)
+    if fmt == "feather":
+        return pd.read_feather(path, columns=columns)
+    return pd.read_csv(path, usecols=columns)
+
+
+def _partition_value(value) -> str:
+    return str(value).replace("/", "_")
+
+
+def _remove(path: Path) -> None:
+    if path.is_dir():
+        shutil.rmtree(path, ignore_errors=True)
+    elif path.exists():
+        path.unlink()
@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Perfilado integrado del pipeline (``run_pipeline.py --profile``).
+
+Los resultados se guardan en ``<run_dir>/<run_id>/profile/``:
+
+- ``stacks.collapsed``: pilas del hilo principal en el formato colapsado
+  (``a;b;c N``) que aceptan ``flamegraph.pl`` y speedscope; ``N`` son
+  microsegundos de reloj.
+- ``cpu.pstats`` y ``cpu.txt``: el mismo perfil en el formato de ``cProfile``,
+  legible con ``pstats`` o snakeviz.
+- ``memory.json``: por etapa del manifiesto, las líneas que más memoria
+  asignaron según ``tracemalloc`` y el pico trazado.
+
+Por defecto el perfil de CPU se obtiene por muestreo: un hilo aparte lee la
+pila del hilo principal cada ``interval`` segundos y le asigna el tiempo
+transcurrido desde la muestra anterior (el código nativo que retiene el GIL
+demora la muestra, pero su tiempo no se pierde). En el ``.pstats`` resultante
+los conteos de llamadas son conteos de muestras. Con ``cpu="deterministic"``
+se usa ``cProfile``, con conteos exactos pero un costo proporcional a la
+cantidad de llamadas (entre 10% y 20% en ``--mode both``).
+
+``tracemalloc`` cuesta varias veces el tiempo de las etapas que crean muchos
+objetos pequeños (la escritura del CSV, por ejemplo), así que tampoco queda
+activo todo el tiempo: cada etapa se traza en ventanas de ``memory_window``
+segundos cada ``memory_period`` segundos, siempre con una ventana al comienzo.
+Las asignaciones informadas son las de esas ventanas que seguían vivas al
+cerrarlas, por lo que representan una muestra y no el total de la etapa; el
+pico real de cada etapa ya figura en el manifiesto.
+
+El código que corre en procesos hijos (por ejemplo, el bootstrap de la
+evaluación) no queda incluido en ninguna de las vistas.
+"""
+
+import cProfile
+import io
+import json
+import logging
+import marshal
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+CPU_STATS_FILENAME = "cpu.pstats"
+CPU_TEXT_FILENAME = "cpu.txt"
+STACKS_FILENAME = "stacks.collapsed"
+MEMORY_FILENAME = "memory.json"
+CPU_MODES = ("sampled", "deterministic")
+
+# Función en el formato de pstats: (archivo, línea, nombre).
+Function = Tuple[str, int, str]
+
+
+def _function(code) -> Function:
+    return code.co_filename, code.co_firstlineno, code.co_name
+
+
+def _label(function: Function) -> str:
+    # Las dos últimas partes de la ruta bastan para distinguir módulos homónimos.
+    filename, lineno, name = function
+    return f"{name} ({'/'.join(Path(filename).parts[-2:])}:{lineno})"
+
+
+class StackSampler:
+    """
+    Muestrea la pila de un hilo a intervalos fijos y acumula segundos por pila.
+
+    ``on_tick`` se invoca desde el hilo de muestreo después de cada muestra.
+    """
+
+    def __init__(
+        self,
+        thread_id: Optional[int] = None,
+        interval: float = 0.01,
+        max_depth: int = 128,
+        on_tick=None,
+    ) -> None:
+        if interval <= 0:
+            raise ValueError("interval debe ser positivo")
+        self.thread_id = thread_id if thread_id is not None else threading.get_ident()
+        self.interval = interval
+        self.max_depth = max_depth
+        self.on_tick = on_tick
+        self.stacks: Dict[Tuple[Function, ...], float] = defaultdict(float)
+        self.samples = 0
+        self.busy_seconds = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        last = time.perf_counter()
+        while not self._stop.wait(self.interval):
+            now = time.perf_counter()
+            self.sample(now - last)
+            if self.on_tick is not None:
+                self.on_tick(now)
+            last = time.perf_counter()
+            self.busy_seconds += last - now
+
+    def sample(self, seconds: float) -> None:
+        frame = sys._current_frames().get(self.thread_id)
+        if frame is None:
+            return
+        stack = []
+        while frame is not None and len(stack) < self.max_depth:
+            stack.append(_function(frame.f_code))
+            frame = frame.f_back
+        # Las pilas se guardan de la raíz a la hoja.
+        self.stacks[tuple(reversed(stack))] += seconds
+        self.samples += 1
+
+    def write_collapsed(self, path: Union[str, Path]) -> None:
+        labels: Dict[Function, str] = {}
+        with open(path, "w", encoding="utf-8") as handle:
+            for stack, seconds in sorted(self.stacks.items(), key=lambda item: -item[1]):
+                micros = round(seconds * 1e6)
+                if micros:
+                    names = (labels.get(f) or labels.setdefault(f, _label(f)) for f in stack)
+                    handle.write(f"{';'.join(names)} {micros}\n")
+
+    def pstats_table(self) -> Dict[Function, tuple]:
+        """Las pilas como tabla de ``pstats``: (cc, nc, tiempo propio, tiempo acumulado, llamadores)."""
+        counts: Counter = Counter()
+        own: Dict[Function, float] = defaultdict(float)
+        cumulative: Dict[Function, float] = defaultdict(float)
+        callers: Dict[Function, Dict[Function, List[float]]] = defaultdict(dict)
+        for stack, seconds in self.stacks.items():
+            own[stack[-1]] += seconds
+            # Una función recursiva cuenta una sola vez por pila en el tiempo acumulado.
+            for function in set(stack):
+                counts[function] += 1
+                cumulative[function] += seconds
+            for caller, callee in set(zip(stack, stack[1:])):
+                edge = callers[callee].setdefault(caller, [0, 0, 0.0, 0.0])
+                edge[0] += 1
+                edge[1] += 1
+                edge[2] += seconds if callee == stack[-1] else 0.0
+                edge[3] += seconds
+        return {
+            function: (
+                counts[function],
+                counts[function],
+                own.get(function, 0.0),
+                cumulative[function],
+                {caller: tuple(edge) for caller, edge in callers.get(function, {}).items()},
+            )
+            for function in cumulative
+        }
+
+
+class PipelineProfiler:
+    """
+    Reúne el perfil de CPU, las pilas colapsadas y tracemalloc por etapa.
+
+    Uso:
+        profiler = PipelineProfiler("runs/<run_id>/profile")
+        profiler.start()
+        with profiler.stage("train/fit"):
+            model.fit(X, y)
+        summary = profiler.stop()
+    """
+
+    def __init__(
+        self,
+        output_dir: Union[str, Path],
+        interval: float = 0.01,
+        cpu: str = "sampled",
+        memory: bool = True,
+        memory_window: float = 0.01,
+        memory_period: float = 1.0,
+        memory_frames: int = 4,
+        top: int = 25,
+    ) -> None:
+        if cpu not in CPU_MODES:
+            raise ValueError(f"cpu debe ser uno de {CPU_MODES}")
+        self.output_dir = Path(output_dir)
+        self.cpu = cpu
+        self.memory = memory
+        self.memory_window = memory_window
+        self.memory_period = memory_period
+        self.memory_frames = memory_frames
+        self.top = top
+        self.sampler = StackSampler(interval=interval, on_tick=self._tick if memory else None)
+        self._cprofile = cProfile.Profile() if cpu == "deterministic" else None
+        self.stages: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._stage: Optional[str] = None
+        self._window_started: Optional[float] = None
+        self._last_window = 0.0
+        self._started: Optional[float] = None
+        self._summary: Optional[Dict[str, Any]] = None
+
+    def start(self) -> None:
+        self._started = time.perf_counter()
+        self.sampler.start()
+        if self._cprofile is not None:
+            self._cprofile.enable()
+
+    # ==============================================================
+    # MEMORIA POR ETAPA
+    # ==============================================================
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Traza la etapa por ventanas; las etapas anidadas se atribuyen a la exterior."""
+        if not self.memory or self._stage is not None or tracemalloc.is_tracing():
+            yield
+            return
+        with self._lock:
+            self._stage = name
+            self.stages.setdefault(name, {
+                "windows": 0,
+                "traced_seconds": 0.0,
+                "traced_peak_bytes": 0,
+                "sites": Counter(),
+                "blocks": Counter(),
+            })
+            self._open_window(time.perf_counter())
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._close_window(time.perf_counter())
+                self._stage = None
+
+    def _tick(self, now: float) -> None:
+        with self._lock:
+            if self._stage is None:
+                return
+            if self._window_started is not None:
+                if now - self._window_started >= self.memory_window:
+                    self._close_window(now)
+            elif now - self._last_window >= self.memory_period:
+                self._open_window(now)
+
+    def _open_window(self, now: float) -> None:
+        tracemalloc.start(self.memory_frames)
+        self._window_started = now
+        self._last_window = now
+
+    def _close_window(self, now: float) -> None:
+        if self._window_started is None:
+            return
+        snapshot = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        stats = self.stages[self._stage]
+        stats["windows"] += 1
+        stats["traced_seconds"] += now - self._window_started
+        stats["traced_peak_bytes"] = max(stats["traced_peak_bytes"], peak)
+        excluded = snapshot.filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+        ])
+        for stat in excluded.statistics("traceback"):
+            site = tuple(f"{frame.filename}:{frame.lineno}" for frame in stat.traceback)
+            stats["sites"][site] += stat.size
+            stats["blocks"][site] += stat.count
+        self._window_started = None
+
+    def _memory_report(self) -> List[Dict[str, Any]]:
+        report = []
+        for name, stats in self.stages.items():
+            report.append({
+                "name": name,
+                "windows": stats["windows"],
+                "traced_seconds": round(stats["traced_seconds"], 4),
+                "traced_peak_bytes": stats["traced_peak_bytes"],
+                "top_allocations": [
+                    {
+                        "location": site[0],
+                        "traceback": list(site),
+                        "size_bytes": size,
+                        "blocks": stats["blocks"][site],
+                    }
+                    for site, size in stats["sites"].most_common(self.top)
+                ],
+            })
+        return report
+
+    # ==============================================================
+    # CIERRE
+    # ==============================================================
+    def stop(self) -> Dict[str, Any]:
+        """Detiene la captura, escribe los archivos y devuelve el resumen para el manifiesto."""
+        if self._summary is not None:
+            return self._summary
+        if self._cprofile is not None:
+            self._cprofile.disable()
+        self.sampler.stop()
+        wall = time.perf_counter() - self._started if self._started is not None else 0.0
+
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        files = {}
+        stats_path = self.output_dir / CPU_STATS_FILENAME
+        if self._cprofile is not None:
+            self._cprofile.dump_stats(str(stats_path))
+        else:
+            stats_path.write_bytes(marshal.dumps(self.sampler.pstats_table()))
+        report = io.StringIO()
+        pstats.Stats(str(stats_path), stream=report).sort_stats("cumulative").print_stats(self.top * 2)
+        (self.output_dir / CPU_TEXT_FILENAME).write_text(report.getvalue(), encoding="utf-8")
+        files["cpu_stats"] = str(stats_path)
+        files["cpu_text"] = str(self.output_dir / CPU_TEXT_FILENAME)
+        self.sampler.write_collapsed(self.output_dir / STACKS_FILENAME)
+        files["stacks"] = str(self.output_dir / STACKS_FILENAME)
+        memory = self._memory_report() if self.memory else []
+        if self.memory:
+            with open(self.output_dir / MEMORY_FILENAME, "w", encoding="utf-8") as handle:
+                json.dump({"stages": memory}, handle, indent=2, ensure_ascii=False)
+            files["memory"] = str(self.output_dir / MEMORY_FILENAME)
+
+        self._summary = {
+            "files": files,
+            "cpu": self.cpu,
+            "wall_seconds": round(wall, 4),
+            "samples": self.sampler.samples,
+            "sample_interval_seconds": self.sampler.interval,
+            "sampler_busy_seconds": round(self.sampler.busy_seconds, 4),
+            "stages": {
+                stage["name"]: {
+                    "traced_seconds": stage["traced_seconds"],
+                    "traced_peak_bytes": stage["traced_peak_bytes"],
+                }
+                for stage in memory
+            },
+        }
+        logging.info(
+            "Perfil de la ejecución en %s (%d muestras de pila, %.1f ms en el muestreo).",
+            self.output_dir,
+            self.sampler.samples,
+            self.sampler.busy_seconds * 1000,
+        )
+        return self._summary
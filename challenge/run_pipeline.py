@@ -9,12 +9,37 @@ Ejemplos de uso en terminal:
 python run_pipeline.py --mode train
 python run_pipeline.py --mode predict --predict_data ../data/data.csv
 python run_pipeline.py --mode both
+python run_pipeline.py --mode cv --cv_strategy time --cv_folds 5
+python run_pipeline.py --mode train --sampling_ratio 1 --sampling_correction threshold
+python run_pipeline.py --mode train --reservoir_size 200000 --sampling_ratio 2
+python run_pipeline.py --mode sampling --sampling_ratios 0.5,1,2,4
+python run_pipeline.py --mode train --estimator_config estimator.json
+python run_pipeline.py --mode both --segment_by OPERA --segment_min_rows 1000
+python run_pipeline.py --mode both --hashed_columns SIGLADES,DIANOM --hash_features 64
+python run_pipeline.py --mode both --rate_features
+python run_pipeline.py --mode update_rates --train_data vuelos_2018_01.csv
+python run_pipeline.py --mode predict --output predicciones.parquet --output_columns OPERA,MES,TIPOVUELO,predicted_delay
+python run_pipeline.py --mode predict --output predicciones --output_format parquet --partition_by MES,OPERA
+python run_pipeline.py --mode watch --watch_dir entrantes --output_dir predicciones --poll_seconds 30
+python run_pipeline.py --mode both --profile
+python run_pipeline.py --mode train --analytics --analytics_groups OPERA,MES,OPERA:SIGLADES
 """
 
 import argparse
-import pandas as pd
 import logging
+import signal
 from model import DelayModel
+from analytics import parse_groups, profile_file
+from evaluation import write_report
+from estimators import load_config
+from ingest import ENGINES
+from sampling import CORRECTIONS
+from segmentation import SEGMENT_COLUMNS
+from validation import STRATEGIES
+from output import FORMATS, PredictionWriter, parse_columns
+from manifest import RunManifest, estimator_config
+from profiling import CPU_MODES, PipelineProfiler
+from watch import ScoringDaemon
 
 
 # El registro de logs es configurado para permitir el seguimiento del proceso.
@@ -24,6 +49,217 @@ logging.basicConfig(
 )
 
 
+def run_stages(args: argparse.Namespace, model: DelayModel, manifest: RunManifest) -> None:
+    """
+    Se ejecutan las etapas del modo elegido; cada una queda medida en el manifiesto.
+    """
+
+    # ==========================================================
+    # ENTRENAMIENTO
+    # ==========================================================
+    if args.mode in ["train", "both"]:
+        logging.info("=== MODO ENTRENAMIENTO ===")
+        manifest.add_input("train_data", args.train_data)
+        inclusion = None
+        if args.reservoir_size:
+            # Muestra de memoria fija: el submuestreo ocurre durante la lectura por bloques.
+            with manifest.stage("train/sample_csv") as info:
+                df_train, inclusion = model.load_sample(
+                    args.train_data, args.reservoir_size, ratio=args.sampling_ratio or 1.0
+                )
+                info.update(rows=len(df_train), inclusion=inclusion)
+            sampling_ratio = None
+        else:
+            with manifest.stage("train/read_csv") as info:
+                df_train, ingest_stats = model.load_data(args.train_data, extra_columns=[], engine=args.engine)
+                info.update(rows=ingest_stats["rows"], ingest=ingest_stats)
+            logging.info("Métricas de lectura (entrenamiento): %s", ingest_stats)
+            sampling_ratio = args.sampling_ratio
+        with manifest.stage("train/preprocess") as info:
+            X, y = model.preprocess(df_train, target_column="delay")
+            info.update(rows=len(X), features=X.shape[1])
+        if args.segment_by:
+            with manifest.stage("train/fit_segments") as info:
+                report = model.fit_segments(
+                    X, y, column=args.segment_by, min_rows=args.segment_min_rows, n_jobs=args.segment_jobs
+                )
+                info.update(
+                    rows=report["train_rows"],
+                    features=X.shape[1],
+                    segments=len(report["segments"]) - 1,
+                    jobs=report["jobs"],
+                    breakdown=report["timings"],
+                )
+        else:
+            with manifest.stage("train/fit") as info:
+                model.fit(
+                    X,
+                    y,
+                    sampling_ratio=sampling_ratio,
+                    correction=args.sampling_correction,
+                    inclusion=inclusion,
+                )
+                info.update(
+                    rows=model._evaluation["train_rows"],
+                    features=X.shape[1],
+                    sampling=model._evaluation.get("sampling"),
+                    iterations=model._evaluation["iterations"],
+                    breakdown=model._evaluation["timings"],
+                )
+        manifest.set("estimator", estimator_config(model._build_estimator() if args.segment_by else model._model))
+        manifest.set("evaluation", model._evaluation["metrics"])
+        manifest.add_artifact("model", model.artifact_path)
+        manifest.add_artifact("evaluation_report", model.report_path)
+        logging.info("El entrenamiento fue completado correctamente.")
+
+        if args.analytics:
+            # Las tasas se calculan sobre el archivo completo, leído por bloques, aunque se haya submuestreado.
+            with manifest.stage("train/analytics") as info:
+                rates = profile_file(args.train_data, parse_groups(args.analytics_groups), chunksize=args.chunksize)
+                write_report(rates, args.analytics_report)
+                info.update(rows=rates["rows"], groups=list(rates["groups"]), combinations=rates["combinations"])
+            manifest.add_artifact("delay_rates", args.analytics_report)
+
+    # ==========================================================
+    # VALIDACIÓN CRUZADA
+    # ==========================================================
+    if args.mode == "cv":
+        logging.info("=== MODO VALIDACIÓN CRUZADA ===")
+        manifest.add_input("train_data", args.train_data)
+        with manifest.stage("cv/read_csv") as info:
+            df_cv, ingest_stats = model.load_data(args.train_data, extra_columns=[], engine=args.engine)
+            info.update(rows=ingest_stats["rows"], ingest=ingest_stats)
+        logging.info("Métricas de lectura (validación): %s", ingest_stats)
+        with manifest.stage("cv/preprocess") as info:
+            X, y = model.preprocess(df_cv, target_column="delay")
+            info.update(rows=len(X), features=X.shape[1])
+        with manifest.stage("cv/cross_validate") as info:
+            report = model.cross_validate(
+                X,
+                y,
+                n_splits=args.cv_folds,
+                strategy=args.cv_strategy,
+                timestamps=df_cv["Fecha-I"],
+                n_jobs=args.cv_jobs,
+            )
+            info.update(rows=len(X), folds=report["folds"], jobs=report["jobs"])
+        manifest.set("estimator", estimator_config(model._build_estimator()))
+        manifest.set("evaluation", report["metrics"])
+        logging.info("La validación cruzada fue completada correctamente.")
+
+    # ==========================================================
+    # SUBMUESTREO
+    # ==========================================================
+    if args.mode == "sampling":
+        logging.info("=== MODO COMPARACIÓN DE SUBMUESTREO ===")
+        manifest.add_input("train_data", args.train_data)
+        with manifest.stage("sampling/read_csv") as info:
+            df_train, ingest_stats = model.load_data(args.train_data, extra_columns=[], engine=args.engine)
+            info.update(rows=ingest_stats["rows"], ingest=ingest_stats)
+        with manifest.stage("sampling/preprocess") as info:
+            X, y = model.preprocess(df_train, target_column="delay")
+            info.update(rows=len(X), features=X.shape[1])
+        with manifest.stage("sampling/compare") as info:
+            ratios = [float(value) for value in args.sampling_ratios.split(",") if value.strip()]
+            report = model.sampling_report(X, y, ratios, correction=args.sampling_correction)
+            info.update(rows=len(X), ratios=ratios)
+        manifest.set("estimator", estimator_config(model._build_estimator()))
+        manifest.set("sampling", report["runs"])
+        logging.info("La comparación de submuestreo fue completada correctamente.")
+
+    # ==========================================================
+    # PREDICCIÓN
+    # ==========================================================
+    if args.mode in ["predict", "both"]:
+        logging.info("=== MODO PREDICCIÓN ===")
+        if args.mode == "predict" and args.segment_by:
+            model.artifact_path = model.segments_path
+        # Solo se leen las columnas que el modelo o la salida necesitan.
+        output_columns = parse_columns(args.output_columns)
+        manifest.add_input("predict_data", args.predict_data)
+        with manifest.stage("predict/read_csv") as info:
+            df_pred, ingest_stats = model.load_data(
+                args.predict_data,
+                extra_columns=output_columns and [col for col in output_columns if col != "predicted_delay"],
+                engine=args.engine,
+            )
+            info.update(rows=ingest_stats["rows"], ingest=ingest_stats)
+        logging.info("Métricas de lectura (predicción): %s", ingest_stats)
+        with manifest.stage("predict/preprocess") as info:
+            X_pred = model.preprocess(df_pred)
+            info.update(rows=len(X_pred), features=X_pred.shape[1])
+        with manifest.stage("predict/predict") as info:
+            preds = model.predict(X_pred)
+            info.update(rows=len(preds), positives=int(sum(preds)))
+        df_pred["predicted_delay"] = preds
+        if args.mode == "predict":
+            manifest.add_input("model", model.artifact_path)
+            manifest.set("estimator", estimator_config(model._model))
+
+        # La salida se escribe por bloques en un destino temporal y se publica de forma atómica.
+        with manifest.stage("predict/write_output") as info:
+            with PredictionWriter(
+                args.output,
+                fmt=args.output_format,
+                columns=output_columns,
+                partition_by=parse_columns(args.partition_by),
+                compression=None if args.compression == "none" else args.compression,
+                row_group_size=args.row_group_size,
+            ) as writer:
+                writer.write(df_pred)
+            info.update(rows=writer.rows_written, format=writer.fmt)
+        manifest.add_artifact("predictions", writer.path)
+        logging.info(f"Las predicciones fueron generadas y guardadas en {writer.path}.")
+
+    # ==========================================================
+    # TASAS HISTÓRICAS
+    # ==========================================================
+    if args.mode == "update_rates":
+        logging.info("=== MODO ACTUALIZACIÓN DE TASAS HISTÓRICAS ===")
+        if args.segment_by:
+            model.artifact_path = model.segments_path
+        # Solo se suman los vuelos nuevos a los conteos guardados en el artefacto; no se reentrena.
+        manifest.add_input("train_data", args.train_data)
+        with manifest.stage("update_rates/update") as info:
+            stats = model.update_rates(args.train_data, chunksize=args.chunksize)
+            info.update(rows=stats["rows"], table_rows=stats["table_rows"], shape=stats["shape"])
+        manifest.add_artifact("model", model.artifact_path)
+        logging.info("Las tasas históricas del artefacto fueron actualizadas correctamente.")
+
+    # ==========================================================
+    # WATCH
+    # ==========================================================
+    if args.mode == "watch":
+        logging.info("=== MODO WATCH ===")
+        if args.segment_by:
+            model.artifact_path = model.segments_path
+        # El modelo se carga una sola vez para todos los archivos que lleguen.
+        with manifest.stage("watch/load_model"):
+            model.load_artifact()
+        manifest.add_input("model", model.artifact_path)
+        manifest.set("estimator", estimator_config(model._model))
+        daemon = ScoringDaemon(
+            model,
+            args.watch_dir,
+            args.output_dir,
+            pattern=args.watch_pattern,
+            chunksize=args.chunksize,
+            fmt=args.output_format,
+            columns=parse_columns(args.output_columns),
+            compression=None if args.compression == "none" else args.compression,
+            poll_seconds=args.poll_seconds,
+            settle_seconds=args.settle_seconds,
+        )
+        # SIGTERM/SIGINT terminan el bloque en curso y dejan el checkpoint al día.
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            signal.signal(signum, lambda *_: daemon.stop())
+        with manifest.stage("watch/serve") as info:
+            metrics = daemon.run(once=args.watch_once)
+            info.update(rows=metrics["rows"], files=metrics["files"], metrics=metrics)
+        manifest.add_artifact("checkpoint", daemon.checkpoint.path)
+        logging.info("El modo watch finalizó: %s", metrics)
+
+
 def main():
     """
     El flujo principal del pipeline es definido y se habilitan los modos de entrenamiento, predicción o ambos.
@@ -34,9 +270,9 @@ def main():
     parser.add_argument(
         "--mode",
         type=str,
-        choices=["train", "predict", "both"],
+        choices=["train", "predict", "both", "cv", "sampling", "watch", "update_rates"],
         required=True,
-        help="Modo de ejecución disponible: train / predict / both"
+        help="Modo de ejecución disponible: train / predict / both / cv / sampling / watch / update_rates"
     )
     parser.add_argument(
         "--train_data",
@@ -50,33 +286,253 @@ def main():
         default="../data/data.csv",
         help="Ruta al archivo CSV con los datos de predicción"
     )
+    parser.add_argument(
+        "--cv_folds",
+        type=int,
+        default=5,
+        help="Cantidad de folds del modo cv"
+    )
+    parser.add_argument(
+        "--cv_strategy",
+        type=str,
+        choices=STRATEGIES,
+        default="stratified",
+        help="Folds estratificados aleatorios o por ventana temporal creciente"
+    )
+    parser.add_argument(
+        "--cv_jobs",
+        type=int,
+        default=None,
+        help="Procesos para entrenar los folds (por defecto, todos los núcleos)"
+    )
+    parser.add_argument(
+        "--estimator_config",
+        type=str,
+        default=None,
+        help="Archivo JSON con la configuración del estimador (por defecto, DELAY_MODEL_CONFIG)"
+    )
+    parser.add_argument(
+        "--hashed_columns",
+        type=str,
+        default=None,
+        help="Columnas de alta cardinalidad codificadas por hashing, p. ej. SIGLADES,DIANOM "
+             "(por defecto, las de la configuración del estimador)"
+    )
+    parser.add_argument(
+        "--hash_features",
+        type=int,
+        default=None,
+        help="Ancho fijo del bloque de hashing (por defecto, el de la configuración del estimador)"
+    )
+    parser.add_argument(
+        "--rate_features",
+        action="store_true",
+        default=None,
+        help="Agrega las tasas históricas de retraso por aerolínea, destino y mes "
+             "(por defecto, según la configuración del estimador)"
+    )
+    parser.add_argument(
+        "--rate_smoothing",
+        type=float,
+        default=None,
+        help="Vuelos ficticios con los que cada tasa histórica se acerca a la del nivel superior"
+    )
+    parser.add_argument(
+        "--segment_by",
+        type=str,
+        choices=SEGMENT_COLUMNS,
+        default=None,
+        help="Entrena (y predice con) un modelo por valor de esta columna más uno global de respaldo"
+    )
+    parser.add_argument(
+        "--segment_min_rows",
+        type=int,
+        default=1000,
+        help="Filas de entrenamiento mínimas para que un segmento tenga modelo propio"
+    )
+    parser.add_argument(
+        "--segment_jobs",
+        type=int,
+        default=None,
+        help="Procesos para entrenar los segmentos (por defecto, todos los núcleos)"
+    )
+    parser.add_argument(
+        "--sampling_ratio",
+        type=float,
+        default=None,
+        help="Filas sin retraso por cada fila con retraso al submuestrear el entrenamiento"
+    )
+    parser.add_argument(
+        "--sampling_correction",
+        type=str,
+        choices=CORRECTIONS,
+        default="weights",
+        help="Compensación del submuestreo: pesos por clase o umbral de decisión corregido"
+    )
+    parser.add_argument(
+        "--reservoir_size",
+        type=int,
+        default=None,
+        help="Filas máximas de la muestra leída por bloques (memoria fija)"
+    )
+    parser.add_argument(
+        "--sampling_ratios",
+        type=str,
+        default="0.5,1,2,4",
+        help="Ratios separados por comas que compara el modo sampling"
+    )
+    parser.add_argument(
+        "--engine",
+        type=str,
+        choices=ENGINES,
+        default="c",
+        help="Parser de lectura del CSV (pyarrow es multihilo si está instalado)"
+    )
+    parser.add_argument(
+        "--output",
+        type=str,
+        default="predictions_output.csv",
+        help="Ruta del archivo (o directorio, si se particiona) de predicciones"
+    )
+    parser.add_argument(
+        "--output_format",
+        type=str,
+        choices=FORMATS,
+        default=None,
+        help="Formato de salida; por defecto se deduce de la extensión de --output"
+    )
+    parser.add_argument(
+        "--output_columns",
+        type=str,
+        default=None,
+        help="Columnas a escribir separadas por comas (por defecto, todas)"
+    )
+    parser.add_argument(
+        "--partition_by",
+        type=str,
+        default=None,
+        help="Columnas de partición separadas por comas, p. ej. MES,OPERA"
+    )
+    parser.add_argument(
+        "--compression",
+        type=str,
+        default="default",
+        help="Códec de compresión (snappy/zstd/gzip para Parquet, lz4/zstd para Feather, none)"
+    )
+    parser.add_argument(
+        "--row_group_size",
+        type=int,
+        default=100_000,
+        help="Filas por bloque escrito en la salida"
+    )
+    parser.add_argument(
+        "--watch_dir",
+        type=str,
+        default="entrantes",
+        help="Directorio vigilado por el modo watch"
+    )
+    parser.add_argument(
+        "--watch_pattern",
+        type=str,
+        default="*.csv",
+        help="Patrón de los archivos a puntuar en el modo watch"
+    )
+    parser.add_argument(
+        "--output_dir",
+        type=str,
+        default="predicciones",
+        help="Directorio de salidas y checkpoint del modo watch"
+    )
+    parser.add_argument(
+        "--chunksize",
+        type=int,
+        default=100_000,
+        help="Filas por bloque del modo watch (unidad de reanudación), del reporte de tasas de retraso "
+             "y del modo update_rates"
+    )
+    parser.add_argument(
+        "--poll_seconds",
+        type=float,
+        default=10.0,
+        help="Segundos entre revisiones del directorio vigilado"
+    )
+    parser.add_argument(
+        "--settle_seconds",
+        type=float,
+        default=2.0,
+        help="Antigüedad mínima de un archivo para considerarlo completo"
+    )
+    parser.add_argument(
+        "--watch_once",
+        action="store_true",
+        help="Procesa lo pendiente y termina, en lugar de seguir vigilando"
+    )
+    parser.add_argument(
+        "--analytics",
+        action="store_true",
+        help="Después de entrenar, guarda las tasas de retraso por categoría de --train_data"
+    )
+    parser.add_argument(
+        "--analytics_groups",
+        type=str,
+        default=None,
+        help="Agrupaciones del reporte separadas por comas; ':' cruza columnas, p. ej. OPERA,MES,OPERA:MES "
+             "(por defecto, las columnas del notebook)"
+    )
+    parser.add_argument(
+        "--analytics_report",
+        type=str,
+        default="delay_rates.json",
+        help="Ruta del reporte JSON de tasas de retraso"
+    )
+    parser.add_argument(
+        "--run_dir",
+        type=str,
+        default="runs",
+        help="Directorio donde se guardan los manifiestos de ejecución y su índice"
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Guarda perfil de CPU (cProfile y pilas colapsadas) y memoria por etapa en <run_dir>/<run_id>/profile"
+    )
+    parser.add_argument(
+        "--profile_interval",
+        type=float,
+        default=0.01,
+        help="Segundos entre muestras de pila del perfil"
+    )
+    parser.add_argument(
+        "--profile_cpu",
+        choices=CPU_MODES,
+        default="sampled",
+        help="Perfil de CPU por muestreo (bajo costo) o determinista con cProfile (conteos exactos)"
+    )
     args = parser.parse_args()
 
-    model = DelayModel()
-
-    # ==========================================================
-    # ENTRENAMIENTO
-    # ==========================================================
-    if args.mode in ["train", "both"]:
-        logging.info("=== MODO ENTRENAMIENTO ===")
-        df_train = pd.read_csv(args.train_data)
-        X, y = model.preprocess(df_train, target_column="delay")
-        model.fit(X, y)
-        logging.info("El entrenamiento fue completado correctamente.")
-
-    # ==========================================================
-    # PREDICCIÓN
-    # ==========================================================
-    if args.mode in ["predict", "both"]:
-        logging.info("=== MODO PREDICCIÓN ===")
-        df_pred = pd.read_csv(args.predict_data)
-        X_pred = model.preprocess(df_pred)
-        preds = model.predict(X_pred)
-        df_pred["predicted_delay"] = preds
-
-        output_file = "predictions_output.csv"
-        df_pred.to_csv(output_file, index=False)
-        logging.info(f"Las predicciones fueron generadas y guardadas en {output_file}.")
+    config = load_config(args.estimator_config)
+    # Las opciones de hashing y de tasas de la línea de comandos prevalecen sobre la configuración.
+    if args.hashed_columns is not None:
+        config["features"]["hashed_columns"] = parse_columns(args.hashed_columns) or []
+    if args.hash_features is not None:
+        config["features"]["hash_features"] = args.hash_features
+    if args.rate_features:
+        config["features"]["rate_features"] = True
+    if args.rate_smoothing is not None:
+        config["features"]["rate_smoothing"] = args.rate_smoothing
+    model = DelayModel(config=config)
+    manifest = RunManifest(args.run_dir, mode=args.mode, arguments=vars(args))
+    if args.profile:
+        manifest.profiler = PipelineProfiler(
+            manifest.directory / "profile", interval=args.profile_interval, cpu=args.profile_cpu
+        )
+        manifest.profiler.start()
+    try:
+        run_stages(args, model, manifest)
+    except BaseException as exc:
+        manifest.finish(status="failed", error=repr(exc))
+        raise
+    manifest.finish()
 
     logging.info("✅ La ejecución del pipeline finalizó exitosamente.")
 
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Submuestreo estratificado de la clase mayoritaria para entrenar más rápido.
+
+Hay dos formas de obtener la muestra:
+
+- ``stratified_downsample``: con los datos en memoria se conservan todas las
+  filas de la clase minoritaria y ``ratio`` filas de la mayoritaria por cada
+  una de ellas, elegidas al azar.
+- ``StratifiedReservoir``: al leer el CSV por bloques se mantiene una muestra
+  de tamaño fijo por clase con el algoritmo R (vectorizado por bloque), de modo
+  que la memoria no depende del tamaño del archivo.
+
+En ambos casos se conoce la probabilidad de inclusión de cada clase, con la que
+se corrige el sesgo de la muestra: pesos ``1 / probabilidad`` en el
+entrenamiento (``weights``) o un umbral de decisión desplazado (``threshold``),
+de modo que las probabilidades y la tasa de retrasos predicha sigan
+representando a la población completa.
+"""
+
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+CORRECTIONS = ("weights", "threshold")
+
+Inclusion = Dict[int, float]
+
+
+def stratified_downsample(
+    target: Sequence[int], ratio: float, seed: int = 42
+) -> Tuple[np.ndarray, Inclusion]:
+    """
+    Se eligen las filas a conservar: todas las de la clase minoritaria y, de la
+    mayoritaria, ``ratio`` filas por cada fila minoritaria (o todas si no alcanzan).
+
+    Args:
+        target: etiqueta binaria de cada fila.
+        ratio: filas mayoritarias por fila minoritaria; 1.0 equivale a clases balanceadas.
+        seed: semilla del muestreo.
+
+    Returns:
+        Tuple[np.ndarray, Dict[int, float]]: posiciones elegidas (ordenadas) y
+        probabilidad de inclusión de cada clase.
+    """
+    if ratio <= 0:
+        raise ValueError("El ratio de submuestreo debe ser positivo.")
+    target = np.asarray(target).astype(np.int64).ravel()
+    counts = np.bincount(target, minlength=2)
+    minority = int(np.argmin(counts))
+    majority = 1 - minority
+    keep = min(int(counts[majority]), int(round(ratio * counts[minority])))
+
+    rng = np.random.default_rng(seed)
+    majority_rows = np.flatnonzero(target == majority)
+    chosen = rng.choice(majority_rows, size=keep, replace=False)
+    index = np.sort(np.concatenate([np.flatnonzero(target == minority), chosen]))
+    inclusion = {minority: 1.0, majority: keep / counts[majority] if counts[majority] else 1.0}
+    return index, inclusion
+
+
+class StratifiedReservoir:
+    """
+    Muestra de capacidad fija, repartida entre clases según ``ratio``.
+
+    La clase ``minority`` (por defecto, los retrasos) recibe ``capacity / (1 + ratio)``
+    lugares y la otra el resto. Cada bloque se incorpora con el algoritmo R
+    vectorizado: la fila número ``t`` de su clase ocupa el lugar ``t`` mientras
+    haya espacio y luego reemplaza el lugar ``j ~ U[0, t)`` si ``j`` cae dentro
+    de la muestra; cuando varias filas del bloque eligen el mismo lugar prevalece
+    la última, igual que en la versión secuencial.
+
+    Uso:
+        reservoir = StratifiedReservoir(200_000, ratio=1.0)
+        for chunk in iter_flights("data.csv"):
+            reservoir.add(chunk, label(chunk))
+        sample, inclusion = reservoir.sample()
+    """
+
+    def __init__(self, capacity: int, ratio: float = 1.0, minority: int = 1, seed: int = 42) -> None:
+        if capacity < 2 or ratio <= 0:
+            raise ValueError("La muestra requiere capacidad >= 2 y ratio positivo.")
+        minority_capacity = max(1, int(round(capacity / (1.0 + ratio))))
+        self.capacity = {minority: minority_capacity, 1 - minority: max(1, capacity - minority_capacity)}
+        self.seen = {0: 0, 1: 0}
+        self._rows: Dict[int, Optional[pd.DataFrame]] = {0: None, 1: None}
+        self._rng = np.random.default_rng(seed)
+
+    def add(self, chunk: pd.DataFrame, target: Sequence[int]) -> None:
+        target = np.asarray(target).astype(np.int64).ravel()
+        for label in (0, 1):
+            rows = chunk.iloc[np.flatnonzero(target == label)]
+            if len(rows):
+                self._add_class(label, rows.reset_index(drop=True))
+
+    def _add_class(self, label: int, rows: pd.DataFrame) -> None:
+        capacity = self.capacity[label]
+        current = self._rows[label]
+        filled = 0 if current is None else len(current)
+        # Posición global (desde 0) de cada fila dentro de su clase.
+        position = self.seen[label] + np.arange(len(rows))
+        self.seen[label] += len(rows)
+
+        slot = np.where(
+            position < capacity,
+            position,
+            np.floor(self._rng.random(len(rows)) * (position + 1)).astype(np.int64),
+        )
+        accepted = np.flatnonzero(slot < capacity)
+        # Última escritura por lugar: se recorre al revés y se toma la primera aparición.
+        slots, first = np.unique(slot[accepted][::-1], return_index=True)
+        writers = accepted[::-1][first]
+
+        # Origen de cada lugar dentro de concat([muestra actual, bloque]).
+        size = min(capacity, self.seen[label])
+        source = np.arange(size)
+        source[slots] = filled + writers
+        combined = rows if current is None else pd.concat([current, rows], ignore_index=True)
+        self._rows[label] = combined.iloc[source].reset_index(drop=True)
+
+    def inclusion(self) -> Inclusion:
+        return {
+            label: (len(rows) / self.seen[label]) if rows is not None and self.seen[label] else 1.0
+            for label, rows in self._rows.items()
+        }
+
+    def sample(self) -> Tuple[pd.DataFrame, Inclusion]:
+        """Muestra acumulada (primero la clase 0) y probabilidad de inclusión de cada clase."""
+        parts = [rows for rows in self._rows.values() if rows is not None]
+        if not parts:
+            raise ValueError("La muestra está vacía.")
+        return pd.concat(parts, ignore_index=True), self.inclusion()
+
+
+def correction_weights(
+    target: Sequence[int], inclusion: Inclusion, normalize: bool = True
+) -> np.ndarray:
+    """
+    Peso ``1 / probabilidad de inclusión`` de cada fila; normalizados, suman la
+    cantidad de filas de la muestra para no alterar la escala de la regularización.
+    """
+    target = np.asarray(target).astype(np.int64).ravel()
+    weights = np.array([1.0 / inclusion.get(0, 1.0), 1.0 / inclusion.get(1, 1.0)])[target]
+    if normalize and len(weights):
+        weights *= len(weights) / weights.sum()
+    return weights
+
+
+def corrected_threshold(inclusion: Inclusion, threshold: float = 0.5) -> float:
+    """
+    Umbral sobre la probabilidad del modelo entrenado con la muestra equivalente a
+    ``threshold`` sobre la población: la muestra multiplica las odds por
+    ``inclusión(1) / inclusión(0)``.
+    """
+    factor = inclusion.get(1, 1.0) / inclusion.get(0, 1.0)
+    odds = threshold / (1.0 - threshold) * factor
+    return float(odds / (1.0 + odds))
+
+
+def combine_inclusion(*inclusions: Optional[Inclusion]) -> Optional[Inclusion]:
+    """Probabilidad de inclusión de muestreos sucesivos e independientes."""
+    present = [inclusion for inclusion in inclusions if inclusion]
+    if not present:
+        return None
+    return {label: float(np.prod([inclusion.get(label, 1.0) for inclusion in present])) for label in (0, 1)}
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Entrenamiento de un modelo por segmento (p. ej. por ``OPERA``) en paralelo.
+
+Igual que en la validación cruzada, la matriz codificada y la etiqueta se
+guardan una vez como ``.npy`` y cada proceso las abre con ``mmap``; por pickle
+solo viajan los índices del segmento y el estimador sin entrenar. El modelo
+global se entrena en el mismo pool y sirve de respaldo para los segmentos con
+menos de ``min_rows`` filas de entrenamiento (o con una sola clase) y para
+categorías nuevas. Todos los modelos conservan el layout one-hot global, de
+modo que la API codifica cada solicitud una sola vez (``api/segments.py``).
+"""
+
+import logging
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+import numpy as np
+import pandas as pd
+from sklearn.base import clone
+
+try:
+    from .api.bundle import write_bundle
+    from .api.segments import FALLBACK, write_manifest
+    from .estimators import fit_params, iterations, stopping_split
+    from .evaluation import evaluate_binary
+    from .validation import _limit_threads
+except ImportError:  # pragma: no cover - ejecución directa desde run_pipeline.py
+    from api.bundle import write_bundle
+    from api.segments import FALLBACK, write_manifest
+    from estimators import fit_params, iterations, stopping_split
+    from evaluation import evaluate_binary
+    from validation import _limit_threads
+
+SEGMENT_COLUMNS = ("OPERA", "TIPOVUELO", "MES")
+
+# metadata(X_train, y_train, report) -> metadatos de entrenamiento guardados en cada bundle.
+Metadata = Callable[[pd.DataFrame, pd.Series, Dict[str, Any]], Dict[str, Any]]
+
+
+def segment_values(features: pd.DataFrame, column: str) -> pd.Series:
+    """Valor del segmento de cada fila a partir de su bloque one-hot; None si no tiene ninguno."""
+    prefix = f"{column}_"
+    names = [name for name in features.columns if str(name).startswith(prefix)]
+    if not names:
+        raise ValueError(f"Las características no incluyen columnas {prefix}*.")
+    block = features[names].to_numpy(dtype=np.float32)
+    labels = np.asarray([str(name)[len(prefix):] for name in names] + [None], dtype=object)
+    codes = np.where(block.any(axis=1), block.argmax(axis=1), len(names))
+    return pd.Series(labels[codes], index=features.index, name=column)
+
+
+def _fit_segment(
+    key: Optional[str],
+    matrix_path: str,
+    target_path: str,
+    train_index: np.ndarray,
+    test_index: np.ndarray,
+    estimator: Any,
+) -> Dict[str, Any]:
+    features = np.load(matrix_path, mmap_mode="r")
+    target = np.load(target_path, mmap_mode="r")
+
+    started = time.perf_counter()
+    model = clone(estimator)
+    train_features, train_target, eval_set = stopping_split(model, features[train_index], target[train_index])
+    model.fit(train_features, train_target, **fit_params(model, eval_set))
+    fit_seconds = time.perf_counter() - started
+    scores = model.predict_proba(features[test_index])[:, 1] if len(test_index) else np.empty(0)
+    return {
+        "segment": key,
+        "pid": os.getpid(),
+        "model": model,
+        "scores": scores,
+        "iterations": iterations(model),
+        "fit_seconds": round(fit_seconds, 4),
+    }
+
+
+def train_segments(
+    features: pd.DataFrame,
+    target: pd.Series,
+    estimator: Any,
+    column: str,
+    train_index: np.ndarray,
+    test_index: np.ndarray,
+    directory: str,
+    min_rows: int = 1000,
+    n_jobs: Optional[int] = None,
+    metadata: Optional[Metadata] = None,
+    hashing: Optional[Dict[str, Any]] = None,
+    rates: Optional[Any] = None,
+) -> Dict[str, Any]:
+    """
+    Se entrena el modelo global y uno por segmento en paralelo y se guardan como
+    bundles en ``directory`` junto con ``segments.json``.
+
+    Args:
+        features (pd.DataFrame): matriz codificada.
+        target (pd.Series): variable objetivo.
+        estimator: estimador sin entrenar (se clona por segmento).
+        column (str): columna que define los segmentos (`OPERA`, `TIPOVUELO` o `MES`).
+        train_index, test_index: posiciones de entrenamiento y de holdout.
+        directory (str): directorio del artefacto segmentado (se reemplaza completo).
+        min_rows (int): filas de entrenamiento mínimas para entrenar un segmento propio.
+        n_jobs (int, opcional): procesos; por defecto, los núcleos disponibles.
+        metadata: función que resume cada entrenamiento para su bundle.
+        hashing (dict, opcional): columnas codificadas por hashing (``api/hashing.py``).
+        rates (DelayRateTable, opcional): tabla de tasas históricas (``api/rates.py``) que
+            comparten todos los bundles.
+
+    Returns:
+        Dict[str, Any]: métricas del holdout enrutado frente al modelo global,
+        por segmento y en total, con los tiempos de entrenamiento.
+    """
+    if column not in SEGMENT_COLUMNS:
+        raise ValueError(f"Columna de segmentación desconocida: {column}")
+    segments = segment_values(features, column).to_numpy()
+    labels = target.to_numpy()
+
+    tasks = [(None, train_index, test_index)]
+    skipped = {}
+    for value in sorted({value for value in segments[train_index] if value is not None}):
+        seg_train = train_index[segments[train_index] == value]
+        seg_test = test_index[segments[test_index] == value]
+        if len(seg_train) < min_rows or len(np.unique(labels[seg_train])) < 2:
+            skipped[value] = int(len(seg_train))
+            continue
+        tasks.append((value, seg_train, seg_test))
+
+    jobs = max(1, min(n_jobs or os.cpu_count() or 1, len(tasks)))
+    estimator = _limit_threads(estimator, jobs)
+    workdir = Path(tempfile.mkdtemp(prefix="delay-segments-"))
+    started = time.perf_counter()
+    try:
+        matrix_path = str(workdir / "features.npy")
+        target_path = str(workdir / "target.npy")
+        np.save(matrix_path, features.to_numpy(dtype=np.float32))
+        np.save(target_path, labels.astype(np.int8))
+        arguments = [(key, matrix_path, target_path, train, test, estimator) for key, train, test in tasks]
+        if jobs == 1:
+            results = [_fit_segment(*args) for args in arguments]
+        else:
+            with ProcessPoolExecutor(max_workers=jobs) as pool:
+                results = list(pool.map(_fit_segment, *zip(*arguments)))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    wall_seconds = time.perf_counter() - started
+
+    # Holdout enrutado: cada fila usa el puntaje de su segmento o, si no lo tiene, el global.
+    position = np.full(len(features), -1, dtype=np.int64)
+    position[test_index] = np.arange(len(test_index))
+    global_scores = results[0]["scores"]
+    routed_scores = global_scores.copy()
+    for result, (_, _, seg_test) in zip(results[1:], tasks[1:]):
+        routed_scores[position[seg_test]] = result["scores"]
+    y_test = labels[test_index]
+    routed = evaluate_binary(y_test, routed_scores, n_bootstrap=0)
+    baseline = evaluate_binary(y_test, global_scores, n_bootstrap=0)
+
+    # Los bundles se escriben en un directorio temporal que reemplaza al anterior al final.
+    target_dir = Path(directory)
+    staging = target_dir.with_name(f".{target_dir.name}.tmp")
+    shutil.rmtree(staging, ignore_errors=True)
+    staging.mkdir(parents=True)
+    feature_columns = features.columns.tolist()
+    per_segment, files = {}, {}
+    for index, (result, (key, seg_train, seg_test)) in enumerate(zip(results, tasks)):
+        filename = f"{FALLBACK}.bundle" if key is None else f"segment-{index:03d}.bundle"
+        offsets = position[seg_test]
+        report = evaluate_binary(y_test[offsets], result["scores"], n_bootstrap=0)
+        training = {}
+        if metadata is not None:
+            training = metadata(features.iloc[seg_train], target.iloc[seg_train], report)
+        training.update(segment={column: key}, iterations=result["iterations"])
+        write_bundle(
+            staging / filename, result["model"], feature_columns, training=training, hashing=hashing, rates=rates
+        )
+        name = FALLBACK if key is None else key
+        if key is not None:
+            files[key] = filename
+            global_report = evaluate_binary(y_test[offsets], global_scores[offsets], n_bootstrap=0)
+        else:
+            global_report = report
+        per_segment[name] = {
+            "train_rows": int(len(seg_train)),
+            "holdout_rows": int(len(seg_test)),
+            "positive_rate": report["positive_rate"],
+            "metrics": report["metrics"],
+            "global_metrics": global_report["metrics"],
+            "iterations": result["iterations"],
+            "fit_seconds": result["fit_seconds"],
+            "pid": result["pid"],
+        }
+    write_manifest(staging, column, files, f"{FALLBACK}.bundle", metadata={"min_rows": min_rows, "fallback_segments": skipped})
+    if target_dir.exists():
+        shutil.rmtree(target_dir)
+    os.replace(staging, target_dir)
+
+    fit_seconds = sum(result["fit_seconds"] for result in results)
+    report = {
+        "estimator": type(estimator).__name__,
+        "column": column,
+        "artifact": str(target_dir),
+        "jobs": jobs,
+        "min_rows": min_rows,
+        "segments": per_segment,
+        "fallback_segments": skipped,
+        "rows": int(len(test_index)),
+        "train_rows": int(len(train_index)),
+        "confusion_matrix": routed["confusion_matrix"],
+        "metrics": routed["metrics"],
+        "global_metrics": baseline["metrics"],
+        "timings": {
+            "wall_seconds": round(wall_seconds, 4),
+            "fit_seconds": round(fit_seconds, 4),
+            "parallel_speedup": round(fit_seconds / wall_seconds, 2) if wall_seconds else None,
+        },
+    }
+    logging.info(
+        "Modelos por %s: %d segmentos propios y %d con respaldo global, entrenados en %.2f s con %d procesos; "
+        "f1 enrutado=%.3f frente a global=%.3f.",
+        column,
+        len(tasks) - 1,
+        len(skipped),
+        wall_seconds,
+        jobs,
+        routed["metrics"]["f1"],
+        baseline["metrics"]["f1"],
+    )
+    return report
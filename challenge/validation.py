@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Validación cruzada k-fold en paralelo para DelayModel.
+
+La matriz codificada y la etiqueta se guardan una sola vez como ``.npy`` en un
+directorio temporal; cada proceso las abre con ``np.load(mmap_mode="r")`` y
+solo recibe por pickle los índices de su fold y el estimador sin entrenar, de
+modo que las páginas de la matriz se comparten entre todos los workers.
+"""
+
+import logging
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from sklearn.base import clone
+from sklearn.model_selection import StratifiedKFold
+
+try:
+    from .estimators import fit_params, iterations, stopping_split
+    from .evaluation import METRICS, evaluate_binary
+except ImportError:  # pragma: no cover - ejecución directa desde run_pipeline.py
+    from estimators import fit_params, iterations, stopping_split
+    from evaluation import METRICS, evaluate_binary
+
+STRATEGIES = ("stratified", "time")
+
+Fold = Tuple[np.ndarray, np.ndarray]
+
+
+def stratified_folds(target: Sequence[int], n_splits: int = 5, seed: int = 42) -> List[Fold]:
+    """Folds aleatorios que preservan la proporción de retrasos en cada partición."""
+    target = np.asarray(target)
+    splitter = StratifiedKFold(n_splits=n_splits, shuffle=True, random_state=seed)
+    return [
+        (train.astype(np.int64), test.astype(np.int64))
+        for train, test in splitter.split(np.zeros(len(target)), target)
+    ]
+
+
+def time_folds(timestamps: Sequence, n_splits: int = 5) -> List[Fold]:
+    """
+    Folds con ventana creciente: los vuelos se ordenan por fecha programada, se
+    dividen en ``n_splits + 1`` bloques y el fold ``i`` entrena con los bloques
+    anteriores al bloque ``i + 1``, que se usa como validación.
+    """
+    order = np.argsort(pd.to_datetime(pd.Series(timestamps)).to_numpy(), kind="stable")
+    blocks = np.array_split(order, n_splits + 1)
+    return [
+        (np.sort(np.concatenate(blocks[: index + 1])), np.sort(blocks[index + 1]))
+        for index in range(n_splits)
+    ]
+
+
+def _fit_fold(
+    fold: int,
+    matrix_path: str,
+    target_path: str,
+    train_index: np.ndarray,
+    test_index: np.ndarray,
+    estimator: Any,
+) -> Dict[str, Any]:
+    features = np.load(matrix_path, mmap_mode="r")
+    target = np.load(target_path, mmap_mode="r")
+
+    started = time.perf_counter()
+    model = clone(estimator)
+    # Con parada temprana, el fold se detiene con una parte de su entrenamiento, no con el bloque que se evalúa.
+    train_features, train_target, eval_set = stopping_split(model, features[train_index], target[train_index])
+    model.fit(train_features, train_target, **fit_params(model, eval_set))
+    fit_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    scores = model.predict_proba(features[test_index])[:, 1]
+    report = evaluate_binary(target[test_index], scores, n_bootstrap=0)
+    return {
+        "fold": fold,
+        "pid": os.getpid(),
+        "train_rows": int(len(train_target)),
+        "stopping_rows": int(len(eval_set[1])) if eval_set is not None else 0,
+        "test_rows": int(len(test_index)),
+        "positive_rate": report["positive_rate"],
+        "confusion_matrix": report["confusion_matrix"],
+        "metrics": report["metrics"],
+        "fit_seconds": round(fit_seconds, 4),
+        "iterations": iterations(model),
+        "score_seconds": round(time.perf_counter() - started, 4),
+    }
+
+
+def _limit_threads(estimator: Any, jobs: int) -> Any:
+    # Con varios folds simultáneos, cada estimador usa su parte de los núcleos.
+    if "n_jobs" in estimator.get_params():
+        estimator = clone(estimator).set_params(n_jobs=max(1, (os.cpu_count() or 1) // jobs))
+    return estimator
+
+
+def cross_validate(
+    features: pd.DataFrame,
+    target: pd.Series,
+    estimator: Any,
+    folds: List[Fold],
+    n_jobs: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Se entrena y evalúa un clon del estimador por fold, en paralelo.
+
+    Args:
+        features (pd.DataFrame): matriz codificada.
+        target (pd.Series): variable objetivo.
+        estimator: estimador sin entrenar (se clona en cada fold).
+        folds: pares (índices de entrenamiento, índices de validación).
+        n_jobs (int, opcional): procesos; por defecto, los núcleos disponibles.
+
+    Returns:
+        Dict[str, Any]: métricas y tiempos por fold junto con su agregado.
+    """
+    jobs = max(1, min(n_jobs or os.cpu_count() or 1, len(folds)))
+    estimator = _limit_threads(estimator, jobs)
+    workdir = Path(tempfile.mkdtemp(prefix="delay-cv-"))
+    started = time.perf_counter()
+    try:
+        matrix_path = str(workdir / "features.npy")
+        target_path = str(workdir / "target.npy")
+        np.save(matrix_path, features.to_numpy(dtype=np.float32))
+        np.save(target_path, target.to_numpy(dtype=np.int8))
+
+        arguments = [
+            (index, matrix_path, target_path, train, test, estimator)
+            for index, (train, test) in enumerate(folds)
+        ]
+        if jobs == 1:
+            results = [_fit_fold(*args) for args in arguments]
+        else:
+            with ProcessPoolExecutor(max_workers=jobs) as pool:
+                results = list(pool.map(_fit_fold, *zip(*arguments)))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    wall_seconds = time.perf_counter() - started
+
+    summary = {}
+    for name in METRICS:
+        values = np.array([r["metrics"][name] for r in results if r["metrics"][name] is not None])
+        summary[name] = {
+            "mean": float(values.mean()) if len(values) else None,
+            "std": float(values.std(ddof=1)) if len(values) > 1 else None,
+        }
+    fold_seconds = sum(r["fit_seconds"] + r["score_seconds"] for r in results)
+    report = {
+        "estimator": type(estimator).__name__,
+        "folds": len(folds),
+        "jobs": jobs,
+        "rows": int(len(target)),
+        "features": int(features.shape[1]),
+        "metrics": summary,
+        "per_fold": results,
+        "timings": {
+            "wall_seconds": round(wall_seconds, 4),
+            "fold_seconds": round(fold_seconds, 4),
+            "parallel_speedup": round(fold_seconds / wall_seconds, 2) if wall_seconds else None,
+        },
+    }
+    logging.info(
+        "Validación cruzada (%d folds, %d procesos) en %.2f s: f1=%.3f roc_auc=%s.",
+        len(folds),
+        jobs,
+        wall_seconds,
+        summary["f1"]["mean"],
+        "n/d" if summary["roc_auc"]["mean"] is None else f"{summary['roc_auc']['mean']:.3f}",
+    )
+    return report
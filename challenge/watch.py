@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Puntuación incremental de los CSV que llegan a un directorio (modo ``watch``).
+
+El proceso carga el modelo una sola vez y revisa ``watch_dir`` cada
+``poll_seconds``. Solo se puntúan los archivos nuevos o modificados (según
+tamaño y fecha de modificación) que no cambiaron durante ``settle_seconds``,
+para no leer copias a medias. Cada archivo se procesa por bloques: cada bloque
+se publica como un archivo de partes de forma atómica y luego se registra en el
+checkpoint (``.watch-checkpoint.json`` en el directorio de salida). Si el proceso
+se interrumpe, al reiniciar se omiten las filas ya puntuadas y se continúa desde
+el último bloque completo. Con todos los bloques listos, las partes se unen en
+``<nombre>.predictions.<formato>``, que también se reemplaza de forma atómica.
+
+El checkpoint incluye además las métricas acumuladas (filas, archivos, filas por
+segundo y archivos pendientes), que se informan en el log en cada ciclo.
+"""
+
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+try:
+    from .output import PredictionWriter, read_predictions
+except ImportError:  # pragma: no cover - ejecución directa desde run_pipeline.py
+    from output import PredictionWriter, read_predictions
+
+CHECKPOINT_FILENAME = ".watch-checkpoint.json"
+
+PathLike = Union[str, Path]
+
+
+def _now() -> str:
+    return datetime.utcnow().isoformat() + "Z"
+
+
+class Checkpoint:
+    """Progreso por archivo de entrada; se guarda de forma atómica después de cada bloque."""
+
+    def __init__(self, path: PathLike) -> None:
+        self.path = Path(path)
+        self.files: Dict[str, Dict[str, Any]] = {}
+        self.metrics: Dict[str, Any] = {}
+        if self.path.exists():
+            state = json.loads(self.path.read_text(encoding="utf-8"))
+            self.files = state.get("files", {})
+            self.metrics = state.get("metrics", {})
+
+    def save(self) -> None:
+        temp = self.path.with_name(f"{self.path.name}.tmp")
+        with open(temp, "w", encoding="utf-8") as handle:
+            json.dump({"files": self.files, "metrics": self.metrics}, handle, indent=2, ensure_ascii=False)
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(temp, self.path)
+
+
+class ScoringDaemon:
+    """
+    Mantiene un ``DelayModel`` cargado y puntúa los archivos que aparecen en
+    ``watch_dir``, con reanudación por bloque (ver el docstring del módulo).
+    """
+
+    def __init__(
+        self,
+        model,
+        watch_dir: PathLike,
+        output_dir: PathLike,
+        pattern: str = "*.csv",
+        chunksize: int = 100_000,
+        fmt: Optional[str] = None,
+        columns: Optional[Sequence[str]] = None,
+        compression: Optional[str] = "default",
+        poll_seconds: float = 10.0,
+        settle_seconds: float = 2.0,
+        checkpoint_path: Optional[PathLike] = None,
+    ) -> None:
+        if chunksize < 1:
+            raise ValueError("chunksize debe ser >= 1")
+        self.model = model
+        self.watch_dir = Path(watch_dir)
+        self.output_dir = Path(output_dir)
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.pattern = pattern
+        self.chunksize = chunksize
+        self.fmt = (fmt or "csv").lower()
+        self.suffix = f".{self.fmt}"
+        self.columns = list(columns) if columns else None
+        self.compression = compression
+        self.poll_seconds = poll_seconds
+        self.settle_seconds = settle_seconds
+        self.checkpoint = Checkpoint(checkpoint_path or self.output_dir / CHECKPOINT_FILENAME)
+        # Igual que en el modo predict, solo se leen las columnas que la salida necesita.
+        self._extra_columns = self.columns and [col for col in self.columns if col != "predicted_delay"]
+        self._stop = threading.Event()
+        self._started = time.perf_counter()
+        self._totals = {"files": 0, "chunks": 0, "rows": 0, "busy_seconds": 0.0, "errors": 0}
+        self._backlog = {"files": 0, "bytes": 0}
+
+    # ==============================================================
+    # CICLO PRINCIPAL
+    # ==============================================================
+    def run(self, once: bool = False) -> Dict[str, Any]:
+        """
+        Revisa el directorio hasta que se llame a :meth:`stop`; con ``once`` procesa
+        lo pendiente una sola vez. Devuelve las métricas acumuladas.
+        """
+        logging.info(
+            "Se vigila %s (%s) cada %.1f s; salidas en %s.",
+            self.watch_dir,
+            self.pattern,
+            self.poll_seconds,
+            self.output_dir,
+        )
+        while not self._stop.is_set():
+            pending = self.pending()
+            self._update_backlog(pending)
+            for path in pending:
+                if self._stop.is_set():
+                    break
+                try:
+                    self.score_file(path)
+                except Exception as exc:
+                    # Un archivo defectuoso no detiene el proceso; se reintenta en el próximo ciclo.
+                    self._totals["errors"] += 1
+                    entry = self.checkpoint.files.setdefault(path.name, {})
+                    entry.update(error=repr(exc), failed_at=_now())
+                    self._save()
+                    logging.error("No se pudo puntuar %s: %s", path, exc, exc_info=True)
+                self._update_backlog(self.pending())
+            if once:
+                break
+            self._stop.wait(self.poll_seconds)
+        return self.snapshot()
+
+    def stop(self) -> None:
+        """Detiene el ciclo al terminar el bloque en curso; el checkpoint queda al día."""
+        self._stop.set()
+
+    def pending(self) -> List[Path]:
+        """Archivos nuevos o modificados, estables durante ``settle_seconds``."""
+        now = time.time()
+        pending = []
+        for path in sorted(self.watch_dir.glob(self.pattern)):
+            if path.name.startswith(".") or not path.is_file():
+                continue
+            stat = path.stat()
+            if now - stat.st_mtime < self.settle_seconds:
+                continue
+            entry = self.checkpoint.files.get(path.name, {})
+            if entry.get("status") == "done" and self._same_file(entry, stat):
+                continue
+            pending.append(path)
+        return pending
+
+    # ==============================================================
+    # PUNTUACIÓN POR ARCHIVO
+    # ==============================================================
+    def score_file(self, path: PathLike) -> bool:
+        """
+        Puntúa ``path`` desde su último bloque completo; devuelve False si se
+        detuvo antes de terminar o si el archivo cambió durante la lectura.
+        """
+        path = Path(path)
+        stat = path.stat()
+        parts_dir = self.output_dir / f".{path.stem}.parts"
+        entry = self.checkpoint.files.get(path.name, {})
+        if entry.get("status") != "partial" or not self._same_file(entry, stat):
+            # Archivo nuevo o modificado: se puntúa desde el comienzo.
+            shutil.rmtree(parts_dir, ignore_errors=True)
+            entry = {
+                "size": stat.st_size,
+                "mtime_ns": stat.st_mtime_ns,
+                "status": "partial",
+                "chunks": 0,
+                "rows": 0,
+                "started_at": _now(),
+            }
+            self.checkpoint.files[path.name] = entry
+            self._save()
+        elif entry["chunks"]:
+            logging.info(
+                "Se reanuda %s desde el bloque %d (%d filas ya puntuadas).", path.name, entry["chunks"], entry["rows"]
+            )
+        parts_dir.mkdir(parents=True, exist_ok=True)
+
+        started = time.perf_counter()
+        rows_before = entry["rows"]
+        for chunk in self.model.iter_data(
+            str(path), extra_columns=self._extra_columns, chunksize=self.chunksize, skip_rows=entry["rows"]
+        ):
+            if self._stop.is_set():
+                logging.info("Se detiene %s tras %d bloques; se reanudará desde allí.", path.name, entry["chunks"])
+                return False
+            chunk_started = time.perf_counter()
+            chunk["predicted_delay"] = self.model.predict(self.model.preprocess(chunk))
+            part = parts_dir / f"part-{entry['chunks']:05d}{self.suffix}"
+            with PredictionWriter(part, fmt=self.fmt, columns=self.columns, compression=self.compression) as writer:
+                writer.write(chunk)
+            entry["chunks"] += 1
+            entry["rows"] += len(chunk)
+            seconds = time.perf_counter() - chunk_started
+            self._totals["chunks"] += 1
+            self._totals["rows"] += len(chunk)
+            self._totals["busy_seconds"] += seconds
+            # El bloque queda confirmado recién cuando el checkpoint lo registra.
+            self._save()
+            logging.info(
+                "%s: bloque %d con %d filas en %.3f s (%.0f filas/s).",
+                path.name,
+                entry["chunks"],
+                len(chunk),
+                seconds,
+                len(chunk) / seconds if seconds else 0.0,
+            )
+
+        if not self._same_file(entry, path.stat()):
+            logging.warning("%s cambió durante la lectura; se puntuará de nuevo.", path.name)
+            shutil.rmtree(parts_dir, ignore_errors=True)
+            del self.checkpoint.files[path.name]
+            self._save()
+            return False
+
+        output = self.output_dir / f"{path.stem}.predictions{self.suffix}"
+        self._merge([parts_dir / f"part-{index:05d}{self.suffix}" for index in range(entry["chunks"])], output)
+        seconds = time.perf_counter() - started
+        entry.update(status="done", output=str(output), finished_at=_now())
+        entry.pop("error", None)
+        self._totals["files"] += 1
+        self._save()
+        # Las partes se borran después de registrar la salida: un corte antes de este
+        # punto vuelve a unirlas sin perder filas.
+        shutil.rmtree(parts_dir, ignore_errors=True)
+        scored = entry["rows"] - rows_before
+        logging.info(
+            "%s: %d filas puntuadas en %.3f s (%.0f filas/s) -> %s.",
+            path.name,
+            scored,
+            seconds,
+            scored / seconds if seconds else 0.0,
+            output,
+        )
+        return True
+
+    def _merge(self, parts: List[Path], output: Path) -> None:
+        """Une las partes en ``output`` y lo publica de forma atómica."""
+        if self.fmt == "csv" and parts:
+            # Los CSV se concatenan byte a byte omitiendo los encabezados repetidos.
+            temp = output.with_name(f".{output.name}.tmp-{uuid.uuid4().hex[:8]}")
+            try:
+                with open(temp, "wb") as target:
+                    for index, part in enumerate(parts):
+                        with open(part, "rb") as source:
+                            if index:
+                                source.readline()
+                            shutil.copyfileobj(source, target)
+                    target.flush()
+                    os.fsync(target.fileno())
+                os.replace(temp, output)
+            except BaseException:
+                if temp.exists():
+                    temp.unlink()
+                raise
+            return
+        with PredictionWriter(output, fmt=self.fmt, columns=self.columns, compression=self.compression) as writer:
+            for part in parts:
+                writer.write(read_predictions(part))
+
+    # ==============================================================
+    # MÉTRICAS
+    # ==============================================================
+    def snapshot(self) -> Dict[str, Any]:
+        """Filas, archivos y rendimiento acumulados, más el backlog de la última revisión."""
+        elapsed = time.perf_counter() - self._started
+        busy = self._totals["busy_seconds"]
+        return {
+            **self._totals,
+            "busy_seconds": round(busy, 4),
+            "uptime_seconds": round(elapsed, 4),
+            "rows_per_second": round(self._totals["rows"] / busy, 1) if busy else None,
+            "backlog_files": self._backlog["files"],
+            "backlog_bytes": self._backlog["bytes"],
+        }
+
+    def _update_backlog(self, pending: List[Path]) -> None:
+        backlog = {"files": len(pending), "bytes": sum(path.stat().st_size for path in pending if path.exists())}
+        if backlog == self._backlog and not pending:
+            return
+        logging.info(
+            "Pendientes: %d archivos (%.1f MiB); acumulado: %d filas en %d archivos.",
+            backlog["files"],
+            backlog["bytes"] / 2**20,
+            self._totals["rows"],
+            self._totals["files"],
+        )
+        self._backlog = backlog
+        self._save()
+
+    def _save(self) -> None:
+        self.checkpoint.metrics = {**self.snapshot(), "updated_at": _now()}
+        self.checkpoint.save()
+
+    @staticmethod
+    def _same_file(entry: Dict[str, Any], stat: os.stat_result) -> bool:
+        return entry.get("size") == stat.st_size and entry.get("mtime_ns") == stat.st_mtime_ns
@@ -1,4 +1,6 @@
 import importlib
+import json
+import time
 
 import pytest
 from fastapi.testclient import TestClient
@@ -66,3 +68,256 @@ def test_predict_batch_request(client):
 
     assert response.status_code == 200
     assert response.json() == {"predict": [0, 0]}
+
+
+def test_metrics_endpoint_reports_inference_queue(client):
+    client.post("/predict", json={"OPERA": "Grupo LATAM", "MES": 5, "TIPOVUELO": "N"})
+
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    inference = response.json()["inference"]
+    assert inference["completed"] >= 1
+    assert inference["queue_depth"] == 0
+
+
+def test_predict_sheds_load_when_executor_is_saturated(client, api_module, monkeypatch):
+    async def saturated(*_args, **_kwargs):
+        raise api_module.ExecutorSaturated("Inference queue is full")
+
+    monkeypatch.setattr(api_module.inference_executor, "run", saturated)
+
+    response = client.post("/predict", json={"OPERA": "Grupo LATAM", "MES": 5, "TIPOVUELO": "N"})
+
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "1"
+
+
+def test_predict_sheds_load_when_every_inference_process_is_busy(client, api_module, monkeypatch):
+    def busy(*_args, **_kwargs):
+        # What ProcessInferencePool.predict raises when no worker frees up in time.
+        raise api_module.ExecutorSaturated("All 1 inference workers are busy")
+
+    monkeypatch.setattr(api_module, "_predict_with", busy)
+
+    response = client.post("/predict", json={"OPERA": "Grupo LATAM", "MES": 5, "TIPOVUELO": "N"})
+
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "1"
+
+
+def test_worker_artifact_pickled_from_memory_is_removed_on_shutdown(api_module, monkeypatch, tmp_path):
+    monkeypatch.setattr(api_module, "xgb_model", {"model": "in memory"})
+    monkeypatch.setattr(api_module, "MODEL_LOCAL_PATH", tmp_path / "missing.pkl")
+
+    artifact = api_module._worker_artifact()
+    assert artifact.exists()
+
+    api_module._shutdown_executor()
+    assert not artifact.exists()
+
+
+class _AlwaysDelayedModel:
+    def predict(self, flights):
+        return [1 for _ in flights]
+
+
+def _wait_for_comparisons(api_module, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while api_module.model_registry.snapshot()["pending_comparisons"] and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def test_canary_is_selected_by_header_and_compared_with_primary(client, api_module):
+    api_module.model_registry.register(
+        api_module.ModelEntry("candidate", _AlwaysDelayedModel(), [], role=api_module.CANARY, traffic_percent=0)
+    )
+    payload = {"OPERA": "Grupo LATAM", "MES": 5, "TIPOVUELO": "N"}
+
+    routed = client.post("/predict", json=payload, headers={"X-Model-Variant": "candidate"})
+    default = client.post("/predict", json=payload)
+    _wait_for_comparisons(api_module)
+
+    assert routed.json()["delay_prediction"] == 1
+    assert routed.headers["X-Model-Variant"] == "candidate"
+    assert default.headers["X-Model-Variant"] == "primary"
+    candidate = client.get("/models").json()["models"]["candidate"]
+    assert candidate["requests"] == 1
+    assert candidate["agreement_rate"] == 0.0
+
+
+def test_canary_comparison_runs_in_process_and_never_counts_primary_errors(client, api_module, monkeypatch):
+    class _SaturatedPool:
+        def predict(self, features):
+            raise api_module.ExecutorSaturated("All 1 inference workers are busy")
+
+        def close(self):
+            pass
+
+    monkeypatch.setattr(api_module, "process_pool", _SaturatedPool())
+    api_module.model_registry.register(
+        api_module.ModelEntry("candidate", _AlwaysDelayedModel(), [], role=api_module.CANARY, traffic_percent=0)
+    )
+
+    response = client.post(
+        "/predict", json={"OPERA": "Grupo LATAM", "MES": 5, "TIPOVUELO": "N"}, headers={"X-Model-Variant": "candidate"}
+    )
+    _wait_for_comparisons(api_module)
+
+    assert response.status_code == 200
+    models = client.get("/models").json()["models"]
+    assert models["primary"]["errors"] == 0
+    assert models["candidate"]["compared_rows"] == 1
+
+
+def test_shadow_model_does_not_change_primary_response(client, api_module):
+    api_module.model_registry.register(
+        api_module.ModelEntry("shadow", _AlwaysDelayedModel(), [], role=api_module.SHADOW)
+    )
+    payload = {
+        "flights": [
+            {"OPERA": "Grupo LATAM", "MES": 1, "TIPOVUELO": "N"},
+            {"OPERA": "Sky Airline", "MES": 12, "TIPOVUELO": "I"},
+        ]
+    }
+
+    response = client.post("/predict", json=payload)
+    _wait_for_comparisons(api_module)
+
+    assert response.json() == {"predict": [0, 0]}
+    shadow = client.get("/models").json()["models"]["shadow"]
+    assert shadow["compared_rows"] == 2
+    assert shadow["agreement_rate"] == 0.0
+    assert shadow["positive_rate"] == 1.0
+
+
+def test_profiled_request_can_be_listed_and_downloaded(client, api_module, monkeypatch):
+    monkeypatch.setattr(api_module, "request_profiler", api_module.RequestProfiler(token="secret"))
+    headers = {"X-Profile-Token": "secret"}
+
+    response = client.post("/predict", json={"OPERA": "Grupo LATAM", "MES": 5, "TIPOVUELO": "N"}, headers=headers)
+    profile_id = response.headers["X-Profile-Id"]
+    listing = client.get("/admin/profiles", headers=headers)
+    report = client.get(f"/admin/profiles/{profile_id}", headers=headers)
+    forbidden = client.get("/admin/profiles", headers={"X-Profile-Token": "wrong"})
+
+    assert [item["id"] for item in listing.json()["profiles"]] == [int(profile_id)]
+    assert "_score_flights" in report.text
+    assert forbidden.status_code == 403
+
+
+def test_profiling_admin_endpoints_are_hidden_when_disabled(client):
+    assert client.get("/admin/profiles").status_code == 404
+
+
+def test_stream_endpoint_scores_ndjson_in_chunks(client, api_module, monkeypatch):
+    monkeypatch.setattr(api_module, "STREAM_CHUNK_SIZE", 2)
+    lines = [
+        '{"OPERA": "Grupo LATAM", "MES": 1, "TIPOVUELO": "N"}',
+        '{"OPERA": "Unknown Airline", "MES": 1, "TIPOVUELO": "N"}',
+        "",
+        '{"OPERA": "Sky Airline", "MES": 12, "TIPOVUELO": "I"}',
+        "not json",
+        '{"OPERA": "Copa Air", "MES": 3, "TIPOVUELO": "I"}',
+    ]
+    body = "\n".join(lines).encode("utf-8")
+
+    def chunks():
+        for start in range(0, len(body), 7):
+            yield body[start:start + 7]
+
+    response = client.post("/predict/stream", data=chunks(), headers={"Content-Type": "application/x-ndjson"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    assert [json.loads(line) for line in response.text.splitlines()] == [
+        {"line": 1, "delay_prediction": 0},
+        {"line": 2, "error": "Invalid airline (OPERA)"},
+        {"line": 4, "delay_prediction": 0},
+        {"line": 5, "error": "Invalid flight record"},
+        {"line": 6, "delay_prediction": 0},
+    ]
+
+
+def test_stream_endpoint_ends_with_an_error_line_when_scoring_fails(client, api_module, monkeypatch):
+    monkeypatch.setattr(api_module, "STREAM_CHUNK_SIZE", 1)
+    calls = []
+
+    def failing(flights, entry=None, observe=True):
+        calls.append(len(flights))
+        if len(calls) > 1:
+            raise api_module.HTTPException(status_code=503, detail="Inference worker unavailable")
+        return [0] * len(flights)
+
+    monkeypatch.setattr(api_module, "_score_flights", failing)
+    body = '{"OPERA": "Grupo LATAM", "MES": 1, "TIPOVUELO": "N"}\n' * 3
+
+    response = client.post("/predict/stream", data=body.encode("utf-8"))
+
+    assert [json.loads(line) for line in response.text.splitlines()] == [
+        {"line": 1, "delay_prediction": 0},
+        {"error": "Inference worker unavailable"},
+    ]
+
+
+def test_stream_endpoint_rejects_oversized_lines_without_buffering_them(client, api_module, monkeypatch):
+    monkeypatch.setattr(api_module, "STREAM_MAX_LINE_BYTES", 64)
+    flight = '{"OPERA": "Grupo LATAM", "MES": 1, "TIPOVUELO": "N"}'
+    body = (flight + "\n" + "x" * 500 + "\n" + flight).encode("utf-8")
+
+    def chunks():
+        for start in range(0, len(body), 16):
+            yield body[start:start + 16]
+
+    response = client.post("/predict/stream", data=chunks())
+
+    assert [json.loads(line) for line in response.text.splitlines()] == [
+        {"line": 1, "delay_prediction": 0},
+        {"line": 2, "error": "Line exceeds 64 bytes"},
+        {"line": 3, "delay_prediction": 0},
+    ]
+
+
+def test_monitor_counts_served_flights(client):
+    client.post("/predict", json={"OPERA": "Grupo LATAM", "MES": 3, "TIPOVUELO": "N"})
+    client.post(
+        "/predict",
+        json={"flights": [{"OPERA": "Sky Airline", "MES": 3, "TIPOVUELO": "I"}] * 4},
+    )
+
+    response = client.get("/monitor")
+
+    assert response.status_code == 200
+    window = response.json()["windows"]["sliding"]
+    assert window["rows"] == 5
+    assert window["predicted_delay_rate"] == 0.0
+    assert window["distribution"]["OPERA"]["Sky Airline"] == 4
+    assert window["distribution"]["MES"]["3"] == 5
+    assert response.json()["reference"]["available"] is False
+
+
+def test_monitor_failures_do_not_fail_predictions(client, api_module, monkeypatch):
+    def broken(*_args, **_kwargs):
+        raise ValueError("broken monitor")
+
+    monkeypatch.setattr(api_module.prediction_monitor, "observe", broken)
+
+    response = client.post("/predict", json={"OPERA": "Grupo LATAM", "MES": 3, "TIPOVUELO": "N"})
+
+    assert response.status_code == 200
+    assert response.json()["delay_prediction"] == 0
+
+
+def test_ledger_records_single_and_batch_predictions(api_module, monkeypatch, tmp_path):
+    monkeypatch.setenv("CHALLENGE_API_LEDGER_DIR", str(tmp_path))
+    api = importlib.reload(api_module)
+    from challenge.api.ledger import read_ledger
+
+    with TestClient(api.app) as test_client:
+        test_client.post("/predict", json={"OPERA": "Grupo LATAM", "MES": 3, "TIPOVUELO": "N"})
+        test_client.post("/predict", json={"flights": [{"OPERA": "Copa Air", "MES": 5, "TIPOVUELO": "I"}] * 3})
+        assert test_client.get("/metrics").json()["ledger"]["rows_written"] == 4
+
+    frame = read_ledger(tmp_path)
+    assert frame["airline"].tolist() == ["Grupo LATAM", "Copa Air", "Copa Air", "Copa Air"]
+    assert set(frame["model"]) == {"primary"}
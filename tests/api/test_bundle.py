@@ -0,0 +1,121 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.linear_model import LogisticRegression
+
+from challenge.api.bundle import BundleError, is_bundle, load_bundle, load_model, write_bundle
+
+_OPERAS = ["Grupo LATAM", "Sky Airline", "Copa Air"]
+
+
+@pytest.fixture()
+def training_frame():
+    rng = np.random.default_rng(3)
+    raw = pd.DataFrame({
+        "OPERA": rng.choice(_OPERAS, 600),
+        "TIPOVUELO": rng.choice(["I", "N"], 600),
+        "MES": rng.integers(1, 13, 600),
+    })
+    features = pd.concat(
+        [
+            pd.get_dummies(raw["OPERA"], prefix="OPERA"),
+            pd.get_dummies(raw["TIPOVUELO"], prefix="TIPOVUELO"),
+            pd.get_dummies(raw["MES"], prefix="MES"),
+        ],
+        axis=1,
+    ).astype(np.float32)
+    target = ((raw["MES"] == 12) | ((raw["OPERA"] == "Sky Airline") & (raw["TIPOVUELO"] == "I"))).astype(int)
+    target[rng.random(600) < 0.1] ^= 1
+    return raw, features, target
+
+
+def test_linear_bundle_matches_estimator(tmp_path, training_frame):
+    raw, features, target = training_frame
+    model = LogisticRegression(max_iter=1000).fit(features, target)
+    path = tmp_path / "model.bundle"
+
+    write_bundle(path, model, list(features.columns))
+    bundle = load_model(path)
+
+    assert is_bundle(path)
+    assert bundle.kind == "linear"
+    np.testing.assert_allclose(bundle.predict_proba(features)[:, 1], model.predict_proba(features)[:, 1], atol=1e-9)
+    assert bundle.predict(features).tolist() == model.predict(features).tolist()
+
+
+def test_tree_bundle_matches_estimator(tmp_path, training_frame):
+    xgb = pytest.importorskip("xgboost")
+    raw, features, target = training_frame
+    model = xgb.XGBClassifier(n_estimators=30, max_depth=3, learning_rate=0.3, eval_metric="logloss").fit(features, target)
+    path = tmp_path / "model.bundle"
+
+    write_bundle(path, model, list(features.columns))
+    bundle = load_bundle(path)
+
+    assert bundle.kind == "tree_ensemble"
+    np.testing.assert_allclose(bundle.predict_proba(features)[:, 1], model.predict_proba(features)[:, 1], atol=1e-5)
+    assert bundle.predict(features).tolist() == model.predict(features).tolist()
+
+
+def test_encode_matches_one_hot_and_ignores_unknown_categories(tmp_path, training_frame):
+    raw, features, target = training_frame
+    path = tmp_path / "model.bundle"
+    write_bundle(path, LogisticRegression().fit(features, target), list(features.columns))
+    bundle = load_bundle(path)
+
+    encoded = bundle.encode({column: raw[column].tolist() for column in ("OPERA", "TIPOVUELO", "MES")})
+    unknown = bundle.encode({"OPERA": ["Unknown"], "TIPOVUELO": ["N"], "MES": [1]})
+
+    np.testing.assert_array_equal(encoded, features.to_numpy())
+    assert unknown.sum() == 2.0
+
+
+def test_corrupted_payload_is_rejected(tmp_path, training_frame):
+    raw, features, target = training_frame
+    path = tmp_path / "model.bundle"
+    write_bundle(path, LogisticRegression().fit(features, target), list(features.columns))
+    data = bytearray(path.read_bytes())
+    data[-1] ^= 0xFF
+    path.write_bytes(bytes(data))
+
+    with pytest.raises(BundleError, match="Checksum"):
+        load_bundle(path)
+
+
+def test_bundle_rebuilds_native_linear_estimator(tmp_path, training_frame):
+    raw, features, target = training_frame
+    model = LogisticRegression(C=0.5, max_iter=1000).fit(features, target)
+    path = tmp_path / "model.bundle"
+    write_bundle(path, model, list(features.columns), threshold=0.4, training={"train_rows": len(features)})
+
+    bundle = load_bundle(path)
+    restored = bundle.estimator()
+
+    assert bundle.format_version == 2
+    assert bundle.threshold == 0.4
+    assert bundle.training == {"train_rows": len(features)}
+    assert bundle.estimator_config["format"] == "arrays"
+    assert bundle.estimator_config["params"]["C"] == 0.5
+    assert isinstance(restored, LogisticRegression)
+    np.testing.assert_allclose(restored.predict_proba(features), model.predict_proba(features))
+
+
+def test_bundle_rebuilds_native_xgboost_estimator(tmp_path, training_frame):
+    xgb = pytest.importorskip("xgboost")
+    raw, features, target = training_frame
+    model = xgb.XGBClassifier(n_estimators=20, max_depth=3, eval_metric="logloss").fit(features, target)
+    path = tmp_path / "model.bundle"
+    write_bundle(path, model, list(features.columns))
+
+    bundle = load_bundle(path)
+    restored = bundle.estimator()
+
+    assert bundle.estimator_config["format"] == "xgboost-ubj"
+    assert restored is bundle.estimator()
+    np.testing.assert_allclose(restored.predict_proba(features), model.predict_proba(features), atol=1e-6)
+
+
+def test_unsupported_estimator_is_rejected(tmp_path, training_frame):
+    raw, features, target = training_frame
+    with pytest.raises(BundleError, match="Unsupported estimator"):
+        write_bundle(tmp_path / "model.bundle", object(), list(features.columns))
@@ -0,0 +1,49 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from challenge.api.executor import DeadlineExceeded, ExecutorSaturated, InferenceExecutor
+
+
+def test_run_returns_result_and_records_metrics():
+    executor = InferenceExecutor(max_workers=1, max_queue=1, timeout=1.0)
+
+    result = asyncio.run(executor.run(lambda value: value * 2, 21))
+
+    snapshot = executor.snapshot()
+    assert result == 42
+    assert snapshot["completed"] == 1
+    assert snapshot["queue_depth"] == 0
+    assert snapshot["wait"]["count"] == 1
+    executor.shutdown()
+
+
+def test_run_sheds_load_when_queue_is_full():
+    """Con un worker ocupado y sin cola disponible, la siguiente solicitud es rechazada de inmediato."""
+    executor = InferenceExecutor(max_workers=1, max_queue=0, timeout=2.0)
+    release = threading.Event()
+
+    async def scenario():
+        blocked = asyncio.ensure_future(executor.run(release.wait))
+        await asyncio.sleep(0.05)
+        with pytest.raises(ExecutorSaturated):
+            await executor.run(lambda: None)
+        release.set()
+        await blocked
+
+    asyncio.run(scenario())
+
+    assert executor.snapshot()["rejected"] == 1
+    executor.shutdown()
+
+
+def test_run_raises_when_deadline_expires():
+    executor = InferenceExecutor(max_workers=1, max_queue=1, timeout=0.05)
+
+    with pytest.raises(DeadlineExceeded):
+        asyncio.run(executor.run(time.sleep, 0.3))
+
+    assert executor.snapshot()["expired"] == 1
+    executor.shutdown()
@@ -0,0 +1,102 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.linear_model import LogisticRegression
+
+from challenge.api.bundle import BundleError, load_bundle, write_bundle
+from challenge.api.hashing import feature_names, hash_codes, hash_encode, spec
+
+_DESTINATIONS = [f"Destino {index}" for index in range(300)]
+
+
+def test_hashing_is_fixed_width_signed_and_ignores_missing_values():
+    records = {"SIGLADES": ["Lima", "Miami", None, "Lima"], "DIANOM": ["Lunes", "Lunes", "Martes", float("nan")]}
+
+    matrix = hash_encode(records, ["SIGLADES", "DIANOM"], 8)
+
+    assert matrix.shape == (4, 8)
+    assert set(np.unique(matrix)) <= {-2.0, -1.0, 0.0, 1.0, 2.0}
+    assert (np.abs(matrix).sum(axis=1) <= [2, 2, 1, 1]).all()
+    np.testing.assert_array_equal(matrix[0], matrix[3] + hash_encode({"DIANOM": ["Lunes"]}, ["DIANOM"], 8)[0])
+    # Same buckets whether the values come as raw strings or as factorized codes.
+    codes, categories = pd.factorize(pd.Series(records["SIGLADES"]))
+    block = np.zeros((4, 8), dtype=np.float32)
+    hash_codes("SIGLADES", codes.astype(np.int64), list(categories), 8, block)
+    np.testing.assert_array_equal(block, hash_encode(records, ["SIGLADES"], 8))
+
+
+def test_hashed_bundle_encodes_unseen_destinations_without_growing(tmp_path):
+    rng = np.random.default_rng(5)
+    raw = pd.DataFrame({
+        "OPERA": rng.choice(["Grupo LATAM", "Sky Airline"], 800),
+        "TIPOVUELO": rng.choice(["I", "N"], 800),
+        "MES": rng.integers(1, 13, 800),
+        "SIGLADES": rng.choice(_DESTINATIONS[:200], 800),
+    })
+    one_hot = pd.get_dummies(raw[["OPERA", "TIPOVUELO", "MES"]], columns=["OPERA", "TIPOVUELO", "MES"])
+    block = hash_encode({"SIGLADES": raw["SIGLADES"].tolist()}, ["SIGLADES"], 32)
+    hashed = pd.DataFrame(block, columns=feature_names(32))
+    features = pd.concat([one_hot, hashed], axis=1).astype(np.float32)
+    target = (raw["SIGLADES"].str[-1].astype(int) < 3).astype(int)
+    model = LogisticRegression(max_iter=1000).fit(features, target)
+    path = tmp_path / "model.bundle"
+
+    write_bundle(path, model, list(features.columns), hashing=spec(["SIGLADES"], 32))
+    bundle = load_bundle(path)
+
+    assert bundle.format_version == 3
+    assert bundle.hashing["offset"] == one_hot.shape[1]
+    encoded = bundle.encode({column: raw[column].tolist() for column in raw.columns})
+    np.testing.assert_array_equal(encoded, features.to_numpy())
+    np.testing.assert_allclose(bundle.predict_proba(encoded), model.predict_proba(features), rtol=1e-5)
+    unseen = bundle.encode({"OPERA": ["Sky Airline"] * 100, "SIGLADES": _DESTINATIONS[200:]})
+    assert unseen.shape == (100, bundle.n_features)
+    assert np.abs(unseen[:, one_hot.shape[1]:]).sum(axis=1).tolist() == [1.0] * 100
+
+
+def test_hashed_features_must_be_contiguous(tmp_path):
+    columns = ["OPERA_Sky Airline", "hashed_0", "MES_1", "hashed_1"]
+    model = LogisticRegression().fit(np.eye(4), [0, 1, 0, 1])
+
+    with pytest.raises(BundleError, match="contiguous"):
+        write_bundle(tmp_path / "model.bundle", model, columns, hashing=spec(["SIGLADES"], 2))
+
+
+def test_api_accepts_hashed_columns_for_models_trained_with_them(tmp_path, monkeypatch):
+    import importlib
+
+    from fastapi.testclient import TestClient
+
+    rng = np.random.default_rng(9)
+    raw = pd.DataFrame({
+        "OPERA": rng.choice(["Grupo LATAM", "Sky Airline"], 400),
+        "TIPOVUELO": rng.choice(["I", "N"], 400),
+        "MES": rng.integers(1, 13, 400),
+    })
+    hashing = spec(["SIGLADES", "DIANOM"], 16)
+    one_hot = pd.get_dummies(raw, columns=["OPERA", "TIPOVUELO", "MES"])
+    columns = list(one_hot.columns) + feature_names(16)
+    features = rng.integers(-1, 2, (400, len(columns))).astype(np.float32)
+    model = LogisticRegression(max_iter=1000).fit(features, rng.integers(0, 2, 400))
+    path = tmp_path / "model.bundle"
+    write_bundle(path, model, columns, hashing=hashing)
+
+    monkeypatch.setenv("CHALLENGE_API_FAKE_MODEL", "0")
+    monkeypatch.setenv("CHALLENGE_API_DISABLE_GCP", "1")
+    monkeypatch.setenv("CHALLENGE_API_ENABLE_BQ", "0")
+    monkeypatch.setenv("MODEL_LOCAL_PATH", str(path))
+    from challenge.api import api
+
+    api = importlib.reload(api)
+    flights = [
+        {"OPERA": "Sky Airline", "MES": 3, "TIPOVUELO": "I", "SIGLADES": "Lima", "DIANOM": "Lunes"},
+        {"OPERA": "Sky Airline", "MES": 3, "TIPOVUELO": "I"},
+    ]
+    with TestClient(api.app) as client:
+        response = client.post("/predict", json={"flights": flights})
+
+    assert response.status_code == 200
+    bundle = load_bundle(path)
+    encoded = bundle.encode({key: [flight.get(key) for flight in flights] for key in flights[0]})
+    assert np.abs(encoded[0, -16:]).sum() == 2.0 and not encoded[1, -16:].any()
+    assert response.json()["predict"] == bundle.predict(encoded).tolist()
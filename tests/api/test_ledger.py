@@ -0,0 +1,127 @@
+import json
+import os
+
+import pytest
+
+from challenge.api.ledger import (
+    PredictionLedger,
+    compact_segment,
+    export_ledger,
+    read_ledger,
+    recover_segments,
+)
+
+_BASE = 1_700_000_000.0  # 2023-11-14T22:13:20Z
+
+
+def _records(*flights):
+    return {
+        "OPERA": [flight[0] for flight in flights],
+        "MES": [flight[1] for flight in flights],
+        "TIPOVUELO": [flight[2] for flight in flights],
+    }
+
+
+@pytest.fixture()
+def ledger(tmp_path):
+    ledger = PredictionLedger(tmp_path, segment_rows=4, fsync_interval=60)
+    yield ledger
+    ledger.close()
+
+
+def test_segments_rotate_and_are_compacted(tmp_path, ledger):
+    for minute in range(3):
+        ledger.append(
+            "primary",
+            _records(("Grupo LATAM", 1, "N"), ("Sky Airline", 7, "I")),
+            [0, 1],
+            now=_BASE + minute * 60,
+        )
+
+    assert ledger.snapshot()["segments_closed"] == 1
+    ledger.close()
+
+    names = sorted(path.suffix for path in tmp_path.iterdir())
+    assert names == [".parquet", ".parquet"]
+    frame = read_ledger(tmp_path)
+    assert len(frame) == 6
+    assert frame["delay_prediction"].tolist() == [0, 1] * 3
+    assert frame["prediction_timestamp"].is_monotonic_increasing
+
+
+def test_query_filters_by_time_range_and_columns(tmp_path, ledger):
+    for minute in range(4):
+        ledger.append("primary", _records(("Copa Air", 3, "I"), ("Grupo LATAM", 3, "N")), [1, 0], now=_BASE + minute * 60)
+    ledger.append("canary", _records(("Copa Air", 4, "I")), [0], now=_BASE + 300)
+    # Rows still buffered by the writer become visible to readers once flushed.
+    ledger.flush()
+
+    frame = read_ledger(tmp_path, start="2023-11-14T22:14:00", end="2023-11-14T22:16:00", airline="Copa Air")
+    assert frame["prediction_timestamp"].dt.minute.tolist() == [14, 15]
+    assert set(frame["airline"]) == {"Copa Air"}
+
+    assert read_ledger(tmp_path, model="canary")["month"].tolist() == [4]
+    with pytest.raises(ValueError):
+        read_ledger(tmp_path, destination="SCEL")
+
+
+def test_recovery_closes_dead_segments_and_drops_torn_line(tmp_path):
+    segment = tmp_path / "20240101T000000-999999999-000001.ndjson.active"
+    row = {
+        "prediction_timestamp": "2024-01-01T00:00:00.000000Z",
+        "model": "primary",
+        "airline": "Grupo LATAM",
+        "month": 1,
+        "flight_type": "N",
+        "delay_prediction": 1,
+    }
+    segment.write_text(json.dumps(row) + "\n" + '{"prediction_timestamp": "2024-01')
+
+    recovered = recover_segments(tmp_path)
+
+    assert [path.name for path in recovered] == ["20240101T000000-999999999-000001.ndjson"]
+    compacted = compact_segment(recovered[0], "npz")
+    assert compacted.suffix == ".npz"
+    frame = read_ledger(tmp_path)
+    assert frame["airline"].tolist() == ["Grupo LATAM"]
+
+
+def test_recovery_skips_segments_another_worker_already_closed(tmp_path, monkeypatch):
+    for sequence in (1, 2):
+        (tmp_path / f"20240101T000000-999999999-00000{sequence}.ndjson.active").write_text("")
+    replace = os.replace
+
+    def raced(source, target):
+        # Another worker closes the first segment between our read and our rename.
+        if str(source).endswith("000001.ndjson.active"):
+            replace(source, target)
+        replace(source, target)
+
+    monkeypatch.setattr("challenge.api.ledger.os.replace", raced)
+
+    recovered = recover_segments(tmp_path)
+
+    assert [path.name for path in recovered] == ["20240101T000000-999999999-000002.ndjson"]
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        "20240101T000000-999999999-000001.ndjson",
+        "20240101T000000-999999999-000002.ndjson",
+    ]
+
+
+def test_export_writes_bigquery_ndjson(tmp_path, ledger):
+    ledger.append("primary", _records(("Sky Airline", 12, "I")), [1], now=_BASE)
+    ledger.flush()
+    output = tmp_path / "export" / "predictions.ndjson"
+    output.parent.mkdir()
+
+    export_ledger(read_ledger(tmp_path), output)
+
+    rows = [json.loads(line) for line in output.read_text().splitlines()]
+    assert rows == [{
+        "prediction_timestamp": "2023-11-14T22:13:20.000000Z",
+        "model": "primary",
+        "airline": "Sky Airline",
+        "month": 12,
+        "flight_type": "I",
+        "delay_prediction": 1,
+    }]
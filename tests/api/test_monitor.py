@@ -0,0 +1,103 @@
+import numpy as np
+import pytest
+
+from challenge.api.monitor import OTHER, DistributionMonitor, population_stability, vocabulary_from_features
+
+_FEATURES = ["OPERA_Copa Air", "OPERA_Grupo LATAM", "TIPOVUELO_I", "TIPOVUELO_N", "MES_1", "MES_7"]
+
+
+class _Clock:
+    def __init__(self, now=1_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def _monitor(clock, reference=None):
+    monitor = DistributionMonitor(
+        vocabulary_from_features(_FEATURES),
+        reference=reference,
+        bucket_seconds=10,
+        window_buckets=3,
+        tumbling_seconds=60,
+        clock=clock,
+    )
+    monitor.bind_features(_FEATURES)
+    return monitor
+
+
+def test_matrix_and_record_observations_produce_the_same_counts():
+    clock = _Clock()
+    by_matrix, by_records = _monitor(clock), _monitor(clock)
+    matrix = np.array([[1, 0, 1, 0, 1, 0], [0, 1, 0, 1, 0, 1], [0, 0, 0, 1, 0, 1]], dtype=np.float32)
+    records = {"OPERA": ["Copa Air", "Grupo LATAM", "Iberia"], "TIPOVUELO": ["I", "N", "N"], "MES": [1, 7, 7]}
+
+    by_matrix.observe([1, 0, 1], matrix=matrix)
+    by_records.observe([1, 0, 1], records=records)
+
+    expected = by_records.snapshot()["windows"]["total"]
+    observed = by_matrix.snapshot()["windows"]["total"]
+    assert observed["distribution"] == expected["distribution"]
+    assert observed["distribution"]["OPERA"] == {"Copa Air": 1, "Grupo LATAM": 1, OTHER: 1}
+    assert observed["rows"] == 3
+    assert observed["predicted_delay_rate"] == pytest.approx(2 / 3, abs=1e-6)
+
+
+def test_matrix_observations_accept_mixed_dtype_frames():
+    pd = pytest.importorskip("pandas")
+    clock = _Clock()
+    monitor = _monitor(clock)
+    frame = pd.get_dummies(pd.DataFrame({"OPERA": ["Copa Air"], "TIPOVUELO": ["I"], "MES": [7]}), columns=["OPERA", "TIPOVUELO", "MES"])
+    frame = frame.reindex(columns=_FEATURES, fill_value=0)
+
+    monitor.observe([1], matrix=frame)
+
+    distribution = monitor.snapshot()["windows"]["total"]["distribution"]
+    assert distribution["OPERA"]["Copa Air"] == 1 and distribution["MES"]["7"] == 1
+
+
+def test_sliding_and_tumbling_windows_expire_old_counts():
+    clock = _Clock(1_000.0)
+    monitor = _monitor(clock)
+    records = {"OPERA": ["Copa Air"], "TIPOVUELO": ["I"], "MES": [1]}
+
+    monitor.observe([1], records=records)
+    clock.now = 1_015.0
+    monitor.observe([0], records=records)
+    windows = monitor.snapshot()["windows"]
+    assert windows["sliding"]["rows"] == 2
+    assert windows["tumbling_current"]["rows"] == 2
+
+    # 1020 opens a new minute: the closed one becomes the previous tumbling window.
+    clock.now = 1_025.0
+    monitor.observe([1], records=records)
+    windows = monitor.snapshot()["windows"]
+    assert windows["tumbling_current"]["rows"] == 1
+    assert windows["tumbling_previous"]["rows"] == 2
+
+    # The sliding window covers three 10 s buckets, so the first observation has expired.
+    clock.now = 1_035.0
+    windows = monitor.snapshot()["windows"]
+    assert windows["sliding"]["rows"] == 2
+    assert windows["total"]["rows"] == 3
+
+
+def test_drift_is_reported_against_training_reference():
+    reference = {
+        "category_counts": {"OPERA": {"Copa Air": 50, "Grupo LATAM": 50}, "TIPOVUELO": {"I": 50, "N": 50}},
+        "predicted_positive_rate": 0.25,
+    }
+    monitor = _monitor(_Clock(), reference=reference)
+
+    monitor.observe([1] * 10, records={"OPERA": ["Copa Air"] * 10, "TIPOVUELO": ["I", "N"] * 5, "MES": [1] * 10})
+    window = monitor.snapshot()["windows"]["total"]
+
+    assert window["drift"]["TIPOVUELO"]["psi"] == pytest.approx(0.0)
+    assert window["drift"]["OPERA"]["max_share_delta"] == pytest.approx(0.5)
+    assert window["drift"]["OPERA"]["psi"] > 1.0
+    assert window["predicted_delay_rate_delta"] == pytest.approx(0.75)
+
+
+def test_population_stability_is_zero_for_identical_shares():
+    assert population_stability(np.array([10.0, 30.0]), np.array([1.0, 3.0])) == pytest.approx(0.0)
@@ -0,0 +1,47 @@
+import marshal
+
+from challenge.api.profiling import PROFILE_HEADER, RequestProfiler
+
+
+def _work(size):
+    return sum(list(range(size)))
+
+
+def test_profiler_is_disabled_without_rate_or_token():
+    profiler = RequestProfiler()
+
+    assert not profiler.enabled
+    assert profiler.select({PROFILE_HEADER: "anything"}) is None
+
+
+def test_privileged_header_triggers_profile_capture():
+    profiler = RequestProfiler(token="secret", capacity=2)
+
+    reason = profiler.select({PROFILE_HEADER: "secret"})
+    result = profiler.wrap(_work, "work", reason)(10_000)
+
+    assert reason == "header"
+    assert result == sum(range(10_000))
+    [summary] = profiler.list()
+    assert summary["reason"] == "header"
+    record = profiler.get(summary["id"])
+    assert "_work" in record.as_text()
+    assert isinstance(marshal.loads(record.as_pstats()), dict)
+
+
+def test_only_the_exact_token_is_authorized():
+    profiler = RequestProfiler(token="secret")
+
+    assert profiler.is_authorized({PROFILE_HEADER: "secret"})
+    for headers in ({}, {PROFILE_HEADER: "secre"}, {PROFILE_HEADER: "secret!"}, {PROFILE_HEADER: "sécret"}):
+        assert not profiler.is_authorized(headers)
+    assert not RequestProfiler(sample_rate=1.0).is_authorized({PROFILE_HEADER: ""})
+
+
+def test_ring_buffer_keeps_only_latest_profiles():
+    profiler = RequestProfiler(sample_rate=1.0, capacity=2)
+
+    for _ in range(3):
+        profiler.wrap(_work, "work", "sampled")(100)
+
+    assert [item["id"] for item in profiler.list()] == [3, 2]
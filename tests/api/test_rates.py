@@ -0,0 +1,134 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.linear_model import LogisticRegression
+
+from challenge.api.bundle import BundleError, load_bundle, replace_rates, write_bundle
+from challenge.api.rates import DelayRateTable, feature_names
+
+
+def _history(rows: int = 2000, seed: int = 3) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    frame = pd.DataFrame({
+        "OPERA": rng.choice(["Grupo LATAM", "Sky Airline", "Copa Air"], rows),
+        "SIGLADES": rng.choice(["Lima", "Miami", "Arica", None], rows),
+        "MES": rng.integers(1, 13, rows),
+    })
+    frame["delay"] = (rng.random(rows) < np.where(frame["SIGLADES"] == "Miami", 0.5, 0.1)).astype(int)
+    return frame
+
+
+def _records(frame: pd.DataFrame) -> dict:
+    return {column: frame[column].tolist() for column in ("OPERA", "SIGLADES", "MES")}
+
+
+def test_rates_match_smoothed_group_means_and_fall_back_for_unseen_values():
+    history = _history()
+    table = DelayRateTable(smoothing=10).update(_records(history), history["delay"])
+
+    airline = history[history["OPERA"] == "Sky Airline"]
+    overall = history["delay"].mean()
+    airline_rate = (airline["delay"].sum() + 10 * overall) / (len(airline) + 10)
+    cell = history[(history["OPERA"] == "Sky Airline") & (history["SIGLADES"] == "Miami") & (history["MES"] == 7)]
+    route = history[(history["OPERA"] == "Sky Airline") & (history["SIGLADES"] == "Miami")]
+    route_rate = (route["delay"].sum() + 10 * airline_rate) / (len(route) + 10)
+    expected = (cell["delay"].sum() + 10 * route_rate) / (len(cell) + 10)
+
+    rates = table.encode({
+        "OPERA": ["Sky Airline", "Sky Airline", "Sky Airline", "Nueva"],
+        "SIGLADES": ["Miami", "Destino nuevo", None, "Lima"],
+        "MES": [7, 7, 7, 7],
+    })
+
+    assert rates.shape == (4, 3) and rates.dtype == np.float32
+    assert rates[0, 1] == pytest.approx(route_rate, rel=1e-5)
+    assert rates[0, 2] == pytest.approx(expected, rel=1e-5)
+    # Unseen destinations share code 0 with missing ones; an unseen airline gets the global rate.
+    np.testing.assert_array_equal(rates[1], rates[2])
+    np.testing.assert_allclose(rates[3], overall, rtol=1e-5)
+
+
+def test_incremental_updates_equal_a_single_pass_and_out_of_fold_excludes_each_row():
+    history = _history()
+    first, second = history.iloc[:1200], history.iloc[1200:]
+    incremental = DelayRateTable().update(_records(first), first["delay"]).update(_records(second), second["delay"])
+    single = DelayRateTable().update(_records(history), history["delay"])
+
+    probe = _records(history.head(50))
+    np.testing.assert_allclose(incremental.encode(probe), single.encode(probe), rtol=1e-6)
+    assert incremental.rows == single.rows == len(history)
+
+    codes = [single.codes(column, values) for column, values in _records(history).items()]
+    rates = single.out_of_fold(codes, history["delay"], n_folds=4)
+    assert rates.shape == (len(history), 3)
+    # Out-of-fold rates no longer move with the row's own label.
+    in_sample = single.gather(codes)[:, 2]
+    assert np.corrcoef(in_sample, history["delay"])[0, 1] > np.corrcoef(rates[:, 2], history["delay"])[0, 1]
+
+
+def test_bundle_embeds_the_table_and_replace_rates_keeps_the_estimator(tmp_path):
+    history = _history()
+    table = DelayRateTable().update(_records(history), history["delay"])
+    one_hot = pd.get_dummies(history[["OPERA", "MES"]].astype({"MES": str}), prefix=["OPERA", "MES"])
+    rates = pd.DataFrame(table.encode(_records(history)), columns=feature_names())
+    features = pd.concat([one_hot, rates], axis=1).astype(np.float32)
+    model = LogisticRegression(max_iter=1000).fit(features, history["delay"])
+    path = tmp_path / "model.bundle"
+
+    write_bundle(path, model, list(features.columns), rates=table)
+    bundle = load_bundle(path)
+
+    assert bundle.format_version == 4
+    assert bundle.header["rates"]["offset"] == one_hot.shape[1]
+    encoded = bundle.encode({column: history[column].tolist() for column in ("OPERA", "MES", "SIGLADES")})
+    np.testing.assert_allclose(encoded, features.to_numpy(), rtol=1e-6)
+
+    month = _history(rows=300, seed=4).assign(SIGLADES="Cusco")
+    replace_rates(path, DelayRateTable.from_arrays(bundle.arrays).update(_records(month), month["delay"]))
+    updated = load_bundle(path)
+
+    assert updated.rates.rows == len(history) + 300
+    assert updated.rates.vocabularies["SIGLADES"][-1] == "Cusco"
+    np.testing.assert_array_equal(updated.arrays["linear/coef"], bundle.arrays["linear/coef"])
+    with pytest.raises(BundleError, match="delay-rate"):
+        plain = tmp_path / "plain.bundle"
+        write_bundle(plain, model, list(features.columns))
+        replace_rates(plain, table)
+
+
+def test_api_gathers_rates_for_models_trained_with_them(tmp_path, monkeypatch):
+    import importlib
+
+    from fastapi.testclient import TestClient
+
+    history = _history().assign(TIPOVUELO="I")
+    table = DelayRateTable().update(_records(history), history["delay"])
+    one_hot = pd.get_dummies(history[["OPERA", "TIPOVUELO", "MES"]], columns=["OPERA", "TIPOVUELO", "MES"])
+    columns = list(one_hot.columns) + feature_names()
+    features = np.hstack([one_hot.to_numpy(dtype=np.float32), table.encode(_records(history))])
+    model = LogisticRegression(max_iter=1000).fit(features, history["delay"])
+    path = tmp_path / "model.bundle"
+    write_bundle(path, model, columns, rates=table)
+
+    monkeypatch.setenv("CHALLENGE_API_FAKE_MODEL", "0")
+    monkeypatch.setenv("CHALLENGE_API_DISABLE_GCP", "1")
+    monkeypatch.setenv("CHALLENGE_API_ENABLE_BQ", "0")
+    monkeypatch.setenv("MODEL_LOCAL_PATH", str(path))
+    from challenge.api import api
+
+    api = importlib.reload(api)
+    flights = [
+        {"OPERA": "Sky Airline", "MES": 3, "TIPOVUELO": "I", "SIGLADES": "Miami"},
+        {"OPERA": "Sky Airline", "MES": 3, "TIPOVUELO": "I"},
+    ]
+    with TestClient(api.app) as client:
+        response = client.post("/predict", json={"flights": flights})
+
+    assert response.status_code == 200
+    bundle = load_bundle(path)
+    encoded = bundle.encode({key: [flight.get(key) for flight in flights] for key in flights[0]})
+    expected = table.encode({"OPERA": ["Sky Airline"] * 2, "SIGLADES": ["Miami", None], "MES": [3, 3]})
+    np.testing.assert_allclose(encoded[:, -3:], expected)
+    built = api._build_features([api.FlightData(**flight) for flight in flights], bundle, bundle.feature_columns)
+    np.testing.assert_array_equal(built, encoded)
+    assert response.json()["predict"] == bundle.predict(encoded).tolist()
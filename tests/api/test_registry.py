@@ -0,0 +1,63 @@
+import time
+
+import pytest
+
+from challenge.api.executor import ExecutorSaturated
+from challenge.api.registry import CANARY, SHADOW, ModelEntry, ModelRegistry, parse_candidates
+
+
+def test_parse_candidates_reads_names_paths_and_percentages():
+    parsed = parse_candidates("v2=/models/v2.bundle@10, v3=/models/v3.pkl")
+
+    assert parsed == [
+        {"name": "v2", "path": "/models/v2.bundle", "percent": 10.0},
+        {"name": "v3", "path": "/models/v3.pkl", "percent": 0.0},
+    ]
+
+
+def test_parse_candidates_rejects_malformed_entries():
+    with pytest.raises(ValueError):
+        parse_candidates("missing-path")
+
+
+def test_route_sends_configured_share_of_traffic_to_canary(monkeypatch):
+    registry = ModelRegistry(ModelEntry("primary", object(), []))
+    registry.register(ModelEntry("canary", object(), [], role=CANARY, traffic_percent=25))
+    draws = iter([0.10, 0.30, 0.99, 0.99])
+    monkeypatch.setattr("challenge.api.registry.random.random", lambda: next(draws))
+
+    routed = [registry.route().name for _ in range(3)]
+
+    assert routed == ["canary", "primary", "primary"]
+    assert registry.route("canary").name == "canary"
+    assert registry.route("unknown").name == "primary"
+    registry.shutdown()
+
+
+def test_route_ignores_shadow_models_named_in_the_header(monkeypatch):
+    registry = ModelRegistry(ModelEntry("primary", object(), []))
+    registry.register(ModelEntry("shadow", object(), [], role=SHADOW))
+    monkeypatch.setattr("challenge.api.registry.random.random", lambda: 0.0)
+
+    assert registry.route("shadow").name == "primary"
+    assert registry.route("primary").name == "primary"
+    registry.shutdown()
+
+
+def test_saturated_comparisons_are_dropped_not_counted_as_errors():
+    primary = ModelEntry("primary", object(), [])
+    registry = ModelRegistry(primary)
+    canary = ModelEntry("canary", object(), [], role=CANARY)
+    registry.register(canary)
+
+    def saturated(entry, flights, features):
+        raise ExecutorSaturated("Inference queue is full")
+
+    registry.compare_async(canary, ["flight"], None, [1], saturated)
+    deadline = time.monotonic() + 2.0
+    while registry.snapshot()["pending_comparisons"] and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert primary.errors == 0
+    assert registry.snapshot()["dropped_comparisons"] == 1
+    registry.shutdown()
@@ -0,0 +1,107 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.linear_model import LogisticRegression
+
+from challenge.api.bundle import BundleError, load_bundle, load_model, write_bundle
+from challenge.api.segments import SegmentedModel, is_segmented, write_manifest
+
+_OPERAS = ["Grupo LATAM", "Sky Airline", "Copa Air"]
+
+
+@pytest.fixture()
+def segmented_dir(tmp_path):
+    rng = np.random.default_rng(8)
+    raw = pd.DataFrame({
+        "OPERA": rng.choice(_OPERAS, 900),
+        "TIPOVUELO": rng.choice(["I", "N"], 900),
+        "MES": rng.integers(1, 13, 900),
+    })
+    features = pd.get_dummies(raw, columns=["OPERA", "TIPOVUELO", "MES"]).astype(np.float32)
+    # Opposite effects per airline, which a single linear model cannot capture.
+    international = (raw["TIPOVUELO"] == "I").to_numpy()
+    target = pd.Series(np.where(raw["OPERA"] == "Sky Airline", international, ~international).astype(int))
+    target[rng.random(900) < 0.1] ^= 1
+
+    columns = list(features.columns)
+    write_bundle(tmp_path / "global.bundle", LogisticRegression().fit(features, target), columns)
+    files = {}
+    for index, opera in enumerate(["Sky Airline", "Copa Air"]):
+        rows = (raw["OPERA"] == opera).to_numpy()
+        model = LogisticRegression().fit(features[rows], target[rows])
+        files[opera] = f"segment-{index}.bundle"
+        write_bundle(tmp_path / files[opera], model, columns)
+    write_manifest(tmp_path, "OPERA", files, "global.bundle")
+    return tmp_path, raw, features
+
+
+def test_router_scores_each_row_with_its_segment_model(segmented_dir):
+    path, raw, features = segmented_dir
+
+    router = load_model(path)
+
+    assert is_segmented(path)
+    assert isinstance(router, SegmentedModel)
+    expected = load_bundle(path / "global.bundle").predict(features)
+    for opera, filename in (("Sky Airline", "segment-0.bundle"), ("Copa Air", "segment-1.bundle")):
+        rows = (raw["OPERA"] == opera).to_numpy()
+        expected[rows] = load_bundle(path / filename).predict(features[rows])
+    assert router.predict(features).tolist() == expected.tolist()
+    assert router.predict_proba(features).shape == (len(features), 2)
+
+    counts = router.snapshot()["segments"]
+    assert counts["global"]["rows"] == int((raw["OPERA"] == "Grupo LATAM").sum())
+    assert counts["Sky Airline"]["rows"] == int((raw["OPERA"] == "Sky Airline").sum())
+
+
+def test_router_encodes_like_a_bundle_and_falls_back_for_unknown_segments(segmented_dir):
+    path, _, _ = segmented_dir
+    router = load_model(path)
+
+    matrix = router.encode({"OPERA": ["Copa Air", "Aerolineas Argentinas"], "TIPOVUELO": ["I", "N"], "MES": [3, 7]})
+
+    assert router.route(matrix).tolist() == [2, 0]
+    assert router.predict(matrix).tolist()[1] == load_bundle(path / "global.bundle").predict(matrix[1:]).tolist()[0]
+
+
+def test_segments_must_share_the_feature_layout(segmented_dir):
+    path, _, features = segmented_dir
+    narrow = features.drop(columns=["MES_12"])
+    target = (narrow["TIPOVUELO_I"] > 0).astype(int)
+    write_bundle(path / "segment-0.bundle", LogisticRegression().fit(narrow, target), list(narrow.columns))
+
+    with pytest.raises(BundleError):
+        load_model(path)
+
+
+def test_api_routes_batches_through_segment_models(segmented_dir, monkeypatch):
+    import importlib
+
+    from fastapi.testclient import TestClient
+
+    path, _, _ = segmented_dir
+    monkeypatch.setenv("CHALLENGE_API_FAKE_MODEL", "0")
+    monkeypatch.setenv("CHALLENGE_API_DISABLE_GCP", "1")
+    monkeypatch.setenv("CHALLENGE_API_ENABLE_BQ", "0")
+    monkeypatch.setenv("MODEL_LOCAL_PATH", str(path))
+    from challenge.api import api
+
+    api = importlib.reload(api)
+    flights = [
+        {"OPERA": "Sky Airline", "MES": 3, "TIPOVUELO": "I"},
+        {"OPERA": "Copa Air", "MES": 3, "TIPOVUELO": "I"},
+        {"OPERA": "Grupo LATAM", "MES": 3, "TIPOVUELO": "I"},
+    ]
+    with TestClient(api.app) as client:
+        assert api.model_warmup.wait(timeout=30)
+        response = client.post("/predict", json={"flights": flights})
+        segments = client.get("/metrics").json()["segments"]
+
+    assert response.status_code == 200
+    matrix = api.xgb_model.encode({key: [flight[key] for flight in flights] for key in ("OPERA", "MES", "TIPOVUELO")})
+    files = ("segment-0.bundle", "segment-1.bundle", "global.bundle")
+    expected = [int(load_bundle(path / name).predict(matrix[[row]])[0]) for row, name in enumerate(files)]
+    assert response.json()["predict"] == expected
+    assert {name: item["rows"] for name, item in segments["segments"].items()} == {
+        "global": 1, "Sky Airline": 1, "Copa Air": 1,
+    }
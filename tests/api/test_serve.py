@@ -0,0 +1,19 @@
+import os
+import sys
+
+import pytest
+
+from challenge.api.serve import process_memory
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="smaps_rollup solo existe en Linux")
+def test_process_memory_reports_unique_and_shared_pages():
+    usage = process_memory(os.getpid())
+
+    assert usage["rss_bytes"] > 0
+    assert 0 < usage["uss_bytes"] <= usage["rss_bytes"]
+    assert usage["pss_bytes"] <= usage["rss_bytes"]
+
+
+def test_process_memory_returns_empty_for_unknown_process():
+    assert process_memory("does-not-exist") == {}
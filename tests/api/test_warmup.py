@@ -0,0 +1,105 @@
+import importlib
+
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+from sklearn.linear_model import LogisticRegression
+
+from challenge.api.bundle import write_bundle
+from challenge.api.warmup import FAILED, READY, WarmUp, batches, parse_batch_sizes
+
+
+def test_batches_cover_the_grid_with_fixed_size_calls():
+    grid = list(range(10))
+
+    assert batches(grid, 4) == [[0, 1, 2, 3], [4, 5, 6, 7], [8, 9, 0, 1]]
+    assert batches(grid, 25) == [grid * 2 + grid[:5]]
+    assert parse_batch_sizes(" 1, 8 ") == (1, 8)
+    with pytest.raises(ValueError):
+        parse_batch_sizes("0,8")
+
+
+def test_warm_up_reports_first_and_steady_calls_per_batch_size():
+    calls = []
+    warmup = WarmUp(batch_sizes=(1, 4), rounds=2)
+
+    assert warmup.run([("primary", calls.append)], list("abcdef"))
+
+    report = warmup.snapshot()
+    assert report["status"] == READY
+    assert report["models"]["primary"]["1"]["calls"] == 12
+    assert report["models"]["primary"]["4"]["calls"] == 4
+    assert report["models"]["primary"]["4"]["steady"]["count"] == 3
+    assert sorted({item for chunk in calls for item in chunk}) == list("abcdef")
+    warmup.record_request(3, 0.002)
+    warmup.record_request(5, 0.001)
+    assert report["first_request"] is None and warmup.first_request == {"rows": 3, "ms": 2.0}
+
+
+def test_warm_up_failure_keeps_the_process_unready():
+    def broken(_flights):
+        raise RuntimeError("boom")
+
+    warmup = WarmUp(batch_sizes=(2,))
+
+    assert not warmup.run([("primary", broken)], [1, 2, 3])
+    assert warmup.status == FAILED and "boom" in warmup.error
+    warmup.record_request(1, 0.001)
+    assert warmup.first_request is None
+
+
+def _reload_api(monkeypatch, model_path):
+    monkeypatch.setenv("CHALLENGE_API_FAKE_MODEL", "0")
+    monkeypatch.setenv("CHALLENGE_API_DISABLE_GCP", "1")
+    monkeypatch.setenv("CHALLENGE_API_ENABLE_BQ", "0")
+    monkeypatch.setenv("CHALLENGE_API_WARMUP_BATCH_SIZES", "1,64")
+    monkeypatch.setenv("MODEL_LOCAL_PATH", str(model_path))
+    from challenge.api import api
+
+    return importlib.reload(api)
+
+
+def test_ready_endpoint_waits_for_warm_up_over_the_whole_grid(tmp_path, monkeypatch):
+    rng = np.random.default_rng(3)
+    raw = pd.DataFrame({
+        "OPERA": rng.choice(["Grupo LATAM", "Sky Airline", "Copa Air"], 300),
+        "TIPOVUELO": rng.choice(["I", "N"], 300),
+        "MES": rng.integers(1, 13, 300),
+    })
+    features = pd.get_dummies(raw, columns=["OPERA", "TIPOVUELO", "MES"]).astype(np.float32)
+    path = tmp_path / "model.bundle"
+    write_bundle(path, LogisticRegression(max_iter=1000).fit(features, rng.integers(0, 2, 300)), features.columns)
+    api = _reload_api(monkeypatch, path)
+
+    with TestClient(api.app) as client:
+        assert api.model_warmup.wait(timeout=30)
+        ready = client.get("/ready")
+        client.post("/predict", json={"OPERA": "Sky Airline", "MES": 7, "TIPOVUELO": "I"})
+        first_request = client.get("/ready").json()["first_request"]
+
+    assert ready.status_code == 200
+    body = ready.json()
+    assert body["status"] == "ready"
+    sizes = body["models"]["primary"]
+    assert set(sizes) == {"1", "64"}
+    # 5 airlines x 2 flight types x 12 months, once per round (two by default).
+    assert sizes["1"]["calls"] == len(api.warm_up_grid()) * 2 == 240
+    assert sizes["64"]["rows"] == 128 * 2
+    assert first_request["rows"] == 1
+    # Warm-up traffic is not observed as live predictions.
+    assert api.model_registry.primary.requests == 1
+
+
+def test_ready_endpoint_is_unavailable_without_a_model(tmp_path, monkeypatch):
+    api = _reload_api(monkeypatch, tmp_path / "missing.bundle")
+
+    with TestClient(api.app) as client:
+        api.model_warmup.wait(timeout=30)
+        health = client.get("/health")
+        ready = client.get("/ready")
+
+    assert health.status_code == 200
+    assert ready.status_code == 503
+    assert ready.json()["status"] == "failed"
+    assert ready.json()["error"] == "Model not available"
@@ -0,0 +1,61 @@
+import os
+
+import numpy as np
+import pytest
+
+from challenge.api.executor import ExecutorSaturated
+from challenge.api.workers import ProcessInferencePool, WorkerCrashed
+
+
+class _ThresholdModel:
+    """Modelo mínimo que predice 1 cuando la suma de la fila supera 1; una fila negativa termina el proceso."""
+
+    def predict(self, features):
+        if (features < 0).any():
+            os._exit(1)
+        return (features.sum(axis=1) > 1).astype(int)
+
+
+def _load_threshold_model():
+    return _ThresholdModel()
+
+
+@pytest.fixture()
+def pool():
+    inference_pool = ProcessInferencePool(_load_threshold_model, n_features=3, processes=1, max_rows=4, timeout=20)
+    yield inference_pool
+    inference_pool.close()
+
+
+def test_predict_round_trips_through_shared_memory(pool):
+    features = np.array(
+        [[0, 0, 1], [1, 1, 0], [1, 1, 1], [0, 0, 0], [1, 0, 1], [0, 1, 0]],
+        dtype=np.float32,
+    )
+
+    predictions = pool.predict(features)
+
+    assert predictions.tolist() == [0, 1, 1, 0, 1, 0]
+    assert pool.snapshot()["workers"][0]["batches"] == 2
+
+
+def test_crashed_worker_is_restarted(pool):
+    with pytest.raises(WorkerCrashed):
+        pool.predict(np.array([[-1, 0, 0]], dtype=np.float32))
+
+    predictions = pool.predict(np.array([[1, 1, 0]], dtype=np.float32))
+
+    assert predictions.tolist() == [1]
+    assert pool.snapshot()["workers"][0]["restarts"] == 1
+
+
+def test_predict_sheds_when_every_worker_is_busy(pool, monkeypatch):
+    busy = pool._idle.get()
+    monkeypatch.setattr(pool, "timeout", 0.05)
+
+    with pytest.raises(ExecutorSaturated):
+        pool.predict(np.array([[1, 1, 0]], dtype=np.float32))
+
+    pool._idle.put(busy)
+    monkeypatch.undo()
+    assert pool.predict(np.array([[1, 1, 0]], dtype=np.float32)).tolist() == [1]
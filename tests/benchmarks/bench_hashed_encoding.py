@@ -0,0 +1,132 @@
+"""
+Compara la codificación one-hot de SIGLADES y DIANOM con el bloque de hashing
+de ancho fijo: ancho y memoria de la matriz, velocidad de codificación en el
+entrenamiento (DataFrame) y en la API (``ModelBundle.encode`` por lote),
+tamaño del bundle y ROC-AUC del holdout.
+
+Uso:
+    PYTHONPATH=. python -m tests.benchmarks.bench_hashed_encoding --rows 200000 --destinations 2000 --widths 32,64,256
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.metrics import roc_auc_score
+
+from challenge.api.bundle import DEFAULT_SCHEMA, load_bundle, write_bundle
+from challenge.api.hashing import spec
+from challenge.estimators import build_estimator, load_config
+from challenge.model import _hashed_block
+
+_HASHED = ["SIGLADES", "DIANOM"]
+_DAYS = ["Lunes", "Martes", "Miercoles", "Jueves", "Viernes", "Sabado", "Domingo"]
+
+
+def _flights(rows: int, destinations: int) -> pd.DataFrame:
+    rng = np.random.default_rng(17)
+    names = np.asarray([f"Destino {index}" for index in range(destinations)])
+    # Pocos destinos concentran la mayoría de los vuelos, como en el dataset original.
+    popularity = 1.0 / np.arange(1, destinations + 1)
+    raw = pd.DataFrame({
+        "OPERA": rng.choice(["Grupo LATAM", "Sky Airline", "Copa Air", "Latin American Wings"], rows),
+        "TIPOVUELO": rng.choice(["I", "N"], rows),
+        "MES": rng.integers(1, 13, rows),
+        "SIGLADES": rng.choice(names, rows, p=popularity / popularity.sum()),
+        "DIANOM": rng.choice(_DAYS, rows),
+    })
+    risk = rng.normal(0, 1, destinations)[pd.factorize(raw["SIGLADES"], sort=True)[0]]
+    logit = -1.5 + 0.8 * risk + 0.5 * (raw["DIANOM"] == "Viernes") + 0.4 * (raw["MES"] == 12)
+    raw["delay"] = (rng.random(rows) < 1 / (1 + np.exp(-logit))).astype(int)
+    for column in ("OPERA", "TIPOVUELO", "SIGLADES", "DIANOM"):
+        raw[column] = raw[column].astype("category")
+    return raw
+
+
+def _one_hot(raw: pd.DataFrame, columns) -> pd.DataFrame:
+    return pd.concat([pd.get_dummies(raw[column], prefix=column) for column in columns], axis=1)
+
+
+def _timed(function, repeats: int):
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        result = function()
+        timings.append(time.perf_counter() - started)
+    return result, float(np.median(timings))
+
+
+def _case(name, raw, encode, schema, hashing, args, workdir):
+    features, encode_seconds = _timed(encode, args.repeats)
+    split = int(len(raw) * 0.67)
+    config = load_config(environ={})
+    config["estimator"] = args.estimator
+    model = build_estimator(config)
+    started = time.perf_counter()
+    model.fit(features.iloc[:split], raw["delay"].iloc[:split])
+    fit_seconds = time.perf_counter() - started
+    scores = model.predict_proba(features.iloc[split:])[:, 1]
+
+    path = os.path.join(workdir, name.replace("/", "-") + ".bundle")
+    write_bundle(path, model, list(features.columns), schema=schema, hashing=hashing)
+    bundle = load_bundle(path)
+    batch = raw.iloc[:args.batch_size]
+    records = {column: batch[column].astype(object).tolist() for column in list(schema) + _HASHED}
+    _, batch_seconds = _timed(lambda: bundle.encode(records), args.repeats * 10)
+    return {
+        "encoding": name,
+        "width": features.shape[1],
+        "matrix_mib": round(features.shape[0] * features.shape[1] * 4 / 2**20, 1),
+        "encode_rows_per_second": round(len(raw) / encode_seconds),
+        "api_batch_rows_per_second": round(args.batch_size / batch_seconds),
+        "bundle_kib": round(os.path.getsize(path) / 1024, 1),
+        "fit_seconds": round(fit_seconds, 3),
+        "roc_auc": round(float(roc_auc_score(raw["delay"].iloc[split:], scores)), 4),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--destinations", type=int, default=500)
+    parser.add_argument("--widths", default="32,64,256")
+    parser.add_argument("--estimator", default="logistic_regression", choices=["logistic_regression", "xgboost"])
+    parser.add_argument("--batch_size", type=int, default=256)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    raw = _flights(args.rows, args.destinations)
+    base = ["OPERA", "TIPOVUELO", "MES"]
+    with tempfile.TemporaryDirectory() as workdir:
+        results = [
+            _case("one_hot/base", raw, lambda: _one_hot(raw, base).astype(np.float32), DEFAULT_SCHEMA, None, args, workdir),
+            _case(
+                "one_hot/all",
+                raw,
+                lambda: _one_hot(raw, base + _HASHED).astype(np.float32),
+                {**DEFAULT_SCHEMA, "SIGLADES": "str", "DIANOM": "str"},
+                None,
+                args,
+                workdir,
+            ),
+        ]
+        for width in (int(value) for value in args.widths.split(",")):
+            results.append(_case(
+                f"hashed/{width}",
+                raw,
+                lambda: pd.concat([_one_hot(raw, base), _hashed_block(raw, _HASHED, width)], axis=1).astype(np.float32),
+                DEFAULT_SCHEMA,
+                spec(_HASHED, width),
+                args,
+                workdir,
+            ))
+    for result in results:
+        print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Compara tamaño, tiempo de guardado y tiempo de carga del artefacto del modelo
+como pickle, joblib y bundle (vista mapeada y estimador nativo reconstruido),
+para LogisticRegression y, si está instalado, XGBoost.
+
+Uso:
+    PYTHONPATH=. python -m tests.benchmarks.bench_model_artifacts --loads 50
+"""
+
+import argparse
+import json
+import pickle
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LogisticRegression
+
+from challenge.api.bundle import load_bundle, write_bundle
+
+_ROOT = Path(__file__).resolve().parents[2]
+
+
+def _features(rows: int) -> pd.DataFrame:
+    rng = np.random.default_rng(11)
+    raw = pd.DataFrame({
+        "OPERA": rng.choice(["Grupo LATAM", "Sky Airline", "Copa Air", "Latin American Wings"], rows),
+        "TIPOVUELO": rng.choice(["I", "N"], rows),
+        "MES": rng.integers(1, 13, rows),
+    })
+    features = pd.get_dummies(raw, columns=["OPERA", "TIPOVUELO", "MES"]).astype(np.float32)
+    target = ((raw["MES"] == 12) | (rng.random(rows) < 0.2)).astype(int)
+    return features, target
+
+
+def _estimators(n_estimators: int):
+    yield "logistic_regression", LogisticRegression(max_iter=1000)
+    try:
+        import xgboost as xgb
+    except ImportError:
+        return
+    yield "xgboost", xgb.XGBClassifier(n_estimators=n_estimators, max_depth=6, learning_rate=0.05)
+
+
+def _timed(function, repeats: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeats):
+        function()
+    return (time.perf_counter() - started) / repeats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=20_000)
+    parser.add_argument("--n_estimators", type=int, default=300)
+    parser.add_argument("--loads", type=int, default=50, help="Cargas promediadas por formato")
+    args = parser.parse_args()
+
+    try:
+        import joblib
+    except ImportError:
+        joblib = None
+
+    features, target = _features(args.rows)
+    workdir = Path(tempfile.mkdtemp(prefix="bench-artifacts-"))
+    try:
+        for name, model in _estimators(args.n_estimators):
+            model.fit(features, target)
+            columns = list(features.columns)
+
+            def save_pickle(path):
+                with open(path, "wb") as handler:
+                    pickle.dump(model, handler)
+
+            def load_pickle(path):
+                with open(path, "rb") as handler:
+                    return pickle.load(handler)
+
+            cases = [("pickle", ".pkl", save_pickle, load_pickle)]
+            if joblib is not None:
+                cases.append(("joblib", ".joblib", lambda path: joblib.dump(model, path), joblib.load))
+            cases.append(("bundle", ".bundle", lambda path: write_bundle(path, model, columns), load_bundle))
+            cases.append((
+                "bundle+estimator",
+                ".bundle",
+                lambda path: write_bundle(path, model, columns),
+                lambda path: load_bundle(path).estimator(),
+            ))
+
+            baseline = None
+            for case, suffix, save, load in cases:
+                path = workdir / f"{name}-{case}{suffix}"
+                save_s = _timed(lambda: save(path), 3)
+                load_s = _timed(lambda: load(path), args.loads)
+                baseline = baseline or load_s
+                print(json.dumps({
+                    "estimator": name,
+                    "format": case,
+                    "size_kib": round(path.stat().st_size / 1024, 1),
+                    "save_ms": round(save_s * 1000, 3),
+                    "load_ms": round(load_s * 1000, 3),
+                    "load_speedup_vs_pickle": round(baseline / load_s, 2),
+                }))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
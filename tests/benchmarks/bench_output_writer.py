@@ -0,0 +1,87 @@
+"""
+Compara el tiempo de escritura y el tamaño de la salida de predicciones en CSV,
+Parquet y Feather (con y sin particionado).
+
+Uso:
+    PYTHONPATH=. python -m tests.benchmarks.bench_output_writer --data data/data.csv --repeat 10
+"""
+
+import argparse
+import json
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from challenge.output import PredictionWriter, read_predictions
+
+_ROOT = Path(__file__).resolve().parents[2]
+
+_CASES = [
+    {"name": "csv", "fmt": "csv", "suffix": ".csv"},
+    {"name": "parquet-snappy", "fmt": "parquet", "suffix": ".parquet", "compression": "snappy"},
+    {"name": "parquet-zstd", "fmt": "parquet", "suffix": ".parquet", "compression": "zstd"},
+    {"name": "feather-lz4", "fmt": "feather", "suffix": ".feather", "compression": "lz4"},
+    {"name": "feather-zstd", "fmt": "feather", "suffix": ".feather", "compression": "zstd"},
+    {"name": "parquet-partitioned", "fmt": "parquet", "suffix": "", "partition_by": ["MES", "OPERA"]},
+]
+
+
+def _size(path: Path) -> int:
+    if path.is_dir():
+        return sum(item.stat().st_size for item in path.rglob("*") if item.is_file())
+    return path.stat().st_size
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data", default=str(_ROOT / "data" / "data.csv"))
+    parser.add_argument("--repeat", type=int, default=10, help="Veces que se replica el dataset de entrada")
+    parser.add_argument("--columns", default=None, help="Subconjunto de columnas a escribir")
+    args = parser.parse_args()
+
+    frame = pd.read_csv(args.data, low_memory=False)
+    frame = pd.concat([frame] * args.repeat, ignore_index=True)
+    frame["predicted_delay"] = np.random.default_rng(7).integers(0, 2, size=len(frame))
+    columns = args.columns.split(",") if args.columns else None
+    print(json.dumps({"rows": len(frame), "columns": len(columns or frame.columns)}))
+
+    workdir = Path(tempfile.mkdtemp(prefix="bench-output-"))
+    try:
+        baseline = None
+        for case in _CASES:
+            target = workdir / f"{case['name']}{case['suffix']}"
+            started = time.perf_counter()
+            with PredictionWriter(
+                target,
+                fmt=case["fmt"],
+                columns=columns,
+                partition_by=case.get("partition_by"),
+                compression=case.get("compression", "default"),
+            ) as writer:
+                writer.write(frame)
+            write_s = time.perf_counter() - started
+
+            started = time.perf_counter()
+            read_predictions(target)
+            read_s = time.perf_counter() - started
+
+            size = _size(target)
+            baseline = baseline or {"write_s": write_s, "size": size}
+            print(json.dumps({
+                "case": case["name"],
+                "write_s": round(write_s, 3),
+                "read_s": round(read_s, 3),
+                "size_mib": round(size / 2**20, 2),
+                "write_speedup_vs_csv": round(baseline["write_s"] / write_s, 2),
+                "size_ratio_vs_csv": round(size / baseline["size"], 3),
+            }))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Mide el costo de ``run_pipeline.py --profile`` sobre una ejecución completa
+(``--mode both``): alterna corridas sin perfil y con cada modo de CPU, y
+compara el tiempo total y por etapa registrado en los manifiestos.
+
+El CSV de entrada se genera con ``challenge/synthetic.py`` a partir del perfil
+de ``data/data.csv``, con ``--rows`` filas.
+
+Uso:
+    PYTHONPATH=. python -m tests.benchmarks.bench_pipeline_profile --rows 200000 --repeats 3
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from challenge.manifest import load_index
+from challenge.synthetic import fit_profile, generate
+
+_ROOT = Path(__file__).resolve().parents[2]
+
+
+def _dataset(path: Path, rows: int) -> None:
+    generate(fit_profile(_ROOT / "data" / "data.csv"), rows, path)
+
+
+def _run(workdir: Path, data: Path, extra) -> None:
+    command = [
+        sys.executable,
+        str(_ROOT / "challenge" / "run_pipeline.py"),
+        "--mode", "both",
+        "--train_data", str(data),
+        "--predict_data", str(data),
+        "--output", str(workdir / "predicciones.csv"),
+        "--run_dir", str(workdir / "runs"),
+        *extra,
+    ]
+    subprocess.run(command, cwd=workdir, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--modes", default="sampled,deterministic")
+    args = parser.parse_args()
+
+    cases = {"none": []}
+    for mode in args.modes.split(","):
+        cases[mode] = ["--profile", "--profile_cpu", mode]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = Path(tmp)
+        data = workdir / "vuelos.csv"
+        _dataset(data, args.rows)
+        order = []
+        # Las corridas se intercalan para que la variación de la máquina afecte a todos los casos por igual.
+        for _ in range(args.repeats):
+            for name, extra in cases.items():
+                _run(workdir, data, extra)
+                order.append(name)
+        runs = load_index(workdir / "runs")
+
+    by_case = {name: [run for case, run in zip(order, runs) if case == name] for name in cases}
+    baseline = statistics.median(run["wall_seconds"] for run in by_case["none"])
+    for name, selected in by_case.items():
+        wall = statistics.median(run["wall_seconds"] for run in selected)
+        print(json.dumps({
+            "profile": name,
+            "rows": args.rows,
+            "wall_seconds": round(wall, 3),
+            "overhead": round(wall / baseline - 1, 4),
+            "stages": {
+                stage: round(statistics.median(run["stages"][stage]["wall_seconds"] for run in selected), 3)
+                for stage in selected[0]["stages"]
+            },
+        }))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+Compara el lanzador pre-fork contra N workers independientes de uvicorn.
+
+Para cada modo se levanta el servidor, se espera a que `/health` responda, se
+mide la memoria (RSS, PSS y única) de todo el árbol de procesos y el
+throughput de `/predict` con un lote representativo.
+
+Uso:
+    PYTHONPATH=. python -m tests.benchmarks.bench_prefork --workers 2
+"""
+
+import argparse
+import http.client
+import json
+import os
+import signal
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from challenge.api.serve import process_memory
+
+_ROOT = Path(__file__).resolve().parents[2]
+_OPERAS = ["Grupo LATAM", "Sky Airline", "Aerolineas Argentinas", "Copa Air", "Latin American Wings"]
+
+
+def _descendants(pid: int) -> list:
+    children = {}
+    for entry in Path("/proc").iterdir():
+        if not entry.name.isdigit():
+            continue
+        try:
+            stat = (entry / "stat").read_text()
+        except OSError:
+            continue
+        ppid = int(stat.rsplit(")", 1)[1].split()[1])
+        children.setdefault(ppid, []).append(int(entry.name))
+
+    found, pending = [], [pid]
+    while pending:
+        current = pending.pop()
+        found.append(current)
+        pending.extend(children.get(current, []))
+    return found
+
+
+def _wait_ready(port: int, timeout: float = 120.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            connection = http.client.HTTPConnection("127.0.0.1", port, timeout=2)
+            connection.request("GET", "/health")
+            if connection.getresponse().status == 200:
+                return
+        except OSError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"Server on port {port} did not become ready")
+
+
+def _load(port: int, requests: int, concurrency: int, batch: int) -> dict:
+    body = json.dumps({
+        "flights": [
+            {"OPERA": _OPERAS[i % len(_OPERAS)], "MES": i % 12 + 1, "TIPOVUELO": "NI"[i % 2]}
+            for i in range(batch)
+        ]
+    })
+
+    def worker(count: int) -> int:
+        connection = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+        ok = 0
+        for _ in range(count):
+            connection.request("POST", "/predict", body=body, headers={"Content-Type": "application/json"})
+            response = connection.getresponse()
+            response.read()
+            ok += response.status == 200
+        return ok
+
+    per_worker = [requests // concurrency] * concurrency
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        ok = sum(pool.map(worker, per_worker))
+    elapsed = time.perf_counter() - started
+    return {"requests": sum(per_worker), "ok": ok, "req_per_s": round(sum(per_worker) / elapsed, 1)}
+
+
+def _run(mode: str, command: list, args) -> dict:
+    env = dict(os.environ, PYTHONPATH=str(_ROOT), CHALLENGE_API_DISABLE_GCP="1", MODEL_LOCAL_PATH=args.model)
+    started = time.perf_counter()
+    process = subprocess.Popen(command, cwd=_ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        _wait_ready(args.port)
+        startup = time.perf_counter() - started
+        throughput = _load(args.port, args.requests, args.concurrency, args.batch)
+        usage = [process_memory(pid) for pid in _descendants(process.pid)]
+        totals = {
+            key: round(sum(item.get(key, 0) for item in usage) / 2**20, 1)
+            for key in ("rss_bytes", "pss_bytes", "uss_bytes")
+        }
+        return {
+            "mode": mode,
+            "processes": len(usage),
+            "startup_s": round(startup, 2),
+            "rss_mib": totals["rss_bytes"],
+            "pss_mib": totals["pss_bytes"],
+            "unique_mib": totals["uss_bytes"],
+            **throughput,
+        }
+    finally:
+        process.send_signal(signal.SIGTERM)
+        process.wait(timeout=30)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default=str(_ROOT / "challenge" / "xgb_model.pkl"))
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--port", type=int, default=8795)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--batch", type=int, default=32)
+    args = parser.parse_args()
+
+    prefork = [
+        sys.executable, "-m", "challenge.api.serve",
+        "--workers", str(args.workers), "--port", str(args.port), "--report_interval", "0", "--log_level", "warning",
+    ]
+    independent = [
+        sys.executable, "-m", "uvicorn", "challenge.api.api:app",
+        "--workers", str(args.workers), "--port", str(args.port), "--log-level", "warning",
+    ]
+    for mode, command in (("prefork", prefork), ("independent", independent)):
+        print(json.dumps(_run(mode, command, args)))
+
+
+if __name__ == "__main__":
+    main()
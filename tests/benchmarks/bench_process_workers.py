@@ -0,0 +1,97 @@
+"""
+Compara la inferencia en proceso contra el pool de workers con memoria compartida.
+
+Uso:
+    PYTHONPATH=. python -m tests.benchmarks.bench_process_workers --model challenge/xgb_model.pkl
+"""
+
+import argparse
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from challenge.api.bundle import load_model
+from challenge.api.workers import ProcessInferencePool, default_loader
+
+_ROOT = Path(__file__).resolve().parents[2]
+
+
+def _random_one_hot(rows: int, columns: list, rng: np.random.Generator) -> pd.DataFrame:
+    """Se genera una matriz one-hot con una categoría activa por grupo (OPERA, TIPOVUELO, MES)."""
+    groups = {}
+    for index, name in enumerate(columns):
+        groups.setdefault(name.split("_", 1)[0], []).append(index)
+
+    matrix = np.zeros((rows, len(columns)), dtype=np.float32)
+    for indices in groups.values():
+        matrix[np.arange(rows), rng.choice(indices, size=rows)] = 1.0
+    return pd.DataFrame(matrix, columns=columns)
+
+
+def _measure(fn, batches, concurrency: int) -> dict:
+    started = time.perf_counter()
+    if concurrency == 1:
+        latencies = []
+        for batch in batches:
+            t0 = time.perf_counter()
+            fn(batch)
+            latencies.append(time.perf_counter() - t0)
+    else:
+        def timed(batch):
+            t0 = time.perf_counter()
+            fn(batch)
+            return time.perf_counter() - t0
+
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            latencies = list(pool.map(timed, batches))
+    elapsed = time.perf_counter() - started
+    rows = sum(len(batch) for batch in batches)
+    return {
+        "p50_ms": round(float(np.percentile(latencies, 50)) * 1000, 3),
+        "p95_ms": round(float(np.percentile(latencies, 95)) * 1000, 3),
+        "rows_per_s": round(rows / elapsed, 1),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument(
+        "--model", default=str(_ROOT / "challenge" / "xgb_model.pkl"), help="Artefacto pickle o bundle"
+    )
+    parser.add_argument("--batch_sizes", default="1,64,1024,8192,32768")
+    parser.add_argument("--processes", type=int, default=2)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--rows_per_case", type=int, default=200_000)
+    parser.add_argument("--max_rows", type=int, default=8192)
+    args = parser.parse_args()
+
+    model = load_model(args.model)
+    columns = list(model.feature_names_in_)
+    rng = np.random.default_rng(7)
+    pool = ProcessInferencePool(
+        default_loader(args.model), n_features=len(columns), processes=args.processes, max_rows=args.max_rows
+    )
+
+    results = []
+    try:
+        for batch_size in (int(value) for value in args.batch_sizes.split(",")):
+            repeats = max(5, min(500, args.rows_per_case // batch_size))
+            frames = [_random_one_hot(batch_size, columns, rng) for _ in range(repeats)]
+            matrices = [frame.to_numpy(dtype=np.float32) for frame in frames]
+            results.append({
+                "batch_size": batch_size,
+                "batches": repeats,
+                "in_process": _measure(model.predict, frames, args.concurrency),
+                "process_pool": _measure(pool.predict, matrices, args.concurrency),
+            })
+            print(json.dumps(results[-1]))
+    finally:
+        pool.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""
+Mide las tasas históricas de retraso (``challenge/api/rates.py``): velocidad del
+gather sobre la tabla precalculada frente a un ``merge`` de pandas con las tasas
+agrupadas, tanto para el dataset completo como para un lote de la API
+(``ModelBundle.encode``), y ROC-AUC del holdout con y sin las tasas. La tabla se
+construye solo con la partición de entrenamiento.
+
+Uso:
+    PYTHONPATH=. python -m tests.benchmarks.bench_rate_features --rows 500000 --destinations 300 --estimator xgboost
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.metrics import roc_auc_score
+
+from challenge.api.bundle import load_bundle, write_bundle
+from challenge.api.rates import RATE_COLUMNS, DelayRateTable, LEVELS, feature_names
+from challenge.estimators import build_estimator, load_config
+from challenge.model import _rate_codes
+
+_AIRLINES = ["Grupo LATAM", "Sky Airline", "Copa Air", "Latin American Wings", "JetSmart SPA", "Aerolineas Argentinas"]
+
+
+def _flights(rows: int, destinations: int) -> pd.DataFrame:
+    rng = np.random.default_rng(23)
+    names = np.asarray([f"Destino {index}" for index in range(destinations)])
+    popularity = 1.0 / np.arange(1, destinations + 1)
+    raw = pd.DataFrame({
+        "OPERA": rng.choice(_AIRLINES, rows),
+        "TIPOVUELO": rng.choice(["I", "N"], rows),
+        "MES": rng.integers(1, 13, rows),
+        "SIGLADES": rng.choice(names, rows, p=popularity / popularity.sum()),
+    })
+    # El riesgo depende de la ruta (aerolínea x destino) y de su estacionalidad, no solo de cada columna.
+    route = pd.factorize(raw["OPERA"] + "|" + raw["SIGLADES"], sort=True)[0]
+    risk = rng.normal(0, 0.8, route.max() + 1)[route]
+    seasonal = rng.normal(0, 0.5, (route.max() + 1, 13))[route, raw["MES"].to_numpy()]
+    logit = -1.6 + risk + seasonal + 0.3 * (raw["MES"] == 12)
+    raw["delay"] = (rng.random(rows) < 1 / (1 + np.exp(-logit))).astype(int)
+    for column in ("OPERA", "TIPOVUELO", "SIGLADES"):
+        raw[column] = raw[column].astype("category")
+    return raw
+
+
+def _timed(function, repeats: int):
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        result = function()
+        timings.append(time.perf_counter() - started)
+    return result, float(np.median(timings))
+
+
+def _lookups(table: DelayRateTable) -> dict:
+    """Las mismas tasas como una Serie por nivel indexada por sus categorías (sin el código 0)."""
+    # Los niveles sin destino o sin mes toman la rebanada 0 del eje que no usan.
+    cells = {
+        ("OPERA", "MES"): table.table[1:, 0, 1:, 0],
+        ("OPERA", "SIGLADES"): table.table[1:, 1:, 0, 1],
+        ("OPERA", "SIGLADES", "MES"): table.table[1:, 1:, 1:, 2],
+    }
+    return {
+        name: pd.Series(
+            cells[level].ravel(),
+            index=pd.MultiIndex.from_product([table.vocabularies[column] for column in level], names=level),
+            name=name,
+        )
+        for level, name in zip(LEVELS, feature_names())
+    }
+
+
+def _merged(lookups: dict, frame: pd.DataFrame) -> np.ndarray:
+    """Alternativa con joins: la Serie de cada nivel unida al lote con ``merge``."""
+    columns = []
+    for level, name in zip(LEVELS, feature_names()):
+        joined = frame[list(level)].merge(lookups[name], left_on=list(level), right_index=True, how="left")
+        columns.append(joined[name].to_numpy(dtype=np.float32))
+    return np.column_stack(columns)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--destinations", type=int, default=200)
+    parser.add_argument("--estimator", default="logistic_regression", choices=["logistic_regression", "xgboost"])
+    parser.add_argument("--batch_size", type=int, default=256)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    raw = _flights(args.rows, args.destinations)
+    split = int(len(raw) * 0.67)
+    train, test = raw.iloc[:split], raw.iloc[split:]
+
+    started = time.perf_counter()
+    table = DelayRateTable()
+    codes = [_rate_codes(table, train[column], grow=True) for column in RATE_COLUMNS]
+    table.add(codes, train["delay"].to_numpy())
+    train_rates = table.out_of_fold(codes, train["delay"].to_numpy())
+    build_seconds = time.perf_counter() - started
+
+    gather = lambda frame: table.gather([_rate_codes(table, frame[column]) for column in RATE_COLUMNS])  # noqa: E731
+    test_rates, gather_seconds = _timed(lambda: gather(test), args.repeats)
+    lookups = _lookups(table)
+    plain = test[list(RATE_COLUMNS)].astype(object)
+    merged, merge_seconds = _timed(lambda: _merged(lookups, plain), args.repeats)
+    # Las categorías que no están en el entrenamiento quedan en NaN con merge.
+    known = ~np.isnan(merged)
+    assert np.allclose(merged[known], test_rates[known])
+
+    one_hot = pd.get_dummies(raw[["OPERA", "TIPOVUELO", "MES"]].astype({"MES": "category"})).astype(np.float32)
+    with_rates = pd.concat(
+        [one_hot, pd.DataFrame(np.vstack([train_rates, test_rates]), index=raw.index, columns=feature_names())], axis=1
+    )
+    config = load_config(environ={})
+    config["estimator"] = args.estimator
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for name, features in (("one_hot", one_hot), ("one_hot+rates", with_rates)):
+            model = build_estimator(config)
+            started = time.perf_counter()
+            model.fit(features.iloc[:split], train["delay"])
+            fit_seconds = time.perf_counter() - started
+            scores = model.predict_proba(features.iloc[split:])[:, 1]
+            result = {
+                "features": name,
+                "width": features.shape[1],
+                "fit_seconds": round(fit_seconds, 3),
+                "roc_auc": round(float(roc_auc_score(test["delay"], scores)), 4),
+            }
+            if name == "one_hot+rates":
+                path = os.path.join(workdir, "rates.bundle")
+                write_bundle(path, model, list(features.columns), rates=table)
+                bundle = load_bundle(path)
+                batch = raw.iloc[split:split + args.batch_size]
+                columns = ("OPERA", "TIPOVUELO", "MES", "SIGLADES")
+                records = {column: batch[column].astype(object).tolist() for column in columns}
+                _, batch_seconds = _timed(lambda: bundle.encode(records), args.repeats * 10)
+                _, batch_merge_seconds = _timed(lambda: _merged(lookups, pd.DataFrame(records)), args.repeats * 10)
+                result.update(
+                    table_shape=list(table.shape),
+                    table_kib=round(table.table.nbytes / 1024, 1),
+                    build_seconds=round(build_seconds, 4),
+                    gather_rows_per_second=round(len(test) / gather_seconds),
+                    merge_rows_per_second=round(len(test) / merge_seconds),
+                    api_batch_encode_ms=round(batch_seconds * 1000, 3),
+                    api_batch_merge_ms=round(batch_merge_seconds * 1000, 3),
+                )
+            results.append(result)
+    for result in results:
+        print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    main()
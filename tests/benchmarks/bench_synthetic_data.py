@@ -0,0 +1,46 @@
+"""
+Mide el throughput del generador de datasets sintéticos (``challenge/synthetic.py``)
+para cada formato y cantidad de procesos: filas por segundo y tamaño del archivo.
+El perfil se aprende una sola vez de ``--data``.
+
+Uso:
+    PYTHONPATH=. python -m tests.benchmarks.bench_synthetic_data --rows 1000000 --jobs 1,4 --formats csv,parquet
+"""
+
+import argparse
+import json
+import tempfile
+from pathlib import Path
+
+from challenge.synthetic import fit_profile, generate
+
+_ROOT = Path(__file__).resolve().parents[2]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data", default=str(_ROOT / "data" / "data.csv"))
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--chunk_rows", type=int, default=250_000)
+    parser.add_argument("--jobs", default="1")
+    parser.add_argument("--formats", default="csv,parquet")
+    args = parser.parse_args()
+
+    profile = fit_profile(args.data)
+    with tempfile.TemporaryDirectory() as tmp:
+        for fmt in args.formats.split(","):
+            for jobs in (int(value) for value in args.jobs.split(",")):
+                path = Path(tmp) / f"vuelos.{fmt}"
+                stats = generate(profile, args.rows, path, chunk_rows=args.chunk_rows, n_jobs=jobs, fmt=fmt)
+                print(json.dumps({
+                    "format": fmt,
+                    "jobs": stats["jobs"],
+                    "rows": args.rows,
+                    "seconds": stats["seconds"],
+                    "rows_per_second": stats["rows_per_second"],
+                    "size_bytes": path.stat().st_size,
+                }))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Mide el tiempo de entrenamiento de DelayModel con distintas cantidades de
+núcleos (``n_jobs``) y, para XGBoost, con cada método de construcción de
+árboles; la parada temprana puede activarse para comparar iteraciones.
+
+Uso:
+    PYTHONPATH=. python -m tests.benchmarks.bench_training_threads --rows 200000 --jobs 1,2,4
+"""
+
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from challenge.estimators import build_estimator, fit_params, iterations, load_config, training_threads
+
+
+def _features(rows: int):
+    rng = np.random.default_rng(11)
+    raw = pd.DataFrame({
+        "OPERA": rng.choice(["Grupo LATAM", "Sky Airline", "Copa Air", "Latin American Wings"], rows),
+        "TIPOVUELO": rng.choice(["I", "N"], rows),
+        "MES": rng.integers(1, 13, rows),
+    })
+    features = pd.get_dummies(raw, columns=["OPERA", "TIPOVUELO", "MES"]).astype(np.float32)
+    target = ((raw["MES"] == 12) | (raw["TIPOVUELO"] == "I") & (rng.random(rows) < 0.3) | (rng.random(rows) < 0.1))
+    return features, target.astype(int)
+
+
+def _cases(tree_methods):
+    yield "logistic_regression", {"estimator": "logistic_regression"}
+    try:
+        import xgboost  # noqa: F401
+    except ImportError:
+        return
+    for method in tree_methods:
+        yield f"xgboost/{method}", {"estimator": "xgboost", "xgboost": {"tree_method": method}}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--jobs", default=",".join(str(2**i) for i in range(4) if 2**i <= (os.cpu_count() or 1)))
+    parser.add_argument("--tree_methods", default="hist,approx,exact")
+    parser.add_argument("--n_estimators", type=int, default=200)
+    parser.add_argument("--early_stopping_rounds", type=int, default=None)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    features, target = _features(args.rows)
+    split = int(len(features) * 0.67)
+    X_train, X_test = features.iloc[:split], features.iloc[split:]
+    y_train, y_test = target.iloc[:split], target.iloc[split:]
+
+    for name, overrides in _cases(args.tree_methods.split(",")):
+        baseline = None
+        for jobs in (int(value) for value in args.jobs.split(",")):
+            config = load_config(environ={})
+            config.update(estimator=overrides["estimator"], n_jobs=jobs)
+            config["xgboost"].update(
+                overrides.get("xgboost", {}),
+                n_estimators=args.n_estimators,
+                early_stopping_rounds=args.early_stopping_rounds,
+            )
+            timings = []
+            for _ in range(args.repeats):
+                model = build_estimator(config)
+                started = time.perf_counter()
+                with training_threads(jobs):
+                    model.fit(X_train, y_train, **fit_params(model, (X_test, y_test)))
+                timings.append(time.perf_counter() - started)
+            seconds = float(np.median(timings))
+            baseline = baseline or seconds
+            print(json.dumps({
+                "estimator": name,
+                "n_jobs": jobs,
+                "rows": len(X_train),
+                "fit_seconds": round(seconds, 4),
+                "speedup_vs_first": round(baseline / seconds, 2),
+                "iterations": iterations(model),
+            }))
+
+
+if __name__ == "__main__":
+    main()
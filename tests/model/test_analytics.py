@@ -0,0 +1,77 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from challenge.analytics import DEFAULT_GROUPS, DelayRateProfiler, delay_rates, parse_groups, profile_file
+
+
+def _flights(rows: int = 3000, seed: int = 11) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    scheduled = pd.Timestamp("2017-01-01") + pd.to_timedelta(rng.integers(0, 365 * 24 * 60, rows), unit="min")
+    frame = pd.DataFrame({
+        "Fecha-I": scheduled.strftime("%Y-%m-%d %H:%M:%S"),
+        "Fecha-O": (scheduled + pd.to_timedelta(rng.integers(-10, 60, rows), unit="min")).strftime("%Y-%m-%d %H:%M:%S"),
+        "OPERA": rng.choice(["Grupo LATAM", "Sky Airline", "Copa Air"], rows),
+        "TIPOVUELO": rng.choice(["I", "N"], rows),
+        "MES": scheduled.month,
+        "DIANOM": rng.choice(["Lunes", "Martes", "Sabado"], rows),
+        "SIGLADES": rng.choice(["Lima", "Arica", "Miami"], rows).astype(object),
+    })
+    frame.loc[::97, "SIGLADES"] = None
+    return frame
+
+
+def _reference(frame: pd.DataFrame, group) -> dict:
+    delay = (pd.to_datetime(frame["Fecha-O"]) - pd.to_datetime(frame["Fecha-I"])).dt.total_seconds() / 60 > 15
+    counts = delay.astype(int).groupby([frame[col] for col in group], dropna=False).agg(["sum", "count"])
+    return {
+        tuple(None if pd.isna(value) else value for value in (key if isinstance(key, tuple) else (key,))):
+            (int(row["sum"]), int(row["count"]))
+        for key, row in counts.iterrows()
+    }
+
+
+class TestDelayRates(unittest.TestCase):
+    def test_single_pass_matches_per_column_counts_for_simple_and_crossed_groups(self) -> None:
+        frame = _flights()
+        groups = parse_groups("OPERA,SIGLADES,MES,OPERA:TIPOVUELO,period_day")
+
+        report = delay_rates(frame, groups)
+
+        self.assertEqual(report["rows"], len(frame))
+        for group in (("OPERA",), ("SIGLADES",), ("MES",), ("OPERA", "TIPOVUELO")):
+            rows = report["groups"][":".join(group)]
+            got = {tuple(row[col] for col in group): (row["delays"], row["flights"]) for row in rows}
+            self.assertEqual(got, _reference(frame, group))
+            self.assertEqual([row["flights"] for row in rows], sorted((row["flights"] for row in rows), reverse=True))
+        # Los faltantes forman su propia categoría y las derivadas salen de Fecha-I.
+        self.assertIn(None, [row["SIGLADES"] for row in report["groups"]["SIGLADES"]])
+        self.assertEqual({row["period_day"] for row in report["groups"]["period_day"]}, {"mañana", "tarde", "noche"})
+        latam = next(row for row in report["groups"]["OPERA"] if row["OPERA"] == "Grupo LATAM")
+        self.assertAlmostEqual(latam["delay_rate"], latam["delays"] / latam["flights"], places=6)
+        self.assertAlmostEqual(latam["lift"], latam["delay_rate"] / report["delay_rate"], places=3)
+        self.assertEqual(parse_groups(None), list(DEFAULT_GROUPS))
+
+    def test_streamed_file_matches_the_in_memory_report(self) -> None:
+        frame = _flights(rows=5000)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "vuelos.csv"
+            frame.to_csv(path, index=False)
+            streamed = profile_file(path, DEFAULT_GROUPS, chunksize=333)
+
+        in_memory = DelayRateProfiler(DEFAULT_GROUPS).add_all([frame]).report()
+        self.assertEqual(streamed["chunks"], 16)
+        for report in (streamed, in_memory):
+            report.pop("timings")
+            report.pop("chunks")
+        self.assertEqual(json.dumps(streamed, sort_keys=True), json.dumps(in_memory, sort_keys=True))
+        filtered = delay_rates(frame, [("MES",)], min_flights=10_000)
+        self.assertEqual(filtered["groups"]["MES"], [])
+
+
+if __name__ == "__main__":
+    unittest.main()
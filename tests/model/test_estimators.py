@@ -0,0 +1,97 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+from sklearn.linear_model import LogisticRegression
+
+from challenge.estimators import build_estimator, fit_params, iterations, load_config, stopping_split
+
+try:
+    import xgboost  # noqa: F401
+
+    HAS_XGBOOST = True
+except ImportError:  # pragma: no cover - XGBoost es opcional
+    HAS_XGBOOST = False
+
+
+class TestEstimatorConfig(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        rng = np.random.default_rng(2)
+        self.features = rng.normal(size=(2000, 4))
+        self.target = (self.features[:, 0] + rng.normal(size=2000) > 1).astype(int)
+
+    def test_file_then_environment_precedence(self) -> None:
+        with tempfile.TemporaryDirectory() as workdir:
+            path = Path(workdir) / "estimator.json"
+            path.write_text(json.dumps({
+                "n_jobs": 2,
+                "xgboost": {"tree_method": "approx", "early_stopping_rounds": 10},
+                "logistic_regression": {"solver": "liblinear"},
+            }))
+            config = load_config(path, environ={
+                "DELAY_MODEL_TREE_METHOD": "hist",
+                "DELAY_MODEL_EARLY_STOPPING_ROUNDS": "none",
+            })
+
+        self.assertEqual(config["estimator"], "logistic_regression")
+        self.assertEqual(config["n_jobs"], 2)
+        self.assertEqual(config["xgboost"]["tree_method"], "hist")
+        self.assertIsNone(config["xgboost"]["early_stopping_rounds"])
+        # Las claves no mencionadas conservan su valor por defecto.
+        self.assertEqual(config["xgboost"]["n_estimators"], 200)
+        self.assertEqual(config["logistic_regression"]["solver"], "liblinear")
+        self.assertEqual(load_config(environ={"USE_XGBOOST": "1"})["estimator"], "xgboost")
+
+    def test_invalid_values_are_rejected(self) -> None:
+        with self.assertRaises(ValueError):
+            load_config(environ={"DELAY_MODEL_SOLVER": "adam"})
+        with self.assertRaises(ValueError):
+            load_config(environ={"DELAY_MODEL_N_JOBS": "0"})
+
+    def test_linear_model_uses_configured_solver_and_reports_iterations(self) -> None:
+        config = load_config(environ={"DELAY_MODEL_SOLVER": "newton-cg"})
+        model = build_estimator(config)
+
+        self.assertIsInstance(model, LogisticRegression)
+        self.assertEqual(model.solver, "newton-cg")
+        self.assertEqual(fit_params(model), {})
+        model.fit(self.features, self.target)
+        report = iterations(model)
+        self.assertGreater(report["n_iter"], 0)
+        self.assertTrue(report["converged"])
+
+    @unittest.skipUnless(HAS_XGBOOST, "XGBoost no está instalado")
+    def test_xgboost_stops_early_on_validation_set(self) -> None:
+        config = load_config(environ={
+            "DELAY_MODEL_ESTIMATOR": "xgboost",
+            "DELAY_MODEL_N_JOBS": "1",
+            "DELAY_MODEL_N_ESTIMATORS": "3000",
+            "DELAY_MODEL_EARLY_STOPPING_ROUNDS": "5",
+        })
+        model = build_estimator(config)
+
+        self.assertEqual(model.get_params()["tree_method"], "hist")
+        with self.assertRaises(ValueError):
+            fit_params(model)
+        features, target, eval_set = stopping_split(model, self.features[:1500], self.target[:1500])
+        model.fit(features, target, **fit_params(model, eval_set))
+        report = iterations(model)
+        self.assertTrue(report["stopped_early"])
+        self.assertEqual(report["boosted_rounds"], report["best_iteration"] + 6)
+
+    def test_stopping_split_reserves_part_of_the_training_rows(self) -> None:
+        linear = build_estimator(load_config(environ={"DELAY_MODEL_ESTIMATOR": "logistic_regression"}))
+        features, target, eval_set = stopping_split(linear, self.features, self.target)
+        self.assertIs(features, self.features)
+        self.assertIsNone(eval_set)
+
+        model = LogisticRegression()
+        model.early_stopping_rounds = 5
+        features, target, (stop_features, stop_target) = stopping_split(model, self.features, self.target)
+        self.assertEqual((len(features), len(stop_features)), (1800, 200))
+        self.assertAlmostEqual(stop_target.mean(), self.target.mean(), places=2)
+        seen = {row.tobytes() for row in features}
+        self.assertFalse(any(row.tobytes() in seen for row in stop_features))
@@ -0,0 +1,59 @@
+import unittest
+
+import numpy as np
+from sklearn.metrics import confusion_matrix, f1_score, precision_score, recall_score, roc_auc_score
+
+from challenge.evaluation import evaluate_binary
+
+
+class TestEvaluateBinary(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        rng = np.random.default_rng(3)
+        self.y_true = rng.integers(0, 2, 5000)
+        # Puntajes redondeados para forzar empates en el cálculo del AUC.
+        self.scores = np.round(np.clip(rng.normal(0.4 + 0.2 * self.y_true, 0.2), 0, 1), 2)
+
+    def test_point_metrics_match_sklearn(self) -> None:
+        report = evaluate_binary(self.y_true, self.scores, n_bootstrap=0)
+        predicted = self.scores > 0.5
+
+        tn, fp, fn, tp = confusion_matrix(self.y_true, predicted).ravel()
+        self.assertEqual(report["confusion_matrix"], {"tn": tn, "fp": fp, "fn": fn, "tp": tp})
+        self.assertAlmostEqual(report["metrics"]["precision"], precision_score(self.y_true, predicted))
+        self.assertAlmostEqual(report["metrics"]["recall"], recall_score(self.y_true, predicted))
+        self.assertAlmostEqual(report["metrics"]["f1"], f1_score(self.y_true, predicted))
+        self.assertAlmostEqual(report["metrics"]["roc_auc"], roc_auc_score(self.y_true, self.scores))
+
+    def test_bootstrap_intervals_are_reproducible_across_jobs(self) -> None:
+        serial = evaluate_binary(self.y_true, self.scores, n_bootstrap=60, n_jobs=1)
+        parallel = evaluate_binary(self.y_true, self.scores, n_bootstrap=60, n_jobs=2)
+
+        self.assertEqual(serial["confidence_intervals"], parallel["confidence_intervals"])
+        interval = serial["confidence_intervals"]["roc_auc"]
+        self.assertLess(interval["low"], serial["metrics"]["roc_auc"])
+        self.assertGreater(interval["high"], serial["metrics"]["roc_auc"])
+
+    def test_single_class_holdout_reports_undefined_auc(self) -> None:
+        report = evaluate_binary([0, 0, 0], [0.2, 0.7, 0.1], n_bootstrap=10)
+
+        self.assertIsNone(report["metrics"]["roc_auc"])
+        self.assertIsNone(report["confidence_intervals"]["roc_auc"]["low"])
+        self.assertEqual(report["confusion_matrix"]["fp"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
+
+    def test_sample_weights_match_sklearn(self) -> None:
+        weights = np.where(self.y_true == 0, 4.0, 1.0)
+        report = evaluate_binary(self.y_true, self.scores, n_bootstrap=0, sample_weight=weights)
+        predicted = self.scores > 0.5
+
+        tn, fp, fn, tp = confusion_matrix(self.y_true, predicted, sample_weight=weights).ravel()
+        self.assertEqual(report["confusion_matrix"], {"tn": tn, "fp": fp, "fn": fn, "tp": tp})
+        self.assertAlmostEqual(report["metrics"]["f1"], f1_score(self.y_true, predicted, sample_weight=weights))
+        self.assertAlmostEqual(
+            report["metrics"]["roc_auc"], roc_auc_score(self.y_true, self.scores, sample_weight=weights)
+        )
+        self.assertAlmostEqual(report["positive_rate"], np.average(self.y_true, weights=weights))
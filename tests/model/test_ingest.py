@@ -0,0 +1,54 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+import pandas as pd
+
+from challenge.ingest import read_flights
+
+
+class TestReadFlights(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.path = Path(self._tmp.name) / "vuelos.csv"
+        pd.DataFrame(
+            {
+                "Fecha-I": ["2017-01-01 23:30:00", "2017-01-02 10:00:00", "sin fecha"],
+                "Vlo-I": ["226", "989P", "11"],
+                "Fecha-O": ["2017-01-01 23:33:00", "2017-01-02 10:20:00", "2017-01-03 08:00:00"],
+                "MES": [1, 1, 1],
+                "OPERA": ["Grupo LATAM", "Sky Airline", "Grupo LATAM"],
+                "TIPOVUELO": ["I", "N", "N"],
+                "SIGLADES": ["Miami", "Lima", "Lima"],
+            }
+        ).to_csv(self.path, index=False)
+
+    def test_schema_is_applied_at_read_time(self) -> None:
+        data, stats = read_flights(self.path)
+
+        self.assertTrue(pd.api.types.is_datetime64_dtype(data["Fecha-I"]))
+        self.assertTrue(pd.isna(data.loc[2, "Fecha-I"]))
+        self.assertEqual(data["MES"].dtype, "int8")
+        for col in ("OPERA", "TIPOVUELO", "SIGLADES", "Vlo-I"):
+            self.assertIsInstance(data[col].dtype, pd.CategoricalDtype)
+        self.assertEqual(stats["rows"], 3)
+        self.assertGreater(stats["memory_bytes"], 0)
+
+    def test_only_requested_columns_are_read(self) -> None:
+        data, stats = read_flights(self.path, columns=["OPERA", "MES", "delay"])
+
+        self.assertListEqual(list(data.columns), ["MES", "OPERA"])
+        self.assertEqual(stats["columns"], 2)
+
+    def test_pyarrow_engine_matches_default_parser(self) -> None:
+        expected, _ = read_flights(self.path)
+        data, stats = read_flights(self.path, engine="pyarrow")
+
+        self.assertEqual(stats["engine"], "pyarrow")
+        pd.testing.assert_frame_equal(data, expected, check_categorical=False)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from sklearn.linear_model import LogisticRegression
+
+from challenge.manifest import RunManifest, estimator_config, fingerprint, load_index, stage_trend
+
+
+class TestRunManifest(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.root = Path(self._tmp.name)
+
+    def test_stages_inputs_and_artifacts_are_recorded(self) -> None:
+        data_path = self.root / "data.csv"
+        data_path.write_text("OPERA,MES\nGrupo LATAM,1\n")
+        manifest = RunManifest(self.root / "runs", mode="train", arguments={"train_data": str(data_path)})
+        manifest.add_input("train_data", data_path)
+
+        with manifest.stage("train/read_csv") as info:
+            info["rows"] = 1
+        with self.assertRaises(RuntimeError):
+            with manifest.stage("train/fit"):
+                raise RuntimeError("fallo")
+        manifest.set("estimator", estimator_config(LogisticRegression(max_iter=10)))
+        path = manifest.finish(status="failed", error="fallo")
+
+        written = json.loads(path.read_text())
+        self.assertEqual([stage["name"] for stage in written["stages"]], ["train/read_csv", "train/fit"])
+        self.assertEqual(written["stages"][0]["rows"], 1)
+        self.assertEqual(written["stages"][1]["status"], "failed")
+        self.assertGreater(written["stages"][0]["peak_memory_bytes"], 0)
+        self.assertEqual(written["inputs"]["train_data"]["sha256"], fingerprint(data_path)["sha256"])
+        self.assertEqual(written["estimator"]["params"]["max_iter"], 10)
+        self.assertEqual(written["status"], "failed")
+
+    def test_index_supports_trend_queries(self) -> None:
+        for _ in range(3):
+            manifest = RunManifest(self.root / "runs", mode="train")
+            with manifest.stage("train/fit"):
+                pass
+            manifest.finish()
+        other = RunManifest(self.root / "runs", mode="predict")
+        other.finish()
+
+        runs = load_index(self.root / "runs")
+        self.assertEqual(len(runs), 4)
+        trend = stage_trend(runs, "train/fit", mode="train")
+        self.assertEqual(len(trend), 3)
+        self.assertIsNone(trend[0]["change"])
+        self.assertIn("wall_seconds", trend[-1])
+
+    def test_directory_fingerprint_changes_with_contents(self) -> None:
+        directory = self.root / "particionado"
+        (directory / "MES=1").mkdir(parents=True)
+        part = directory / "MES=1" / "part-00000.csv"
+        part.write_text("a\n1\n")
+        before = fingerprint(directory)
+        part.write_text("a\n2\n")
+
+        self.assertEqual(before["files"], 1)
+        self.assertNotEqual(before["sha256"], fingerprint(directory)["sha256"])
+        self.assertFalse(fingerprint(self.root / "missing.csv")["exists"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,9 +1,14 @@
+import json
+import tempfile
 import unittest
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
 import pandas.testing as pdt
 
+from challenge.api.bundle import load_bundle
+from challenge.estimators import load_config
 from challenge.model import DelayModel
 
 
@@ -12,7 +17,8 @@ class TestDelayModel(unittest.TestCase):
     def setUpClass(cls) -> None:
         super().setUpClass()
         cls._data_path = Path(__file__).resolve().parents[2] / "data" / "data.csv"
-        cls._artifact_path = Path(__file__).resolve().parents[2] / "xgb_model.pkl"
+        cls._artifact_path = Path(__file__).resolve().parents[2] / "xgb_model.bundle"
+        cls._report_path = Path(__file__).resolve().parents[2] / "xgb_model.evaluation.json"
         cls._raw_data = pd.read_csv(cls._data_path, low_memory=False)
 
     def setUp(self) -> None:
@@ -39,8 +45,9 @@ class TestDelayModel(unittest.TestCase):
         return expected
 
     def _cleanup_artifact(self) -> None:
-        if self._artifact_path.exists():
-            self._artifact_path.unlink()
+        for path in (self._artifact_path, self._report_path):
+            if path.exists():
+                path.unlink()
 
     def test_preprocess_for_training_matches_expected_engineering(self) -> None:
         features, target = self.model.preprocess(data=self._raw_data, target_column="delay")
@@ -64,6 +71,17 @@ class TestDelayModel(unittest.TestCase):
         self.assertIsNotNone(self.model._feature_columns)
         self.assertListEqual(self.model._feature_columns, list(features.columns))
 
+    def test_preprocess_on_typed_ingestion_matches_raw_csv(self) -> None:
+        typed_data, stats = self.model.load_data(str(self._data_path), extra_columns=[])
+
+        self.assertEqual(stats["rows"], len(self._raw_data))
+        self.assertLess(stats["memory_bytes"], self._raw_data.memory_usage(deep=True).sum())
+
+        features, target = self.model.preprocess(data=typed_data, target_column="delay")
+
+        pdt.assert_frame_equal(features, self._expected_features(), check_dtype=False)
+        pdt.assert_series_equal(target, self._expected_target(), check_dtype=False)
+
     def test_fit_and_predict_end_to_end(self) -> None:
         features, target = self.model.preprocess(data=self._raw_data, target_column="delay")
 
@@ -71,6 +89,16 @@ class TestDelayModel(unittest.TestCase):
 
         self.assertIsNotNone(self.model._model)
         self.assertTrue(self._artifact_path.exists())
+        self.assertTrue(self._report_path.exists())
+        report = json.loads(self._report_path.read_text())
+        self.assertEqual(report["rows"] + report["train_rows"], len(features))
+        self.assertEqual(sum(report["confusion_matrix"].values()), report["rows"])
+        self.assertIn("roc_auc", report["confidence_intervals"])
+        self.assertTrue(report["iterations"]["converged"])
+        self.assertEqual(report["estimator_config"]["estimator"], "logistic_regression")
+        training = load_bundle(self._artifact_path).training
+        self.assertEqual(training["train_rows"], report["train_rows"])
+        self.assertEqual(sum(training["category_counts"]["TIPOVUELO"].values()), report["train_rows"])
 
         inference_batch = features.head(32).copy()
         predictions = self.model.predict(features=inference_batch)
@@ -82,3 +110,83 @@ class TestDelayModel(unittest.TestCase):
         reload_predictions = self.model.predict(features=inference_batch.copy())
         self.assertEqual(len(reload_predictions), inference_batch.shape[0])
         self.assertTrue(all(pred in (0, 1) for pred in reload_predictions))
+
+        # Un proceso nuevo no tiene el orden de columnas en memoria: el bundle lo provee.
+        fresh_model = DelayModel()
+        shuffled = inference_batch[list(reversed(inference_batch.columns))].drop(columns=inference_batch.columns[0])
+        self.assertListEqual(fresh_model.predict(features=shuffled), predictions)
+
+    def test_fit_with_downsampling_keeps_corrected_threshold(self) -> None:
+        features, target = self.model.preprocess(data=self._raw_data, target_column="delay")
+
+        self.model.fit(features=features, target=target, sampling_ratio=1.0, correction="threshold")
+
+        report = json.loads(self._report_path.read_text())
+        sampling = report["sampling"]
+        self.assertLess(report["train_rows"], sampling["available_rows"])
+        self.assertGreater(self.model._threshold, 0.5)
+        self.assertEqual(report["threshold"], self.model._threshold)
+        bundle = load_bundle(self._artifact_path)
+        self.assertAlmostEqual(bundle.threshold, self.model._threshold)
+        self.assertEqual(bundle.training["sampling"]["train_rows"], report["train_rows"])
+
+        inference_batch = features.head(200).copy()
+        predictions = self.model.predict(features=inference_batch)
+        self.assertListEqual(DelayModel().predict(features=inference_batch), predictions)
+
+    def test_hashed_columns_add_a_fixed_width_block_shared_with_the_bundle(self) -> None:
+        config = load_config(environ={})
+        config["features"].update(hashed_columns=["SIGLADES", "DIANOM"], hash_features=16)
+        model = DelayModel(config=config)
+
+        features, target = model.preprocess(data=self._raw_data, target_column="delay")
+
+        hashed = [f"hashed_{index}" for index in range(16)]
+        self.assertListEqual(features.columns[-16:].tolist(), hashed)
+        pdt.assert_frame_equal(features.drop(columns=hashed), self._expected_features(), check_dtype=False)
+        # Un token por columna hasheada en cada fila.
+        self.assertTrue((features[hashed].abs().sum(axis=1) <= 2).all())
+
+        model.fit(features=features, target=target)
+
+        bundle = load_bundle(self._artifact_path)
+        self.assertEqual(bundle.hashing["columns"], ["SIGLADES", "DIANOM"])
+        sample = self._raw_data.head(300)
+        columns = list(bundle.schema) + bundle.hashing["columns"]
+        encoded = bundle.encode({column: sample[column].tolist() for column in columns})
+        self.assertTrue((encoded == features.head(300)[bundle.feature_columns].to_numpy(dtype="float32")).all())
+
+    def test_rate_features_are_out_of_fold_in_training_and_gathered_from_the_bundle(self) -> None:
+        config = load_config(environ={})
+        config["features"].update(rate_features=True, rate_folds=4)
+        model = DelayModel(config=config)
+
+        features, target = model.preprocess(data=self._raw_data, target_column="delay")
+
+        rates = ["rate_OPERA_MES", "rate_OPERA_SIGLADES", "rate_OPERA_SIGLADES_MES"]
+        self.assertListEqual(features.columns[-3:].tolist(), rates)
+        pdt.assert_frame_equal(features.drop(columns=rates), self._expected_features(), check_dtype=False)
+        self.assertTrue(features[rates].apply(lambda column: column.between(0, 1)).all().all())
+        # Las filas de entrenamiento no reciben las tasas de la tabla completa, que incluyen su etiqueta.
+        served = model.preprocess(data=self._raw_data)
+        self.assertFalse(np.allclose(served[rates].to_numpy(), features[rates].to_numpy()))
+
+        model.fit(features=features, target=target)
+
+        bundle = load_bundle(self._artifact_path)
+        self.assertEqual(bundle.format_version, 4)
+        self.assertEqual(bundle.header["rates"]["rows"], len(self._raw_data))
+        sample = self._raw_data.head(300)
+        encoded = bundle.encode({column: sample[column].tolist() for column in list(bundle.schema) + ["SIGLADES"]})
+        np.testing.assert_allclose(encoded, served.head(300)[bundle.feature_columns].to_numpy(dtype="float32"))
+
+        with tempfile.TemporaryDirectory() as tmp:
+            month = Path(tmp) / "mes.csv"
+            self._raw_data.head(500).to_csv(month, index=False)
+            stats = DelayModel(config=config).update_rates(str(month))
+
+        self.assertEqual(stats["rows"], 500)
+        updated = load_bundle(self._artifact_path)
+        self.assertEqual(updated.rates.rows, len(self._raw_data) + 500)
+        # Solo cambia la tabla; el estimador queda igual.
+        np.testing.assert_array_equal(updated.arrays["linear/coef"], bundle.arrays["linear/coef"])
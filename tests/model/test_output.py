@@ -0,0 +1,79 @@
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import pandas as pd
+import pandas.testing as pdt
+
+from challenge.output import PredictionWriter, read_predictions, write_predictions
+
+
+class TestPredictionWriter(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.root = Path(self._tmp.name)
+        self.frame = pd.DataFrame(
+            {
+                "OPERA": ["Grupo LATAM", "Sky Airline", "Grupo LATAM", "Copa Air", "Sky Airline"],
+                "MES": [1, 1, 2, 2, 3],
+                "TIPOVUELO": ["N", "I", "N", "I", "N"],
+                # read_csv deja columnas object con enteros y textos mezclados.
+                "Vlo-O": [226, "989P", 112, None, 11],
+                "predicted_delay": [0, 1, 0, 1, 1],
+            }
+        )
+
+    def test_parquet_and_feather_round_trip_across_appends(self) -> None:
+        for fmt in ("parquet", "feather"):
+            with self.subTest(fmt=fmt):
+                target = self.root / f"predicciones.{fmt}"
+                with PredictionWriter(target, row_group_size=2) as writer:
+                    writer.write(self.frame.iloc[:3])
+                    writer.write(self.frame.iloc[3:])
+
+                result = read_predictions(target)
+                self.assertEqual(writer.rows_written, len(self.frame))
+                pdt.assert_frame_equal(result.drop(columns="Vlo-O"), self.frame.drop(columns="Vlo-O"))
+                self.assertEqual(result["Vlo-O"].tolist(), ["226", "989P", "112", None, "11"])
+
+    def test_selected_columns_and_partitions(self) -> None:
+        target = self.root / "particionado"
+        write_predictions(
+            self.frame,
+            target,
+            fmt="parquet",
+            columns=["OPERA", "MES", "predicted_delay"],
+            partition_by=["MES", "OPERA"],
+        )
+
+        self.assertTrue((target / "MES=1" / "OPERA=Sky Airline" / "part-00000.parquet").exists())
+        result = read_predictions(target).sort_values(["MES", "OPERA"]).reset_index(drop=True)
+        self.assertEqual(sorted(result.columns), ["MES", "OPERA", "predicted_delay"])
+        self.assertEqual(len(result), len(self.frame))
+        self.assertEqual(result["predicted_delay"].sum(), self.frame["predicted_delay"].sum())
+
+    def test_failed_write_keeps_previous_output(self) -> None:
+        target = self.root / "predicciones.csv"
+        write_predictions(self.frame, target)
+        previous = target.read_bytes()
+
+        with self.assertRaises(KeyError):
+            with PredictionWriter(target, columns=["OPERA", "predicted_delay"]) as writer:
+                writer.write(self.frame.iloc[:2])
+                writer.write(self.frame.iloc[2:].drop(columns="predicted_delay"))
+
+        self.assertEqual(target.read_bytes(), previous)
+        self.assertEqual([path.name for path in self.root.iterdir()], ["predicciones.csv"])
+
+    def test_columnar_format_without_pyarrow_fails_instead_of_writing_csv(self) -> None:
+        with mock.patch("challenge.output.pa", None):
+            with self.assertRaisesRegex(ImportError, "pyarrow"):
+                PredictionWriter(self.root / "predicciones.parquet")
+        self.assertEqual(list(self.root.iterdir()), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
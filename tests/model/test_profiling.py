@@ -0,0 +1,86 @@
+import json
+import pstats
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+from challenge.manifest import RunManifest
+from challenge.profiling import (
+    CPU_STATS_FILENAME,
+    CPU_TEXT_FILENAME,
+    MEMORY_FILENAME,
+    STACKS_FILENAME,
+    PipelineProfiler,
+    StackSampler,
+)
+
+
+def _busy(seconds: float) -> int:
+    deadline = time.perf_counter() + seconds
+    total = 0
+    while time.perf_counter() < deadline:
+        total += 1
+    return total
+
+
+def _allocate() -> list:
+    return [np.ones(200_000) for _ in range(4)]
+
+
+class TestPipelineProfiler(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.root = Path(self._tmp.name)
+
+    def test_sampler_collapses_time_weighted_stacks_from_root_to_leaf(self) -> None:
+        sampler = StackSampler(interval=0.001)
+        sampler.start()
+        _busy(0.2)
+        sampler.stop()
+        path = self.root / STACKS_FILENAME
+        sampler.write_collapsed(path)
+
+        self.assertGreater(sampler.samples, 10)
+        stack, micros = path.read_text().splitlines()[0].rsplit(" ", 1)
+        frames = stack.split(";")
+        self.assertTrue(frames[-1].startswith("_busy (model/test_profiling.py:"))
+        self.assertTrue(any(frame.startswith("test_sampler_collapses") for frame in frames[:-1]))
+        # Cada muestra se pondera por el tiempo transcurrido, no por la cantidad de muestras.
+        self.assertAlmostEqual(int(micros) / 1e6, 0.2, delta=0.05)
+        table = sampler.pstats_table()
+        busy = next(function for function in table if function[2] == "_busy")
+        self.assertAlmostEqual(table[busy][2], table[busy][3])
+
+    def test_profile_files_are_written_next_to_the_manifest(self) -> None:
+        manifest = RunManifest(self.root / "runs", mode="train")
+        manifest.profiler = PipelineProfiler(manifest.directory / "profile", interval=0.002)
+        manifest.profiler.start()
+        with manifest.stage("train/read_csv"):
+            kept = _allocate()
+        with manifest.stage("train/fit"):
+            _busy(0.1)
+        path = manifest.finish()
+
+        written = json.loads(path.read_text())
+        profile_dir = path.parent / "profile"
+        self.assertEqual(written["profile"]["files"]["stacks"], str(profile_dir / STACKS_FILENAME))
+        self.assertGreater(written["profile"]["samples"], 0)
+        stats = pstats.Stats(str(profile_dir / CPU_STATS_FILENAME))
+        self.assertTrue(any(name == "_busy" for _, _, name in stats.stats))
+        self.assertTrue((profile_dir / CPU_TEXT_FILENAME).read_text().strip())
+        memory = json.loads((profile_dir / MEMORY_FILENAME).read_text())
+        self.assertEqual([stage["name"] for stage in memory["stages"]], ["train/read_csv", "train/fit"])
+        read = memory["stages"][0]
+        self.assertGreaterEqual(read["traced_peak_bytes"], sum(array.nbytes for array in kept))
+        self.assertGreaterEqual(read["windows"], 1)
+        top = read["top_allocations"][0]
+        self.assertGreaterEqual(top["size_bytes"], kept[0].nbytes)
+        self.assertTrue(any("test_profiling.py" in frame for frame in top["traceback"]))
+        # Las etapas conservan su medición habitual y el índice marca la ejecución perfilada.
+        self.assertEqual([stage["name"] for stage in written["stages"]], ["train/read_csv", "train/fit"])
+        self.assertTrue(manifest.summary()["profiled"])
@@ -0,0 +1,95 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LogisticRegression
+
+from challenge.sampling import (
+    StratifiedReservoir,
+    combine_inclusion,
+    corrected_threshold,
+    correction_weights,
+    stratified_downsample,
+)
+
+
+class TestStratifiedDownsample(unittest.TestCase):
+    def test_keeps_minority_and_ratio_of_majority(self) -> None:
+        target = np.array([1] * 100 + [0] * 900)
+
+        index, inclusion = stratified_downsample(target, ratio=2.0)
+
+        self.assertEqual(int(target[index].sum()), 100)
+        self.assertEqual(int((target[index] == 0).sum()), 200)
+        self.assertTrue(np.all(np.diff(index) > 0))
+        self.assertEqual(inclusion, {1: 1.0, 0: 200 / 900})
+
+    def test_ratio_above_available_rows_keeps_everything(self) -> None:
+        target = np.array([1] * 40 + [0] * 60)
+
+        index, inclusion = stratified_downsample(target, ratio=4.0)
+
+        self.assertEqual(len(index), 100)
+        self.assertEqual(inclusion[0], 1.0)
+
+
+class TestStratifiedReservoir(unittest.TestCase):
+    def test_sample_is_bounded_and_uniform_across_chunks(self) -> None:
+        rows = 60_000
+        frame = pd.DataFrame({"row": np.arange(rows)})
+        target = (np.arange(rows) % 5 == 0).astype(int)
+        reservoir = StratifiedReservoir(3000, ratio=2.0, seed=7)
+        for start in range(0, rows, 7000):
+            reservoir.add(frame.iloc[start:start + 7000], target[start:start + 7000])
+
+        sample, inclusion = reservoir.sample()
+
+        self.assertEqual(len(sample), 3000)
+        self.assertEqual(sample["row"].nunique(), 3000)
+        self.assertEqual(reservoir.seen, {0: 48_000, 1: 12_000})
+        self.assertAlmostEqual(inclusion[1], 1000 / 12_000)
+        self.assertAlmostEqual(inclusion[0], 2000 / 48_000)
+        # Cada mitad del archivo debe aportar aproximadamente la mitad de la muestra.
+        early = (sample["row"] < rows // 2).mean()
+        self.assertAlmostEqual(early, 0.5, delta=0.05)
+
+    def test_small_input_is_kept_whole(self) -> None:
+        frame = pd.DataFrame({"row": np.arange(10)})
+        reservoir = StratifiedReservoir(100, ratio=1.0)
+        reservoir.add(frame, np.array([0, 1] * 5))
+
+        sample, inclusion = reservoir.sample()
+
+        self.assertListEqual(sorted(sample["row"]), list(range(10)))
+        self.assertEqual(inclusion, {0: 1.0, 1: 1.0})
+
+
+class TestCorrection(unittest.TestCase):
+    def test_weights_and_threshold(self) -> None:
+        inclusion = {0: 0.25, 1: 1.0}
+        weights = correction_weights([0, 0, 1, 1], inclusion)
+
+        self.assertAlmostEqual(weights.sum(), 4.0)
+        self.assertAlmostEqual(weights[0] / weights[2], 4.0)
+        self.assertAlmostEqual(corrected_threshold(inclusion), 0.8)
+        self.assertEqual(combine_inclusion(None, {0: 0.5, 1: 1.0}, {0: 0.5, 1: 0.5}), {0: 0.25, 1: 0.5})
+        self.assertIsNone(combine_inclusion(None, None))
+
+    def test_corrections_preserve_predicted_delay_rate(self) -> None:
+        rng = np.random.default_rng(5)
+        features = rng.normal(size=(40_000, 3))
+        logits = features @ np.array([1.5, -1.0, 0.5]) - 2.0
+        target = (rng.random(40_000) < 1 / (1 + np.exp(-logits))).astype(int)
+        full = LogisticRegression().fit(features, target)
+        expected = full.predict(features).mean()
+
+        index, inclusion = stratified_downsample(target, ratio=1.0)
+        sampled = LogisticRegression().fit(features[index], target[index])
+        weighted = LogisticRegression().fit(
+            features[index], target[index], sample_weight=correction_weights(target[index], inclusion)
+        )
+        shifted = (sampled.predict_proba(features)[:, 1] > corrected_threshold(inclusion)).mean()
+
+        self.assertGreater(sampled.predict(features).mean(), 2 * expected)
+        self.assertAlmostEqual(shifted, expected, delta=0.01)
+        self.assertAlmostEqual(weighted.predict(features).mean(), expected, delta=0.01)
@@ -0,0 +1,68 @@
+import json
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LogisticRegression
+
+from challenge.api.bundle import load_model
+from challenge.segmentation import segment_values, train_segments
+
+
+class TestTrainSegments(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        rng = np.random.default_rng(4)
+        rows = 6000
+        raw = pd.DataFrame({
+            "OPERA": rng.choice(["Grupo LATAM", "Sky Airline", "Copa Air"], rows, p=[0.5, 0.47, 0.03]),
+            "TIPOVUELO": rng.choice(["I", "N"], rows),
+            "MES": rng.integers(1, 13, rows),
+        })
+        self.features = pd.get_dummies(raw, columns=["OPERA", "TIPOVUELO", "MES"]).astype(np.float32)
+        # Los vuelos internacionales se retrasan en una aerolínea y los nacionales en la otra.
+        international = (raw["TIPOVUELO"] == "I").to_numpy()
+        flip = rng.random(rows) < 0.1
+        self.target = pd.Series(np.where(raw["OPERA"] == "Sky Airline", international, ~international) ^ flip).astype(int)
+        positions = np.arange(rows)
+        self.train_index = positions[positions % 3 != 2]
+        self.test_index = positions[positions % 3 == 2]
+        workdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, workdir, True)
+        self.directory = Path(workdir) / "model.segments"
+
+    def test_segment_values_from_one_hot_block(self) -> None:
+        head = self.features.head(4).copy()
+        expected = [column[len("OPERA_"):] for column in head.filter(like="OPERA_").idxmax(axis=1)]
+        head.iloc[0, head.columns.get_indexer(head.filter(like="OPERA_").columns)] = 0.0
+
+        self.assertListEqual(segment_values(head, "OPERA").tolist(), [None] + expected[1:])
+        with self.assertRaises(ValueError):
+            segment_values(self.features, "DIANOM")
+
+    def test_segments_beat_global_model_and_small_segments_fall_back(self) -> None:
+        report = train_segments(
+            self.features,
+            self.target,
+            LogisticRegression(max_iter=1000),
+            "OPERA",
+            self.train_index,
+            self.test_index,
+            str(self.directory),
+            min_rows=500,
+            n_jobs=2,
+        )
+
+        self.assertEqual(set(report["segments"]), {"global", "Grupo LATAM", "Sky Airline"})
+        self.assertIn("Copa Air", report["fallback_segments"])
+        self.assertGreater(report["metrics"]["f1"], report["global_metrics"]["f1"] + 0.2)
+        manifest = json.loads((self.directory / "segments.json").read_text())
+        self.assertEqual(manifest["column"], "OPERA")
+
+        router = load_model(self.directory)
+        holdout = self.features.iloc[self.test_index]
+        accuracy = (router.predict(holdout) == self.target.iloc[self.test_index].to_numpy()).mean()
+        self.assertAlmostEqual(accuracy, report["metrics"]["accuracy"], places=6)
@@ -0,0 +1,106 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pandas.testing as pdt
+
+from challenge.ingest import read_flights
+from challenge.output import read_predictions
+from challenge.synthetic import FlightProfile, generate
+
+
+def _source(rows: int = 4000, seed: int = 5) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    opera = rng.choice(["Grupo LATAM", "Sky Airline", "Copa Air"], rows, p=[0.6, 0.35, 0.05])
+    tipo = np.where(opera == "Copa Air", "I", rng.choice(["N", "I"], rows, p=[0.7, 0.3]))
+    scheduled = pd.Timestamp("2017-01-01") + pd.to_timedelta(rng.integers(0, 365 * 96, rows) * 15, unit="min")
+    # Sky Airline se retrasa bastante más que el resto.
+    gap = np.where(opera == "Sky Airline", rng.integers(0, 60, rows), rng.integers(-5, 20, rows))
+    operated = scheduled + pd.to_timedelta(gap, unit="min")
+    flight = np.where(
+        opera == "Copa Air", np.char.add("CM", rng.integers(1, 4, rows).astype(str)), rng.integers(1, 300, rows).astype(str)
+    )
+    weekdays = np.array(["Lunes", "Martes", "Miercoles", "Jueves", "Viernes", "Sabado", "Domingo"])
+    frame = pd.DataFrame({
+        "Fecha-I": scheduled,
+        "Vlo-I": flight,
+        "Ori-I": "SCEL",
+        "Fecha-O": operated,
+        "DIA": operated.day,
+        "MES": operated.month,
+        "AÑO": operated.year,
+        "DIANOM": weekdays[operated.weekday],
+        "TIPOVUELO": tipo,
+        "OPERA": opera,
+        "SIGLADES": np.where(tipo == "I", rng.choice(["Lima", "Miami"], rows), rng.choice(["Arica", "Calama"], rows)),
+    })
+    for col in ("Vlo-I", "Ori-I", "DIANOM", "TIPOVUELO", "OPERA", "SIGLADES"):
+        frame[col] = frame[col].astype("category")
+    return frame
+
+
+class TestFlightProfile(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.root = Path(self._tmp.name)
+        self.source = _source()
+        self.profile = FlightProfile.fit(self.source, min_rows=40)
+
+    def test_generated_flights_follow_the_learned_distributions(self) -> None:
+        sample = self.profile.sample(60_000, np.random.default_rng(0))
+
+        self.assertEqual(sample.columns.tolist(), self.source.columns.tolist())
+        for col in ("OPERA", "TIPOVUELO", "SIGLADES", "MES"):
+            expected = self.source[col].value_counts(normalize=True)
+            observed = sample[col].value_counts(normalize=True).reindex(expected.index, fill_value=0)
+            self.assertLess((expected - observed).abs().sum() / 2, 0.02, col)
+        # Las rutas solo combinan valores observados juntos y los vuelos Copa conservan su numeración.
+        pairs = set(map(tuple, sample[["TIPOVUELO", "SIGLADES"]].astype(str).drop_duplicates().to_numpy()))
+        self.assertEqual(pairs, {("I", "Lima"), ("I", "Miami"), ("N", "Arica"), ("N", "Calama")})
+        self.assertTrue(sample.loc[sample["OPERA"] == "Copa Air", "Vlo-I"].astype(str).str.startswith("CM").all())
+
+        gap = (sample["Fecha-O"] - sample["Fecha-I"]).dt.total_seconds() / 60
+        source_gap = (self.source["Fecha-O"] - self.source["Fecha-I"]).dt.total_seconds() / 60
+        for opera in ("Grupo LATAM", "Sky Airline"):
+            expected = (source_gap[self.source["OPERA"] == opera] > 15).mean()
+            self.assertAlmostEqual((gap[sample["OPERA"] == opera] > 15).mean(), expected, delta=0.03)
+        # Copa Air no alcanza ``min_rows`` por mes y usa su distribución anual.
+        copa = [group for group in self.profile.data["gap_groups"] if group["level"] == ["OPERA", "TIPOVUELO"]]
+        self.assertTrue(copa)
+
+        # El calendario se deriva de la fecha a la que corresponde en el original (aquí, Fecha-O).
+        self.assertEqual(self.profile.data["calendar_source"], "Fecha-O")
+        self.assertTrue((sample["DIA"] == sample["Fecha-O"].dt.day).all())
+        self.assertTrue((sample["MES"] == sample["Fecha-O"].dt.month).all())
+        self.assertTrue((sample["AÑO"] == sample["Fecha-O"].dt.year).all())
+        self.assertTrue((sample["DIANOM"].cat.codes == sample["Fecha-O"].dt.weekday).all())
+
+    def test_output_depends_on_seed_and_chunks_but_not_on_processes(self) -> None:
+        path = self.profile.save(self.root / "perfil.json")
+        profile = FlightProfile.load(path)
+        single = generate(profile, 2500, self.root / "uno.csv", seed=7, chunk_rows=600, n_jobs=1)
+        generate(profile, 2500, self.root / "dos.csv", seed=7, chunk_rows=600, n_jobs=2)
+        generate(profile, 2500, self.root / "otra.csv", seed=8, chunk_rows=600, n_jobs=1)
+        generate(profile, 2500, self.root / "vuelos.parquet", seed=7, chunk_rows=600, n_jobs=2)
+
+        self.assertEqual(single["chunks"], 5)
+        self.assertEqual((self.root / "uno.csv").read_bytes(), (self.root / "dos.csv").read_bytes())
+        self.assertNotEqual((self.root / "uno.csv").read_bytes(), (self.root / "otra.csv").read_bytes())
+        # El CSV se lee con el esquema del pipeline y coincide con la salida columnar.
+        flights, stats = read_flights(self.root / "uno.csv")
+        self.assertEqual(stats["rows"], 2500)
+        self.assertFalse(flights[["Fecha-I", "Fecha-O"]].isna().any().any())
+        columnar = read_predictions(self.root / "vuelos.parquet")
+        pdt.assert_frame_equal(
+            flights.astype({col: str for col in flights.select_dtypes("category")}),
+            columnar.astype({col: str for col in columnar.select_dtypes("category")}),
+            check_dtype=False,
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
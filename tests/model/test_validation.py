@@ -0,0 +1,59 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LogisticRegression
+
+from challenge.validation import cross_validate, stratified_folds, time_folds
+
+
+class TestCrossValidation(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        rng = np.random.default_rng(11)
+        rows = 600
+        self.features = pd.DataFrame(
+            rng.integers(0, 2, size=(rows, 6)).astype(float), columns=[f"OPERA_{i}" for i in range(6)]
+        )
+        noise = rng.random(rows) < 0.15
+        self.target = pd.Series(((self.features["OPERA_0"] == 1) ^ noise).astype(int), name="delay")
+        self.timestamps = pd.Series(pd.date_range("2017-01-01", periods=rows, freq="h")).sample(
+            frac=1.0, random_state=3
+        ).reset_index(drop=True)
+
+    def test_stratified_folds_partition_rows_and_keep_class_balance(self) -> None:
+        folds = stratified_folds(self.target, n_splits=4)
+
+        tested = np.sort(np.concatenate([test for _, test in folds]))
+        np.testing.assert_array_equal(tested, np.arange(len(self.target)))
+        for train, test in folds:
+            self.assertEqual(len(np.intersect1d(train, test)), 0)
+            self.assertAlmostEqual(self.target.iloc[test].mean(), self.target.mean(), delta=0.02)
+
+    def test_time_folds_only_train_on_the_past(self) -> None:
+        folds = time_folds(self.timestamps, n_splits=3)
+
+        self.assertEqual(len(folds), 3)
+        for train, test in folds:
+            self.assertLess(self.timestamps.iloc[train].max(), self.timestamps.iloc[test].min())
+        self.assertGreater(len(folds[-1][0]), len(folds[0][0]))
+
+    def test_parallel_report_matches_serial(self) -> None:
+        folds = stratified_folds(self.target, n_splits=4)
+        estimator = LogisticRegression(max_iter=1000, random_state=1)
+
+        serial = cross_validate(self.features, self.target, estimator, folds, n_jobs=1)
+        parallel = cross_validate(self.features, self.target, estimator, folds, n_jobs=2)
+
+        self.assertEqual(parallel["jobs"], 2)
+        self.assertEqual(len(parallel["per_fold"]), 4)
+        self.assertEqual(serial["metrics"], parallel["metrics"])
+        self.assertGreater(serial["metrics"]["roc_auc"]["mean"], 0.75)
+        self.assertEqual(
+            [fold["confusion_matrix"] for fold in serial["per_fold"]],
+            [fold["confusion_matrix"] for fold in parallel["per_fold"]],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
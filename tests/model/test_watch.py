@@ -0,0 +1,108 @@
+import json
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+import pandas as pd
+import pandas.testing as pdt
+from sklearn.linear_model import LogisticRegression
+
+from challenge.api.bundle import write_bundle
+from challenge.model import DelayModel
+from challenge.watch import CHECKPOINT_FILENAME, ScoringDaemon
+
+
+class _Crash(Exception):
+    pass
+
+
+class _CrashingModel:
+    """Delega en DelayModel y falla en la llamada a predict número ``fail_at``."""
+
+    def __init__(self, model: DelayModel, fail_at: int) -> None:
+        self._model = model
+        self._calls = 0
+        self._fail_at = fail_at
+
+    def __getattr__(self, name):
+        return getattr(self._model, name)
+
+    def predict(self, features):
+        self._calls += 1
+        if self._calls == self._fail_at:
+            raise _Crash("corte simulado")
+        return self._model.predict(features)
+
+
+class TestScoringDaemon(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        data_path = Path(__file__).resolve().parents[2] / "data" / "data.csv"
+        cls._raw = pd.read_csv(data_path, nrows=2500, low_memory=False)
+
+    def setUp(self) -> None:
+        super().setUp()
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        root = Path(self._tmp.name)
+        self.inbox = root / "entrantes"
+        self.outbox = root / "predicciones"
+        self.inbox.mkdir()
+
+        self.model = DelayModel()
+        features, target = self.model.preprocess(self._raw, target_column="delay")
+        self.model.artifact_path = str(root / "model.bundle")
+        write_bundle(self.model.artifact_path, LogisticRegression(max_iter=1000).fit(features, target), features.columns)
+        self.model.load_artifact()
+
+    def _drop(self, name: str, frame: pd.DataFrame) -> Path:
+        path = self.inbox / name
+        frame.to_csv(path, index=False)
+        os.utime(path, (0, 0))
+        return path
+
+    def _daemon(self, model=None) -> ScoringDaemon:
+        return ScoringDaemon(model or self.model, self.inbox, self.outbox, chunksize=700, settle_seconds=0)
+
+    def _expected(self, frame: pd.DataFrame) -> list:
+        return self.model.predict(self.model.preprocess(frame))
+
+    def test_scores_new_and_changed_files_once(self) -> None:
+        first = self._drop("a.csv", self._raw.iloc[:1500])
+        self._drop("b.csv", self._raw.iloc[1500:])
+
+        metrics = self._daemon().run(once=True)
+
+        self.assertEqual((metrics["files"], metrics["rows"], metrics["backlog_files"]), (2, 2500, 0))
+        output = pd.read_csv(self.outbox / "a.predictions.csv")
+        self.assertEqual(output["predicted_delay"].tolist(), self._expected(self._raw.iloc[:1500]))
+        self.assertListEqual(list(output.columns), list(self._raw.columns) + ["predicted_delay"])
+        self.assertEqual(self._daemon().pending(), [])
+
+        self._drop("a.csv", self._raw.iloc[:300])
+        self.assertEqual(self._daemon().pending(), [first])
+        self._daemon().run(once=True)
+        self.assertEqual(len(pd.read_csv(self.outbox / "a.predictions.csv")), 300)
+        self.assertFalse(any(path.name.endswith(".parts") for path in self.outbox.iterdir()))
+
+    def test_resumes_from_the_last_completed_chunk_after_a_crash(self) -> None:
+        self._drop("a.csv", self._raw)
+
+        crashing = self._daemon(_CrashingModel(self.model, fail_at=3))
+        with self.assertRaises(_Crash):
+            crashing.score_file(self.inbox / "a.csv")
+
+        checkpoint = json.loads((self.outbox / CHECKPOINT_FILENAME).read_text())
+        self.assertEqual(checkpoint["files"]["a.csv"]["chunks"], 2)
+        self.assertEqual(checkpoint["files"]["a.csv"]["rows"], 1400)
+        self.assertFalse((self.outbox / "a.predictions.csv").exists())
+
+        resumed = self._daemon()
+        resumed.run(once=True)
+
+        self.assertEqual(resumed.snapshot()["rows"], 1100)
+        output = pd.read_csv(self.outbox / "a.predictions.csv")
+        self.assertEqual(output["predicted_delay"].tolist(), self._expected(self._raw))
+        pdt.assert_series_equal(output["Vlo-I"].astype(str), self._raw["Vlo-I"].astype(str))